@@ -0,0 +1,116 @@
+"""
+Ventas por mes, margen y top de productos: por filas contra por columnas.
+
+- por filas: como se hacía antes, obtener_ventas (un dict por venta y por
+  línea), filtro de fechas con parsear_fecha y sumas en bucles de Python.
+- por columnas: agregaciones_reportes.resumen_ventas (cantidad, montos y el
+  día como entero directo del cursor, agrupados sin filas; con NumPy si está
+  instalado).
+
+Los dos deben dar los mismos totales; se verifica antes de medir.
+
+Uso:
+    python benchmarks/bench_agregaciones.py [--tamano 1m] [--base archivo.db] [--ruta carpeta]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.controllers import agregaciones_reportes  # noqa: E402
+from src.controllers.reportes_exportacion import filtrar_por_fecha, parsear_fecha  # noqa: E402
+from src.database.database_manager import DatabaseManager  # noqa: E402
+from suite import ruta_dataset  # noqa: E402
+
+TOP = 20
+
+
+def por_filas(db, inicio, fin):
+    """Ventas, costo y unidades por mes y por producto recorriendo dicts."""
+    precios = {p['id']: p['precio_compra'] or 0 for p in db.obtener_productos()}
+    ventas = filtrar_por_fecha(db.obtener_ventas(historico=True), inicio, fin)
+    por_mes, por_producto = {}, {}
+    for venta in ventas:
+        if venta['estado'] == 'Anulado':
+            continue
+        fecha = parsear_fecha(venta['fecha'])
+        mes = fecha.year * 100 + fecha.month
+        for detalle in venta['detalles']:
+            monto = detalle['cantidad'] * detalle['precio_unitario']
+            costo = detalle['cantidad'] * precios.get(detalle['producto_id'], 0)
+            for grupos, clave in ((por_mes, mes), (por_producto, detalle['producto_id'] or 0)):
+                suma = grupos.setdefault(clave, [0.0, 0.0, 0])
+                suma[0] += monto
+                suma[1] += costo
+                suma[2] += detalle['cantidad']
+    top = sorted(por_producto.items(), key=lambda item: -item[1][0])[:TOP]
+    return {
+        'ventas': sum(s[0] for s in por_mes.values()),
+        'costo': sum(s[1] for s in por_mes.values()),
+        'meses': len(por_mes),
+        'top': [producto_id for producto_id, _ in top],
+    }
+
+
+def por_columnas(db, inicio, fin):
+    resumen = agregaciones_reportes.resumen_ventas(db, inicio, fin, 'mes', TOP)
+    return {
+        'ventas': resumen['ventas'],
+        'costo': resumen['costo'],
+        'meses': len(resumen['por_periodo']),
+        'top': [p['producto_id'] for p in resumen['top_productos']],
+    }
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reportes agregados por filas y por columnas")
+    parser.add_argument('--tamano', default='1m', help="Base generada a usar: 10k, 100k o 1m")
+    parser.add_argument('--base', help="Base de datos a usar en lugar de una generada")
+    parser.add_argument('--ruta', default=os.path.join(tempfile.gettempdir(), 'inventarios_bench'),
+                        help="Carpeta donde se guardan las bases generadas")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    os.makedirs(args.ruta, exist_ok=True)
+    ruta = args.base or ruta_dataset(args.ruta, args.tamano)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(ruta)
+    db.instrumentacion.activa = False
+    fechas = db.execute_query(f'''
+        SELECT MIN({agregaciones_reportes.dia_sql('fecha')}) AS desde,
+               MAX({agregaciones_reportes.dia_sql('fecha')}) AS hasta FROM ventas
+    ''', historico=True)[0]
+    rangos = [
+        ('todo el historial', date.fromordinal(fechas['desde']), date.fromordinal(fechas['hasta'])),
+        ('último año', date.fromordinal(fechas['hasta'] - 364), date.fromordinal(fechas['hasta'])),
+    ]
+    motor = 'NumPy' if agregaciones_reportes._numpy() else 'Python (sin NumPy)'
+    print(f"{os.path.basename(ruta)} — motor por columnas: {motor}\n")
+    print(f"{'Rango':<18} {'por filas s':>12} {'por columnas s':>15} {'x':>6}")
+    for nombre, desde, hasta in rangos:
+        inicio, fin = desde.strftime('%d/%m/%Y'), hasta.strftime('%d/%m/%Y')
+        t_filas, filas = medir(lambda: por_filas(db, inicio, fin), args.repeticiones)
+        t_columnas, columnas = medir(lambda: por_columnas(db, inicio, fin), args.repeticiones)
+        iguales = (abs(filas['ventas'] - columnas['ventas']) < 0.01 and abs(filas['costo'] - columnas['costo']) < 0.01
+                   and filas['meses'] == columnas['meses'] and filas['top'] == columnas['top'])
+        print(f"{nombre:<18} {t_filas:>12.2f} {t_columnas:>15.2f} {t_filas / t_columnas:>6.1f}"
+              f"{'' if iguales else '   ¡resultados distintos!'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Compara filas/segundo de movimientos de stock: un commit por fila contra la
+cola de escritura en lotes.
+
+Uso:
+    python benchmarks/bench_cola_escritura.py [--filas 2000] [--ruta carpeta]
+
+Usar --ruta para medir en el disco real (por ejemplo la carpeta de OneDrive),
+donde cada commit cuesta un fsync.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database_manager import DatabaseManager  # noqa: E402
+
+
+def preparar(carpeta, nombre):
+    db = DatabaseManager(os.path.join(carpeta, nombre))
+    producto_id = db.crear_producto('BENCH-1', 'Producto benchmark', 'Pruebas', 10.0, 25.0)
+    return db, producto_id
+
+
+def por_fila(db, producto_id, filas):
+    """Comportamiento anterior: una conexión y un commit por movimiento."""
+    query = '''
+        INSERT INTO movimientos_stock (producto_id, tipo, cantidad, motivo)
+        VALUES (?, ?, ?, ?)
+    '''
+    t0 = time.perf_counter()
+    for _ in range(filas):
+        db.execute_insert(query, (producto_id, 'entrada', 1, 'benchmark'))
+    return time.perf_counter() - t0
+
+
+def en_lotes(db, producto_id, filas):
+    """Cola de escritura: se mide hasta que la última fila está confirmada."""
+    t0 = time.perf_counter()
+    for _ in range(filas):
+        db.registrar_movimiento_stock(producto_id, 'entrada', 1, 'benchmark')
+    db.cola_escritura.vaciar()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la cola de escritura")
+    parser.add_argument('--filas', type=int, default=2000)
+    parser.add_argument('--ruta', help="Carpeta donde crear las bases de prueba (por defecto una temporal)")
+    args = parser.parse_args()
+
+    carpeta = args.ruta or tempfile.mkdtemp(prefix='bench_cola_')
+    os.makedirs(carpeta, exist_ok=True)
+
+    db, producto_id = preparar(carpeta, 'bench_por_fila.db')
+    t_fila = por_fila(db, producto_id, args.filas)
+
+    db, producto_id = preparar(carpeta, 'bench_lotes.db')
+    t_lote = en_lotes(db, producto_id, args.filas)
+    escritas = len(db.obtener_movimientos_stock(producto_id))
+    lotes = db.cola_escritura.lotes
+
+    print(f"Filas: {args.filas}  (bases en {carpeta})")
+    print(f"{'Commit por fila':<20} {t_fila:>8.3f} s {args.filas / t_fila:>12,.0f} filas/s")
+    print(f"{'Cola en lotes':<20} {t_lote:>8.3f} s {args.filas / t_lote:>12,.0f} filas/s  ({lotes} lotes)")
+    print(f"Aceleración: x{t_fila / t_lote:.1f}")
+    if escritas != args.filas:
+        print(f"ERROR: se esperaban {args.filas} movimientos y hay {escritas}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Memoria y tiempo de carga de un resultado grande en cada forma de fila:
+dict por fila (execute_query), filas compactas (execute_query_filas), modelos
+con __slots__ (a_modelos) y columnas con arreglos (execute_query_columnas).
+
+Consulta: movimientos de stock con el nombre del producto (los campos del
+modelo MovimientoStock) sobre una base generada de 1m filas.
+
+Para cada forma se reporta la memoria que retiene el resultado y el pico
+durante la carga (tracemalloc): una forma compacta que se arma a partir de
+una lista intermedia retiene poco pero puede tener un pico alto.
+
+Uso:
+    python benchmarks/bench_filas.py [--filas 100000] [--base archivo.db] [--ruta carpeta]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database_manager import DatabaseManager  # noqa: E402
+from src.database.filas import a_modelos  # noqa: E402
+from src.models.models import MovimientoStock  # noqa: E402
+from suite import ruta_dataset  # noqa: E402
+
+CONSULTA = '''
+    SELECT m.id, m.producto_id, m.tipo, m.cantidad, m.motivo, m.fecha, p.nombre AS producto_nombre
+    FROM movimientos_stock m
+    JOIN productos p ON m.producto_id = p.id
+    ORDER BY m.id
+    LIMIT ?
+'''
+
+
+def medir(funcion):
+    """(MB retenidos por el resultado, MB de pico durante la carga, segundos) de una carga."""
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - t0
+    gc.collect()
+    retenido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return retenido / 1024 / 1024, pico / 1024 / 1024, segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria por forma de fila")
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--base', help="Base de datos a usar (por defecto una generada de 1m filas)")
+    parser.add_argument('--ruta', default=os.path.join(tempfile.gettempdir(), 'inventarios_bench'),
+                        help="Carpeta donde se guardan las bases generadas")
+    args = parser.parse_args()
+
+    os.makedirs(args.ruta, exist_ok=True)
+    ruta = args.base or ruta_dataset(args.ruta, '1m')
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(ruta)
+    # Sin instrumentación: se mide solo el resultado
+    db.instrumentacion.activa = False
+    parametros = (args.filas,)
+    muestra = db.execute_query_filas(CONSULTA, parametros)
+    filas, columnas = len(muestra), len(muestra.columnas)
+    del muestra
+
+    formas = [
+        ('dict por fila (execute_query)', lambda: db.execute_query(CONSULTA, parametros)),
+        ('filas compactas', lambda: db.execute_query_filas(CONSULTA, parametros)),
+        ('modelos con __slots__', lambda: a_modelos(db.execute_query_filas(CONSULTA, parametros),
+                                                    MovimientoStock)),
+        ('columnas (arreglos)', lambda: db.execute_query_columnas(CONSULTA, parametros)),
+    ]
+    print(f"{filas:,} filas de movimientos de stock ({columnas} columnas)\n")
+    print(f"{'Forma':<32} {'MB':>8} {'MB/100k filas':>14} {'bytes/fila':>11} {'pico MB':>8} {'carga s':>8}")
+    base = None
+    for nombre, funcion in formas:
+        mb, pico, segundos = medir(funcion)
+        base = base or mb
+        print(f"{nombre:<32} {mb:>8.1f} {mb * 100000 / filas:>14.1f} {mb * 1024 * 1024 / filas:>11.0f} "
+              f"{pico:>8.1f} {segundos:>8.2f}   {mb / base:>5.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Mide el respaldo en caliente sobre una base de datos de tamaño dado: tiempo de
+copia con la API de backup, tiempo de compresión y cuánto se retrasan las
+escrituras que la aplicación hace mientras se copia.
+
+Uso:
+    python benchmarks/bench_respaldo.py [--mb 1024] [--ruta carpeta]
+
+La base de prueba se genera una sola vez por tamaño y se reutiliza en las
+siguientes ejecuciones (se guarda en --ruta o en una carpeta temporal).
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database_manager import DatabaseManager  # noqa: E402
+from src.database import respaldo  # noqa: E402
+
+
+def generar(ruta, megas):
+    """Llena movimientos_stock hasta alcanzar aproximadamente `megas` MB."""
+    if os.path.exists(ruta) and os.path.getsize(ruta) >= megas * 1024 * 1024 * 0.95:
+        return
+    db = DatabaseManager(ruta)
+    producto_id = db.crear_producto('BENCH-1', 'Producto benchmark', 'Pruebas', 10.0, 25.0)
+    conn = sqlite3.connect(ruta)
+    motivo = 'benchmark de respaldo ' * 4
+    while os.path.getsize(ruta) < megas * 1024 * 1024:
+        with conn:
+            conn.executemany(
+                'INSERT INTO movimientos_stock (producto_id, tipo, cantidad, motivo) VALUES (?, ?, ?, ?)',
+                ((producto_id, 'entrada', 1, motivo) for _ in range(50000)))
+    conn.close()
+
+
+def escritor(ruta, detener, latencias):
+    """Simula ventas: un commit pequeño cada 10 ms mientras dura el respaldo."""
+    conn = sqlite3.connect(ruta, timeout=30)
+    while not detener.is_set():
+        t0 = time.perf_counter()
+        with conn:
+            conn.execute("INSERT INTO movimientos_stock (producto_id, tipo, cantidad, motivo) "
+                         "VALUES (1, 'salida', 1, 'venta simulada')")
+        latencias.append(time.perf_counter() - t0)
+        time.sleep(0.01)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del respaldo en caliente")
+    parser.add_argument('--mb', type=int, default=1024, help="Tamaño de la base de prueba")
+    parser.add_argument('--ruta', help="Carpeta de trabajo (por defecto una temporal)")
+    args = parser.parse_args()
+
+    carpeta = args.ruta or os.path.join(tempfile.gettempdir(), 'bench_respaldo')
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, f'bench_{args.mb}mb.db')
+
+    t0 = time.perf_counter()
+    generar(ruta, args.mb)
+    print(f"Base de prueba: {ruta} ({os.path.getsize(ruta) / 1024 / 1024:.0f} MB, "
+          f"{time.perf_counter() - t0:.1f} s en prepararla)")
+
+    detener = threading.Event()
+    latencias = []
+    hilo = threading.Thread(target=escritor, args=(ruta, detener, latencias))
+    hilo.start()
+    try:
+        resultado = respaldo.crear_respaldo(ruta, os.path.join(carpeta, 'respaldos'))
+    finally:
+        detener.set()
+        hilo.join()
+
+    latencias.sort()
+    print(f"{'Copia (API backup)':<24} {resultado['segundos_copia']:>8.2f} s  ({resultado['reinicios']} reinicios)")
+    print(f"{'Compresión gzip':<24} {resultado['segundos_compresion']:>8.2f} s  "
+          f"({resultado['bytes_db'] / 1024 / 1024:.0f} MB → {resultado['bytes_gz'] / 1024 / 1024:.0f} MB)")
+    if latencias:
+        p99 = latencias[int(len(latencias) * 0.99) - 1 if len(latencias) > 1 else 0]
+        print(f"{'Escrituras concurrentes':<24} {len(latencias):>8} commits, "
+              f"p50 {latencias[len(latencias) // 2] * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, "
+              f"máx {latencias[-1] * 1000:.1f} ms")
+    os.remove(resultado['ruta'])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
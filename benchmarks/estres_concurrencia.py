@@ -0,0 +1,426 @@
+"""
+Prueba de estrés de varias terminales escribiendo en la misma base de datos.
+
+Lanza N procesos; cada uno abre su propio InventarioController sobre el mismo
+archivo y ejecuta una mezcla de ventas, compras, anulaciones y movimientos
+manuales de caja durante --duracion segundos, como varias cajas a la vez.
+
+Mide por operación: ejecuciones por segundo, latencia p50/p99, errores
+"database is locked" y reintentos. Los reintentos son los de la política de
+bloqueos de DatabaseManager (src/database/bloqueos.py), que también informa
+cuánto se esperó el bloqueo de escritura; con --reintentos N la terminal
+además repite N veces una operación que falló por bloqueo, como el cajero que
+vuelve a presionar el botón.
+
+Al terminar verifica los invariantes sobre lo escrito durante la prueba:
+- stock: stock_actual de cada producto cambió lo mismo que la suma de sus
+  movimientos de stock (entradas - salidas),
+- PEPS: cantidad_disponible de los lotes bajó lo mismo que lo vendido (las
+  anulaciones devuelven stock pero no lotes, así que su cantidad se descuenta),
+- caja: la cadena saldo_anterior/saldo_nuevo es continua y cada venta, compra
+  y anulación nueva tiene su movimiento de caja.
+
+Uso:
+    python benchmarks/estres_concurrencia.py [--procesos 4] [--duracion 20] [--base archivo.db]
+        [--modo-diario delete|wal] [--reintentos 0] [--salida resultados.json]
+
+Sin --base se genera una base de 10k filas (src/utils/generador_datos.py).
+Se trabaja siempre sobre una copia. Termina con código 1 si algún invariante
+no se cumple.
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.bloqueos import MENSAJE_OCUPADA  # noqa: E402
+
+# Proporción de cada operación en la mezcla
+MEZCLA = (('venta', 0.60), ('compra', 0.15), ('anulacion', 0.10), ('caja', 0.15))
+# Productos que venden las terminales (los más vendidos: donde hay más choques)
+PRODUCTOS_EN_PRUEBA = 40
+STOCK_INICIAL_PRUEBA = 400
+TOLERANCIA_MONTO = 0.005
+
+
+def _es_bloqueo(mensaje: str) -> bool:
+    mensaje = mensaje.lower()
+    return 'locked' in mensaje or 'busy' in mensaje or MENSAJE_OCUPADA in mensaje
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+# ---------------------------------------------------------------- preparación
+
+def preparar_base(args, carpeta) -> str:
+    """Copia (o genera) la base de la prueba, fija el modo del diario y repone stock de los productos en prueba."""
+    from src.utils import generador_datos
+
+    ruta = os.path.join(carpeta, 'inventarios.db')
+    if args.base:
+        shutil.copy2(args.base, ruta)
+    else:
+        print("Generando base de datos 10k...")
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            generador_datos.generar(ruta, '10k', args.semilla)
+
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    try:
+        conn.execute(f'PRAGMA journal_mode = {args.modo_diario}')
+    finally:
+        conn.close()
+
+    # Un lote grande de cada producto en prueba para que las ventas no se rechacen por stock
+    from src.controllers.inventario_controller import InventarioController
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = InventarioController(ruta)
+        productos = controller.db.execute_query('''
+            SELECT p.id FROM productos p JOIN ventas_detalle d ON d.producto_id = p.id
+            WHERE p.activo = 1 GROUP BY p.id ORDER BY SUM(d.cantidad) DESC LIMIT ?
+        ''', (PRODUCTOS_EN_PRUEBA,))
+        proveedor_id = controller.db.execute_query('SELECT MIN(id) AS id FROM proveedores')[0]['id']
+        fecha = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        for producto in productos:
+            controller.registrar_compra(producto['id'], STOCK_INICIAL_PRUEBA, 5.0, proveedor_id,
+                                        'ESTRES-INICIAL', fecha)
+        controller.db.cola_escritura.cerrar()
+    return ruta
+
+
+def foto(ruta) -> dict:
+    """Estado de la base antes de la prueba, para comparar solo lo escrito durante ella."""
+    conn = sqlite3.connect(ruta)
+    try:
+        return {
+            'stock': dict(conn.execute('SELECT id, stock_actual FROM productos')),
+            'movimientos': dict(conn.execute(_NETO_MOVIMIENTOS)),
+            'disponible': dict(conn.execute(_DISPONIBLE_LOTES)),
+            'anuladas': {fila[0] for fila in conn.execute("SELECT id FROM ventas WHERE estado = 'Anulado'")},
+            'max_venta': conn.execute('SELECT COALESCE(MAX(id), 0) FROM ventas').fetchone()[0],
+            'max_compra': conn.execute('SELECT COALESCE(MAX(id), 0) FROM compras').fetchone()[0],
+            'max_caja': conn.execute('SELECT COALESCE(MAX(id), 0) FROM movimientos_caja').fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+
+_NETO_MOVIMIENTOS = '''
+    SELECT producto_id, SUM(CASE tipo WHEN 'entrada' THEN cantidad WHEN 'salida' THEN -cantidad ELSE 0 END)
+    FROM movimientos_stock GROUP BY producto_id
+'''
+_DISPONIBLE_LOTES = '''
+    SELECT producto_id, SUM(COALESCE(cantidad_disponible, cantidad)) FROM compras GROUP BY producto_id
+'''
+
+
+# ------------------------------------------------------------------ terminales
+
+def terminal(numero, ruta, args, barrera, resultados):
+    """Proceso de una terminal: ejecuta la mezcla de operaciones y envía sus mediciones."""
+    from src.controllers.inventario_controller import InventarioController
+
+    rng = random.Random(args.semilla * 1000 + numero)
+    nulo = open(os.devnull, 'w')
+    # El controlador imprime mensajes de depuración en cada venta
+    with contextlib.redirect_stdout(nulo), contextlib.redirect_stderr(nulo):
+        controller = InventarioController(ruta)
+        db = controller.db
+        productos = [(p['id'], p['precio_venta']) for p in db.execute_query(
+            'SELECT id, precio_venta FROM productos WHERE activo = 1 AND stock_actual >= ? ORDER BY id',
+            (STOCK_INICIAL_PRUEBA,))]
+        clientes = [c['id'] for c in db.execute_query('SELECT id FROM clientes ORDER BY id LIMIT 200')]
+        proveedores = [p['id'] for p in db.execute_query('SELECT id FROM proveedores ORDER BY id')]
+        propias = []  # ventas de esta terminal que se pueden anular
+
+        def venta():
+            lineas = rng.choices((1, 2, 3, 5), weights=(45, 30, 15, 10))[0]
+            carrito = [{'producto_id': producto_id, 'cantidad': rng.randint(1, 3),
+                        'precio_unitario': precio or 10.0}
+                       for producto_id, precio in rng.sample(productos, lineas)]
+            exito, mensaje = controller.registrar_venta_con_carrito(
+                rng.choice(clientes), carrito, datetime.now().strftime('%d/%m/%Y %H:%M:%S'))
+            if exito and 'ID: ' in mensaje:
+                propias.append(int(mensaje.split('ID: ')[1].split('\n')[0]))
+            return exito, mensaje
+
+        def compra():
+            producto_id = rng.choice(productos)[0]
+            return controller.registrar_compra(
+                producto_id, rng.randint(12, 48), round(rng.uniform(2, 40), 2), rng.choice(proveedores),
+                f"ESTRES-{numero}-{rng.randrange(10 ** 6)}", datetime.now().strftime('%d/%m/%Y %H:%M:%S'))
+
+        def anulacion():
+            if not propias:
+                return None
+            return controller.anular_venta(propias.pop(rng.randrange(len(propias))))
+
+        def caja():
+            if rng.random() < 0.7:
+                return controller.registrar_movimiento_caja(
+                    'EGRESO', 'GASTO_OPERATIVO', f"Gasto terminal {numero}", round(rng.uniform(5, 150), 2))
+            return controller.registrar_movimiento_caja(
+                'INGRESO', 'OTRO', f"Ingreso terminal {numero}", round(rng.uniform(5, 150), 2))
+
+        operaciones = {'venta': venta, 'compra': compra, 'anulacion': anulacion, 'caja': caja}
+        nombres = [nombre for nombre, _ in MEZCLA]
+        pesos = [peso for _, peso in MEZCLA]
+        medicion = {nombre: {'latencias_ms': [], 'ok': 0, 'rechazadas': 0, 'bloqueos': 0,
+                             'reintentos': 0, 'errores': 0, 'ultimo_error': ''} for nombre in nombres}
+
+        barrera.wait()
+        fin = time.perf_counter() + args.duracion
+        while time.perf_counter() < fin:
+            nombre = rng.choices(nombres, pesos)[0]
+            m = medicion[nombre]
+            t0 = time.perf_counter()
+            for intento in range(args.reintentos + 1):
+                resultado = operaciones[nombre]()
+                if resultado is None or resultado[0] or not _es_bloqueo(resultado[1]):
+                    break
+                if intento < args.reintentos:
+                    m['reintentos'] += 1
+                    time.sleep(rng.uniform(0.005, 0.05))
+            if resultado is None:
+                continue
+            m['latencias_ms'].append((time.perf_counter() - t0) * 1000)
+            exito, mensaje = resultado
+            if exito:
+                m['ok'] += 1
+            elif _es_bloqueo(mensaje):
+                m['bloqueos'] += 1
+                m['ultimo_error'] = mensaje
+            elif 'insuficiente' in mensaje.lower():
+                m['rechazadas'] += 1
+            else:
+                m['errores'] += 1
+                m['ultimo_error'] = mensaje
+
+        # Los movimientos de stock encolados se escriben antes de salir; vaciar()
+        # devuelve el lote a la cola si la base está bloqueada
+        reintentos_cola = 0
+        while True:
+            try:
+                db.cola_escritura.vaciar()
+                break
+            except sqlite3.Error:
+                reintentos_cola += 1
+                time.sleep(0.05)
+        db.cola_escritura.cerrar()
+    resultados.put((numero, medicion, reintentos_cola, db.bloqueos.resumen()))
+
+
+def _sumar_esperas(resumenes) -> list:
+    """Suma por operación las métricas de PoliticaBloqueos.resumen() de todas las terminales."""
+    por_operacion = {}
+    for resumen in resumenes:
+        for fila in resumen:
+            total = por_operacion.setdefault(fila['operacion'], {
+                'operacion': fila['operacion'], 'unidades': 0, 'esperas': 0, 'espera_total_ms': 0.0,
+                'espera_maxima_ms': 0.0, 'reintentos': 0, 'fallidas': 0})
+            for clave in ('unidades', 'esperas', 'espera_total_ms', 'reintentos', 'fallidas'):
+                total[clave] += fila[clave]
+            total['espera_maxima_ms'] = max(total['espera_maxima_ms'], fila['espera_maxima_ms'])
+    return sorted(por_operacion.values(), key=lambda f: f['espera_total_ms'], reverse=True)
+
+
+# --------------------------------------------------------------- verificación
+
+def verificar(ruta, antes) -> list:
+    """(invariante, se cumple, detalle) de cada verificación sobre lo escrito en la prueba."""
+    conn = sqlite3.connect(ruta)
+    try:
+        stock = dict(conn.execute('SELECT id, stock_actual FROM productos'))
+        movimientos = dict(conn.execute(_NETO_MOVIMIENTOS))
+        disponible = dict(conn.execute(_DISPONIBLE_LOTES))
+        anuladas_prueba = [fila[0] for fila in conn.execute("SELECT id FROM ventas WHERE estado = 'Anulado'")
+                           if fila[0] not in antes['anuladas']]
+        devuelto = defaultdict(int)
+        for inicio in range(0, len(anuladas_prueba), 500):
+            bloque = anuladas_prueba[inicio:inicio + 500]
+            for producto_id, cantidad in conn.execute(
+                    f"SELECT producto_id, SUM(cantidad) FROM ventas_detalle WHERE venta_id IN "
+                    f"({','.join('?' * len(bloque))}) GROUP BY producto_id", bloque):
+                devuelto[producto_id] += cantidad
+
+        resultados = []
+
+        # Stock contra movimientos
+        diferencias = []
+        for producto_id, actual in stock.items():
+            cambio_stock = actual - antes['stock'].get(producto_id, 0)
+            cambio_mov = movimientos.get(producto_id, 0) - antes['movimientos'].get(producto_id, 0)
+            if cambio_stock != cambio_mov:
+                diferencias.append(f"producto {producto_id}: stock {cambio_stock:+d}, movimientos {cambio_mov:+d}")
+        negativos = [producto_id for producto_id, actual in stock.items() if actual < 0]
+        resultados.append(('stock = suma de movimientos', not diferencias,
+                           f"{len(diferencias)} productos con diferencia" + (f" (p. ej. {diferencias[0]})"
+                                                                             if diferencias else '')))
+        resultados.append(('stock no negativo', not negativos, f"{len(negativos)} productos con stock negativo"))
+
+        # PEPS: lotes contra stock; las anulaciones devuelven stock pero no lotes
+        diferencias = []
+        for producto_id, actual in stock.items():
+            cambio_stock = actual - antes['stock'].get(producto_id, 0)
+            cambio_lotes = disponible.get(producto_id, 0) - antes['disponible'].get(producto_id, 0)
+            if cambio_lotes != cambio_stock - devuelto.get(producto_id, 0):
+                diferencias.append(f"producto {producto_id}: lotes {cambio_lotes:+d}, stock {cambio_stock:+d}, "
+                                   f"anulado {devuelto.get(producto_id, 0)}")
+        lotes_negativos = conn.execute('SELECT COUNT(*) FROM compras WHERE cantidad_disponible < 0').fetchone()[0]
+        resultados.append(('PEPS cantidad_disponible = ventas', not diferencias,
+                           f"{len(diferencias)} productos con diferencia" + (f" (p. ej. {diferencias[0]})"
+                                                                             if diferencias else '')))
+        resultados.append(('PEPS sin lotes negativos', not lotes_negativos, f"{lotes_negativos} lotes negativos"))
+
+        # Cadena de saldos de caja desde el último movimiento anterior a la prueba
+        cortes = []
+        anterior = None
+        for id_mov, tipo, monto, saldo_anterior, saldo_nuevo in conn.execute(
+                'SELECT id, tipo, monto, saldo_anterior, saldo_nuevo FROM movimientos_caja WHERE id >= ? '
+                'ORDER BY id', (antes['max_caja'],)):
+            signo = 1 if tipo == 'INGRESO' else -1
+            if anterior is not None and abs(saldo_anterior - anterior) > TOLERANCIA_MONTO:
+                cortes.append(f"#{id_mov}: saldo_anterior {saldo_anterior:,.2f} ≠ {anterior:,.2f}")
+            if abs(saldo_anterior + signo * monto - saldo_nuevo) > TOLERANCIA_MONTO:
+                cortes.append(f"#{id_mov}: saldo_nuevo no cuadra con el monto")
+            anterior = saldo_nuevo
+        resultados.append(('cadena de saldos de caja continua', not cortes,
+                           f"{len(cortes)} cortes" + (f" (p. ej. {cortes[0]})" if cortes else '')))
+
+        # Cada operación nueva con su movimiento de caja
+        conceptos = [fila[0] for fila in conn.execute(
+            'SELECT concepto FROM movimientos_caja WHERE id > ?', (antes['max_caja'],))]
+        ventas = {fila[0] for fila in conn.execute('SELECT id FROM ventas WHERE id > ?', (antes['max_venta'],))}
+        compras = {fila[0] for fila in conn.execute('SELECT id FROM compras WHERE id > ?', (antes['max_compra'],))}
+        con_venta = {int(c.split('#')[1].split(' ')[0]) for c in conceptos if c.startswith('Venta #')
+                     and c.split('#')[1].split(' ')[0].isdigit()}
+        con_compra = {int(c.split('#')[1].split(' ')[0]) for c in conceptos if c.startswith('Compra #')}
+        con_devolucion = {int(c.split('#')[1].split(' ')[0]) for c in conceptos if c.startswith('Devolución Venta #')}
+        faltan = (len(ventas - con_venta), len(compras - con_compra), len(set(anuladas_prueba) - con_devolucion))
+        resultados.append(('operaciones con movimiento de caja', not any(faltan),
+                           f"sin movimiento: {faltan[0]} ventas, {faltan[1]} compras, {faltan[2]} anulaciones"))
+        return resultados
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------- main
+
+def ejecutar(args):
+    carpeta = tempfile.mkdtemp(prefix='estres_concurrencia_')
+    try:
+        ruta = preparar_base(args, carpeta)
+        antes = foto(ruta)
+
+        contexto = multiprocessing.get_context('spawn')
+        barrera = contexto.Barrier(args.procesos + 1)
+        cola = contexto.Queue()
+        procesos = [contexto.Process(target=terminal, args=(numero, ruta, args, barrera, cola),
+                                     name=f'terminal-{numero}')
+                    for numero in range(1, args.procesos + 1)]
+        for proceso in procesos:
+            proceso.start()
+        print(f"{args.procesos} terminales, {args.duracion:g} s, diario {args.modo_diario}, "
+              f"hasta {args.reintentos} reintentos por bloqueo...")
+        barrera.wait()
+        t0 = time.perf_counter()
+        mediciones = [cola.get() for _ in procesos]
+        duracion = time.perf_counter() - t0
+        for proceso in procesos:
+            proceso.join()
+
+        por_operacion = {}
+        for nombre, _ in MEZCLA:
+            partes = [m[1][nombre] for m in mediciones]
+            latencias = [ms for parte in partes for ms in parte['latencias_ms']]
+            por_operacion[nombre] = {
+                'ejecutadas': len(latencias),
+                'por_segundo': len(latencias) / duracion,
+                'p50_ms': _percentil(latencias, 0.50),
+                'p99_ms': _percentil(latencias, 0.99),
+                'maximo_ms': max(latencias, default=0.0),
+                **{clave: sum(parte[clave] for parte in partes)
+                   for clave in ('ok', 'rechazadas', 'bloqueos', 'reintentos', 'errores')},
+                'ultimo_error': next((parte['ultimo_error'] for parte in partes if parte['ultimo_error']), ''),
+            }
+        invariantes = verificar(ruta, antes)
+        return {
+            'fecha': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            'procesos': args.procesos,
+            'duracion_s': duracion,
+            'modo_diario': args.modo_diario,
+            'reintentos_maximos': args.reintentos,
+            'sqlite': sqlite3.sqlite_version,
+            'operaciones': por_operacion,
+            'ok_por_segundo': sum(o['ok'] for o in por_operacion.values()) / duracion,
+            'reintentos_cola_escritura': sum(m[2] for m in mediciones),
+            'esperas_bloqueo': _sumar_esperas([m[3] for m in mediciones]),
+            'invariantes': [{'nombre': n, 'cumple': c, 'detalle': d} for n, c, d in invariantes],
+        }
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def imprimir(resultado):
+    print(f"\n{'Operación':<10} {'ejec':>6} {'ok':>6} {'/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8} "
+          f"{'bloqueo':>8} {'reint':>6} {'rechaz':>7} {'error':>6}")
+    for nombre, o in resultado['operaciones'].items():
+        print(f"{nombre:<10} {o['ejecutadas']:>6} {o['ok']:>6} {o['por_segundo']:>7.1f} {o['p50_ms']:>8.1f} "
+              f"{o['p99_ms']:>8.1f} {o['maximo_ms']:>8.1f} {o['bloqueos']:>8} {o['reintentos']:>6} "
+              f"{o['rechazadas']:>7} {o['errores']:>6}")
+    print(f"\nOperaciones exitosas por segundo: {resultado['ok_por_segundo']:.1f}")
+    if resultado['esperas_bloqueo']:
+        print(f"\n{'Espera del bloqueo de escritura':<32} {'unid':>6} {'esperas':>8} {'total ms':>10} "
+              f"{'prom ms':>8} {'máx ms':>8} {'reint':>6} {'fallid':>7}")
+        for fila in resultado['esperas_bloqueo']:
+            promedio = fila['espera_total_ms'] / fila['esperas'] if fila['esperas'] else 0.0
+            print(f"{fila['operacion']:<32} {fila['unidades']:>6} {fila['esperas']:>8} "
+                  f"{fila['espera_total_ms']:>10,.0f} {promedio:>8.1f} {fila['espera_maxima_ms']:>8.1f} "
+                  f"{fila['reintentos']:>6} {fila['fallidas']:>7}")
+    for nombre, o in resultado['operaciones'].items():
+        if o['ultimo_error']:
+            print(f"  Último error en {nombre}: {o['ultimo_error'].splitlines()[0]}")
+    print("\nInvariantes:")
+    for invariante in resultado['invariantes']:
+        print(f"  {'✅' if invariante['cumple'] else '❌'} {invariante['nombre']}: {invariante['detalle']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de estrés de varias terminales sobre la misma base")
+    parser.add_argument('--procesos', type=int, default=4, help="Terminales simultáneas")
+    parser.add_argument('--duracion', type=float, default=20, help="Segundos de carga")
+    parser.add_argument('--base', help="Base de datos a copiar (por defecto se genera una de 10k filas)")
+    parser.add_argument('--modo-diario', choices=('delete', 'wal'), default='delete',
+                        help="journal_mode de la copia (delete es el de las bases de la aplicación)")
+    parser.add_argument('--reintentos', type=int, default=0,
+                        help="Veces que la terminal repite una operación que falló por bloqueo")
+    parser.add_argument('--semilla', type=int, default=7)
+    parser.add_argument('--salida', help="Archivo JSON para guardar los resultados")
+    args = parser.parse_args(argv)
+
+    resultado = ejecutar(args)
+    imprimir(resultado)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+    return 0 if all(i['cumple'] for i in resultado['invariantes']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
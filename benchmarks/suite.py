@@ -0,0 +1,264 @@
+"""
+Suite de benchmarks de las rutas frecuentes del controlador y la base de datos.
+
+Cada caso se mide sobre bases de datos sintéticas de varios tamaños
+(src/utils/generador_datos.py, semilla y fecha final fijas para que los datos
+sean los mismos entre versiones). El resultado se guarda en JSON y se puede
+comparar con el de otra versión: un caso cuya mediana empeora más que la
+tolerancia cuenta como regresión y el proceso termina con código 1.
+
+Uso:
+    python benchmarks/suite.py [--tamanos 10k,100k] [--repeticiones 7] [--salida resultados.json]
+    python benchmarks/suite.py --comparar base.json [--tolerancia 0.25] [--casos ventas,venta_]
+
+Las bases generadas se guardan en --ruta (por defecto una carpeta temporal
+fija) y se reutilizan; cada ejecución trabaja sobre una copia, con el
+journal_mode de --modo-diario (delete, el de las bases de la aplicación, si no
+se indica) fijado explícitamente para que no dependa de cómo quedó el archivo.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.controllers.inventario_controller import InventarioController  # noqa: E402
+from src.controllers import reportes_exportacion as reportes  # noqa: E402
+from src.utils import generador_datos  # noqa: E402
+
+SEMILLA = 2025
+HASTA = datetime(2026, 6, 30)
+# Diferencias menores a esto (ms) son ruido y no cuentan como regresión
+PISO_RUIDO_MS = 0.5
+
+
+def ruta_dataset(carpeta, tamano):
+    """Genera (una sola vez) la base de datos de ese preset y devuelve su ruta."""
+    ruta = os.path.join(carpeta, f"inventarios_{tamano}_s{SEMILLA}_{HASTA:%Y%m%d}.db")
+    if not os.path.exists(ruta):
+        print(f"Generando base de datos {tamano}...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generador_datos.generar(ruta, tamano, SEMILLA, HASTA)
+    return ruta
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """Tiempos en ms de `repeticiones` llamadas (después de una de calentamiento)."""
+    tiempos = []
+    fallos = 0
+    for i in range(repeticiones + 1):
+        argumentos = preparar(i) if preparar else ()
+        t0 = time.perf_counter()
+        resultado = funcion(*argumentos)
+        if i:
+            tiempos.append((time.perf_counter() - t0) * 1000)
+            # Las escrituras del controlador devuelven (éxito, mensaje)
+            if isinstance(resultado, tuple) and resultado and resultado[0] is False:
+                fallos += 1
+    tiempos.sort()
+    return {
+        'fallos': fallos,
+        'min_ms': tiempos[0],
+        'mediana_ms': statistics.median(tiempos),
+        'p95_ms': tiempos[min(int(len(tiempos) * 0.95), len(tiempos) - 1)],
+        'repeticiones': repeticiones,
+    }
+
+
+def _exportar_excel(filas, ruta):
+    """Escritura a Excel como en ReportesTab, si pandas y openpyxl están instalados."""
+    try:
+        import pandas as pd
+    except ImportError:
+        return
+    pd.DataFrame(filas).to_excel(ruta, index=False)
+
+
+def casos(controller, carpeta_trabajo):
+    """(nombre, función, preparar) de cada caso; las escrituras van al final."""
+    db = controller.db
+    conn = sqlite3.connect(db.db_path)
+    productos = conn.execute(
+        "SELECT id, precio_venta FROM productos WHERE activo = 1 AND stock_actual >= 5 "
+        "ORDER BY stock_actual DESC LIMIT 200").fetchall()
+    codigo = conn.execute("SELECT codigo FROM productos ORDER BY id LIMIT 1 OFFSET 7").fetchone()[0]
+    nit = conn.execute("SELECT nit_dpi FROM clientes ORDER BY id LIMIT 1 OFFSET 11").fetchone()[0]
+    proveedor_id = conn.execute("SELECT MIN(id) FROM proveedores").fetchone()[0]
+    fechas = conn.execute("SELECT MIN(substr(fecha, 7, 4) || substr(fecha, 4, 2) || substr(fecha, 1, 2)), "
+                          "MAX(substr(fecha, 7, 4) || substr(fecha, 4, 2) || substr(fecha, 1, 2)) FROM ventas"
+                          ).fetchone()
+    conn.close()
+    # Rango de los reportes: el último año de datos
+    fin = datetime.strptime(fechas[1], '%Y%m%d')
+    inicio, fin = fin.replace(year=fin.year - 1).strftime('%d/%m/%Y'), fin.strftime('%d/%m/%Y')
+    excel = os.path.join(carpeta_trabajo, 'reporte.xlsx')
+    fecha = HASTA.strftime('%d/%m/%Y 12:00:00')
+
+    def carrito(lineas, desplazamiento):
+        return [{'producto_id': productos[(desplazamiento + k) % len(productos)][0], 'cantidad': 1,
+                 'precio_unitario': productos[(desplazamiento + k) % len(productos)][1]} for k in range(lineas)]
+
+    def exportar_general():
+        hojas, _ = reportes.hojas_reporte_general(controller)
+        _exportar_excel(hojas['Estado Vencimientos'], excel)
+
+    def exportar_productos():
+        _exportar_excel(reportes.filas_productos(controller.obtener_productos()), excel)
+
+    def exportar_compras():
+        compras = reportes.filtrar_por_fecha(controller.obtener_compras(historico=True), inicio, fin)
+        _exportar_excel(reportes.filas_compras(compras)[0], excel)
+
+    def exportar_ventas():
+        hojas, _, _ = reportes.hojas_reporte_ventas(controller, inicio, fin)
+        _exportar_excel(hojas['Ventas'], excel)
+
+    def exportar_caja():
+        movimientos = reportes.filtrar_por_fecha(controller.obtener_movimientos_caja(historico=True), inicio, fin)
+        _exportar_excel(reportes.filas_caja(movimientos)[0], excel)
+
+    def venta_a_anular(_):
+        return (db.execute_query("SELECT MAX(id) AS id FROM ventas WHERE estado != 'Anulado'")[0]['id'],)
+
+    return [
+        ('obtener_ventas', controller.obtener_ventas, None),
+        ('obtener_compras', controller.obtener_compras, None),
+        ('obtener_resumen_inventario', controller.obtener_resumen_inventario, None),
+        ('obtener_productos_proximos_vencer', controller.obtener_productos_proximos_vencer, None),
+        ('buscar_cliente', lambda: controller.buscar_cliente('gar'), None),
+        ('buscar_proveedor', lambda: controller.buscar_proveedor('dist'), None),
+        ('obtener_cliente_por_nit', lambda: controller.obtener_cliente_por_nit(nit), None),
+        ('obtener_producto_por_codigo', lambda: controller.obtener_producto_por_codigo(codigo), None),
+        ('exportar_reporte_general', exportar_general, None),
+        ('exportar_productos', exportar_productos, None),
+        ('exportar_reporte_compras', exportar_compras, None),
+        ('exportar_reporte_ventas', exportar_ventas, None),
+        ('exportar_reporte_caja', exportar_caja, None),
+        ('exportar_resumen', controller.exportar_resumen, None),
+        ('resumen_ventas', lambda: controller.obtener_resumen_ventas(inicio, fin, 'mes', 20), None),
+        ('venta_1_linea', controller.registrar_venta_con_carrito, lambda i: (1, carrito(1, i), fecha)),
+        ('venta_10_lineas', controller.registrar_venta_con_carrito, lambda i: (1, carrito(10, i * 10), fecha)),
+        ('venta_50_lineas', controller.registrar_venta_con_carrito, lambda i: (1, carrito(50, i * 50), fecha)),
+        ('registrar_compra', controller.registrar_compra,
+         lambda i: (productos[i % len(productos)][0], 24, 10.0, proveedor_id, f"BENCH-{i}", fecha)),
+        ('anular_venta', controller.anular_venta, venta_a_anular),
+    ]
+
+
+def ejecutar(tamanos, repeticiones, carpeta, filtro=None, modo_diario='delete'):
+    resultados = {}
+    for tamano in tamanos:
+        origen = ruta_dataset(carpeta, tamano)
+        trabajo = tempfile.mkdtemp(prefix='bench_suite_')
+        copia = os.path.join(trabajo, 'inventarios.db')
+        shutil.copy2(origen, copia)
+        try:
+            conn = sqlite3.connect(copia, isolation_level=None)
+            try:
+                conn.execute(f'PRAGMA journal_mode = {modo_diario}')
+            finally:
+                conn.close()
+            with contextlib.redirect_stdout(io.StringIO()):
+                controller = InventarioController(copia)
+            resultados[tamano] = {}
+            for nombre, funcion, preparar in casos(controller, trabajo):
+                if filtro and not any(parte in nombre for parte in filtro):
+                    continue
+                # Silenciar los print de depuración (su costo queda incluido igual en todas las versiones)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    resultado = medir(funcion, repeticiones, preparar)
+                resultados[tamano][nombre] = resultado
+                print(f"  {tamano:>5} {nombre:<36} mediana {resultado['mediana_ms']:>10.2f} ms   "
+                      f"min {resultado['min_ms']:>10.2f} ms"
+                      + (f"   ⚠️ {resultado['fallos']} fallidas" if resultado['fallos'] else ''))
+            controller.db.cola_escritura.cerrar()
+        finally:
+            shutil.rmtree(trabajo, ignore_errors=True)
+    return resultados
+
+
+def comparar(actual, base, tolerancia):
+    """Imprime la comparación caso por caso y devuelve la lista de regresiones."""
+    regresiones = []
+    print(f"\n{'Tamaño':>6} {'Caso':<36} {'Base ms':>10} {'Actual ms':>10} {'Cambio':>8}")
+    for tamano, casos_actuales in actual['resultados'].items():
+        for nombre, resultado in casos_actuales.items():
+            anterior = base['resultados'].get(tamano, {}).get(nombre)
+            if anterior is None:
+                continue
+            antes, ahora = anterior['mediana_ms'], resultado['mediana_ms']
+            cambio = (ahora - antes) / antes if antes else 0.0
+            regresion = cambio > tolerancia and ahora - antes > PISO_RUIDO_MS
+            marca = '❌' if regresion else ('✅' if cambio < -tolerancia else '  ')
+            print(f"{tamano:>6} {nombre:<36} {antes:>10.2f} {ahora:>10.2f} {cambio:>+7.0%} {marca}")
+            if regresion:
+                regresiones.append((tamano, nombre, cambio))
+    return regresiones
+
+
+def _version():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de rutas frecuentes del controlador")
+    parser.add_argument('--tamanos', default='10k,100k', help="Presets del generador separados por coma")
+    parser.add_argument('--repeticiones', type=int, default=7)
+    parser.add_argument('--ruta', default=os.path.join(tempfile.gettempdir(), 'inventarios_bench'),
+                        help="Carpeta donde se guardan las bases generadas")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="JSON de otra versión contra el cual comparar")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="Empeoramiento relativo de la mediana que cuenta como regresión")
+    parser.add_argument('--casos', help="Solo los casos que contienen alguno de estos textos (separados por coma)")
+    parser.add_argument('--modo-diario', choices=('delete', 'wal'), default='delete',
+                        help="journal_mode de la copia (delete es el de las bases de la aplicación)")
+    args = parser.parse_args()
+
+    os.makedirs(args.ruta, exist_ok=True)
+    tamanos = [t.strip() for t in args.tamanos.split(',') if t.strip()]
+    filtro = [c.strip() for c in args.casos.split(',')] if args.casos else None
+
+    actual = {
+        'version': _version(),
+        'fecha': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'plataforma': platform.platform(),
+        'dataset': {'semilla': SEMILLA, 'hasta': HASTA.strftime('%d/%m/%Y'), 'modo_diario': args.modo_diario},
+        'resultados': ejecutar(tamanos, args.repeticiones, args.ruta, filtro, args.modo_diario),
+    }
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(actual, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en: {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+        regresiones = comparar(actual, base, args.tolerancia)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresiones de más de {args.tolerancia:.0%}")
+            return 1
+        print(f"\n✅ Sin regresiones de más de {args.tolerancia:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,100 +22,158 @@ import json
 # Agregar el directorio actual al path para imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-try:
+
+def _valor_argumento(nombre, defecto=None):
+    """Obtiene el valor de un argumento '--nombre valor' o '--nombre=valor'"""
+    for i, arg in enumerate(sys.argv):
+        if arg.startswith(nombre + '='):
+            return arg.split('=', 1)[1]
+        if arg == nombre and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+    return defecto
+
+
+def activar_trazas():
+    """Enciende el registro de trazas con --trace o si está activado en la configuración"""
+    from src.config.settings import Settings
+    from src.utils import trazas
+    
+    if '--trace' in sys.argv or Settings.get_trazas_activas():
+        trazas.activar()
+
+
+def main():
+    """Función principal de la aplicación"""
+    activar_trazas()
+    # Las ventanas se importan aquí para que el arranque no cargue
+    # ttkbootstrap ni las pestañas antes de que sean necesarias
     from src.ui.login_window import LoginWindow
-    from src.ui.main_window import MainWindow
     
-    def main():
-        """Función principal de la aplicación"""
-        print("Iniciando Sistema de Control de Inventarios...")
-        print("Versión 2.0")
-        print("=" * 50)
-        
-        # Mostrar ventana de login
-        login = LoginWindow()
-        usuario_autenticado = login.run()
-        
-        # Si el usuario se autenticó correctamente, abrir la aplicación principal
-        if usuario_autenticado:
-            print(f"Usuario autenticado: {usuario_autenticado['nombre_completo']}")
-            print("Iniciando aplicación principal...")
-            
-            # Ocultar la ventana de login
-            login.root.withdraw()
-            
-            # Crear y ejecutar la aplicación principal usando la misma raíz
-            app = MainWindow(usuario=usuario_autenticado, root=login.root)
-            app.run()
-            
-            print("Aplicación cerrada correctamente.")
-        else:
-            print("Login cancelado. Aplicación cerrada.")
-            # Cerrar la ventana de login si fue cancelada
-            try:
-                login.root.destroy()
-            except:
-                pass
-
-    if __name__ == "__main__":
-        main()
-
-except ImportError as e:
-    print(f"Error al importar módulos: {e}")
-    print("Asegúrate de que todas las dependencias estén instaladas.")
-    print("Ejecuta: pip install tkinter ttkbootstrap")
-    sys.exit(1)
-
-except Exception as e:
-    print(f"Error inesperado: {e}")
-    sys.exit(1)
-
-class Settings:
-    """Maneja la configuración de la aplicación"""
-    
-    def __init__(self):
-        self.config_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
-        self.config_file = os.path.join(self.config_dir, 'config.json')
-        self.config = self.load_config()
-    
-    def load_config(self):
-        """Carga la configuración desde el archivo"""
-        # Crear directorio si no existe
-        os.makedirs(self.config_dir, exist_ok=True)
+    print("Iniciando Sistema de Control de Inventarios...")
+    print("Versión 2.0")
+    print("=" * 50)
+    
+    # Mostrar ventana de login
+    login = LoginWindow()
+    usuario_autenticado = login.run()
+    
+    # Si el usuario se autenticó correctamente, abrir la aplicación principal
+    if usuario_autenticado:
+        print(f"Usuario autenticado: {usuario_autenticado['nombre_completo']}")
+        print("Iniciando aplicación principal...")
         
-        # Si el archivo no existe, crear configuración por defecto
-        if not os.path.exists(self.config_file):
-            default_config = {
-                'theme': 'cosmo',
-                'window_size': '1400x850'
-            }
-            self.save_config(default_config)
-            return default_config
+        # Ocultar la ventana de login
+        login.root.withdraw()
         
-        # Cargar configuración existente
-        try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error al cargar configuración: {e}")
-            return {'theme': 'cosmo', 'window_size': '1400x850'}
-    
-    def save_config(self, config=None):
-        """Guarda la configuración en el archivo"""
-        if config is None:
-            config = self.config
+        # Crear y ejecutar la aplicación principal usando la misma raíz
+        from src.ui.main_window import MainWindow
+        app = MainWindow(usuario=usuario_autenticado, root=login.root)
+        app.run()
         
+        print("Aplicación cerrada correctamente.")
+        return reportar_respuesta_ui(app.monitor_ui)
+    else:
+        print("Login cancelado. Aplicación cerrada.")
+        # Cerrar la ventana de login si fue cancelada
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4)
-        except Exception as e:
-            print(f"Error al guardar configuración: {e}")
-    
-    def get_theme(self):
-        """Obtiene el tema guardado"""
-        return self.config.get('theme', 'cosmo')
-    
-    def set_theme(self, theme):
-        """Guarda el tema seleccionado"""
-        self.config['theme'] = theme
-        self.save_config()
+            login.root.destroy()
+        except:
+            pass
+
+
+def reportar_respuesta_ui(monitor):
+    """
+    Muestra los bloqueos de la interfaz de la sesión. Con --ui-report archivo.json
+    los guarda, y con --ui-stall-budget MS retorna 1 si algún bloqueo lo excede.
+    """
+    from src.ui.utils.monitor_ui import formatear_reporte
+    
+    reporte = monitor.reporte()
+    print(formatear_reporte(reporte))
+    
+    salida = _valor_argumento('--ui-report')
+    if salida:
+        with open(salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        print(f"Reporte de la interfaz guardado en: {salida}")
+    
+    presupuesto = _valor_argumento('--ui-stall-budget')
+    if presupuesto is not None:
+        presupuesto = float(presupuesto)
+        if reporte['maximo_ms'] > presupuesto:
+            print(f"❌ Bloqueo de {reporte['maximo_ms']:.0f} ms excede el presupuesto de {presupuesto:.0f} ms")
+            return 1
+        print(f"✅ Bloqueo máximo de {reporte['maximo_ms']:.0f} ms dentro del presupuesto de {presupuesto:.0f} ms")
+    return 0
+
+
+def perfilar_arranque():
+    """
+    Mide el arranque en frío (imports, login y ventana principal) y lo reporta.
+    No entra al mainloop: construye las ventanas, mide y cierra.
+    Retorna el código de salida (1 si se excede el presupuesto indicado).
+    """
+    from src.utils.perfil_arranque import PerfilArranque, contar_widgets
+    
+    perfil = PerfilArranque()
+    perfil.instalar()
+    
+    with perfil.fase("import login_window"):
+        from src.ui.login_window import LoginWindow
+    with perfil.fase("LoginWindow()"):
+        login = LoginWindow()
+        login.root.update_idletasks()
+    with perfil.fase("import main_window"):
+        from src.ui.main_window import MainWindow
+    with perfil.fase("MainWindow()"):
+        login.root.withdraw()
+        app = MainWindow(root=login.root)
+        app.root.update_idletasks()
+    perfil.widgets = contar_widgets(app.root)
+    
+    # Opcional: construir todas las pestañas para medir su costo individual
+    if '--profile-tabs' in sys.argv:
+        from src.ui.main_window import PESTANAS
+        for nombre, _, _, _, _ in PESTANAS:
+            with perfil.fase(f"pestaña {nombre}"):
+                app.obtener_tab(nombre)
+                app.root.update_idletasks()
+            perfil.widgets_por_pestana[nombre] = contar_widgets(app.tab_frames[nombre])
+    
+    perfil.desinstalar()
+    # Detener los hilos que inició la ventana (ejecutor, cola, réplica, monitores) antes de destruirla
+    app.cerrar_servicios(salida=False)
+    app.root.destroy()
+    
+    print(perfil.reporte())
+    
+    salida = _valor_argumento('--profile-output')
+    if salida:
+        perfil.guardar(salida)
+        print(f"Perfil guardado en: {salida}")
+    
+    presupuesto = _valor_argumento('--startup-budget')
+    if presupuesto is not None:
+        presupuesto = float(presupuesto)
+        if perfil.total() > presupuesto:
+            print(f"❌ Arranque de {perfil.total():.2f}s excede el presupuesto de {presupuesto:.2f}s")
+            return 1
+        print(f"✅ Arranque de {perfil.total():.2f}s dentro del presupuesto de {presupuesto:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        if '--profile-startup' in sys.argv:
+            sys.exit(perfilar_arranque())
+        sys.exit(main())
+    
+    except ImportError as e:
+        print(f"Error al importar módulos: {e}")
+        print("Asegúrate de que todas las dependencias estén instaladas.")
+        print("Ejecuta: pip install tkinter ttkbootstrap")
+        sys.exit(1)
+    
+    except Exception as e:
+        print(f"Error inesperado: {e}")
+        sys.exit(1)
@@ -13,7 +13,22 @@ class Settings:
     DEFAULT_CONFIG = {
         "theme": "superhero",
         "db_path": "data/inventarios.db",
-        "use_cloud_storage": False
+        "use_cloud_storage": False,
+        "impresora_termica": "",
+        "ancho_papel_mm": 80,
+        "empresa_nombre": "MARTELIZ SHOP",
+        "empresa_direccion": "Cobán, Alta Verapaz",
+        "empresa_telefono": "+502 3987-7846",
+        "replicacion_activa": False,
+        "carpeta_intercambio": "",
+        "terminal_id": 1,
+        "carpeta_respaldos": "",
+        "respaldo_cada_horas": 1,
+        "umbral_consultas_lentas_ms": 100,
+        "trazas_activas": False,
+        "espera_bloqueo_ms": 5000,
+        "reintentos_bloqueo": 4,
+        "espera_reintento_max_ms": 1000
     }
     
     @classmethod
@@ -128,3 +143,133 @@ class Settings:
             app_folder = os.path.join(onedrive, "Sistema_Inventarios")
             return os.path.join(app_folder, "inventarios.db")
         return None
+    
+    @classmethod
+    def get_impresora_termica(cls):
+        """Obtiene la configuración de la impresora térmica de recibos"""
+        config = cls.load_config()
+        return {
+            "nombre": config.get("impresora_termica", cls.DEFAULT_CONFIG["impresora_termica"]),
+            "ancho_mm": config.get("ancho_papel_mm", cls.DEFAULT_CONFIG["ancho_papel_mm"])
+        }
+    
+    @classmethod
+    def set_impresora_termica(cls, nombre, ancho_mm=80):
+        """Guarda la impresora térmica y el ancho del papel (58 u 80 mm)"""
+        config = cls.load_config()
+        config["impresora_termica"] = nombre
+        config["ancho_papel_mm"] = ancho_mm
+        return cls.save_config(config)
+    
+    @classmethod
+    def get_datos_empresa(cls):
+        """Datos de la empresa que se imprimen en los recibos (PDF y ticket térmico)"""
+        config = cls.load_config()
+        return {
+            clave: config.get(clave, cls.DEFAULT_CONFIG[clave])
+            for clave in ("empresa_nombre", "empresa_direccion", "empresa_telefono")
+        }
+    
+    @classmethod
+    def set_datos_empresa(cls, nombre, direccion="", telefono=""):
+        """Guarda los datos de la empresa para los recibos"""
+        config = cls.load_config()
+        config["empresa_nombre"] = nombre
+        config["empresa_direccion"] = direccion
+        config["empresa_telefono"] = telefono
+        return cls.save_config(config)
+    
+    @classmethod
+    def get_replicacion(cls):
+        """Obtiene la configuración de replicación (réplica local + carpeta de intercambio)"""
+        config = cls.load_config()
+        return {
+            "activa": config.get("replicacion_activa", cls.DEFAULT_CONFIG["replicacion_activa"]),
+            "carpeta": config.get("carpeta_intercambio", cls.DEFAULT_CONFIG["carpeta_intercambio"]),
+            "terminal_id": config.get("terminal_id", cls.DEFAULT_CONFIG["terminal_id"])
+        }
+    
+    @classmethod
+    def set_replicacion(cls, activa, carpeta="", terminal_id=1):
+        """Guarda la configuración de replicación. terminal_id debe ser distinto en cada terminal (1-99)"""
+        config = cls.load_config()
+        config["replicacion_activa"] = activa
+        config["carpeta_intercambio"] = carpeta
+        config["terminal_id"] = int(terminal_id)
+        return cls.save_config(config)
+    
+    @classmethod
+    def get_respaldos(cls, db_path=None):
+        """
+        Obtiene la carpeta de respaldos y cada cuántas horas se respalda (0 = nunca).
+        Sin carpeta configurada los respaldos van a 'respaldos' junto a la base de
+        datos (db_path o la configurada), no a la carpeta desde la que se abrió el programa.
+        """
+        config = cls.load_config()
+        carpeta = config.get("carpeta_respaldos", cls.DEFAULT_CONFIG["carpeta_respaldos"])
+        # "data/respaldos" era el valor por defecto anterior (relativo a la carpeta actual)
+        if not carpeta or carpeta == "data/respaldos":
+            base = db_path or config.get("db_path", cls.DEFAULT_CONFIG["db_path"])
+            carpeta = os.path.join(os.path.dirname(os.path.abspath(base)), "respaldos")
+        return {
+            "carpeta": os.path.abspath(carpeta),
+            "cada_horas": config.get("respaldo_cada_horas", cls.DEFAULT_CONFIG["respaldo_cada_horas"])
+        }
+    
+    @classmethod
+    def set_respaldos(cls, carpeta, cada_horas=1):
+        """Guarda la configuración de respaldos automáticos"""
+        config = cls.load_config()
+        config["carpeta_respaldos"] = carpeta
+        config["respaldo_cada_horas"] = cada_horas
+        return cls.save_config(config)
+    
+    @classmethod
+    def get_umbral_consultas_lentas(cls):
+        """Milisegundos a partir de los cuales una consulta se registra como lenta"""
+        config = cls.load_config()
+        return config.get("umbral_consultas_lentas_ms", cls.DEFAULT_CONFIG["umbral_consultas_lentas_ms"])
+    
+    @classmethod
+    def set_umbral_consultas_lentas(cls, umbral_ms):
+        """Guarda el umbral de consultas lentas"""
+        config = cls.load_config()
+        config["umbral_consultas_lentas_ms"] = umbral_ms
+        return cls.save_config(config)
+    
+    @classmethod
+    def get_trazas_activas(cls):
+        """Indica si se registran las trazas de operaciones (apagado por defecto)"""
+        config = cls.load_config()
+        return config.get("trazas_activas", cls.DEFAULT_CONFIG["trazas_activas"])
+    
+    @classmethod
+    def set_trazas_activas(cls, activas):
+        """Guarda si se registran las trazas de operaciones"""
+        config = cls.load_config()
+        config["trazas_activas"] = bool(activas)
+        return cls.save_config(config)
+    
+    @classmethod
+    def get_bloqueos(cls):
+        """
+        Política ante la base de datos bloqueada por otra terminal: cuánto espera
+        cada sentencia (busy timeout), cuántas veces se reintenta la operación
+        completa y la espera máxima entre reintentos
+        """
+        config = cls.load_config()
+        return {
+            "espera_ms": config.get("espera_bloqueo_ms", cls.DEFAULT_CONFIG["espera_bloqueo_ms"]),
+            "reintentos": config.get("reintentos_bloqueo", cls.DEFAULT_CONFIG["reintentos_bloqueo"]),
+            "espera_reintento_max_ms": config.get("espera_reintento_max_ms",
+                                                  cls.DEFAULT_CONFIG["espera_reintento_max_ms"])
+        }
+    
+    @classmethod
+    def set_bloqueos(cls, espera_ms, reintentos=4, espera_reintento_max_ms=1000):
+        """Guarda la política ante bloqueos de la base de datos"""
+        config = cls.load_config()
+        config["espera_bloqueo_ms"] = int(espera_ms)
+        config["reintentos_bloqueo"] = int(reintentos)
+        config["espera_reintento_max_ms"] = int(espera_reintento_max_ms)
+        return cls.save_config(config)
@@ -0,0 +1,329 @@
+"""
+Cálculos de los reportes sobre columnas.
+
+Para sumar ventas por mes o buscar los productos más vendidos no hace falta
+un dict por fila: basta con las columnas numéricas (cantidad, precio, total
+y la fecha como número de día). Aquí se leen así, directo del cursor
+(DatabaseManager.execute_query_columnas, sin objetos por fila), y se agrupan
+por producto o por período.
+
+NumPy es opcional. Si está instalado, los array.array de las columnas se ven
+como arreglos de NumPy sin copiarlos y las agrupaciones (np.unique +
+np.bincount), los períodos y el top-N son vectorizados. Si no, la misma
+lógica corre en Python sobre los array.array; el resultado es el mismo.
+
+Las fechas se convierten en SQL al ordinal de date (date.toordinal()), en
+cualquiera de los formatos que tienen los registros (dd/mm/yyyy o ISO).
+"""
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# date(1970, 1, 1).toordinal(): para pasar del ordinal a datetime64 de NumPy
+ORDINAL_EPOCA = 719163
+# julianday('0001-01-01') - 1: julianday - esto = date.toordinal()
+_DESFASE_JULIANO = 1721424.5
+PERIODOS = ('dia', 'semana', 'mes', 'anio')
+
+
+def _numpy():
+    """El módulo numpy, o None si no está instalado."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def dia_sql(columna: str) -> str:
+    """Expresión SQL con el ordinal del día de una columna de fecha (NULL si no se reconoce)."""
+    iso = (f"CASE WHEN substr({columna}, 5, 1) = '-' THEN substr({columna}, 1, 10) "
+           f"ELSE substr({columna}, 7, 4) || '-' || substr({columna}, 4, 2) || '-' || substr({columna}, 1, 2) END")
+    return f"CAST(julianday({iso}) - {_DESFASE_JULIANO} AS INTEGER)"
+
+
+def cargar_columnas(db, consulta: str, params: tuple = (), historico: bool = False) -> Dict:
+    """
+    Ejecuta la consulta y devuelve {columna: valores}. Las numéricas son arreglos
+    de NumPy (sin copia) si está instalado; si no, array.array. Las de texto, listas.
+    """
+    columnas = db.execute_query_columnas(consulta, params, historico)
+    np = _numpy()
+    datos = {nombre: columnas[nombre] for nombre in columnas.nombres}
+    if np is not None:
+        for nombre in columnas.numericas():
+            arreglo = datos[nombre]
+            datos[nombre] = np.frombuffer(arreglo, dtype=np.int64 if arreglo.typecode == 'q' else np.float64)
+    datos['_filas'] = len(columnas)
+    return datos
+
+
+# ---------------------------------------------------------------- primitivas
+
+def periodo(dias, tipo: str = 'mes'):
+    """
+    Clave de período de cada día: 'dia' → ordinal, 'semana' → ordinal del lunes,
+    'mes' → aaaamm, 'anio' → aaaa.
+    """
+    if tipo not in PERIODOS:
+        raise ValueError(f"Período desconocido: {tipo}")
+    np = _numpy()
+    if np is not None and isinstance(dias, np.ndarray):
+        dias = dias.astype(np.int64)
+        if tipo == 'dia':
+            return dias
+        if tipo == 'semana':
+            # El ordinal 1 (01/01/0001) fue lunes
+            return dias - (dias - 1) % 7
+        meses = (dias - ORDINAL_EPOCA).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        anios = meses // 12 + 1970
+        return anios if tipo == 'anio' else anios * 100 + meses % 12 + 1
+    if tipo == 'dia':
+        return list(dias)
+    if tipo == 'semana':
+        return [int(dia) - (int(dia) - 1) % 7 for dia in dias]
+    claves = []
+    cache = {}
+    for dia in dias:
+        clave = cache.get(dia)
+        if clave is None:
+            fecha = date.fromordinal(int(dia))
+            clave = cache[dia] = fecha.year if tipo == 'anio' else fecha.year * 100 + fecha.month
+        claves.append(clave)
+    return claves
+
+
+def etiqueta_periodo(clave: int, tipo: str = 'mes') -> str:
+    """Texto para mostrar una clave de periodo()."""
+    if tipo == 'anio':
+        return str(clave)
+    if tipo == 'mes':
+        return f"{clave % 100:02d}/{clave // 100}"
+    return date.fromordinal(int(clave)).strftime('%d/%m/%Y')
+
+
+def agrupar(claves, **valores) -> Tuple[list, Dict[str, list]]:
+    """
+    Suma cada columna de `valores` por clave (GROUP BY clave).
+
+    Returns:
+        (claves distintas en orden ascendente, {nombre: sumas en el mismo orden}),
+        más el número de filas de cada clave en 'filas'
+    """
+    np = _numpy()
+    if np is not None and isinstance(claves, np.ndarray):
+        unicas, inverso = np.unique(claves, return_inverse=True)
+        sumas = {nombre: np.bincount(inverso, weights=np.asarray(columna, dtype=np.float64),
+                                     minlength=len(unicas)).tolist()
+                 for nombre, columna in valores.items()}
+        sumas['filas'] = np.bincount(inverso, minlength=len(unicas)).tolist()
+        return unicas.tolist(), sumas
+    acumulado = {}
+    nombres = list(valores)
+    for fila in zip(claves, *(valores[nombre] for nombre in nombres)):
+        sumas = acumulado.get(fila[0])
+        if sumas is None:
+            sumas = acumulado[fila[0]] = [0.0] * len(nombres) + [0]
+        for posicion in range(len(nombres)):
+            sumas[posicion] += fila[posicion + 1]
+        sumas[-1] += 1
+    unicas = sorted(acumulado)
+    resultado = {nombre: [acumulado[clave][posicion] for clave in unicas] for posicion, nombre in enumerate(nombres)}
+    resultado['filas'] = [acumulado[clave][-1] for clave in unicas]
+    return unicas, resultado
+
+
+def top_n(valores: Sequence[float], n: int) -> List[int]:
+    """
+    Posiciones de los n valores más grandes, de mayor a menor; entre valores
+    iguales va primero la posición menor (con y sin NumPy).
+    """
+    if n <= 0:
+        return []
+    np = _numpy()
+    if np is not None:
+        arreglo = np.asarray(valores, dtype=np.float64)
+        if n < len(arreglo):
+            # El n-ésimo mayor; de los empatados con él entran los de posición menor
+            limite = -np.partition(-arreglo, n - 1)[n - 1]
+            mayores = np.flatnonzero(arreglo > limite)
+            empatados = np.flatnonzero(arreglo == limite)[:n - len(mayores)]
+            candidatos = np.concatenate((mayores, empatados))
+        else:
+            candidatos = np.arange(len(arreglo))
+        return candidatos[np.lexsort((candidatos, -arreglo[candidatos]))].tolist()
+    return sorted(range(len(valores)), key=lambda posicion: -valores[posicion])[:n]
+
+
+def margen(ventas: float, costo: float) -> Tuple[float, float]:
+    """(ganancia, % de margen sobre la venta)"""
+    ganancia = ventas - costo
+    return ganancia, (ganancia / ventas * 100) if ventas else 0.0
+
+
+def _suma(columna) -> float:
+    np = _numpy()
+    if np is not None and isinstance(columna, np.ndarray):
+        return float(columna.sum())
+    return float(sum(columna))
+
+
+def _ordinal(fecha: Optional[str]) -> Optional[int]:
+    return datetime.strptime(fecha, '%d/%m/%Y').toordinal() if fecha else None
+
+
+def _rango_dias(fecha_inicio: Optional[str], fecha_fin: Optional[str]) -> Tuple[int, int]:
+    """Parámetros de `dia BETWEEN ? AND ?` para un rango dd/mm/yyyy (None = sin límite)."""
+    desde, hasta = _ordinal(fecha_inicio), _ordinal(fecha_fin)
+    return -1 if desde is None else desde, 10 ** 7 if hasta is None else hasta
+
+
+# ---------------------------------------------------------------- reportes
+
+_LINEAS_VENDIDAS = f'''
+    SELECT COALESCE(vd.producto_id, 0) AS producto_id, vd.cantidad, vd.cantidad * vd.precio_unitario AS venta,
+           vd.cantidad * COALESCE(p.precio_compra, 0) AS costo, {dia_sql('v.fecha')} AS dia
+    FROM ventas_detalle vd
+    INNER JOIN ventas v ON vd.venta_id = v.id
+    LEFT JOIN productos p ON vd.producto_id = p.id
+    WHERE v.estado != 'Anulado'
+'''
+
+
+def resumen_ventas(db, fecha_inicio: str = None, fecha_fin: str = None, tipo_periodo: str = 'mes',
+                   top: int = 10) -> Dict:
+    """
+    Ventas, costo y ganancia (precio de compra actual, como la ganancia bruta del
+    resumen de inventario) de las ventas no anuladas, por período y por producto.
+
+    Args:
+        fecha_inicio, fecha_fin: Rango dd/mm/yyyy (incluidos); None = sin límite
+        tipo_periodo: 'dia', 'semana', 'mes' o 'anio'
+        top: Cuántos productos devolver en 'top_productos' (por monto vendido)
+
+    Returns:
+        {'ventas', 'costo', 'ganancia', 'margen_pct', 'unidades', 'lineas',
+         'por_periodo': [{'periodo', 'clave', 'ventas', 'costo', 'ganancia', 'margen_pct', 'unidades', 'lineas'}],
+         'top_productos': [{'producto_id', 'nombre', 'ventas', 'costo', 'ganancia', 'margen_pct', 'unidades'}]}
+    """
+    # El rango se filtra en SQL para no traer las líneas de fuera (BETWEEN deja fuera las fechas no reconocidas)
+    datos = cargar_columnas(db, f"SELECT * FROM ({_LINEAS_VENDIDAS}) WHERE dia BETWEEN ? AND ?",
+                            _rango_dias(fecha_inicio, fecha_fin), historico=True)
+    cantidad, venta, costo = datos['cantidad'], datos['venta'], datos['costo']
+    dias, productos = datos['dia'], datos['producto_id']
+
+    total_ventas, total_costo = _suma(venta), _suma(costo)
+    ganancia, margen_pct = margen(total_ventas, total_costo)
+    resumen = {
+        'ventas': total_ventas, 'costo': total_costo, 'ganancia': ganancia, 'margen_pct': margen_pct,
+        'unidades': int(_suma(cantidad)), 'lineas': len(venta), 'por_periodo': [], 'top_productos': [],
+    }
+    if not len(venta):
+        return resumen
+
+    claves, sumas = agrupar(periodo(dias, tipo_periodo), ventas=venta, costo=costo, unidades=cantidad)
+    for posicion, clave in enumerate(claves):
+        ganancia, margen_pct = margen(sumas['ventas'][posicion], sumas['costo'][posicion])
+        resumen['por_periodo'].append({
+            'periodo': etiqueta_periodo(clave, tipo_periodo), 'clave': clave,
+            'ventas': sumas['ventas'][posicion], 'costo': sumas['costo'][posicion],
+            'ganancia': ganancia, 'margen_pct': margen_pct,
+            'unidades': int(sumas['unidades'][posicion]), 'lineas': sumas['filas'][posicion],
+        })
+
+    ids, sumas = agrupar(productos, ventas=venta, costo=costo, unidades=cantidad)
+    elegidos = top_n(sumas['ventas'], top)
+    nombres = _nombres_productos(db, [ids[posicion] for posicion in elegidos])
+    for posicion in elegidos:
+        ganancia, margen_pct = margen(sumas['ventas'][posicion], sumas['costo'][posicion])
+        resumen['top_productos'].append({
+            'producto_id': ids[posicion], 'nombre': nombres.get(ids[posicion], '[Producto Eliminado]'),
+            'ventas': sumas['ventas'][posicion], 'costo': sumas['costo'][posicion],
+            'ganancia': ganancia, 'margen_pct': margen_pct, 'unidades': int(sumas['unidades'][posicion]),
+        })
+    return resumen
+
+
+_LINEAS_REPORTE_VENTAS = f'''
+    SELECT v.id AS venta_id, v.referencia_no, v.fecha, v.estado,
+           COALESCE(c.nombre, '[Cliente Eliminado]') AS cliente_nombre,
+           COALESCE(p.nombre, '[Producto Eliminado]') AS producto_nombre,
+           vd.cantidad, vd.precio_unitario, vd.subtotal
+    FROM ventas v
+    INNER JOIN ventas_detalle vd ON vd.venta_id = v.id
+    LEFT JOIN clientes c ON v.cliente_id = c.id
+    LEFT JOIN productos p ON vd.producto_id = p.id
+    WHERE {dia_sql('v.fecha')} BETWEEN ? AND ?
+    ORDER BY v.id DESC, vd.id
+'''
+
+
+def ventas_en_rango(db, fecha_inicio: str, fecha_fin: str) -> Tuple[list, int, float]:
+    """
+    Ventas del rango (todas, también las anuladas) para el reporte de ventas,
+    con el filtro de fechas en SQL y el total sumado por columnas.
+
+    Returns:
+        (líneas vendidas como filas compactas, de la venta más reciente a la más
+         antigua, con las columnas venta_id, referencia_no, fecha, estado,
+         cliente_nombre, producto_nombre, cantidad, precio_unitario y subtotal;
+         número de ventas; suma del total de esas ventas)
+    """
+    rango = _rango_dias(fecha_inicio, fecha_fin)
+    lineas = db.execute_query_filas(_LINEAS_REPORTE_VENTAS, rango, historico=True)
+    totales = cargar_columnas(db, f"SELECT v.total FROM ventas v WHERE {dia_sql('v.fecha')} BETWEEN ? AND ?",
+                              rango, historico=True)
+    return lineas, totales['_filas'], _suma(totales['total'])
+
+
+def ganancia_por_producto(db, producto_ids: Sequence[int] = None) -> Dict[int, Dict]:
+    """
+    Compras y ventas (no anuladas) agrupadas por producto; la ganancia usa el
+    costo promedio de lo comprado.
+
+    Returns:
+        {producto_id: {'total_comprado', 'cantidad_comprada', 'total_vendido',
+                       'cantidad_vendida', 'ganancia', 'porcentaje_ganancia'}}
+    """
+    filtro, params = '', ()
+    if producto_ids is not None:
+        filtro = f" AND producto_id IN ({','.join('?' * len(producto_ids))})"
+        params = tuple(producto_ids)
+    compras = cargar_columnas(db, f'''
+        SELECT producto_id, cantidad, total FROM compras WHERE producto_id IS NOT NULL{filtro}
+    ''', params, historico=True)
+    ventas = cargar_columnas(db, f'''
+        SELECT vd.producto_id, vd.cantidad, vd.subtotal FROM ventas_detalle vd
+        INNER JOIN ventas v ON vd.venta_id = v.id
+        WHERE v.estado != 'Anulado' AND vd.producto_id IS NOT NULL{filtro.replace('producto_id', 'vd.producto_id')}
+    ''', params, historico=True)
+
+    resultado = {}
+
+    def fila(producto_id):
+        return resultado.setdefault(int(producto_id), {
+            'total_comprado': 0.0, 'cantidad_comprada': 0, 'total_vendido': 0.0, 'cantidad_vendida': 0})
+
+    if compras['_filas']:
+        ids, sumas = agrupar(compras['producto_id'], total=compras['total'], cantidad=compras['cantidad'])
+        for posicion, producto_id in enumerate(ids):
+            fila(producto_id).update(total_comprado=sumas['total'][posicion],
+                                     cantidad_comprada=int(sumas['cantidad'][posicion]))
+    if ventas['_filas']:
+        ids, sumas = agrupar(ventas['producto_id'], total=ventas['subtotal'], cantidad=ventas['cantidad'])
+        for posicion, producto_id in enumerate(ids):
+            fila(producto_id).update(total_vendido=sumas['total'][posicion],
+                                     cantidad_vendida=int(sumas['cantidad'][posicion]))
+    for datos in resultado.values():
+        costo_promedio = datos['total_comprado'] / datos['cantidad_comprada'] if datos['cantidad_comprada'] else 0
+        datos['ganancia'] = datos['total_vendido'] - datos['cantidad_vendida'] * costo_promedio
+        datos['porcentaje_ganancia'] = (datos['ganancia'] / datos['total_comprado'] * 100
+                                        if datos['total_comprado'] > 0 else 0)
+    return resultado
+
+
+def _nombres_productos(db, ids: List[int]) -> Dict[int, str]:
+    if not ids:
+        return {}
+    filas = db.execute_query_filas(
+        f"SELECT id, nombre FROM productos WHERE id IN ({','.join('?' * len(ids))})", tuple(ids))
+    return {fila[0]: fila[1] for fila in filas}
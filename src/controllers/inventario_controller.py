@@ -2,23 +2,125 @@
 Controlador principal para el sistema de inventarios
 """
 from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+from concurrent.futures import Future
+from datetime import datetime, timezone
+import threading
+from src.database.bloqueos import describir_error
 from src.database.database_manager import DatabaseManager
+from src.utils.trazas import trazar_metodos
 from src.models.models import Producto, Compra, Venta, ResumenInventario
 
+# Eventos que emite el controlador después de cada escritura exitosa.
+# Los suscriptores reciben los datos como argumentos con nombre:
+#   product_changed -> producto_id, accion ('crear', 'actualizar', 'estado', 'stock', 'eliminar')
+#   purchase_added  -> compra_id, producto_id
+#   sale_added      -> venta_id (None si no se pudo determinar)
+#   sale_voided     -> venta_id
+#   cash_moved      -> movimiento_id, accion ('crear', 'eliminar')
+EVENTOS = ('product_changed', 'purchase_added', 'sale_added', 'sale_voided', 'cash_moved')
+
+# Tablas que escribe la operación que emite cada evento
+TABLAS_POR_EVENTO = {
+    'product_changed': ('productos', 'movimientos_stock'),
+    'purchase_added': ('compras', 'productos', 'movimientos_stock', 'movimientos_caja'),
+    'sale_added': ('ventas', 'ventas_detalle', 'compras', 'productos', 'movimientos_stock', 'movimientos_caja'),
+    'sale_voided': ('ventas', 'productos', 'movimientos_stock', 'movimientos_caja'),
+    'cash_moved': ('movimientos_caja',),
+}
+
+# Métodos que solo leen: en segundo plano van a los hilos lectores, el resto al escritor
+PREFIJOS_LECTURA = ('obtener_', 'buscar_', 'calcular_')
+
+
+class _VarianteAsincrona:
+    """Expone los métodos del controlador devolviendo un Future en lugar del resultado"""
+    
+    def __init__(self, controller):
+        self._controller = controller
+    
+    def __getattr__(self, metodo):
+        def llamar(*args, **kwargs):
+            return self._controller.en_segundo_plano(metodo, *args, **kwargs)
+        return llamar
+
+
+@trazar_metodos(categoria='controlador', excluir=('suscribir', 'desuscribir', 'configurar_ejecutor'))
 class InventarioController:
     def eliminar_producto(self, producto_id: int) -> tuple:
         """Elimina un producto y sus movimientos relacionados"""
         try:
             exito = self.db.eliminar_producto(producto_id)
             if exito:
+                self.emitir('product_changed', producto_id=producto_id, accion='eliminar')
                 return True, "Producto eliminado correctamente."
             else:
                 return False, "No se pudo eliminar el producto."
         except Exception as e:
-            return False, f"Error al eliminar producto: {str(e)}"
+            return False, f"Error al eliminar producto: {describir_error(e)}"
     def __init__(self, db_path: str = "data/inventarios.db"):
         self.db = DatabaseManager(db_path)
+        self._suscriptores = {evento: [] for evento in EVENTOS}
+        self._indice_codigos = None  # codigo normalizado -> producto_id (se construye al primer uso)
+        self.suscribir('product_changed', self._invalidar_indice_codigos)
+        self.ejecutor = None     # EjecutorBD para operaciones en segundo plano
+        self.despachador = None  # Función(callable, *args) que ejecuta en el hilo de la interfaz
+        self.asincrono = _VarianteAsincrona(self)
+    
+    # EJECUCIÓN EN SEGUNDO PLANO
+    def configurar_ejecutor(self, ejecutor, despachador):
+        """
+        Activa las variantes asíncronas (controller.asincrono.metodo(...)).
+        
+        Args:
+            ejecutor: EjecutorBD con hilo escritor y lectores
+            despachador: Función que ejecuta un callable en el hilo de la interfaz
+        """
+        self.ejecutor = ejecutor
+        self.despachador = despachador
+    
+    def en_segundo_plano(self, metodo: str, *args, **kwargs) -> Future:
+        """Ejecuta un método del controlador en el ejecutor y devuelve un Future"""
+        funcion = getattr(self, metodo)
+        if self.ejecutor is None:
+            # Sin ejecutor (scripts, pruebas) se ejecuta en el mismo hilo
+            futuro = Future()
+            try:
+                futuro.set_result(funcion(*args, **kwargs))
+            except Exception as e:
+                futuro.set_exception(e)
+            return futuro
+        if metodo.startswith(PREFIJOS_LECTURA):
+            return self.ejecutor.leer(funcion, *args, **kwargs)
+        return self.ejecutor.escribir(funcion, *args, **kwargs)
+    
+    # EVENTOS
+    def suscribir(self, evento: str, callback):
+        """Registra un callback que se llamará cada vez que se emita el evento"""
+        if evento not in self._suscriptores:
+            raise ValueError(f"Evento desconocido: {evento}")
+        if callback not in self._suscriptores[evento]:
+            self._suscriptores[evento].append(callback)
+    
+    def desuscribir(self, evento: str, callback):
+        """Elimina un callback registrado"""
+        if callback in self._suscriptores.get(evento, []):
+            self._suscriptores[evento].remove(callback)
+    
+    def emitir(self, evento: str, **datos):
+        """Notifica a los suscriptores; un error en uno no afecta a los demás"""
+        # Los suscriptores tocan la interfaz: si la escritura corrió en un hilo
+        # del ejecutor, la notificación se pasa al hilo de Tk
+        if self.despachador is not None and threading.current_thread() is not threading.main_thread():
+            self.despachador(self._notificar, evento, datos)
+        else:
+            self._notificar(evento, datos)
+    
+    def _notificar(self, evento: str, datos: Dict):
+        for callback in list(self._suscriptores.get(evento, [])):
+            try:
+                callback(**datos)
+            except Exception as e:
+                print(f"Error en suscriptor de '{evento}': {e}")
     
     # GESTIÓN DE PRODUCTOS
     def crear_producto(self, codigo: str, nombre: str, categoria: str, precio_compra: float, porcentaje_ganancia: float, marca: str = '', color: str = '', tamaño: str = '', dibujo: str = '', cod_color: str = '') -> Tuple[bool, str]:
@@ -34,12 +136,13 @@ class InventarioController:
                 return False, "El porcentaje de ganancia no puede ser negativo"
             
             producto_id = self.db.crear_producto(codigo.strip() if codigo else "", nombre.strip(), categoria.strip() if categoria else "", precio_compra, porcentaje_ganancia, marca.strip(), color.strip(), tamaño.strip(), dibujo.strip(), cod_color.strip())
+            self.emitir('product_changed', producto_id=producto_id, accion='crear')
             return True, f"Producto creado con ID: {producto_id}"
         
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
                 return False, "Ya existe un producto con ese código"
-            return False, f"Error al crear producto: {str(e)}"
+            return False, f"Error al crear producto: {describir_error(e)}"
     
     def obtener_productos(self) -> List[Dict]:
         """Obtiene todos los productos"""
@@ -64,6 +167,7 @@ class InventarioController:
             filas_afectadas = self.db.actualizar_producto(producto_id, codigo.strip() if codigo else "", nombre.strip(), categoria.strip() if categoria else "", precio_compra, porcentaje_ganancia, marca.strip(), color.strip(), tamaño.strip(), dibujo.strip(), cod_color.strip())
             
             if filas_afectadas > 0:
+                self.emitir('product_changed', producto_id=producto_id, accion='actualizar')
                 return True, "Producto actualizado correctamente"
             else:
                 return False, "No se pudo actualizar el producto"
@@ -71,7 +175,7 @@ class InventarioController:
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
                 return False, "Ya existe un producto con ese código"
-            return False, f"Error al actualizar producto: {str(e)}"
+            return False, f"Error al actualizar producto: {describir_error(e)}"
     
     def cambiar_estado_producto(self, producto_id: int, activo: bool) -> Tuple[bool, str]:
         """Cambia el estado activo/inactivo de un producto"""
@@ -85,18 +189,48 @@ class InventarioController:
             exito = self.db.cambiar_estado_producto(producto_id, activo)
             
             if exito:
+                self.emitir('product_changed', producto_id=producto_id, accion='estado')
                 estado_texto = "activado" if activo else "desactivado"
                 return True, f"Producto {estado_texto} correctamente"
             else:
                 return False, "No se pudo cambiar el estado del producto"
         
         except Exception as e:
-            return False, f"Error al cambiar estado: {str(e)}"
+            return False, f"Error al cambiar estado: {describir_error(e)}"
     
     def obtener_productos_activos(self) -> List[Dict]:
         """Obtiene solo los productos activos"""
         return self.db.obtener_productos_activos()
     
+    # ÍNDICE DE CÓDIGOS (lector de código de barras)
+    def buscar_id_por_codigo(self, codigo: str) -> Optional[int]:
+        """Devuelve el ID del producto activo con ese código exacto, o None"""
+        if self._indice_codigos is None:
+            self._indice_codigos = {
+                p['codigo'].strip().upper(): p['id']
+                for p in self.db.obtener_productos_activos()
+                if p.get('codigo') and p['codigo'].strip()
+            }
+        return self._indice_codigos.get((codigo or '').strip().upper())
+    
+    def obtener_producto_por_codigo(self, codigo: str) -> Optional[Dict]:
+        """Obtiene un producto activo por su código exacto (con stock actualizado)"""
+        producto_id = self.buscar_id_por_codigo(codigo)
+        if producto_id is None:
+            return None
+        return self.db.obtener_producto_por_id(producto_id)
+    
+    def notificar_cambios_externos(self, tablas):
+        """Descarta lo que se guarda en memoria cuando otra terminal modificó esas tablas"""
+        if 'productos' in tablas:
+            self._indice_codigos = None
+    
+    def _invalidar_indice_codigos(self, producto_id, accion):
+        """Descarta el índice si cambió un código o el estado de un producto"""
+        # Los cambios de stock no afectan al índice: el stock se lee al resolver el producto
+        if accion != 'stock':
+            self._indice_codigos = None
+    
     def obtener_productos_inactivos(self) -> List[Dict]:
         """Obtiene solo los productos inactivos"""
         return self.db.obtener_productos_inactivos()
@@ -135,25 +269,34 @@ class InventarioController:
             if not proveedor:
                 return False, "Proveedor no encontrado"
             
+            # El EGRESO en caja se registra en la misma transacción que la compra
+            caja = {
+                'categoria': 'COMPRA_MERCADERIA',
+                'concepto': lambda compra_id: f"Compra #{compra_id} - Proveedor: {proveedor['nombre']} - Doc: {no_documento}",
+            }
             compra_id = self.db.registrar_compra(producto_id, cantidad, precio_unitario,
                                                 proveedor_id, no_documento, fecha_manual,
-                                                es_perecedero, fecha_vencimiento)
-            
-            # Calcular total de la compra
-            total_compra = cantidad * precio_unitario
-            
-            # Registrar EGRESO en caja
-            concepto = f"Compra #{compra_id} - Proveedor: {proveedor['nombre']} - Doc: {no_documento}"
-            self.registrar_movimiento_caja('EGRESO', 'COMPRA_MERCADERIA', concepto, total_compra, fecha_manual)
+                                                es_perecedero, fecha_vencimiento, caja=caja)
             
+            self.emitir('purchase_added', compra_id=compra_id, producto_id=producto_id)
+            self.emitir('cash_moved', movimiento_id=caja['movimiento_id'], accion='crear')
+            self.emitir('product_changed', producto_id=producto_id, accion='stock')
             return True, f"Compra registrada con ID: {compra_id}"
         
         except Exception as e:
-            return False, f"Error al registrar compra: {str(e)}"
+            return False, f"Error al registrar compra: {describir_error(e)}"
+    
+    def obtener_compras(self, historico: bool = False) -> List[Dict]:
+        """Obtiene todas las compras (historico=True incluye los años archivados)"""
+        return self.db.obtener_compras(historico)
+    
+    def obtener_compras_perecederas(self) -> List[Dict]:
+        """Obtiene las compras perecederas con fecha de vencimiento"""
+        return self.db.obtener_compras_perecederas()
     
-    def obtener_compras(self) -> List[Dict]:
-        """Obtiene todas las compras"""
-        return self.db.obtener_compras()
+    def obtener_compra_por_id(self, compra_id: int) -> Optional[Dict]:
+        """Obtiene una compra con los nombres de producto y proveedor"""
+        return self.db.obtener_compra_por_id(compra_id)
     
     def obtener_productos_proximos_vencer(self, dias_limite: int = 30) -> List[Dict]:
         """Obtiene productos perecederos próximos a vencer"""
@@ -171,63 +314,57 @@ class InventarioController:
             else:
                 return False, "Error al actualizar la compra"
         except Exception as e:
-            return False, f"Error: {str(e)}"
+            return False, f"Error: {describir_error(e)}"
     
     # GESTIÓN DE VENTAS
     # GESTIÓN DE VENTAS
-    def registrar_venta_con_carrito(self, cliente_id: int, productos_carrito: List[Dict], fecha_manual: str) -> Tuple[bool, str]:
+    def registrar_venta_con_carrito(self, cliente_id: int, productos_carrito: List[Dict],
+                                    fecha_manual: str) -> Tuple[bool, str, Optional[int]]:
         """
         Registra una venta con múltiples productos (carrito)
         productos_carrito: Lista de diccionarios con {producto_id, cantidad, precio_unitario}
         fecha_manual debe estar en formato 'dd/mm/yyyy HH:MM:SS' o 'dd/mm/yyyy'
+        Devuelve (exito, mensaje, venta_id); venta_id es None si no se registró
         """
         try:
             if not productos_carrito:
-                return False, "El carrito está vacío"
+                return False, "El carrito está vacío", None
             
             # Validar cliente
             cliente = self.db.obtener_cliente_por_id(cliente_id)
             if not cliente:
-                return False, "Cliente no encontrado"
+                return False, "Cliente no encontrado", None
             
             # Validar productos
             for item in productos_carrito:
                 if item['cantidad'] <= 0:
-                    return False, f"La cantidad debe ser mayor a 0"
+                    return False, f"La cantidad debe ser mayor a 0", None
                 
                 if item['precio_unitario'] <= 0:
-                    return False, f"El precio debe ser mayor a 0"
+                    return False, f"El precio debe ser mayor a 0", None
             
-            exito, mensaje = self.db.registrar_venta_con_carrito(cliente_id, productos_carrito, fecha_manual)
+            # El INGRESO en caja (con número de venta) se registra en la misma transacción:
+            # una venta confirmada siempre tiene su movimiento de caja
+            caja = {
+                'categoria': 'VENTA',
+                'concepto': lambda venta_id, referencia: f"Venta #{venta_id} ({referencia}) - Cliente: {cliente['nombre']}",
+            }
+            exito, mensaje = self.db.registrar_venta_con_carrito(cliente_id, productos_carrito, fecha_manual,
+                                                                 caja=caja)
             
-            if exito:
-                # Calcular total de la venta (con descuentos aplicados)
-                total_venta = sum(item['cantidad'] * item['precio_unitario'] for item in productos_carrito)
-                
-                # Extraer ID y referencia de la venta del mensaje
-                venta_id = 'N/A'
-                referencia = 'N/A'
-                
-                if 'ID:' in mensaje:
-                    try:
-                        venta_id = mensaje.split('ID: ')[1].split('\n')[0].strip()
-                    except:
-                        pass
-                
-                if 'Referencia:' in mensaje:
-                    try:
-                        referencia = mensaje.split('Referencia: ')[1].split('\n')[0].strip()
-                    except:
-                        pass
-                
-                # Registrar INGRESO en caja con número de venta
-                concepto = f"Venta #{venta_id} ({referencia}) - Cliente: {cliente['nombre']}"
-                self.registrar_movimiento_caja('INGRESO', 'VENTA', concepto, total_venta, fecha_manual)
+            if not exito:
+                return False, mensaje, None
             
-            return exito, mensaje
+            venta_id = caja['venta_id']
+            self.emitir('sale_added', venta_id=venta_id)
+            self.emitir('cash_moved', movimiento_id=caja['movimiento_id'], accion='crear')
+            for producto_id in {item['producto_id'] for item in productos_carrito}:
+                self.emitir('product_changed', producto_id=producto_id, accion='stock')
+            
+            return True, mensaje, venta_id
         
         except Exception as e:
-            return False, f"Error al registrar venta: {str(e)}"
+            return False, f"Error al registrar venta: {describir_error(e)}", None
     
     def registrar_venta(self, producto_id: int, cantidad: int, precio_unitario: float,
                        cliente_id: int, fecha_manual: str) -> Tuple[bool, str]:
@@ -250,14 +387,17 @@ class InventarioController:
             
             exito, mensaje = self.db.registrar_venta(producto_id, cantidad, precio_unitario,
                                                      cliente_id, fecha_manual)
+            if exito:
+                self.emitir('sale_added', venta_id=None)
+                self.emitir('product_changed', producto_id=producto_id, accion='stock')
             return exito, mensaje
         
         except Exception as e:
-            return False, f"Error al registrar venta: {str(e)}"
+            return False, f"Error al registrar venta: {describir_error(e)}"
     
-    def obtener_ventas(self) -> List[Dict]:
-        """Obtiene todas las ventas"""
-        return self.db.obtener_ventas()
+    def obtener_ventas(self, historico: bool = False) -> List[Dict]:
+        """Obtiene todas las ventas (historico=True incluye los años archivados)"""
+        return self.db.obtener_ventas(historico)
     
     def obtener_venta_por_id(self, venta_id: int) -> Optional[Dict]:
         """Obtiene una venta específica con todos sus detalles"""
@@ -283,17 +423,24 @@ class InventarioController:
             total_venta = sum(detalle['cantidad'] * detalle['precio_unitario'] 
                              for detalle in venta['detalles'])
             
-            # Anular en la base de datos
-            exito, mensaje = self.db.anular_venta(venta_id)
+            # Obtener datos del cliente
+            cliente = self.db.obtener_cliente_por_id(venta['cliente_id'])
+            cliente_nombre = cliente['nombre'] if cliente else 'Desconocido'
+            
+            # Anular en la base de datos junto con el EGRESO en caja (devolución)
+            caja = {
+                'categoria': 'DEVOLUCION_VENTA',
+                'concepto': f"Devolución Venta #{venta_id} - Cliente: {cliente_nombre}",
+                'monto': total_venta,
+                'fecha': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            }
+            exito, mensaje = self.db.anular_venta(venta_id, caja=caja)
             
             if exito:
-                # Obtener datos del cliente
-                cliente = self.db.obtener_cliente_por_id(venta['cliente_id'])
-                cliente_nombre = cliente['nombre'] if cliente else 'Desconocido'
-                
-                # Registrar EGRESO en caja (devolución)
-                concepto = f"Devolución Venta #{venta_id} - Cliente: {cliente_nombre}"
-                self.registrar_movimiento_caja('EGRESO', 'DEVOLUCION_VENTA', concepto, total_venta)
+                self.emitir('sale_voided', venta_id=venta_id)
+                self.emitir('cash_moved', movimiento_id=caja['movimiento_id'], accion='crear')
+                for producto_id in {detalle['producto_id'] for detalle in venta['detalles']}:
+                    self.emitir('product_changed', producto_id=producto_id, accion='stock')
                 
                 productos_devueltos = len(venta['detalles'])
                 return True, f"Venta anulada. Productos devueltos: {productos_devueltos}. Dinero devuelto: Q {total_venta:.2f}"
@@ -301,7 +448,7 @@ class InventarioController:
                 return False, mensaje
                 
         except Exception as e:
-            return False, f"Error al anular venta: {str(e)}"
+            return False, f"Error al anular venta: {describir_error(e)}"
     
     # GESTIÓN DE PROVEEDORES
     def crear_proveedor(self, nombre: str, nit_dpi: str, direccion: str, telefono: str = "") -> Tuple[bool, str]:
@@ -320,7 +467,7 @@ class InventarioController:
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
                 return False, "Ya existe un proveedor con ese NIT o DPI"
-            return False, f"Error al crear proveedor: {str(e)}"
+            return False, f"Error al crear proveedor: {describir_error(e)}"
     
     def obtener_proveedores(self) -> List[Dict]:
         """Obtiene todos los proveedores"""
@@ -358,26 +505,32 @@ class InventarioController:
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
                 return False, "Ya existe un proveedor con ese NIT o DPI"
-            return False, f"Error al actualizar proveedor: {str(e)}"
+            return False, f"Error al actualizar proveedor: {describir_error(e)}"
     
     # GESTIÓN DE CLIENTES
-    def crear_cliente(self, nombre: str, nit_dpi: str, direccion: str, telefono: str = "") -> Tuple[bool, str]:
-        """Crea un nuevo cliente"""
+    def crear_cliente(self, nombre: str, nit_dpi: str, direccion: str, telefono: str = "") -> Tuple[bool, str, Optional[int]]:
+        """
+        Crea un nuevo cliente.
+        Retorna (éxito, mensaje, id del cliente creado o None)
+        """
         try:
             if not nombre.strip():
-                return False, "El nombre del cliente es obligatorio"
+                return False, "El nombre del cliente es obligatorio", None
             
             if not nit_dpi.strip():
-                return False, "El NIT o DPI es obligatorio"
+                return False, "El NIT o DPI es obligatorio", None
+            
+            if self.db.obtener_cliente_por_nit(nit_dpi):
+                return False, "Ya existe un cliente con ese NIT o DPI", None
             
             cliente_id = self.db.crear_cliente(nombre.strip(), nit_dpi.strip(), 
                                               direccion.strip(), telefono.strip())
-            return True, f"Cliente creado con ID: {cliente_id}"
+            return True, f"Cliente creado con ID: {cliente_id}", cliente_id
         
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
-                return False, "Ya existe un cliente con ese NIT o DPI"
-            return False, f"Error al crear cliente: {str(e)}"
+                return False, "Ya existe un cliente con ese NIT o DPI", None
+            return False, f"Error al crear cliente: {describir_error(e)}", None
     
     def obtener_clientes(self) -> List[Dict]:
         """Obtiene todos los clientes"""
@@ -387,6 +540,12 @@ class InventarioController:
         """Obtiene un cliente por su ID"""
         return self.db.obtener_cliente_por_id(cliente_id)
     
+    def obtener_cliente_por_nit(self, nit_dpi: str) -> Optional[Dict]:
+        """Obtiene un cliente por NIT/DPI exacto (sin distinguir mayúsculas ni espacios)"""
+        if not nit_dpi or not nit_dpi.strip():
+            return None
+        return self.db.obtener_cliente_por_nit(nit_dpi)
+    
     def buscar_cliente(self, busqueda: str) -> List[Dict]:
         """Busca clientes por nombre o NIT"""
         if not busqueda.strip():
@@ -403,6 +562,10 @@ class InventarioController:
             if not nit_dpi.strip():
                 return False, "El NIT o DPI es obligatorio"
             
+            existente = self.db.obtener_cliente_por_nit(nit_dpi)
+            if existente and existente['id'] != cliente_id:
+                return False, "Ya existe un cliente con ese NIT o DPI"
+            
             filas_afectadas = self.db.actualizar_cliente(cliente_id, nombre.strip(), 
                                                         nit_dpi.strip(), direccion.strip(), 
                                                         telefono.strip())
@@ -415,7 +578,7 @@ class InventarioController:
         except Exception as e:
             if "UNIQUE constraint failed" in str(e):
                 return False, "Ya existe un cliente con ese NIT o DPI"
-            return False, f"Error al actualizar cliente: {str(e)}"
+            return False, f"Error al actualizar cliente: {describir_error(e)}"
     
     # REPORTES Y RESÚMENES
     def obtener_resumen_inventario(self) -> Dict:
@@ -424,37 +587,32 @@ class InventarioController:
     
     def obtener_productos_con_stock_bajo(self, limite: int = 5) -> List[Dict]:
         """Obtiene productos con stock bajo (solo activos)"""
-        productos = self.db.obtener_productos_activos()  # Solo productos activos
-        return [p for p in productos if p['stock_actual'] <= limite]
+        return self.db.obtener_productos_con_stock_bajo(limite)
     
     def obtener_movimientos_stock(self, producto_id: int = None) -> List[Dict]:
         """Obtiene los movimientos de stock"""
         return self.db.obtener_movimientos_stock(producto_id)
     
+    def obtener_resumen_ventas(self, fecha_inicio: str = None, fecha_fin: str = None,
+                               periodo: str = 'mes', top: int = 10) -> Dict:
+        """Ventas, costo y margen por período y productos más vendidos (fechas dd/mm/yyyy)"""
+        from src.controllers.agregaciones_reportes import resumen_ventas
+        return resumen_ventas(self.db, fecha_inicio, fecha_fin, periodo, top)
+    
+    def obtener_ventas_en_rango(self, fecha_inicio: str, fecha_fin: str) -> Tuple:
+        """Líneas vendidas, número de ventas y total de las ventas del rango (fechas dd/mm/yyyy)"""
+        from src.controllers.agregaciones_reportes import ventas_en_rango
+        return ventas_en_rango(self.db, fecha_inicio, fecha_fin)
+    
     def calcular_ganancia_producto(self, producto_id: int) -> Dict:
         """Calcula la ganancia de un producto específico"""
+        from src.controllers.agregaciones_reportes import ganancia_por_producto
         try:
-            # Obtener todas las compras del producto
-            compras = [c for c in self.db.obtener_compras() if c['producto_id'] == producto_id]
-            total_comprado = sum(c['total'] for c in compras)
-            cantidad_comprada = sum(c['cantidad'] for c in compras)
-            
-            # Obtener todas las ventas del producto
-            ventas = [v for v in self.db.obtener_ventas() if v['producto_id'] == producto_id]
-            total_vendido = sum(v['total'] for v in ventas)
-            cantidad_vendida = sum(v['cantidad'] for v in ventas)
-            
-            ganancia = total_vendido - (cantidad_vendida * (total_comprado / cantidad_comprada if cantidad_comprada > 0 else 0))
-            
-            return {
-                'producto_id': producto_id,
-                'total_comprado': total_comprado,
-                'cantidad_comprada': cantidad_comprada,
-                'total_vendido': total_vendido,
-                'cantidad_vendida': cantidad_vendida,
-                'ganancia': ganancia,
-                'porcentaje_ganancia': (ganancia / total_comprado * 100) if total_comprado > 0 else 0
-            }
+            datos = ganancia_por_producto(self.db, [producto_id]).get(producto_id, {
+                'total_comprado': 0, 'cantidad_comprada': 0, 'total_vendido': 0,
+                'cantidad_vendida': 0, 'ganancia': 0, 'porcentaje_ganancia': 0
+            })
+            return {'producto_id': producto_id, **datos}
         
         except Exception as e:
             return {
@@ -472,6 +630,118 @@ class InventarioController:
         except Exception as e:
             return False, f"Error al cambiar base de datos: {str(e)}"
     
+    def copiar_base_datos(self, destino: str) -> Tuple[bool, str]:
+        """Copia consistente de la base de datos en uso a otra ubicación"""
+        from src.database import respaldo
+        try:
+            self.db.cola_escritura.vaciar()  # incluir bitácoras encoladas
+            resultado = respaldo.copiar_en_caliente(self.db.db_path, destino)
+            return True, f"Base de datos copiada en {resultado['segundos']:.1f} s"
+        except Exception as e:
+            return False, f"No se pudo copiar la base de datos: {str(e)}"
+    
+    def crear_respaldo(self) -> Tuple[bool, str]:
+        """Crea un respaldo comprimido y aplica la política de retención"""
+        from src.config.settings import Settings
+        from src.database import respaldo
+        try:
+            carpeta = Settings.get_respaldos(self.db.db_path)['carpeta']
+            self.db.cola_escritura.vaciar()
+            resultado = respaldo.crear_respaldo(self.db.db_path, carpeta, conectar=self.db._conectar)
+            eliminados = respaldo.aplicar_retencion(carpeta)
+            return True, (f"Respaldo creado: {resultado['ruta']}\n"
+                          f"Copia {resultado['segundos_copia']:.1f} s, compresión {resultado['segundos_compresion']:.1f} s, "
+                          f"{resultado['bytes_db'] / 1024 / 1024:.1f} MB → {resultado['bytes_gz'] / 1024 / 1024:.1f} MB"
+                          + (f"\nRespaldos antiguos eliminados: {len(eliminados)}" if eliminados else ""))
+        except Exception as e:
+            return False, f"Error al crear respaldo: {str(e)}"
+    
+    def obtener_respaldos(self) -> List[Dict]:
+        """Lista los respaldos disponibles, del más reciente al más antiguo"""
+        from src.config.settings import Settings
+        from src.database import respaldo
+        return respaldo.listar_respaldos(Settings.get_respaldos(self.db.db_path)['carpeta'])
+    
+    def restaurar_respaldo(self, ruta: str) -> Tuple[bool, str]:
+        """Reemplaza los datos actuales por los de un respaldo (antes respalda el estado actual)"""
+        from src.config.settings import Settings
+        from src.database import respaldo
+        try:
+            self.db.cola_escritura.vaciar()
+            resultado = respaldo.restaurar_respaldo(ruta, self.db.db_path, Settings.get_respaldos(self.db.db_path)['carpeta'],
+                                                   conectar=self.db._conectar)
+            # El respaldo puede ser de una versión anterior del esquema
+            self.db.init_database()
+            self.notificar_cambios_externos({'productos'})
+            return True, (f"Respaldo restaurado en {resultado['segundos']:.1f} s.\n"
+                          f"El estado anterior se guardó en: {resultado['respaldo_previo']}")
+        except Exception as e:
+            return False, f"Error al restaurar respaldo: {str(e)}"
+    
+    def ejecutar_mantenimiento(self, completo: bool = True) -> Tuple[bool, str]:
+        """Mantenimiento de la base de datos (ANALYZE/optimize, vacuum incremental, quick_check)"""
+        from src.database.mantenimiento import formatear_reporte
+        try:
+            reporte = self.db.ejecutar_mantenimiento(completo)
+            texto = formatear_reporte(reporte)
+            print(texto)
+            if reporte['integridad'] not in (None, 'ok'):
+                return False, texto
+            return True, texto
+        except Exception as e:
+            return False, f"Error en el mantenimiento: {str(e)}"
+    
+    def horas_desde_mantenimiento(self) -> Optional[float]:
+        """Horas desde el último mantenimiento completo (None si nunca se ha hecho)"""
+        ultimo = self.db.obtener_ultimo_mantenimiento()
+        if not ultimo:
+            return None
+        fecha = datetime.strptime(ultimo['fecha'], '%Y-%m-%d %H:%M:%S')
+        return (datetime.now(timezone.utc).replace(tzinfo=None) - fecha).total_seconds() / 3600
+    
+    def obtener_anios_archivables(self) -> List[int]:
+        """Años cerrados que todavía se pueden archivar"""
+        return self.db.obtener_anios_archivables()
+    
+    def archivar_anio(self, anio: int) -> Tuple[bool, str]:
+        """Respalda la base de datos y mueve a su archivo las filas cerradas de un año"""
+        exito, mensaje = self.crear_respaldo()
+        if not exito:
+            return False, f"No se archivó: {mensaje}"
+        try:
+            movidas = self.db.archivar_anio(anio)
+        except Exception as e:
+            return False, f"Error al archivar {anio}: {str(e)}"
+        
+        detalle = "\n".join(f"  {tabla}: {filas}" for tabla, filas in movidas.items())
+        return True, f"Año {anio} archivado ({sum(movidas.values())} filas):\n{detalle}"
+    
+    def cambios_desde(self, seq: int, limite: int = 1000) -> Tuple[List[Dict], int]:
+        """
+        Devuelve los cambios posteriores a seq y la secuencia hasta la que se leyó.
+        
+        El consumidor guarda la secuencia devuelta y la usa en la siguiente llamada.
+        Si hay más de `limite` cambios pendientes, se llama de nuevo hasta recibir
+        menos de `limite`.
+        
+        Returns:
+            (cambios, ultima_seq): cambios = [{seq, tabla, fila_id, operacion, fecha}]
+        """
+        cambios = self.db.obtener_cambios_desde(seq, limite)
+        return cambios, (cambios[-1]['seq'] if cambios else seq)
+    
+    def ultima_secuencia_cambios(self) -> int:
+        """Secuencia actual del log de cambios (punto de partida para un consumidor nuevo)"""
+        return self.db.obtener_ultima_secuencia_cambios()
+    
+    def podar_cambios(self, dias: int = 30) -> Tuple[bool, str]:
+        """Elimina del log de cambios lo que tenga más de `dias` días"""
+        try:
+            eliminados = self.db.podar_cambios(dias)
+            return True, f"Log de cambios podado: {eliminados} registros eliminados"
+        except Exception as e:
+            return False, f"Error al podar el log de cambios: {str(e)}"
+    
     def exportar_resumen(self) -> str:
         """Exporta un resumen completo del inventario"""
         try:
@@ -529,14 +799,20 @@ PRODUCTOS EN INVENTARIO:
             
             movimiento_id = self.db.registrar_movimiento_caja(tipo, categoria, concepto, 
                                                               monto, fecha_manual)
+            self.emitir('cash_moved', movimiento_id=movimiento_id, accion='crear')
             return True, f"Movimiento registrado correctamente (ID: {movimiento_id})"
         
         except Exception as e:
-            return False, f"Error al registrar movimiento: {str(e)}"
+            return False, f"Error al registrar movimiento: {describir_error(e)}"
+    
+    def obtener_movimientos_caja(self, fecha_inicio: str = None, fecha_fin: str = None,
+                                 historico: bool = False) -> List[Dict]:
+        """Obtiene los movimientos de caja (historico=True incluye los años archivados)"""
+        return self.db.obtener_movimientos_caja(fecha_inicio, fecha_fin, historico)
     
-    def obtener_movimientos_caja(self, fecha_inicio: str = None, fecha_fin: str = None) -> List[Dict]:
-        """Obtiene los movimientos de caja"""
-        return self.db.obtener_movimientos_caja(fecha_inicio, fecha_fin)
+    def obtener_movimiento_caja_por_id(self, movimiento_id: int) -> Optional[Dict]:
+        """Obtiene un movimiento de caja por su ID"""
+        return self.db.obtener_movimiento_caja_por_id(movimiento_id)
     
     def obtener_resumen_caja(self, fecha_inicio: str = None, fecha_fin: str = None) -> Dict:
         """Obtiene el resumen de movimientos de caja"""
@@ -546,7 +822,8 @@ PRODUCTOS EN INVENTARIO:
         """Elimina un movimiento de caja"""
         try:
             self.db.eliminar_movimiento_caja(movimiento_id)
+            self.emitir('cash_moved', movimiento_id=movimiento_id, accion='eliminar')
             return True, "Movimiento eliminado correctamente"
         except Exception as e:
-            return False, f"Error al eliminar movimiento: {str(e)}"
+            return False, f"Error al eliminar movimiento: {describir_error(e)}"
 
@@ -0,0 +1,298 @@
+"""
+Filas de los reportes que exporta la pestaña Reportes.
+
+Aquí se arma el contenido de cada reporte (filtro de fechas, estado de
+vencimiento, formato de montos y totales) sin tocar la interfaz: la pestaña
+pide el rango y el archivo, y solo convierte estas filas a Excel. Así el
+costo de cada exportación se puede medir sin Tk (benchmarks/suite.py).
+
+El reporte general y el de ventas filtran en SQL y suman por columnas
+(agregaciones_reportes); hojas_reporte_general() y hojas_reporte_ventas()
+consultan la base, por eso la pestaña las llama desde un hilo lector.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Formatos de fecha que pueden tener los registros (los más antiguos usaban ISO)
+FORMATOS_FECHA = ('%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y', '%Y-%m-%d')
+
+
+def parsear_fecha(texto: str) -> Optional[datetime]:
+    """Fecha de un registro en cualquiera de los formatos usados; None si no se reconoce"""
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    # Solo la parte de la fecha (hora con otro formato)
+    if ' ' in texto:
+        for formato in ('%d/%m/%Y', '%Y-%m-%d'):
+            try:
+                return datetime.strptime(texto.split()[0], formato)
+            except ValueError:
+                continue
+    return None
+
+
+def fecha_corta(texto: str) -> str:
+    """dd/mm/yyyy para mostrar en el reporte"""
+    if len(texto) == 19 and texto[2] == '/' and texto[5] == '/':
+        # dd/mm/yyyy HH:MM:SS (el formato de los registros): la fecha ya está como se muestra
+        return texto[:10]
+    for formato in ('%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S'):
+        try:
+            return datetime.strptime(texto, formato).strftime('%d/%m/%Y')
+        except ValueError:
+            continue
+    return texto.split()[0] if ' ' in texto else texto
+
+
+def filtrar_por_fecha(registros: List[Dict], fecha_inicio: str, fecha_fin: str) -> List[Dict]:
+    """Registros cuya fecha cae en el rango (fechas dd/mm/yyyy, fin incluido todo el día)"""
+    inicio = datetime.strptime(fecha_inicio, '%d/%m/%Y')
+    fin = datetime.strptime(fecha_fin, '%d/%m/%Y').replace(hour=23, minute=59, second=59)
+    filtrados = []
+    for registro in registros:
+        fecha = parsear_fecha(registro.get('fecha') or '')
+        if fecha and inicio <= fecha <= fin:
+            filtrados.append(registro)
+    return filtrados
+
+
+def dias_para_vencer(fecha_vencimiento: str, hoy: datetime) -> int:
+    return (datetime.strptime(fecha_vencimiento, '%d/%m/%Y') - hoy).days
+
+
+def estado_vencimiento(dias_restantes: int) -> str:
+    if dias_restantes < 0:
+        return f'VENCIDO (hace {abs(dias_restantes)} días)'
+    if dias_restantes <= 7:
+        return f'CRITICO ({dias_restantes} días)'
+    if dias_restantes <= 30:
+        return f'ADVERTENCIA ({dias_restantes} días)'
+    return f'OK ({dias_restantes} días)'
+
+
+def filas_reporte_general(resumen: Dict, productos_bajo: List[Dict],
+                          perecederas: List[Dict]) -> Tuple[Dict, List[Dict], List[Dict]]:
+    """
+    Contenido del reporte general.
+
+    Args:
+        productos_bajo: Productos activos con stock bajo (obtener_productos_con_stock_bajo)
+        perecederas: Compras perecederas con fecha de vencimiento (obtener_compras_perecederas)
+
+    Returns:
+        (resumen en columnas Concepto/Monto, productos con stock bajo,
+         lotes perecederos con su estado de vencimiento, los más urgentes primero)
+    """
+    resumen_data = {
+        'Concepto': ['Total Compras', 'Total Ventas', 'Ganancia Bruta', 'Valor Inventario', 'Saldo en Banco'],
+        'Monto (Q)': [
+            f"Q {resumen['total_compras']:,.2f}",
+            f"Q {resumen['total_ventas']:,.2f}",
+            f"Q {resumen['ganancia_bruta']:,.2f}",
+            f"Q {resumen['valor_inventario']:,.2f}",
+            f"Q {resumen['saldo_banco']:,.2f}"
+        ]
+    }
+
+    for p in productos_bajo:
+        p['estado'] = 'ACTIVO' if p.get('activo', 1) == 1 else 'INACTIVO'
+
+    hoy = datetime.now()
+    vencimientos = []
+    for compra in perecederas:
+        try:
+            dias_restantes = dias_para_vencer(compra['fecha_vencimiento'], hoy)
+        except ValueError:
+            continue
+        vencimientos.append({
+            'Producto': compra.get('producto_nombre', 'N/A'),
+            'Proveedor': compra.get('proveedor_nombre', 'N/A'),
+            'Cantidad': compra['cantidad'],
+            'Fecha Vencimiento': compra['fecha_vencimiento'],
+            'Días Restantes': dias_restantes,
+            'Estado': estado_vencimiento(dias_restantes)
+        })
+    vencimientos.sort(key=lambda x: x['Días Restantes'])
+    return resumen_data, productos_bajo, vencimientos
+
+
+def hojas_reporte_general(controller) -> Tuple[Dict[str, object], int]:
+    """
+    Hojas del reporte general en orden (nombre → filas) y cuántos lotes tienen
+    control de vencimiento. Consulta la base: fuera del hilo de Tk.
+    """
+    resumen_data, productos_bajo, vencimientos = filas_reporte_general(
+        controller.obtener_resumen_inventario(),
+        controller.obtener_productos_con_stock_bajo(),
+        controller.obtener_compras_perecederas()
+    )
+    resumen_ventas = controller.obtener_resumen_ventas(periodo='mes', top=20)
+    hojas = {
+        'Resumen General': resumen_data,
+        'Ventas por Mes': filas_ventas_por_periodo(resumen_ventas),
+        'Top Productos': filas_top_productos(resumen_ventas),
+        'Estado Vencimientos': vencimientos,
+        'Stock Bajo': productos_bajo,
+    }
+    return hojas, len(vencimientos)
+
+
+def filas_productos(productos: List[Dict]) -> List[Dict]:
+    """Todos los productos con los datos del SKU"""
+    return [{
+        'ID': p.get('id', ''),
+        'Código SKU': p.get('codigo', ''),
+        'Nombre': p.get('nombre', ''),
+        'Categoría': p.get('categoria', ''),
+        'Marca': p.get('marca', ''),
+        'Color': p.get('color', ''),
+        'Tamaño': p.get('tamaño', ''),
+        'Dibujo': p.get('dibujo', ''),
+        'Código Color': p.get('cod_color', ''),
+        'Stock Actual': p.get('stock_actual', 0),
+        'Precio Compra (Q)': f"{p.get('precio_compra', 0):.2f}",
+        'Precio Venta (Q)': f"{p.get('precio_venta', 0):.2f}",
+        '% Ganancia': f"{p.get('porcentaje_ganancia', 0):.2f}",
+        'Estado': 'ACTIVO' if p.get('activo', 1) == 1 else 'INACTIVO'
+    } for p in productos]
+
+
+def filas_compras(compras: List[Dict]) -> Tuple[List[Dict], float]:
+    """Filas del reporte de compras (ya filtradas) y el total general"""
+    hoy = datetime.now()
+    datos = []
+    total_general = 0
+    for compra in compras:
+        estado = 'N/A'
+        fecha_vencimiento_texto = 'N/A'
+        if compra.get('es_perecedero') == 1 and compra.get('fecha_vencimiento'):
+            fecha_vencimiento_texto = compra['fecha_vencimiento']
+            try:
+                estado = estado_vencimiento(dias_para_vencer(compra['fecha_vencimiento'], hoy))
+            except ValueError:
+                estado = 'Error en fecha'
+
+        datos.append({
+            'ID': compra['id'],
+            'Fecha': fecha_corta(compra['fecha']),
+            'Producto': compra.get('producto_nombre', 'N/A'),
+            'Proveedor': compra.get('proveedor_nombre', 'N/A'),
+            'Cantidad': compra['cantidad'],
+            'Precio Unitario': f"Q {compra['precio_unitario']:,.2f}",
+            'Total': f"Q {compra['total']:,.2f}",
+            'Vencimiento': fecha_vencimiento_texto,
+            'Estado': estado
+        })
+        total_general += compra['total']
+    return datos, total_general
+
+
+def filas_ventas(lineas, total_general: float) -> List[Dict]:
+    """
+    Una fila por producto vendido a partir de agregaciones_reportes.ventas_en_rango()
+    (líneas ya filtradas por fecha, con sus columnas en ese orden), con la fila de total al final
+    """
+    datos = [{
+        'ID Venta': venta_id,
+        'Referencia': referencia,
+        'Fecha': fecha_corta(fecha),
+        'Cliente': cliente,
+        'Producto': producto,
+        'Cantidad': cantidad,
+        'Precio Unitario': f"Q {precio_unitario:,.2f}",
+        'Subtotal': f"Q {subtotal:,.2f}",
+        'Estado': estado
+    } for venta_id, referencia, fecha, estado, cliente, producto, cantidad, precio_unitario, subtotal in lineas]
+    datos.append({
+        'ID Venta': '',
+        'Referencia': '',
+        'Fecha': '',
+        'Cliente': '',
+        'Producto': '',
+        'Cantidad': '',
+        'Precio Unitario': 'TOTAL:',
+        'Subtotal': f"Q {total_general:,.2f}",
+        'Estado': ''
+    })
+    return datos
+
+
+def hojas_reporte_ventas(controller, fecha_inicio: str, fecha_fin: str) -> Tuple[Dict[str, List[Dict]], int, float]:
+    """
+    Hojas del reporte de ventas del rango en orden (nombre → filas), número de
+    ventas y total. Sin ventas en el rango, las hojas quedan vacías. Consulta
+    la base: fuera del hilo de Tk.
+    """
+    lineas, ventas, total_general = controller.obtener_ventas_en_rango(fecha_inicio, fecha_fin)
+    if not ventas:
+        return {}, 0, 0.0
+    # Totales del rango por mes y productos más vendidos (calculados por columnas)
+    resumen_ventas = controller.obtener_resumen_ventas(fecha_inicio, fecha_fin, periodo='mes', top=20)
+    hojas = {
+        'Ventas': filas_ventas(lineas, total_general),
+        'Resumen por Mes': filas_ventas_por_periodo(resumen_ventas),
+        'Top Productos': filas_top_productos(resumen_ventas),
+    }
+    return hojas, ventas, total_general
+
+
+def filas_caja(movimientos: List[Dict]) -> Tuple[List[Dict], float, float]:
+    """Filas del reporte de caja (movimientos ya filtrados), total de ingresos y de egresos"""
+    datos = []
+    total_ingresos = 0
+    total_egresos = 0
+    for mov in movimientos:
+        datos.append({
+            'ID': mov['id'],
+            'Fecha': fecha_corta(mov['fecha']),
+            'Tipo': mov['tipo'],
+            'Categoría': mov.get('categoria', 'N/A'),
+            'Concepto': mov['concepto'],
+            'Monto': f"Q {mov['monto']:,.2f}"
+        })
+        if mov['tipo'].upper() == 'INGRESO':
+            total_ingresos += mov['monto']
+        else:
+            total_egresos += mov['monto']
+    return datos, total_ingresos, total_egresos
+
+
+def filas_ventas_por_periodo(resumen: Dict) -> List[Dict]:
+    """Hoja de ventas por período a partir de agregaciones_reportes.resumen_ventas(), con fila de total"""
+    datos = [{
+        'Período': p['periodo'],
+        'Líneas': p['lineas'],
+        'Unidades': p['unidades'],
+        'Ventas (Q)': f"Q {p['ventas']:,.2f}",
+        'Costo (Q)': f"Q {p['costo']:,.2f}",
+        'Ganancia (Q)': f"Q {p['ganancia']:,.2f}",
+        '% Margen': f"{p['margen_pct']:.2f}"
+    } for p in resumen['por_periodo']]
+    if datos:
+        datos.append({
+            'Período': 'TOTAL:',
+            'Líneas': resumen['lineas'],
+            'Unidades': resumen['unidades'],
+            'Ventas (Q)': f"Q {resumen['ventas']:,.2f}",
+            'Costo (Q)': f"Q {resumen['costo']:,.2f}",
+            'Ganancia (Q)': f"Q {resumen['ganancia']:,.2f}",
+            '% Margen': f"{resumen['margen_pct']:.2f}"
+        })
+    return datos
+
+
+def filas_top_productos(resumen: Dict) -> List[Dict]:
+    """Hoja de los productos más vendidos (por monto) de resumen_ventas()"""
+    return [{
+        'Posición': posicion,
+        'ID': p['producto_id'] or '',
+        'Producto': p['nombre'],
+        'Unidades': p['unidades'],
+        'Ventas (Q)': f"Q {p['ventas']:,.2f}",
+        'Costo (Q)': f"Q {p['costo']:,.2f}",
+        'Ganancia (Q)': f"Q {p['ganancia']:,.2f}",
+        '% Margen': f"{p['margen_pct']:.2f}"
+    } for posicion, p in enumerate(resumen['top_productos'], start=1)]
@@ -0,0 +1,201 @@
+"""
+Archivo histórico por año.
+
+Las compras, ventas y movimientos de un año cerrado se mueven a una base de
+datos aparte, <carpeta de la BD>/archivo/<nombre>_<AAAA>.db, con las mismas
+tablas. Así la base de datos en uso (la que se sincroniza con OneDrive) deja
+de crecer año con año, y los archivos de años cerrados no vuelven a cambiar.
+
+Qué NO se archiva:
+- Compras con cantidad disponible (lotes PEPS abiertos): se archivan en una
+  pasada posterior, cuando se agoten.
+- El último movimiento de caja: su saldo_nuevo es el saldo actual.
+- Productos, clientes, proveedores y usuarios (son datos maestros).
+
+Los reportes históricos leen los archivos sin cambiar sus consultas:
+conectar() adjunta los archivos con ATTACH y crea vistas TEMP con el mismo
+nombre de cada tabla (main UNION ALL archivos). Los nombres sin esquema se
+resuelven primero en temp, así que `FROM ventas` lee todo el historial.
+"""
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from src.database.bloqueos import PoliticaBloqueos
+
+# Tablas que se archivan, con la expresión que extrae el año de su fecha
+TABLAS_ARCHIVADAS = {
+    'compras': 'substr(fecha, 7, 4)',            # dd/mm/yyyy HH:MM:SS
+    'ventas': 'substr(fecha, 7, 4)',
+    'ventas_detalle': None,                       # sigue a su venta
+    'movimientos_stock': 'substr(fecha, 1, 4)',  # yyyy-mm-dd HH:MM:SS
+    'movimientos_caja': 'substr(fecha, 7, 4)',
+}
+
+# SQLite permite adjuntar 10 bases de datos por conexión (SQLITE_MAX_ATTACHED por defecto)
+MAX_ADJUNTOS = 10
+
+
+def carpeta_archivo(db_path) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), 'archivo')
+
+
+def ruta_archivo(db_path, anio: int) -> str:
+    nombre = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(carpeta_archivo(db_path), f"{nombre}_{anio}.db")
+
+
+def listar_archivos(db_path) -> Dict[int, str]:
+    """Años archivados de esta base de datos: {año: ruta}"""
+    carpeta = carpeta_archivo(db_path)
+    if not os.path.isdir(carpeta):
+        return {}
+    nombre = os.path.splitext(os.path.basename(db_path))[0]
+    patron = re.compile(re.escape(nombre) + r'_(\d{4})\.db$')
+    archivos = {}
+    for archivo in os.listdir(carpeta):
+        coincidencia = patron.match(archivo)
+        if coincidencia:
+            archivos[int(coincidencia.group(1))] = os.path.join(carpeta, archivo)
+    return archivos
+
+
+def _conexion_por_defecto(db_path, politica: PoliticaBloqueos) -> Callable[[], sqlite3.Connection]:
+    """Abre db_path con el busy timeout de la política (uso sin DatabaseManager)"""
+    return lambda: sqlite3.connect(db_path, **politica.opciones_conexion({}))
+
+
+def anios_archivables(db_path, conectar: Callable[[], sqlite3.Connection] = None) -> List[int]:
+    """
+    Años anteriores al actual que todavía tienen filas en la base de datos en uso
+
+    Args:
+        conectar: Función que abre la conexión (DatabaseManager._conectar)
+    """
+    conn = (conectar or _conexion_por_defecto(db_path, PoliticaBloqueos()))()
+    try:
+        anios = set()
+        for tabla, anio_sql in TABLAS_ARCHIVADAS.items():
+            if anio_sql:
+                anios.update(int(fila[0]) for fila in conn.execute(
+                    f"SELECT DISTINCT {anio_sql} FROM {tabla} WHERE {anio_sql} GLOB '[0-9][0-9][0-9][0-9]'"))
+    finally:
+        conn.close()
+    return sorted(anio for anio in anios if anio < datetime.now().year)
+
+
+def archivar_anio(db_path, anio: int, conectar: Callable[[], sqlite3.Connection] = None,
+                  ejecutar: Callable = None) -> Dict[str, int]:
+    """
+    Mueve las filas cerradas de un año a su archivo, en una sola transacción.
+
+    Se puede repetir sobre el mismo año: mueve lo que se cerró desde la vez
+    anterior (lotes que se agotaron después).
+
+    Args:
+        conectar: Función que abre la conexión (DatabaseManager._conectar)
+        ejecutar: PoliticaBloqueos.ejecutar(nombre, conectar, unidad): la transacción
+                  BEGIN IMMEDIATE espera y se reintenta si otra terminal está escribiendo
+
+    Returns:
+        Filas movidas por tabla
+    """
+    if anio >= datetime.now().year:
+        raise ValueError(f"El año {anio} no está cerrado")
+
+    destino = ruta_archivo(db_path, anio)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+
+    if conectar is None or ejecutar is None:
+        politica = PoliticaBloqueos()
+        conectar = conectar or _conexion_por_defecto(db_path, politica)
+        ejecutar = ejecutar or politica.ejecutar
+
+    def conectar_con_archivo():
+        # ATTACH no puede ir dentro de la transacción
+        conn = conectar()
+        try:
+            conn.execute('ATTACH DATABASE ? AS archivo', (destino,))
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def unidad(conn):
+        # Mismas tablas que en la base de datos en uso (sin triggers ni índices)
+        for tabla in TABLAS_ARCHIVADAS:
+            sql = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+                               (tabla,)).fetchone()[0]
+            conn.execute(re.sub(r'^CREATE TABLE\s+(IF NOT EXISTS\s+)?"?' + tabla + '"?',
+                                f'CREATE TABLE IF NOT EXISTS archivo.{tabla}', sql.strip()))
+            # Archivo creado con una versión anterior del esquema: agregar las columnas nuevas
+            existentes = {fila[1] for fila in conn.execute(f'PRAGMA archivo.table_info({tabla})')}
+            for fila in conn.execute(f'PRAGMA main.table_info({tabla})').fetchall():
+                if fila[1] not in existentes:
+                    conn.execute(f'ALTER TABLE archivo.{tabla} ADD COLUMN "{fila[1]}" {fila[2]}')
+        seq_antes = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM main.cambios').fetchone()[0]
+
+        anio_txt = str(anio)
+        filtros = {
+            'compras': ("substr(fecha, 7, 4) = ? AND COALESCE(cantidad_disponible, cantidad) <= 0", (anio_txt,)),
+            'ventas': ("substr(fecha, 7, 4) = ?", (anio_txt,)),
+            'ventas_detalle': ("venta_id IN (SELECT id FROM main.ventas WHERE substr(fecha, 7, 4) = ?)", (anio_txt,)),
+            'movimientos_stock': ("substr(fecha, 1, 4) = ?", (anio_txt,)),
+            'movimientos_caja': ("substr(fecha, 7, 4) = ? AND id < (SELECT MAX(id) FROM main.movimientos_caja)",
+                                 (anio_txt,)),
+        }
+        movidas = {}
+        # ventas_detalle antes que ventas: su filtro lee las ventas de main
+        for tabla in ('compras', 'ventas_detalle', 'ventas', 'movimientos_stock', 'movimientos_caja'):
+            condicion, parametros = filtros[tabla]
+            columnas = ', '.join(f'"{fila[1]}"' for fila in conn.execute(f'PRAGMA main.table_info({tabla})'))
+            conn.execute(f'INSERT OR REPLACE INTO archivo.{tabla} ({columnas}) '
+                         f'SELECT {columnas} FROM main.{tabla} WHERE {condicion}', parametros)
+            movidas[tabla] = conn.execute(f'DELETE FROM main.{tabla} WHERE {condicion}', parametros).rowcount
+
+        # Los borrados del archivo no son bajas: la replicación no debe enviarlos a otras terminales
+        conn.execute("UPDATE main.cambios SET origen = 'archivo' WHERE seq > ?", (seq_antes,))
+        return movidas
+
+    return ejecutar('archivar_anio', conectar_con_archivo, unidad)
+
+
+def conectar(db_path, anios: Optional[List[int]] = None, conn=None) -> sqlite3.Connection:
+    """
+    Conexión que ve la base de datos en uso más sus archivos.
+
+    Args:
+        anios: Solo adjuntar estos años (por defecto todos). Si hay más archivos
+               que MAX_ADJUNTOS se adjuntan los más recientes.
+        conn: Conexión ya abierta a db_path sobre la que adjuntar
+              (DatabaseManager._conectar; por defecto una nueva con el busy timeout)
+    """
+    if conn is None:
+        conn = _conexion_por_defecto(db_path, PoliticaBloqueos())()
+    archivos = listar_archivos(db_path)
+    if anios is not None:
+        archivos = {anio: ruta for anio, ruta in archivos.items() if anio in anios}
+    seleccion = sorted(archivos)[-MAX_ADJUNTOS:]
+    if len(seleccion) < len(archivos):
+        print(f"⚠️ Solo se consultan los últimos {MAX_ADJUNTOS} años archivados")
+
+    esquemas = []
+    for anio in seleccion:
+        esquema = f'archivo_{anio}'
+        conn.execute(f'ATTACH DATABASE ? AS {esquema}', (archivos[anio],))
+        esquemas.append(esquema)
+
+    if esquemas:
+        for tabla in TABLAS_ARCHIVADAS:
+            nombres = [fila[1] for fila in conn.execute(f'PRAGMA main.table_info({tabla})')]
+            partes = ['SELECT ' + ', '.join(f'"{n}"' for n in nombres) + f' FROM main.{tabla}']
+            for esquema in esquemas:
+                # Un archivo de una versión anterior puede no tener alguna columna nueva
+                existentes = {fila[1] for fila in conn.execute(f'PRAGMA {esquema}.table_info({tabla})')}
+                if existentes:
+                    partes.append('SELECT ' + ', '.join(f'"{n}"' if n in existentes else f'NULL AS "{n}"'
+                                                        for n in nombres) + f' FROM {esquema}.{tabla}')
+            conn.execute(f'CREATE TEMP VIEW {tabla} AS ' + ' UNION ALL '.join(partes))
+    return conn
@@ -0,0 +1,177 @@
+"""
+Manejo de la base de datos bloqueada por otra terminal.
+
+Varias cajas escriben en el mismo archivo. SQLite deja un solo escritor a la
+vez; sin política, la segunda terminal recibía "database is locked" de
+inmediato y la venta fallaba. Con esta política:
+
+- Cada conexión espera hasta `espera_ms` a que se libere el bloqueo (busy
+  timeout) en lugar de fallar.
+- Las operaciones de escritura (una venta, una compra, una anulación, un
+  movimiento de caja) son unidades de trabajo que empiezan con BEGIN
+  IMMEDIATE: toman el bloqueo de escritura antes de leer. Una transacción
+  diferida que lee y después escribe no puede esperar (SQLite devuelve
+  SQLITE_BUSY sin esperar para evitar el interbloqueo) y además leería datos
+  que otra terminal está por cambiar (stock, saldo de caja, referencia).
+- Si aun así la base sigue bloqueada, se reintenta la unidad completa hasta
+  `reintentos` veces con espera exponencial acotada (con variación aleatoria
+  para que dos terminales no reintenten al mismo tiempo).
+
+Las esperas para tomar el bloqueo, los reintentos y las unidades que se
+rindieron se acumulan por operación (resumen()).
+"""
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+# Esperas menores a esto (ms) no cuentan: es el costo normal de BEGIN IMMEDIATE
+UMBRAL_ESPERA_MS = 1.0
+ESPERA_REINTENTO_INICIAL_MS = 20
+MAX_MUESTRAS = 2000
+
+MENSAJE_OCUPADA = "la base de datos está ocupada por otra terminal, intente de nuevo"
+
+
+def es_bloqueo(error: Exception) -> bool:
+    """True si el error es de base de datos bloqueada u ocupada (SQLITE_BUSY / SQLITE_LOCKED)"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    mensaje = str(error).lower()
+    return 'locked' in mensaje or 'busy' in mensaje
+
+
+def describir_error(error: Exception) -> str:
+    """Texto del error para el usuario; el bloqueo se explica en lugar de mostrar el mensaje de SQLite"""
+    return MENSAJE_OCUPADA if es_bloqueo(error) else str(error)
+
+
+class _Metrica:
+    __slots__ = ('unidades', 'esperas', 'espera_total', 'espera_maxima', 'reintentos', 'fallidas', 'muestras')
+
+    def __init__(self):
+        self.unidades = 0
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.reintentos = 0
+        self.fallidas = 0
+        self.muestras = deque(maxlen=MAX_MUESTRAS)  # ms de cada espera
+
+
+class PoliticaBloqueos:
+    """Busy timeout, unidades de escritura con BEGIN IMMEDIATE y reintentos (seguro entre hilos)."""
+
+    def __init__(self, espera_ms: int = 5000, reintentos: int = 4, espera_reintento_max_ms: int = 1000):
+        """
+        Args:
+            espera_ms: Busy timeout de cada conexión
+            reintentos: Veces que se repite una unidad de trabajo que encontró la base bloqueada
+            espera_reintento_max_ms: Tope de la espera exponencial entre reintentos
+        """
+        self.espera_ms = espera_ms
+        self.reintentos = reintentos
+        self.espera_reintento_max_ms = espera_reintento_max_ms
+        self._lock = threading.Lock()
+        self._metricas: Dict[str, _Metrica] = {}
+        self.desde = time.time()
+
+    def opciones_conexion(self, opciones: dict) -> dict:
+        """Opciones de sqlite3.connect con el busy timeout (si quien conecta no pidió otro)"""
+        opciones.setdefault('timeout', self.espera_ms / 1000)
+        return opciones
+
+    def espera_reintento(self, intento: int) -> float:
+        """Segundos antes del reintento número `intento` (1, 2, ...)"""
+        tope = min(ESPERA_REINTENTO_INICIAL_MS * 2 ** (intento - 1), self.espera_reintento_max_ms)
+        return random.uniform(tope / 2, tope) / 1000
+
+    def ejecutar(self, nombre: str, conectar: Callable[[], sqlite3.Connection],
+                 unidad: Callable[[sqlite3.Connection], object]):
+        """
+        Ejecuta unidad(conn) en una transacción BEGIN IMMEDIATE y la confirma.
+
+        Si la base está bloqueada (al empezar o a mitad de la unidad) se deshace
+        y se repite la unidad completa con una conexión nueva. Cualquier otro
+        error deshace la transacción y se propaga igual que antes.
+
+        Returns:
+            Lo que devuelva unidad(conn)
+        """
+        intento = 0
+        while True:
+            conn = conectar()
+            try:
+                t0 = time.perf_counter()
+                try:
+                    conn.execute('BEGIN IMMEDIATE')
+                finally:
+                    self._registrar_espera(nombre, (time.perf_counter() - t0) * 1000, intento == 0)
+                resultado = unidad(conn)
+                conn.commit()
+                return resultado
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                if not es_bloqueo(e):
+                    raise
+                if intento >= self.reintentos:
+                    self._sumar(nombre, 'fallidas')
+                    print(f"🔒 {nombre}: base de datos bloqueada después de {intento} reintentos")
+                    raise
+                intento += 1
+                self._sumar(nombre, 'reintentos')
+                time.sleep(self.espera_reintento(intento))
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+    def _metrica(self, nombre: str) -> _Metrica:
+        metrica = self._metricas.get(nombre)
+        if metrica is None:
+            metrica = self._metricas[nombre] = _Metrica()
+        return metrica
+
+    def _registrar_espera(self, nombre: str, ms: float, nueva: bool):
+        with self._lock:
+            metrica = self._metrica(nombre)
+            if nueva:
+                metrica.unidades += 1
+            if ms >= UMBRAL_ESPERA_MS:
+                metrica.esperas += 1
+                metrica.espera_total += ms
+                metrica.espera_maxima = max(metrica.espera_maxima, ms)
+                metrica.muestras.append(ms)
+
+    def _sumar(self, nombre: str, campo: str):
+        with self._lock:
+            metrica = self._metrica(nombre)
+            setattr(metrica, campo, getattr(metrica, campo) + 1)
+
+    def resumen(self) -> List[Dict]:
+        """Una fila por operación, ordenadas por tiempo total esperando el bloqueo."""
+        with self._lock:
+            filas = []
+            for nombre, m in self._metricas.items():
+                muestras = sorted(m.muestras)
+                filas.append({
+                    'operacion': nombre,
+                    'unidades': m.unidades,
+                    'esperas': m.esperas,
+                    'espera_total_ms': m.espera_total,
+                    'espera_p95_ms': muestras[min(int(len(muestras) * 0.95), len(muestras) - 1)] if muestras else 0.0,
+                    'espera_maxima_ms': m.espera_maxima,
+                    'reintentos': m.reintentos,
+                    'fallidas': m.fallidas,
+                })
+        return sorted(filas, key=lambda f: f['espera_total_ms'], reverse=True)
+
+    def reiniciar(self):
+        with self._lock:
+            self._metricas.clear()
+            self.desde = time.time()
@@ -0,0 +1,250 @@
+"""
+Cola de escritura diferida para filas de solo inserción (bitácoras).
+
+Los movimientos de stock y el último acceso de los usuarios no se leen justo
+después de escribirse, así que no necesitan su propio commit (y su propio
+fsync). Se acumulan aquí y un hilo los escribe juntos en una sola transacción
+cada `intervalo_ms` milisegundos o al llegar a `max_filas` filas.
+
+No se usa para tablas cuyo valor siguiente depende de la fila anterior
+(caja: saldo_anterior/saldo_nuevo) ni para ventas o compras.
+
+Si al cerrar no se puede escribir lo pendiente (base bloqueada o no
+disponible), las filas se guardan junto a la base de datos en
+<base>.pendientes y se escriben la próxima vez que se abra
+(recuperar_pendientes()).
+
+Solo los errores de bloqueo se reintentan: las filas vuelven a la cola. Si
+un lote falla por otra causa (una restricción, un producto que ya no existe),
+sus filas se escriben una por una y las que fallan solas se apartan en el
+archivo de pendientes, para que no detengan a las que vienen detrás.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.database.bloqueos import es_bloqueo
+
+
+def marca_tiempo():
+    """Fecha y hora en el formato de CURRENT_TIMESTAMP (UTC), tomada al encolar."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ColaEscritura:
+    """Agrupa sentencias de escritura y las confirma en lotes desde un hilo."""
+
+    def __init__(self, db_path, intervalo_ms=200, max_filas=100, conectar=None, ejecutar=None):
+        """
+        Args:
+            db_path: Ruta de la base de datos
+            intervalo_ms: Espera máxima antes de escribir lo acumulado
+            max_filas: Filas acumuladas que fuerzan una escritura inmediata
+            conectar: Función que abre la conexión (por defecto sqlite3.connect(db_path))
+            ejecutar: PoliticaBloqueos.ejecutar(nombre, conectar, unidad) para escribir
+                      cada lote con BEGIN IMMEDIATE y reintentos si la base está bloqueada
+        """
+        self.db_path = db_path
+        self._conectar = conectar
+        self._ejecutar = ejecutar
+        self.intervalo_ms = intervalo_ms
+        self.max_filas = max_filas
+        self._filas = []  # (sql, parámetros)
+        self._condicion = threading.Condition()
+        self._lock_escritura = threading.Lock()  # un solo lote escribiéndose a la vez
+        self._hilo = None
+        self._cerrada = False
+        self.filas_escritas = 0
+        self.lotes = 0
+        atexit.register(self.cerrar)
+
+    def agregar(self, sql, parametros=()):
+        """Encola una sentencia. Si la cola está cerrada se escribe de inmediato."""
+        if self._cerrada:
+            try:
+                self._escribir([(sql, parametros)])
+            except sqlite3.Error as e:
+                print(f"Error al escribir con la cola cerrada: {e}")
+                self._guardar_pendientes()
+            return
+        with self._condicion:
+            self._filas.append((sql, parametros))
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name='bd-cola-escritura', daemon=True)
+                self._hilo.start()
+            if len(self._filas) >= self.max_filas:
+                self._condicion.notify()
+
+    def pendientes(self):
+        """Filas encoladas que aún no se escriben."""
+        return len(self._filas)
+
+    def vaciar(self):
+        """
+        Escribe ya todo lo pendiente (para leer lo recién encolado). Devuelve las
+        filas escritas. No lanza el error del escritor: si la base está bloqueada
+        las filas siguen en la cola y la lectura ve lo que ya estaba escrito.
+        """
+        try:
+            return self._vaciar()
+        except sqlite3.Error as e:
+            print(f"No se pudo escribir la cola antes de leer: {e}")
+            return 0
+
+    def vaciar_o_guardar(self):
+        """Escribe lo pendiente; lo que no se pueda escribir pasa al archivo de pendientes."""
+        try:
+            self._vaciar()
+        except sqlite3.Error as e:
+            print(f"Error al escribir lo pendiente: {e}")
+            self._guardar_pendientes()
+
+    def cerrar(self):
+        """
+        Escribe lo pendiente y detiene el hilo (al salir de la aplicación). Si no
+        se puede escribir, lo guarda en el archivo de pendientes en lugar de perderlo.
+        """
+        atexit.unregister(self.cerrar)
+        with self._condicion:
+            self._cerrada = True
+            self._condicion.notify()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(timeout=5)
+        self.vaciar_o_guardar()
+
+    def _vaciar(self):
+        with self._lock_escritura:
+            with self._condicion:
+                lote, self._filas = self._filas, []
+            if lote:
+                self._escribir(lote)
+            return len(lote)
+
+    def archivo_pendientes(self):
+        """Archivo donde se guardan las filas que no se pudieron escribir al cerrar."""
+        return self.db_path + '.pendientes'
+
+    def _guardar_pendientes(self):
+        """Pasa las filas encoladas al archivo de pendientes (una fila JSON por línea)."""
+        with self._condicion:
+            lote, self._filas = self._filas, []
+        if not lote:
+            return 0
+        try:
+            self._anexar_pendientes(lote)
+        except OSError:
+            with self._condicion:
+                self._filas[:0] = lote
+            raise
+        print(f"{len(lote)} filas pendientes guardadas en {self.archivo_pendientes()}; se escribirán al volver a abrir")
+        return len(lote)
+
+    def _anexar_pendientes(self, lote, modo='a'):
+        with open(self.archivo_pendientes(), modo, encoding='utf-8') as f:
+            for sql, parametros in lote:
+                f.write(json.dumps([sql, list(parametros)], ensure_ascii=False) + '\n')
+
+    def recuperar_pendientes(self):
+        """
+        Escribe las filas que quedaron en el archivo de pendientes de una sesión
+        anterior y lo elimina. Si tampoco ahora se puede, el archivo se conserva.
+        Devuelve las filas escritas.
+        """
+        ruta = self.archivo_pendientes()
+        if not os.path.exists(ruta):
+            return 0
+        with open(ruta, 'r', encoding='utf-8') as f:
+            lote = [(sql, tuple(parametros)) for sql, parametros in
+                    (json.loads(linea) for linea in f if linea.strip())]
+        with self._lock_escritura:
+            try:
+                self._ejecutar_lote(lote)
+                conservar = []
+            except sqlite3.Error as e:
+                if es_bloqueo(e):
+                    print(f"No se pudieron escribir las filas pendientes de {ruta}: {e}")
+                    return 0
+                fallidas, restantes, _ = self._escribir_por_fila(lote)
+                conservar = fallidas + restantes
+        if conservar:
+            # Se conservan solo las que no se pudieron escribir
+            self._anexar_pendientes(conservar, modo='w')
+            print(f"⚠️ {len(conservar)} filas de {ruta} no se pudieron escribir y se conservan en el archivo")
+        else:
+            os.remove(ruta)
+        escritas = len(lote) - len(conservar)
+        print(f"{escritas} filas pendientes de la sesión anterior escritas")
+        return escritas
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                if not self._cerrada and len(self._filas) < self.max_filas:
+                    self._condicion.wait(self.intervalo_ms / 1000)
+                if self._cerrada:
+                    return
+            try:
+                self._vaciar()
+            except sqlite3.Error as e:
+                # Base bloqueada: las filas se devolvieron a la cola; se reintenta en el siguiente ciclo
+                print(f"Error al escribir lote diferido: {e}")
+                time.sleep(self.intervalo_ms / 1000)
+
+    def _escribir(self, lote):
+        """Escribe un lote. Un bloqueo lo devuelve a la cola y se lanza; otro error aparta las filas que fallan."""
+        try:
+            self._ejecutar_lote(lote)
+        except sqlite3.Error as e:
+            if es_bloqueo(e):
+                # De vuelta a la cola: el hilo reintenta, y al cerrar van al archivo de pendientes
+                with self._condicion:
+                    self._filas[:0] = lote
+                raise
+            fallidas, restantes, bloqueo = self._escribir_por_fila(lote)
+            if fallidas:
+                self._anexar_pendientes(fallidas)
+                print(f"⚠️ Lote diferido con error ({e}): {len(fallidas)} de {len(lote)} filas "
+                      f"apartadas en {self.archivo_pendientes()}")
+            if bloqueo is not None:
+                with self._condicion:
+                    self._filas[:0] = restantes
+                raise bloqueo
+
+    def _escribir_por_fila(self, lote):
+        """
+        Escribe cada fila en su propia transacción.
+
+        Returns:
+            (filas que fallaron, filas sin intentar porque la base se bloqueó, error de bloqueo o None)
+        """
+        fallidas = []
+        for posicion, fila in enumerate(lote):
+            try:
+                self._ejecutar_lote([fila])
+            except sqlite3.Error as e:
+                if es_bloqueo(e):
+                    return fallidas, lote[posicion:], e
+                fallidas.append(fila)
+        return fallidas, [], None
+
+    def _ejecutar_lote(self, lote):
+        def unidad(conn):
+            for sql, parametros in lote:
+                conn.execute(sql, parametros)
+
+        conectar = self._conectar or (lambda: sqlite3.connect(self.db_path))
+        if self._ejecutar is not None:
+            self._ejecutar('cola_escritura', conectar, unidad)
+        else:
+            conn = conectar()
+            try:
+                with conn:  # una transacción para todo el lote
+                    unidad(conn)
+            finally:
+                conn.close()
+        self.filas_escritas += len(lote)
+        self.lotes += 1
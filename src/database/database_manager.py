@@ -6,6 +6,14 @@ import os
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 
+from src.database import archivo_historico, mantenimiento, migraciones
+from src.database.bloqueos import PoliticaBloqueos, describir_error
+from src.database.cola_escritura import ColaEscritura, marca_tiempo
+from src.database.filas import Columnas, Filas
+from src.database.instrumentacion import ConexionInstrumentada, Instrumentacion
+from src.database.monitor_cambios import leer_contadores
+from src.database.normalizacion import normalizar_nit
+
 class DatabaseManager:
     def __init__(self, db_path: str = None):
         """
@@ -18,342 +26,82 @@ class DatabaseManager:
             db_path = Settings.get_db_path()
         
         self.db_path = db_path
+        # Tiempos por forma de sentencia y registro de consultas lentas
+        from src.config.settings import Settings
+        self.instrumentacion = Instrumentacion(umbral_ms=Settings.get_umbral_consultas_lentas())
+        # Espera y reintentos cuando otra terminal tiene la base bloqueada
+        self.bloqueos = PoliticaBloqueos(**Settings.get_bloqueos())
+        # Función({tabla: (antes, después)}) que recibe el avance de contadores_cambios
+        # de cada escritura de esta terminal (el monitor de cambios la descuenta)
+        self.al_confirmar_escritura = None
+        # Bitácoras (movimientos de stock, último acceso) se escriben en lotes
+        self.cola_escritura = ColaEscritura(db_path, conectar=self._conectar, ejecutar=self._ejecutar)
         self.init_database()
+        # Filas que una sesión anterior no pudo escribir al cerrar
+        self.cola_escritura.recuperar_pendientes()
+    
+    def _conectar(self, **opciones) -> sqlite3.Connection:
+        """
+        Abre una conexión a la base de datos en uso con el busy timeout y la instrumentación.
+        Todo acceso de este gestor pasa por aquí, y también el de la cola de escritura,
+        la replicación, el mantenimiento, el archivo histórico y los respaldos.
+        """
+        self.bloqueos.opciones_conexion(opciones)
+        if not self.instrumentacion.activa:
+            return sqlite3.connect(self.db_path, **opciones)
+        conn = sqlite3.connect(self.db_path, factory=ConexionInstrumentada, **opciones)
+        conn.instrumentacion = self.instrumentacion
+        return conn
+    
+    def _ejecutar(self, nombre: str, conectar, unidad):
+        """
+        Ejecuta una unidad de escritura con la política de bloqueos. Si hay
+        al_confirmar_escritura, le informa después del commit cuánto avanzaron
+        los contadores de cambios; se leen dentro de la transacción BEGIN IMMEDIATE,
+        así que el avance es solo el de esta unidad.
+        """
+        if self.al_confirmar_escritura is None:
+            return self.bloqueos.ejecutar(nombre, conectar, unidad)
+        
+        cambios = {}
+        def unidad_con_contadores(conn):
+            antes = leer_contadores(conn)
+            resultado = unidad(conn)
+            cambios.clear()  # un reintento vuelve a empezar
+            cambios.update({tabla: (antes.get(tabla, 0), version)
+                            for tabla, version in leer_contadores(conn).items()
+                            if version != antes.get(tabla, 0)})
+            return resultado
+        
+        resultado = self.bloqueos.ejecutar(nombre, conectar, unidad_con_contadores)
+        if cambios:
+            self.al_confirmar_escritura(cambios)
+        return resultado
     
     def init_database(self):
-        """Inicializa la base de datos con todas las tablas necesarias"""
+        """
+        Verifica la versión del esquema y aplica solo las migraciones pendientes.
+        En una base de datos al día solo se lee la tabla schema_version.
+        """
         # Crear directorio si no existe
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        directorio = os.path.dirname(self.db_path)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Tabla de proveedores
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS proveedores (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    nit_dpi TEXT NOT NULL UNIQUE,
-                    direccion TEXT NOT NULL,
-                    telefono TEXT,
-                    fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Tabla de clientes
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS clientes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    nit_dpi TEXT NOT NULL UNIQUE,
-                    direccion TEXT,
-                    telefono TEXT,
-                    fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Tabla de productos
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS productos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    codigo TEXT UNIQUE,
-                    nombre TEXT NOT NULL UNIQUE,
-                    categoria TEXT,
-                    precio_compra REAL NOT NULL,
-                    porcentaje_ganancia REAL NOT NULL,
-                    precio_venta REAL NOT NULL,
-                    stock_actual INTEGER DEFAULT 0,
-                    fecha_creacion TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Agregar columna categoria si no existe (para bases de datos existentes)
-            try:
-                cursor.execute('ALTER TABLE productos ADD COLUMN categoria TEXT')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            # Agregar columna monto_ganancia si no existe
-            try:
-                cursor.execute('ALTER TABLE productos ADD COLUMN monto_ganancia REAL DEFAULT 0')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            # Agregar columnas para datos del SKU (marca, color, tamaño)
-            try:
-                cursor.execute('ALTER TABLE productos ADD COLUMN marca TEXT')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            try:
-                cursor.execute('ALTER TABLE productos ADD COLUMN color TEXT')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            try:
-                cursor.execute('ALTER TABLE productos ADD COLUMN tamaño TEXT')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            # Agregar columnas adicionales del generador SKU (dibujo, cod_color)
-            try:
-                cursor.execute('ALTER TABLE productos ADD COLUMN dibujo TEXT')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            try:
-                cursor.execute('ALTER TABLE productos ADD COLUMN cod_color TEXT')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            # Tabla de compras
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS compras (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    producto_id INTEGER,
-                    proveedor_id INTEGER,
-                    cantidad INTEGER NOT NULL,
-                    precio_unitario REAL NOT NULL,
-                    total REAL NOT NULL,
-                    no_documento TEXT NOT NULL,
-                    fecha TEXT NOT NULL,
-                    FOREIGN KEY (producto_id) REFERENCES productos (id),
-                    FOREIGN KEY (proveedor_id) REFERENCES proveedores (id)
-                )
-            ''')
-            
-            # Tabla de ventas (encabezado) - NUEVA ESTRUCTURA
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS ventas (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    referencia_no TEXT NOT NULL UNIQUE,
-                    cliente_id INTEGER,
-                    fecha TEXT NOT NULL,
-                    total REAL NOT NULL,
-                    estado TEXT DEFAULT 'Emitido',
-                    FOREIGN KEY (cliente_id) REFERENCES clientes (id)
-                )
-            ''')
-            
-            # Tabla de detalle de ventas (productos individuales) - NUEVA
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS ventas_detalle (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    venta_id INTEGER NOT NULL,
-                    producto_id INTEGER,
-                    cantidad INTEGER NOT NULL,
-                    precio_unitario REAL NOT NULL,
-                    subtotal REAL NOT NULL,
-                    FOREIGN KEY (venta_id) REFERENCES ventas (id) ON DELETE CASCADE,
-                    FOREIGN KEY (producto_id) REFERENCES productos (id)
-                )
-            ''')
-            
-            # Tabla de movimientos de stock
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS movimientos_stock (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    producto_id INTEGER,
-                    tipo TEXT NOT NULL, -- 'entrada' o 'salida'
-                    cantidad INTEGER NOT NULL,
-                    motivo TEXT NOT NULL, -- 'compra', 'venta', 'ajuste'
-                    fecha TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (producto_id) REFERENCES productos (id)
-                )
-            ''')
-            
-            # Tabla de movimientos de caja
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS movimientos_caja (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    tipo TEXT NOT NULL, -- 'INGRESO' o 'EGRESO'
-                    categoria TEXT NOT NULL, -- 'VENTA', 'COMPRA', 'RETIRO_UTILIDAD', 'GASTO_OPERATIVO', 'APORTE_CAPITAL'
-                    concepto TEXT NOT NULL,
-                    monto REAL NOT NULL,
-                    saldo_anterior REAL NOT NULL,
-                    saldo_nuevo REAL NOT NULL,
-                    fecha TEXT NOT NULL,
-                    usuario TEXT DEFAULT 'Sistema'
-                )
-            ''')
-            
-            # Tabla de usuarios
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS usuarios (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    usuario TEXT NOT NULL UNIQUE,
-                    contrasena TEXT NOT NULL,
-                    nombre_completo TEXT NOT NULL,
-                    rol TEXT DEFAULT 'usuario',
-                    activo INTEGER DEFAULT 1,
-                    fecha_creacion TEXT DEFAULT CURRENT_TIMESTAMP,
-                    ultimo_acceso TEXT
-                )
-            ''')
-            
-            # Crear usuario por defecto si no existe
-            cursor.execute("SELECT COUNT(*) FROM usuarios WHERE usuario = 'Marteliz'")
-            if cursor.fetchone()[0] == 0:
-                cursor.execute('''
-                    INSERT INTO usuarios (usuario, contrasena, nombre_completo, rol)
-                    VALUES (?, ?, ?, ?)
-                ''', ('Marteliz', 'Admin', 'Administrador', 'admin'))
-                print("Usuario por defecto 'Marteliz' creado exitosamente")
-            
-            # Agregar columnas de vencimiento a compras si no existen
-            try:
-                cursor.execute('ALTER TABLE compras ADD COLUMN es_perecedero INTEGER DEFAULT 0')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            try:
-                cursor.execute('ALTER TABLE compras ADD COLUMN fecha_vencimiento TEXT')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            # Agregar columna activo a productos si no existe (para productos descontinuados)
-            try:
-                cursor.execute('ALTER TABLE productos ADD COLUMN activo INTEGER DEFAULT 1')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            # Agregar columna cantidad_disponible para método PEPS
-            try:
-                cursor.execute('ALTER TABLE compras ADD COLUMN cantidad_disponible INTEGER')
-                # Inicializar cantidad_disponible = cantidad para compras existentes
-                cursor.execute('UPDATE compras SET cantidad_disponible = cantidad WHERE cantidad_disponible IS NULL')
-            except sqlite3.OperationalError:
-                pass  # La columna ya existe
-            
-            # MIGRACIÓN: Verificar si hay datos en la tabla ventas antigua
-            # Si existe la columna producto_id en ventas, significa que es la estructura antigua
-            try:
-                cursor.execute("SELECT producto_id FROM ventas LIMIT 1")
-                # Si llega aquí, la tabla tiene estructura antigua - necesita migración
-                # Verificar si hay datos
-                cursor.execute("SELECT COUNT(*) FROM ventas")
-                count = cursor.fetchone()[0]
-                
-                if count > 0:
-                    # Hay datos, hacer migración completa
-                    self._migrar_ventas_a_nueva_estructura(cursor)
-                else:
-                    # No hay datos, solo actualizar estructura
-                    print("Actualizando estructura de tabla ventas (sin datos)...")
-                    cursor.execute("DROP TABLE ventas")
-                    cursor.execute('''
-                        CREATE TABLE ventas (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            referencia_no TEXT NOT NULL UNIQUE,
-                            cliente_id INTEGER,
-                            fecha TEXT NOT NULL,
-                            total REAL NOT NULL,
-                            estado TEXT DEFAULT 'Emitido',
-                            FOREIGN KEY (cliente_id) REFERENCES clientes (id)
-                        )
-                    ''')
-            except sqlite3.OperationalError:
-                # La columna producto_id no existe, es la nueva estructura
-                # Verificar si falta la columna estado
-                try:
-                    cursor.execute("SELECT estado FROM ventas LIMIT 1")
-                except sqlite3.OperationalError:
-                    # Falta columna estado, agregarla
-                    try:
-                        cursor.execute("ALTER TABLE ventas ADD COLUMN estado TEXT DEFAULT 'Emitido'")
-                        print("Columna 'estado' agregada a la tabla ventas")
-                    except sqlite3.OperationalError:
-                        pass  # Ya existe
-            
-            conn.commit()
-    
-    def _migrar_ventas_a_nueva_estructura(self, cursor):
-        """Migra ventas de la estructura antigua (un producto por venta) a la nueva (encabezado + detalle)"""
+        conn = self._conectar(isolation_level=None)
         try:
-            # Verificar si ya existe la tabla ventas_detalle
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='ventas_detalle'")
-            if not cursor.fetchone():
-                return  # No hay tabla detalle, no migrar aún
-            
-            # Verificar si hay datos para migrar
-            cursor.execute("SELECT COUNT(*) as count FROM ventas")
-            count_result = cursor.fetchone()
-            if not count_result or count_result[0] == 0:
-                return  # No hay ventas para migrar
-            
-            # Obtener todas las ventas antiguas agrupadas por referencia_no
-            cursor.execute("""
-                SELECT referencia_no, cliente_id, fecha, 
-                       producto_id, cantidad, precio_unitario, total
-                FROM ventas
-                ORDER BY referencia_no, id
-            """)
-            ventas_antiguas = cursor.fetchall()
-            
-            if not ventas_antiguas:
-                return
-            
-            # Renombrar tabla antigua
-            cursor.execute("ALTER TABLE ventas RENAME TO ventas_old")
-            
-            # Crear nueva tabla ventas (encabezado)
-            cursor.execute('''
-                CREATE TABLE ventas (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    referencia_no TEXT NOT NULL UNIQUE,
-                    cliente_id INTEGER,
-                    fecha TEXT NOT NULL,
-                    total REAL NOT NULL,
-                    estado TEXT DEFAULT 'Emitido',
-                    FOREIGN KEY (cliente_id) REFERENCES clientes (id)
-                )
-            ''')
-            
-            # Agrupar ventas por referencia_no
-            ventas_agrupadas = {}
-            for row in ventas_antiguas:
-                ref_no = str(row[0])  # referencia_no como string
-                if ref_no not in ventas_agrupadas:
-                    ventas_agrupadas[ref_no] = {
-                        'cliente_id': row[1],
-                        'fecha': row[2],
-                        'productos': [],
-                        'total': 0
-                    }
-                ventas_agrupadas[ref_no]['productos'].append({
-                    'producto_id': row[3],
-                    'cantidad': row[4],
-                    'precio_unitario': row[5],
-                    'subtotal': row[6]
-                })
-                ventas_agrupadas[ref_no]['total'] += row[6]
-            
-            # Insertar en nueva estructura
-            for ref_no, venta_data in ventas_agrupadas.items():
-                # Insertar encabezado
-                cursor.execute("""
-                    INSERT INTO ventas (referencia_no, cliente_id, fecha, total, estado)
-                    VALUES (?, ?, ?, ?, 'Emitido')
-                """, (ref_no, venta_data['cliente_id'], venta_data['fecha'], venta_data['total']))
-                
-                venta_id = cursor.lastrowid
-                
-                # Insertar detalles
-                for producto in venta_data['productos']:
-                    cursor.execute("""
-                        INSERT INTO ventas_detalle (venta_id, producto_id, cantidad, precio_unitario, subtotal)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (venta_id, producto['producto_id'], producto['cantidad'], 
-                          producto['precio_unitario'], producto['subtotal']))
-            
-            # Opcional: Eliminar tabla antigua (comentar si quieres mantener backup)
-            # cursor.execute("DROP TABLE ventas_old")
-            
-            print(f"✅ Migración completada: {len(ventas_agrupadas)} ventas migradas a nueva estructura")
-            
-        except Exception as e:
-            print(f"⚠️ Error en migración de ventas: {e}")
-            # No hacer rollback, solo reportar el error
+            version = migraciones.version_actual(conn)
+            if version == 0:
+                # Solo tiene efecto en un archivo nuevo (antes de crear tablas); las bases
+                # de datos existentes las convierte el mantenimiento
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            if version < migraciones.VERSION_ESQUEMA:
+                self.reporte_migraciones = migraciones.aplicar_migraciones(conn, version)
+                print(migraciones.formatear_reporte(self.reporte_migraciones))
+            else:
+                self.reporte_migraciones = []
+        finally:
+            conn.close()
     
     # MÉTODOS PARA PROVEEDORES
     def crear_proveedor(self, nombre: str, nit_dpi: str, direccion: str, telefono: str = "") -> int:
@@ -398,10 +146,10 @@ class DatabaseManager:
     def crear_cliente(self, nombre: str, nit_dpi: str, direccion: str, telefono: str = "") -> int:
         """Crea un nuevo cliente"""
         query = '''
-            INSERT INTO clientes (nombre, nit_dpi, direccion, telefono)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO clientes (nombre, nit_dpi, direccion, telefono, nit_normalizado)
+            VALUES (?, ?, ?, ?, ?)
         '''
-        return self.execute_insert(query, (nombre, nit_dpi, direccion, telefono))
+        return self.execute_insert(query, (nombre, nit_dpi, direccion, telefono, normalizar_nit(nit_dpi)))
     
     def obtener_clientes(self) -> List[Dict]:
         """Obtiene todos los clientes"""
@@ -414,6 +162,12 @@ class DatabaseManager:
         resultado = self.execute_query(query, (cliente_id,))
         return resultado[0] if resultado else None
     
+    def obtener_cliente_por_nit(self, nit_dpi: str) -> Optional[Dict]:
+        """Obtiene un cliente por NIT/DPI exacto (normalizado, usa índice)"""
+        query = 'SELECT * FROM clientes WHERE nit_normalizado = ? ORDER BY id LIMIT 1'
+        resultado = self.execute_query(query, (normalizar_nit(nit_dpi),))
+        return resultado[0] if resultado else None
+    
     def buscar_cliente(self, busqueda: str) -> List[Dict]:
         """Busca clientes por nombre o NIT"""
         query = '''
@@ -428,34 +182,69 @@ class DatabaseManager:
         """Actualiza un cliente"""
         query = '''
             UPDATE clientes 
-            SET nombre = ?, nit_dpi = ?, direccion = ?, telefono = ?
+            SET nombre = ?, nit_dpi = ?, direccion = ?, telefono = ?, nit_normalizado = ?
             WHERE id = ?
         '''
-        return self.execute_update(query, (nombre, nit_dpi, direccion, telefono, cliente_id))
+        return self.execute_update(query, (nombre, nit_dpi, direccion, telefono,
+                                           normalizar_nit(nit_dpi), cliente_id))
     
-    def execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
-        """Ejecuta una consulta SELECT y devuelve los resultados"""
-        with sqlite3.connect(self.db_path) as conn:
+    def execute_query(self, query: str, params: tuple = (), historico: bool = False) -> List[Dict]:
+        """
+        Ejecuta una consulta SELECT y devuelve los resultados.
+        Con historico=True la consulta ve también los años archivados.
+        """
+        conn = self._conectar_lectura(historico)
+        try:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
     
-    def execute_insert(self, query: str, params: tuple = ()) -> int:
-        """Ejecuta una consulta INSERT y devuelve el ID del registro insertado"""
-        with sqlite3.connect(self.db_path) as conn:
+    def execute_query_filas(self, query: str, params: tuple = (), historico: bool = False) -> Filas:
+        """
+        Como execute_query pero con filas compactas (tuplas con el índice de columnas
+        compartido, ver src/database/filas.py). Para resultados grandes que solo se leen.
+        """
+        conn = self._conectar_lectura(historico)
+        try:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            conn.commit()
-            return cursor.lastrowid
+            return Filas([columna[0] for columna in cursor.description], cursor.fetchall())
+        finally:
+            conn.close()
     
-    def execute_update(self, query: str, params: tuple = ()) -> int:
-        """Ejecuta una consulta UPDATE y devuelve el número de filas afectadas"""
-        with sqlite3.connect(self.db_path) as conn:
+    def execute_query_columnas(self, query: str, params: tuple = (), historico: bool = False,
+                               numericas: tuple = None) -> Columnas:
+        """
+        Resultado por columnas: las numéricas en array.array (todas las que solo tienen
+        números, o las indicadas en `numericas`) y el resto en listas. Se lee con
+        fetchmany por lotes, sin armar antes la lista de todas las filas.
+        """
+        conn = self._conectar_lectura(historico)
+        try:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            conn.commit()
-            return cursor.rowcount
+            return Columnas.desde_cursor(cursor, numericas)
+        finally:
+            conn.close()
+    
+    def _conectar_lectura(self, historico: bool) -> sqlite3.Connection:
+        """Conexión para consultas; con historico=True adjunta los años archivados"""
+        if historico and archivo_historico.listar_archivos(self.db_path):
+            return archivo_historico.conectar(self.db_path, conn=self._conectar())
+        return self._conectar()
+    
+    def execute_insert(self, query: str, params: tuple = ()) -> int:
+        """Ejecuta una consulta INSERT y devuelve el ID del registro insertado"""
+        return self._ejecutar('execute_insert', self._conectar,
+                              lambda conn: conn.execute(query, params).lastrowid)
+    
+    def execute_update(self, query: str, params: tuple = ()) -> int:
+        """Ejecuta una consulta UPDATE y devuelve el número de filas afectadas"""
+        return self._ejecutar('execute_update', self._conectar,
+                              lambda conn: conn.execute(query, params).rowcount)
     
     # MÉTODOS PARA PRODUCTOS
     def crear_producto(self, codigo: str, nombre: str, categoria: str, precio_compra: float, porcentaje_ganancia: float, marca: str = '', color: str = '', tamaño: str = '', dibujo: str = '', cod_color: str = '') -> int:
@@ -478,11 +267,11 @@ class DatabaseManager:
         try:
             # Solo eliminar movimientos de stock y el producto
             # Las compras y ventas se mantienen para historial
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM movimientos_stock WHERE producto_id = ?', (producto_id,))
-                cursor.execute('DELETE FROM productos WHERE id = ?', (producto_id,))
-                conn.commit()
+            self.cola_escritura.vaciar()  # que no quede un movimiento encolado del producto
+            def unidad(conn):
+                conn.execute('DELETE FROM movimientos_stock WHERE producto_id = ?', (producto_id,))
+                conn.execute('DELETE FROM productos WHERE id = ?', (producto_id,))
+            self._ejecutar('eliminar_producto', self._conectar, unidad)
             return True
         except Exception as e:
             print(f"Error al eliminar producto: {e}")
@@ -520,6 +309,11 @@ class DatabaseManager:
         query = 'SELECT * FROM productos WHERE activo = 1 ORDER BY nombre'
         return self.execute_query(query)
     
+    def obtener_productos_con_stock_bajo(self, limite: int = 5) -> List[Dict]:
+        """Obtiene los productos activos con stock menor o igual al límite"""
+        query = 'SELECT * FROM productos WHERE activo = 1 AND stock_actual <= ? ORDER BY nombre'
+        return self.execute_query(query, (limite,))
+    
     def obtener_productos_inactivos(self) -> List[Dict]:
         """Obtiene solo los productos inactivos"""
         query = 'SELECT * FROM productos WHERE activo = 0 ORDER BY nombre'
@@ -528,55 +322,75 @@ class DatabaseManager:
     # MÉTODOS PARA COMPRAS
     def registrar_compra(self, producto_id: int, cantidad: int, precio_unitario: float,
                          proveedor_id: int, no_documento: str, fecha_manual: str,
-                         es_perecedero: bool = False, fecha_vencimiento: str = None) -> int:
+                         es_perecedero: bool = False, fecha_vencimiento: str = None,
+                         caja: Optional[Dict] = None) -> int:
         """
         Registra una compra y actualiza el stock
         fecha_manual debe estar en formato 'dd/mm/yyyy HH:MM:SS' o 'dd/mm/yyyy'
         es_perecedero: True si el producto tiene fecha de vencimiento
         fecha_vencimiento: Fecha en formato 'dd/mm/yyyy' (solo si es_perecedero=True)
+        caja: {'categoria', 'concepto': función(compra_id)} registra el EGRESO en la misma
+              transacción; al confirmar se completa con 'movimiento_id'
         """
         total = round(cantidad * precio_unitario, 2)
         
-        # Insertar compra
-        query_compra = '''
-            INSERT INTO compras (producto_id, cantidad, precio_unitario, total, fecha, proveedor_id, no_documento,
-                               es_perecedero, fecha_vencimiento)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
-        compra_id = self.execute_insert(query_compra, (producto_id, cantidad, precio_unitario, total, 
-                                                       fecha_manual, proveedor_id, no_documento,
-                                                       1 if es_perecedero else 0, fecha_vencimiento))
-        
-        # Actualizar stock
-        producto = self.obtener_producto_por_id(producto_id)
-        if producto:
-            nuevo_stock = producto['stock_actual'] + cantidad
-            self.actualizar_stock(producto_id, nuevo_stock)
+        def unidad(conn):
+            # Insertar compra
+            cursor = conn.execute('''
+                INSERT INTO compras (producto_id, cantidad, precio_unitario, total, fecha, proveedor_id, no_documento,
+                                   es_perecedero, fecha_vencimiento)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (producto_id, cantidad, precio_unitario, total, fecha_manual, proveedor_id, no_documento,
+                  1 if es_perecedero else 0, fecha_vencimiento))
+            compra_id = cursor.lastrowid
             
-            # Registrar movimiento de stock
-            self.registrar_movimiento_stock(producto_id, 'entrada', cantidad, 'compra')
+            # Actualizar stock en la misma transacción (sin leer antes: otra terminal puede estar vendiendo)
+            cursor = conn.execute('UPDATE productos SET stock_actual = stock_actual + ? WHERE id = ?',
+                                  (cantidad, producto_id))
+            if cursor.rowcount > 0:
+                # Registrar movimiento de stock (en la misma transacción que la compra)
+                conn.execute('''
+                    INSERT INTO movimientos_stock (producto_id, tipo, cantidad, motivo)
+                    VALUES (?, 'entrada', ?, 'compra')
+                ''', (producto_id, cantidad))
             
-            # NOTA: El movimiento de caja se registra ahora en inventario_controller.py
-            # para tener un control centralizado de los movimientos de caja
+            if caja is not None:
+                caja['movimiento_id'] = self._insertar_movimiento_caja(
+                    conn, 'EGRESO', caja['categoria'], caja['concepto'](compra_id), total, fecha_manual)
+            return compra_id
         
-        return compra_id
+        return self._ejecutar('registrar_compra', self._conectar, unidad)
     
-    def obtener_compras(self) -> List[Dict]:
-        """Obtiene todas las compras con información del producto y proveedor"""
-        query = '''
-            SELECT c.*, 
-                   COALESCE(p.nombre, '[Producto Eliminado - ID: ' || c.producto_id || ']') as producto_nombre,
-                   COALESCE(pr.nombre, '[Proveedor Eliminado]') as proveedor_nombre,
-                   COALESCE(pr.nit_dpi, '') as proveedor_nit,
-                   COALESCE(c.es_perecedero, 0) as es_perecedero,
-                   c.fecha_vencimiento
-            FROM compras c
-            LEFT JOIN productos p ON c.producto_id = p.id
-            LEFT JOIN proveedores pr ON c.proveedor_id = pr.id
+    # Consulta base de compras con información del producto y proveedor
+    _SELECT_COMPRAS = '''
+        SELECT c.*, 
+               COALESCE(p.nombre, '[Producto Eliminado - ID: ' || c.producto_id || ']') as producto_nombre,
+               COALESCE(pr.nombre, '[Proveedor Eliminado]') as proveedor_nombre,
+               COALESCE(pr.nit_dpi, '') as proveedor_nit,
+               COALESCE(c.es_perecedero, 0) as es_perecedero,
+               c.fecha_vencimiento
+        FROM compras c
+        LEFT JOIN productos p ON c.producto_id = p.id
+        LEFT JOIN proveedores pr ON c.proveedor_id = pr.id
+    '''
+    
+    def obtener_compras(self, historico: bool = False) -> List[Dict]:
+        """Obtiene todas las compras con información del producto y proveedor (historico: incluir años archivados)"""
+        return self.execute_query(self._SELECT_COMPRAS + ' ORDER BY c.id ASC', historico=historico)
+    
+    def obtener_compras_perecederas(self) -> List[Dict]:
+        """Obtiene las compras perecederas que tienen fecha de vencimiento"""
+        query = self._SELECT_COMPRAS + '''
+            WHERE COALESCE(c.es_perecedero, 0) = 1 AND COALESCE(c.fecha_vencimiento, '') != ''
             ORDER BY c.id ASC
         '''
         return self.execute_query(query)
     
+    def obtener_compra_por_id(self, compra_id: int) -> Optional[Dict]:
+        """Obtiene una compra con información del producto y proveedor"""
+        resultado = self.execute_query(self._SELECT_COMPRAS + ' WHERE c.id = ?', (compra_id,))
+        return resultado[0] if resultado else None
+    
     def obtener_productos_proximos_vencer(self, dias_limite: int = 30) -> List[Dict]:
         """
         Obtiene productos perecederos próximos a vencer (solo productos activos)
@@ -629,10 +443,8 @@ class DatabaseManager:
                 SET es_perecedero = ?, fecha_vencimiento = ?
                 WHERE id = ?
             '''
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (1 if es_perecedero else 0, fecha_vencimiento, compra_id))
-                conn.commit()
+            self._ejecutar('actualizar_compra', self._conectar,
+                           lambda conn: conn.execute(query, (1 if es_perecedero else 0, fecha_vencimiento, compra_id)))
             return True
         except Exception as e:
             print(f"Error al actualizar compra: {e}")
@@ -640,120 +452,106 @@ class DatabaseManager:
     
     # MÉTODOS PARA VENTAS
     # MÉTODOS PARA VENTAS (NUEVO SISTEMA CON CARRITO)
-    def registrar_venta_con_carrito(self, cliente_id: int, productos_carrito: List[Dict], fecha_manual: str) -> Tuple[bool, str]:
+    def registrar_venta_con_carrito(self, cliente_id: int, productos_carrito: List[Dict], fecha_manual: str,
+                                    caja: Optional[Dict] = None) -> Tuple[bool, str]:
         """
         Registra una venta con múltiples productos (carrito de compras)
         productos_carrito: Lista de diccionarios con {producto_id, cantidad, precio_unitario}
         fecha_manual debe estar en formato 'dd/mm/yyyy HH:MM:SS' o 'dd/mm/yyyy'
+        caja: {'categoria', 'concepto': función(venta_id, referencia)} registra el INGRESO
+              en la misma transacción; al confirmar se completa con 'venta_id' y 'movimiento_id'
         """
         if not productos_carrito:
             return False, "El carrito está vacío"
         
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Validar stock para todos los productos antes de proceder
-                for item in productos_carrito:
-                    cursor.execute('SELECT nombre, stock_actual FROM productos WHERE id = ?', (item['producto_id'],))
-                    producto = cursor.fetchone()
-                    if not producto:
-                        return False, f"Producto ID {item['producto_id']} no encontrado"
-                    
-                    if producto[1] < item['cantidad']:
-                        return False, f"Stock insuficiente para {producto[0]}. Disponible: {producto[1]}"
+        # Validación, referencia, detalle, PEPS y stock en una sola transacción de escritura:
+        # el stock y la referencia que se leen no pueden cambiar antes de escribir
+        def unidad(conn):
+            cursor = conn.cursor()
+            
+            # Validar stock para todos los productos antes de proceder
+            for item in productos_carrito:
+                cursor.execute('SELECT nombre, stock_actual FROM productos WHERE id = ?', (item['producto_id'],))
+                producto = cursor.fetchone()
+                if not producto:
+                    return False, f"Producto ID {item['producto_id']} no encontrado"
                 
-                # Obtener el siguiente número de referencia
-                cursor.execute('SELECT MAX(id) FROM ventas')
-                max_id = cursor.fetchone()[0]
-                siguiente_num = (max_id + 1) if max_id else 1
-                referencia_no = f"REF{siguiente_num:06d}"
+                if producto[1] < item['cantidad']:
+                    return False, f"Stock insuficiente para {producto[0]}. Disponible: {producto[1]}"
+            
+            # Obtener el siguiente número de referencia (= ID que asignará AUTOINCREMENT;
+            # con replicación MAX(id) puede pertenecer al rango de otra terminal)
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'ventas'")
+            fila_seq = cursor.fetchone()
+            siguiente_num = (fila_seq[0] + 1) if fila_seq else 1
+            referencia_no = f"REF{siguiente_num:06d}"
+            
+            # Calcular total general
+            total_general = sum(item['cantidad'] * item['precio_unitario'] for item in productos_carrito)
+            total_general = round(total_general, 2)
+            
+            # Insertar encabezado de venta
+            cursor.execute('''
+                INSERT INTO ventas (referencia_no, cliente_id, fecha, total, estado)
+                VALUES (?, ?, ?, ?, 'Emitido')
+            ''', (referencia_no, cliente_id, fecha_manual, total_general))
+            
+            venta_id = cursor.lastrowid
+            
+            # Lista para el concepto de movimiento de caja
+            productos_nombres = []
+            
+            # Procesar cada producto del carrito
+            for item in productos_carrito:
+                producto_id = item['producto_id']
+                cantidad = item['cantidad']
+                precio_unitario = item['precio_unitario']
+                subtotal = round(cantidad * precio_unitario, 2)
                 
-                # Calcular total general
-                total_general = sum(item['cantidad'] * item['precio_unitario'] for item in productos_carrito)
-                total_general = round(total_general, 2)
+                # Obtener nombre del producto
+                cursor.execute('SELECT nombre, stock_actual FROM productos WHERE id = ?', (producto_id,))
+                producto_data = cursor.fetchone()
+                producto_nombre = producto_data[0]
+                stock_actual = producto_data[1]
                 
-                # Insertar encabezado de venta
+                # Insertar detalle de venta
                 cursor.execute('''
-                    INSERT INTO ventas (referencia_no, cliente_id, fecha, total, estado)
-                    VALUES (?, ?, ?, ?, 'Emitido')
-                ''', (referencia_no, cliente_id, fecha_manual, total_general))
-                
-                venta_id = cursor.lastrowid
+                    INSERT INTO ventas_detalle (venta_id, producto_id, cantidad, precio_unitario, subtotal)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (venta_id, producto_id, cantidad, precio_unitario, subtotal))
                 
-                # Lista para el concepto de movimiento de caja
-                productos_nombres = []
+                # Aplicar PEPS para descontar de compras más antiguas (en la misma transacción)
+                self._descontar_peps(conn, producto_id, cantidad)
                 
-                # Procesar cada producto del carrito
-                for item in productos_carrito:
-                    producto_id = item['producto_id']
-                    cantidad = item['cantidad']
-                    precio_unitario = item['precio_unitario']
-                    subtotal = round(cantidad * precio_unitario, 2)
-                    
-                    # Obtener nombre del producto
-                    cursor.execute('SELECT nombre, stock_actual FROM productos WHERE id = ?', (producto_id,))
-                    producto_data = cursor.fetchone()
-                    producto_nombre = producto_data[0]
-                    stock_actual = producto_data[1]
-                    
-                    # Insertar detalle de venta
-                    cursor.execute('''
-                        INSERT INTO ventas_detalle (venta_id, producto_id, cantidad, precio_unitario, subtotal)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (venta_id, producto_id, cantidad, precio_unitario, subtotal))
-                    
-                    # Aplicar PEPS para descontar de compras más antiguas (dentro del mismo cursor)
-                    cursor.execute('''
-                        SELECT id, cantidad, COALESCE(cantidad_disponible, cantidad) as disponible
-                        FROM compras 
-                        WHERE producto_id = ? AND COALESCE(cantidad_disponible, cantidad) > 0
-                        ORDER BY fecha ASC
-                    ''', (producto_id,))
-                    compras = cursor.fetchall()
-                    
-                    cantidad_restante = cantidad
-                    for compra in compras:
-                        if cantidad_restante <= 0:
-                            break
-                        
-                        compra_id, cantidad_compra, disponible = compra
-                        
-                        if disponible >= cantidad_restante:
-                            nueva_disponible = disponible - cantidad_restante
-                            cursor.execute('UPDATE compras SET cantidad_disponible = ? WHERE id = ?',
-                                         (nueva_disponible, compra_id))
-                            cantidad_restante = 0
-                        else:
-                            cursor.execute('UPDATE compras SET cantidad_disponible = 0 WHERE id = ?',
-                                         (compra_id,))
-                            cantidad_restante -= disponible
-                    
-                    # Actualizar stock total del producto
-                    nuevo_stock = stock_actual - cantidad
-                    cursor.execute('UPDATE productos SET stock_actual = ? WHERE id = ?', (nuevo_stock, producto_id))
-                    print(f"DEBUG: Producto {producto_nombre} - Stock anterior: {stock_actual}, Vendido: {cantidad}, Nuevo stock: {nuevo_stock}")
-                    
-                    # Registrar movimiento de stock
-                    cursor.execute('''
-                        INSERT INTO movimientos_stock (producto_id, tipo, cantidad, motivo)
-                        VALUES (?, 'salida', ?, 'venta')
-                    ''', (producto_id, cantidad))
-                    
-                    # Agregar nombre para el concepto
-                    productos_nombres.append(producto_nombre)
+                # Actualizar stock total del producto
+                nuevo_stock = stock_actual - cantidad
+                cursor.execute('UPDATE productos SET stock_actual = ? WHERE id = ?', (nuevo_stock, producto_id))
+                print(f"DEBUG: Producto {producto_nombre} - Stock anterior: {stock_actual}, Vendido: {cantidad}, Nuevo stock: {nuevo_stock}")
                 
-                # NOTA: El movimiento de caja se registra ahora en inventario_controller.py
-                # para tener un control centralizado de los movimientos de caja
-                
-                conn.commit()
-                
-                return True, f"✅ Venta registrada exitosamente\n\n📋 Referencia: {referencia_no}\n🆔 ID: {venta_id}\n🛒 Productos: {len(productos_carrito)}\n💰 Total: Q {total_general:,.2f}"
+                # Registrar movimiento de stock
+                cursor.execute('''
+                    INSERT INTO movimientos_stock (producto_id, tipo, cantidad, motivo)
+                    VALUES (?, 'salida', ?, 'venta')
+                ''', (producto_id, cantidad))
                 
+                # Agregar nombre para el concepto
+                productos_nombres.append(producto_nombre)
+            
+            # El INGRESO en caja va en la misma transacción: si falla, la venta se deshace
+            if caja is not None:
+                caja['venta_id'] = venta_id
+                caja['movimiento_id'] = self._insertar_movimiento_caja(
+                    conn, 'INGRESO', caja['categoria'], caja['concepto'](venta_id, referencia_no),
+                    total_general, fecha_manual)
+            
+            return True, f"✅ Venta registrada exitosamente\n\n📋 Referencia: {referencia_no}\n🆔 ID: {venta_id}\n🛒 Productos: {len(productos_carrito)}\n💰 Total: Q {total_general:,.2f}"
+        
+        try:
+            return self._ejecutar('registrar_venta', self._conectar, unidad)
         except Exception as e:
             import traceback
             traceback.print_exc()
-            return False, f"Error al registrar venta: {str(e)}"
+            return False, f"Error al registrar venta: {describir_error(e)}"
     
     # Método antiguo mantenido para compatibilidad (llama al nuevo método)
     def registrar_venta(self, producto_id: int, cantidad: int, precio_unitario: float,
@@ -774,45 +572,37 @@ class DatabaseManager:
         Aplica el método PEPS (Primeras Entradas, Primeras Salidas)
         Descuenta la cantidad vendida de las compras más antiguas primero
         """
-        # Obtener compras del producto ordenadas por fecha (más antiguas primero)
-        # Solo compras con cantidad disponible > 0
-        query = '''
-            SELECT id, cantidad, COALESCE(cantidad_disponible, cantidad) as disponible
+        self._ejecutar('aplicar_peps', self._conectar,
+                       lambda conn: self._descontar_peps(conn, producto_id, cantidad_vendida))
+    
+    def _descontar_peps(self, conn, producto_id: int, cantidad_vendida: int) -> int:
+        """
+        Descuenta cantidad_vendida de cantidad_disponible de las compras más antiguas
+        del producto, dentro de la transacción de conn. Devuelve lo que no se pudo cubrir.
+        """
+        # Compras del producto ordenadas por fecha (más antiguas primero), solo con disponible > 0
+        compras = conn.execute('''
+            SELECT id, COALESCE(cantidad_disponible, cantidad) as disponible
             FROM compras 
             WHERE producto_id = ? AND COALESCE(cantidad_disponible, cantidad) > 0
             ORDER BY fecha ASC
-        '''
-        compras = self.execute_query(query, (producto_id,))
+        ''', (producto_id,)).fetchall()
         
         cantidad_restante = cantidad_vendida
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Descontar de las compras más antiguas
-            for compra in compras:
-                if cantidad_restante <= 0:
-                    break
-                
-                disponible = compra['disponible']
-                
-                if disponible >= cantidad_restante:
-                    # Esta compra tiene suficiente para cubrir lo restante
-                    nueva_disponible = disponible - cantidad_restante
-                    cursor.execute(
-                        'UPDATE compras SET cantidad_disponible = ? WHERE id = ?',
-                        (nueva_disponible, compra['id'])
-                    )
-                    cantidad_restante = 0
-                else:
-                    # Esta compra se agota completamente
-                    cursor.execute(
-                        'UPDATE compras SET cantidad_disponible = 0 WHERE id = ?',
-                        (compra['id'],)
-                    )
-                    cantidad_restante -= disponible
+        for compra_id, disponible in compras:
+            if cantidad_restante <= 0:
+                break
             
-            conn.commit()
+            if disponible >= cantidad_restante:
+                # Esta compra tiene suficiente para cubrir lo restante
+                conn.execute('UPDATE compras SET cantidad_disponible = ? WHERE id = ?',
+                             (disponible - cantidad_restante, compra_id))
+                cantidad_restante = 0
+            else:
+                # Esta compra se agota completamente
+                conn.execute('UPDATE compras SET cantidad_disponible = 0 WHERE id = ?', (compra_id,))
+                cantidad_restante -= disponible
+        return cantidad_restante
     
     def obtener_siguiente_referencia(self) -> str:
         """Genera el siguiente número de referencia para ventas"""
@@ -831,8 +621,8 @@ class DatabaseManager:
         
         return f"REF{siguiente_num:06d}"  # REF000001, REF000002, etc.
     
-    def obtener_ventas(self) -> List[Dict]:
-        """Obtiene todas las ventas con información del cliente y detalles de productos"""
+    def obtener_ventas(self, historico: bool = False) -> List[Dict]:
+        """Obtiene todas las ventas con información del cliente y detalles de productos (historico: incluir años archivados)"""
         query = '''
             SELECT v.id, v.referencia_no, v.cliente_id, v.fecha, v.total, v.estado,
                    COALESCE(c.nombre, '[Cliente Eliminado]') as cliente_nombre,
@@ -841,20 +631,23 @@ class DatabaseManager:
             LEFT JOIN clientes c ON v.cliente_id = c.id
             ORDER BY v.id DESC
         '''
-        ventas = self.execute_query(query)
+        ventas = self.execute_query(query, historico=historico)
+        
+        # Detalles de todas las ventas en una sola consulta (una conexión, archivos adjuntos una vez)
+        query_detalle = '''
+            SELECT vd.*, 
+                   COALESCE(p.nombre, '[Producto Eliminado]') as producto_nombre,
+                   COALESCE(p.codigo, '') as producto_codigo
+            FROM ventas_detalle vd
+            LEFT JOIN productos p ON vd.producto_id = p.id
+            ORDER BY vd.venta_id, vd.id
+        '''
+        detalles_por_venta = {}
+        for detalle in self.execute_query(query_detalle, historico=historico):
+            detalles_por_venta.setdefault(detalle['venta_id'], []).append(detalle)
         
-        # Obtener detalles de cada venta
         for venta in ventas:
-            query_detalle = '''
-                SELECT vd.*, 
-                       COALESCE(p.nombre, '[Producto Eliminado]') as producto_nombre,
-                       COALESCE(p.codigo, '') as producto_codigo
-                FROM ventas_detalle vd
-                LEFT JOIN productos p ON vd.producto_id = p.id
-                WHERE vd.venta_id = ?
-                ORDER BY vd.id
-            '''
-            detalles = self.execute_query(query_detalle, (venta['id'],))
+            detalles = detalles_por_venta.get(venta['id'], [])
             venta['detalles'] = detalles
             
             # Agregar conteo de productos
@@ -894,16 +687,16 @@ class DatabaseManager:
         
         return venta
     
-    def anular_venta(self, venta_id: int) -> tuple:
+    def anular_venta(self, venta_id: int, caja: Optional[Dict] = None) -> tuple:
         """
         Anula una venta:
         1. Cambia el estado a 'Anulado'
         2. Devuelve los productos al inventario
         3. Registra movimientos de stock
+        4. Con caja={'categoria', 'concepto', 'monto', 'fecha'} registra el EGRESO en la misma
+           transacción; al confirmar se completa con 'movimiento_id'
         """
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path)
+        def unidad(conn):
             cursor = conn.cursor()
             
             # Verificar que la venta existe y no está anulada
@@ -947,28 +740,28 @@ class DatabaseManager:
                 WHERE id = ?
             ''', (venta_id,))
             
-            conn.commit()
+            if caja is not None:
+                caja['movimiento_id'] = self._insertar_movimiento_caja(
+                    conn, 'EGRESO', caja['categoria'], caja['concepto'], caja['monto'], caja['fecha'])
             return True, f"Venta anulada exitosamente. {len(detalles)} productos devueltos al inventario."
-            
+        
+        try:
+            return self._ejecutar('anular_venta', self._conectar, unidad)
         except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
-            return False, f"Error al anular venta: {str(e)}"
-        finally:
-            if conn:
-                conn.close()
+            return False, f"Error al anular venta: {describir_error(e)}"
     
     # MÉTODOS PARA MOVIMIENTOS DE STOCK
     def registrar_movimiento_stock(self, producto_id: int, tipo: str, cantidad: int, motivo: str):
-        """Registra un movimiento de stock"""
+        """Registra un movimiento de stock (se confirma en lote con la cola de escritura)"""
         query = '''
-            INSERT INTO movimientos_stock (producto_id, tipo, cantidad, motivo)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO movimientos_stock (producto_id, tipo, cantidad, motivo, fecha)
+            VALUES (?, ?, ?, ?, ?)
         '''
-        return self.execute_insert(query, (producto_id, tipo, cantidad, motivo))
+        self.cola_escritura.agregar(query, (producto_id, tipo, cantidad, motivo, marca_tiempo()))
     
     def obtener_movimientos_stock(self, producto_id: int = None) -> List[Dict]:
         """Obtiene los movimientos de stock"""
+        self.cola_escritura.vaciar()
         if producto_id:
             query = '''
                 SELECT m.*, p.nombre as producto_nombre
@@ -987,17 +780,46 @@ class DatabaseManager:
             '''
             return self.execute_query(query)
     
+    # MÉTODOS PARA EL LOG DE CAMBIOS
+    def obtener_cambios_desde(self, seq: int, limite: int = 1000) -> List[Dict]:
+        """Obtiene los cambios con secuencia mayor a seq, en orden"""
+        self.cola_escritura.vaciar()  # incluir los movimientos de stock encolados
+        query = '''
+            SELECT seq, tabla, fila_id, operacion, fecha
+            FROM cambios
+            WHERE seq > ?
+            ORDER BY seq
+            LIMIT ?
+        '''
+        return self.execute_query(query, (seq, limite))
+    
+    def obtener_ultima_secuencia_cambios(self) -> int:
+        """Obtiene la secuencia del último cambio registrado (0 si no hay)"""
+        resultado = self.execute_query('SELECT COALESCE(MAX(seq), 0) as seq FROM cambios')
+        return resultado[0]['seq'] if resultado else 0
+    
+    def podar_cambios(self, dias: int = 30) -> int:
+        """Elimina del log los cambios con más de `dias` días. Devuelve las filas eliminadas"""
+        # Con replicación activa nunca se poda lo que aún no se exportó
+        query = '''
+            DELETE FROM cambios
+            WHERE fecha < datetime('now', ?)
+              AND seq <= COALESCE((SELECT CAST(valor AS INTEGER) FROM replicacion_estado
+                                   WHERE clave = 'ultimo_seq_exportado'), seq)
+        '''
+        return self.execute_update(query, (f'-{int(dias)} days',))
+    
     # MÉTODOS PARA REPORTES
     def obtener_total_compras(self) -> float:
         """Obtiene el total de todas las compras"""
         query = 'SELECT COALESCE(SUM(total), 0) as total FROM compras'
-        resultado = self.execute_query(query)
+        resultado = self.execute_query(query, historico=True)
         return resultado[0]['total'] if resultado else 0
     
     def obtener_total_ventas(self) -> float:
         """Obtiene el total de todas las ventas activas (no anuladas)"""
         query = "SELECT COALESCE(SUM(total), 0) as total FROM ventas WHERE estado != 'Anulado'"
-        resultado = self.execute_query(query)
+        resultado = self.execute_query(query, historico=True)
         return resultado[0]['total'] if resultado else 0
     
     def obtener_resumen_inventario(self) -> Dict:
@@ -1014,7 +836,7 @@ class DatabaseManager:
             INNER JOIN productos p ON vd.producto_id = p.id
             WHERE v.estado != 'Anulado'
         '''
-        resultado_ganancia = self.execute_query(query_ganancia)
+        resultado_ganancia = self.execute_query(query_ganancia, historico=True)
         ganancia_bruta = resultado_ganancia[0]['ganancia_bruta'] if resultado_ganancia else 0
         
         # Valor actual del inventario (stock * precio_compra)
@@ -1049,23 +871,38 @@ class DatabaseManager:
     def registrar_movimiento_caja(self, tipo: str, categoria: str, concepto: str, 
                                    monto: float, fecha: str, usuario: str = 'Sistema') -> int:
         """Registra un movimiento de caja"""
-        saldo_anterior = self.obtener_saldo_caja()
+        def unidad(conn):
+            return self._insertar_movimiento_caja(conn, tipo, categoria, concepto, monto, fecha, usuario)
+        
+        return self._ejecutar('registrar_movimiento_caja', self._conectar, unidad)
+    
+    def _insertar_movimiento_caja(self, conn, tipo: str, categoria: str, concepto: str,
+                                  monto: float, fecha: str, usuario: str = 'Sistema') -> int:
+        """Inserta un movimiento de caja dentro de la transacción de escritura de conn"""
+        # El saldo se lee dentro de la transacción de escritura: otra terminal
+        # no puede insertar un movimiento entre la lectura y el INSERT
+        fila = conn.execute('SELECT saldo_nuevo FROM movimientos_caja ORDER BY id DESC LIMIT 1').fetchone()
+        saldo_anterior = fila[0] if fila else 0.0
         
         if tipo == 'INGRESO':
             saldo_nuevo = saldo_anterior + monto
         else:  # EGRESO
             saldo_nuevo = saldo_anterior - monto
         
-        query = '''
+        cursor = conn.execute('''
             INSERT INTO movimientos_caja 
             (tipo, categoria, concepto, monto, saldo_anterior, saldo_nuevo, fecha, usuario)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        '''
-        return self.execute_insert(query, (tipo, categoria, concepto, monto, 
-                                           saldo_anterior, saldo_nuevo, fecha, usuario))
+        ''', (tipo, categoria, concepto, monto, saldo_anterior, saldo_nuevo, fecha, usuario))
+        return cursor.lastrowid
     
-    def obtener_movimientos_caja(self, fecha_inicio: str = None, fecha_fin: str = None) -> List[Dict]:
-        """Obtiene los movimientos de caja, opcionalmente filtrados por rango de fechas"""
+    def obtener_movimientos_caja(self, fecha_inicio: str = None, fecha_fin: str = None,
+                                 historico: bool = False) -> List[Dict]:
+        """
+        Obtiene los movimientos de caja, opcionalmente filtrados por rango de fechas.
+        Un rango de fechas también busca en los años archivados; sin rango se
+        devuelven los últimos 100 (o todos con historico=True).
+        """
         if fecha_inicio and fecha_fin:
             # Las fechas vienen en formato yyyy-mm-dd desde el filtro
             # La fecha en BD está en formato dd/mm/yyyy HH:MM:SS
@@ -1076,11 +913,18 @@ class DatabaseManager:
                 BETWEEN date(?) AND date(?)
                 ORDER BY id DESC
             '''
-            return self.execute_query(query, (fecha_inicio, fecha_fin))
+            return self.execute_query(query, (fecha_inicio, fecha_fin), historico=True)
+        elif historico:
+            return self.execute_query('SELECT * FROM movimientos_caja ORDER BY id DESC', historico=True)
         else:
             query = 'SELECT * FROM movimientos_caja ORDER BY id DESC LIMIT 100'
             return self.execute_query(query)
     
+    def obtener_movimiento_caja_por_id(self, movimiento_id: int) -> Optional[Dict]:
+        """Obtiene un movimiento de caja por su ID"""
+        resultado = self.execute_query('SELECT * FROM movimientos_caja WHERE id = ?', (movimiento_id,))
+        return resultado[0] if resultado else None
+    
     def obtener_resumen_caja(self, fecha_inicio: str = None, fecha_fin: str = None) -> Dict:
         """Obtiene un resumen de los movimientos de caja"""
         if fecha_inicio and fecha_fin:
@@ -1100,8 +944,8 @@ class DatabaseManager:
                 AND date(substr(fecha, 7, 4) || '-' || substr(fecha, 4, 2) || '-' || substr(fecha, 1, 2)) 
                 BETWEEN date(?) AND date(?)
             '''
-            ingresos = self.execute_query(query_ingresos, (fecha_inicio, fecha_fin))
-            egresos = self.execute_query(query_egresos, (fecha_inicio, fecha_fin))
+            ingresos = self.execute_query(query_ingresos, (fecha_inicio, fecha_fin), historico=True)
+            egresos = self.execute_query(query_egresos, (fecha_inicio, fecha_fin), historico=True)
         else:
             query_ingresos = '''
                 SELECT COALESCE(SUM(monto), 0) as total 
@@ -1113,8 +957,8 @@ class DatabaseManager:
                 FROM movimientos_caja 
                 WHERE tipo = 'EGRESO'
             '''
-            ingresos = self.execute_query(query_ingresos)
-            egresos = self.execute_query(query_egresos)
+            ingresos = self.execute_query(query_ingresos, historico=True)
+            egresos = self.execute_query(query_egresos, historico=True)
         
         total_ingresos = ingresos[0]['total'] if ingresos else 0
         total_egresos = egresos[0]['total'] if egresos else 0
@@ -1151,13 +995,14 @@ class DatabaseManager:
         """Actualiza la fecha y hora del último acceso del usuario"""
         query = '''
             UPDATE usuarios 
-            SET ultimo_acceso = CURRENT_TIMESTAMP 
+            SET ultimo_acceso = ? 
             WHERE usuario = ?
         '''
-        self.execute_update(query, (usuario,))
+        self.cola_escritura.agregar(query, (marca_tiempo(), usuario))
     
     def obtener_todos_usuarios(self) -> List[Dict]:
         """Obtiene todos los usuarios del sistema"""
+        self.cola_escritura.vaciar()
         query = 'SELECT id, usuario, nombre_completo, rol, activo, fecha_creacion, ultimo_acceso FROM usuarios'
         return self.execute_query(query)
     
@@ -1197,17 +1042,49 @@ class DatabaseManager:
         query = 'DELETE FROM movimientos_caja WHERE id = ?'
         return self.execute_update(query, (movimiento_id,))
     
+    # MÉTODOS PARA EL MANTENIMIENTO
+    def ejecutar_mantenimiento(self, completo: bool = True) -> Dict:
+        """Estadísticas, espacio libre e integridad; registra la ejecución y devuelve el reporte"""
+        self.cola_escritura.vaciar()
+        reporte = mantenimiento.ejecutar(self.db_path, completo=completo, conectar=self._conectar)
+        mantenimiento.registrar(self.db_path, reporte, completo, conectar=self._conectar,
+                                ejecutar_unidad=self._ejecutar)
+        return reporte
+    
+    def obtener_ultimo_mantenimiento(self, completo: bool = True) -> Optional[Dict]:
+        """Última ejecución registrada del mantenimiento (completo o cualquiera)"""
+        query = 'SELECT * FROM mantenimiento WHERE completo >= ? ORDER BY id DESC LIMIT 1'
+        resultado = self.execute_query(query, (1 if completo else 0,))
+        return resultado[0] if resultado else None
+    
+    # MÉTODOS PARA EL ARCHIVO HISTÓRICO
+    def obtener_anios_archivables(self) -> List[int]:
+        """Años cerrados que todavía tienen movimientos en la base de datos en uso"""
+        self.cola_escritura.vaciar()
+        return archivo_historico.anios_archivables(self.db_path, conectar=self._conectar)
+    
+    def obtener_anios_archivados(self) -> List[int]:
+        """Años que ya tienen archivo"""
+        return sorted(archivo_historico.listar_archivos(self.db_path))
+    
+    def archivar_anio(self, anio: int) -> Dict[str, int]:
+        """Mueve a su archivo las filas cerradas de un año; devuelve las filas movidas por tabla"""
+        self.cola_escritura.vaciar()  # movimientos de stock encolados del año
+        return archivo_historico.archivar_anio(self.db_path, anio, conectar=self._conectar,
+                                              ejecutar=self._ejecutar)
+    
     def cambiar_base_datos(self, nueva_ruta: str) -> bool:
         """Cambia la ruta de la base de datos"""
         try:
-            if os.path.exists(nueva_ruta):
-                self.db_path = nueva_ruta
-                return True
-            else:
-                # Si no existe, crear nueva base de datos
-                self.db_path = nueva_ruta
-                self.init_database()
-                return True
+            # Lo pendiente pertenece a la base de datos anterior (si no se puede escribir,
+            # queda en su archivo de pendientes)
+            self.cola_escritura.vaciar_o_guardar()
+            # Si no existe se crea; si es de una versión anterior se migra
+            self.db_path = nueva_ruta
+            self.cola_escritura.db_path = nueva_ruta
+            self.init_database()
+            self.cola_escritura.recuperar_pendientes()
+            return True
         except Exception as e:
             print(f"Error al cambiar base de datos: {e}")
             return False
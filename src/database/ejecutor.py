@@ -0,0 +1,79 @@
+"""
+Ejecutor de operaciones de base de datos fuera del hilo de Tk.
+
+Las escrituras van a un único hilo escritor (SQLite admite un solo escritor a
+la vez y así se conserva el orden en que el usuario las pidió). Las lecturas
+se reparten entre varios hilos lectores. El mantenimiento (quick_check,
+VACUUM) corre en su propio hilo para no dejar esperando a las escrituras
+encoladas detrás de él. Cada llamada devuelve un concurrent.futures.Future.
+
+DatabaseManager abre una conexión nueva en cada operación, así que cada hilo
+usa siempre sus propias conexiones y no se comparte ningún objeto sqlite3
+entre hilos.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+
+
+class EjecutorBD:
+    """Un hilo escritor y un grupo de hilos lectores que devuelven Futures."""
+
+    def __init__(self, lectores=2):
+        """
+        Args:
+            lectores: Cantidad de hilos para consultas de solo lectura
+        """
+        self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bd-escritura')
+        self._lectores = ThreadPoolExecutor(max_workers=lectores, thread_name_prefix='bd-lectura')
+        self._pendientes = 0
+        self._lock = threading.Lock()
+        self._lock_mantenimiento = threading.Lock()  # un mantenimiento a la vez
+
+    def escribir(self, funcion, *args, **kwargs):
+        """Encola una escritura; se ejecutan de una en una y en orden."""
+        return self._enviar(self._escritor, funcion, args, kwargs)
+
+    def leer(self, funcion, *args, **kwargs):
+        """Encola una consulta en el grupo de lectores."""
+        return self._enviar(self._lectores, funcion, args, kwargs)
+
+    def mantener(self, funcion, *args, **kwargs):
+        """
+        Ejecuta una tarea larga de mantenimiento en un hilo propio (de una en una).
+
+        El hilo no es daemon: si la aplicación se cierra mientras corre, el
+        proceso espera a que termine en lugar de cortarlo a la mitad.
+        """
+        futuro = Future()
+
+        def correr():
+            with self._lock_mantenimiento:
+                if not futuro.set_running_or_notify_cancel():
+                    return
+                try:
+                    futuro.set_result(funcion(*args, **kwargs))
+                except BaseException as e:
+                    futuro.set_exception(e)
+
+        threading.Thread(target=correr, name='bd-mantenimiento').start()
+        return futuro
+
+    def _enviar(self, grupo, funcion, args, kwargs):
+        with self._lock:
+            self._pendientes += 1
+        futuro = grupo.submit(funcion, *args, **kwargs)
+        futuro.add_done_callback(self._terminado)
+        return futuro
+
+    def _terminado(self, _futuro):
+        with self._lock:
+            self._pendientes -= 1
+
+    def pendientes(self):
+        """Operaciones encoladas o en curso."""
+        return self._pendientes
+
+    def cerrar(self, esperar=True):
+        """Deja de aceptar trabajo; con esperar=True termina lo ya encolado."""
+        self._lectores.shutdown(wait=esperar)
+        self._escritor.shutdown(wait=esperar)
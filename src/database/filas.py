@@ -0,0 +1,258 @@
+"""
+Resultados compactos de consultas.
+
+execute_query devuelve un dict por fila: cómodo, pero cada dict pesa varias
+veces lo que sus valores (tabla hash propia, claves repetidas en cada fila).
+Con los históricos de 100k filas eso son cientos de MB. Aquí hay tres formas
+más livianas de recibir el mismo resultado:
+
+- Filas: lista de tuplas de una clase generada por consulta. La clase guarda
+  el índice de columnas una sola vez; cada fila es solo la tupla de valores y
+  se lee igual que el dict (fila['total'], fila.get('estado')) o por atributo
+  (fila.total) o posición (fila[3]). Los textos repetidos (tipo, motivo,
+  nombre del producto) se guardan una vez y todas las filas los comparten.
+- a_modelos(): instancias con __slots__ de los modelos de src/models/models.py
+  (Producto, Compra, Venta, MovimientoStock), con sus métodos.
+- Columnas: un arreglo por columna; las numéricas en array.array (8 bytes por
+  valor, sin objeto float/int por celda), para sumar o agrupar sin filas.
+
+Memoria por 100k filas de cada forma: benchmarks/bench_filas.py.
+"""
+import dataclasses
+from array import array
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+class FilaCompacta(tuple):
+    """Base de las filas de una consulta: una tupla con el índice de columnas en la clase."""
+
+    __slots__ = ()
+    _indice: Dict[str, int] = {}
+    columnas: Tuple[str, ...] = ()
+
+    def __getitem__(self, clave):
+        if isinstance(clave, str):
+            return tuple.__getitem__(self, self._indice[clave])
+        return tuple.__getitem__(self, clave)
+
+    def get(self, clave, defecto=None):
+        posicion = self._indice.get(clave)
+        return defecto if posicion is None else tuple.__getitem__(self, posicion)
+
+    def __contains__(self, clave):
+        # Como en el dict: "'total' in fila" pregunta por la columna
+        return clave in self._indice
+
+    def keys(self):
+        return self.columnas
+
+    def items(self):
+        return zip(self.columnas, self)
+
+    def a_dict(self) -> Dict:
+        return dict(zip(self.columnas, self))
+
+    def __repr__(self):
+        return f"Fila({', '.join(f'{c}={v!r}' for c, v in zip(self.columnas, self))})"
+
+
+@lru_cache(maxsize=256)
+def tipo_fila(columnas: Tuple[str, ...]) -> type:
+    """Clase de fila para esas columnas (una por forma de resultado, reutilizada entre consultas)."""
+    # Con columnas repetidas (SELECT c.*, p.id ...) gana la última, como en dict(row)
+    indice = {nombre: posicion for posicion, nombre in enumerate(columnas)}
+    atributos = {'__slots__': (), '_indice': indice, 'columnas': columnas}
+    for nombre, posicion in indice.items():
+        if nombre.isidentifier() and not hasattr(FilaCompacta, nombre):
+            atributos[nombre] = property(itemgetter(posicion))
+    return type('Fila', (FilaCompacta,), atributos)
+
+
+def _compartir_textos(valores: List) -> List:
+    """La misma lista, con una sola instancia de cada texto repetido."""
+    unicos = {}
+    return [unicos.setdefault(valor, valor) if valor.__class__ is str else valor for valor in valores]
+
+
+def _columnas_de_texto(valores: Sequence[tuple], ancho: int) -> List[int]:
+    """Posiciones de las columnas cuyo primer valor no nulo es texto."""
+    pendientes, texto = set(range(ancho)), []
+    for fila in valores:
+        for posicion in list(pendientes):
+            if fila[posicion] is not None:
+                pendientes.discard(posicion)
+                if fila[posicion].__class__ is str:
+                    texto.append(posicion)
+        if not pendientes:
+            break
+    return texto
+
+
+class Filas(list):
+    """Lista de filas compactas; `columnas` son los nombres del SELECT en orden."""
+
+    def __init__(self, columnas: Sequence[str], valores: Iterable[tuple] = (), compartir_textos: bool = True):
+        self.columnas = tuple(columnas)
+        self.tipo = tipo_fila(self.columnas)
+        if compartir_textos:
+            valores = valores if isinstance(valores, list) else list(valores)
+            texto = _columnas_de_texto(valores, len(self.columnas))
+            if texto and valores:
+                por_columna = list(zip(*valores))
+                for posicion in texto:
+                    por_columna[posicion] = _compartir_textos(por_columna[posicion])
+                valores = zip(*por_columna)
+        super().__init__(map(self.tipo, valores))
+
+    def columna(self, nombre: str) -> List:
+        """Valores de una columna como lista."""
+        return list(map(itemgetter(self.tipo._indice[nombre]), self))
+
+    def a_dicts(self) -> List[Dict]:
+        """Mismo resultado que execute_query (para código que modifica las filas)."""
+        return [fila.a_dict() for fila in self]
+
+
+# ---------------------------------------------------------------- modelos
+
+@lru_cache(maxsize=None)
+def modelo_compacto(modelo: type) -> type:
+    """
+    Versión con __slots__ de un dataclass de models.py: mismos campos, mismo
+    __init__ y mismos métodos, sin __dict__ por instancia.
+    """
+    campos = tuple(campo.name for campo in dataclasses.fields(modelo))
+    atributos = {clave: valor for clave, valor in modelo.__dict__.items()
+                 if clave not in campos and clave not in ('__dict__', '__weakref__')}
+    atributos['__slots__'] = campos
+    return type(modelo.__name__, modelo.__bases__, atributos)
+
+
+def a_modelos(filas: Filas, modelo: type) -> List:
+    """
+    Convierte las filas en instancias compactas de `modelo` (Producto, Compra, ...).
+    Las columnas que el modelo no tiene se ignoran; los campos sin columna quedan
+    en su valor por defecto (o None si el modelo no define uno).
+    """
+    clase = modelo_compacto(modelo)
+    presentes, faltantes = [], {}
+    for campo in dataclasses.fields(modelo):
+        if campo.name in filas.tipo._indice:
+            presentes.append((campo.name, filas.tipo._indice[campo.name]))
+        elif campo.default is not dataclasses.MISSING:
+            faltantes[campo.name] = campo.default
+        else:
+            faltantes[campo.name] = None
+    return [clase(**faltantes, **{nombre: fila[posicion] for nombre, posicion in presentes})
+            for fila in filas]
+
+
+# ---------------------------------------------------------------- columnas
+
+# Filas que se reparten en las columnas de una vez (el pico de memoria extra es un lote)
+TAMANO_LOTE = 5000
+
+def _arreglo_numerico(valores: List):
+    """array('q') si todos son enteros, array('d') si hay decimales o vacíos (NaN); None si no son números."""
+    enteros = True
+    for valor in valores:
+        if valor is None:
+            enteros = False
+        elif isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            return None
+        elif isinstance(valor, float):
+            enteros = False
+    if enteros:
+        try:
+            return array('q', valores)
+        except OverflowError:
+            pass
+    return array('d', (float('nan') if valor is None else valor for valor in valores))
+
+
+class Columnas:
+    """
+    Resultado por columnas: columnas[nombre] es un array.array para las
+    columnas numéricas (NaN donde había NULL) y una lista para las demás
+    (con los textos repetidos compartidos).
+
+    Las filas se reparten en las columnas por lotes (desde_cursor() lee con
+    fetchmany), así que nunca está en memoria la lista completa de tuplas:
+    el pico es el resultado más un lote.
+    """
+
+    def __init__(self, columnas: Sequence[str], valores: Iterable[tuple] = (), numericas: Sequence[str] = None,
+                 tamano_lote: int = TAMANO_LOTE):
+        """
+        Args:
+            valores: Filas (tuplas); se recorren por lotes de `tamano_lote`
+            numericas: Columnas a guardar en arreglos; por defecto todas las que
+                       solo tienen números (se detecta con los valores)
+        """
+        self.nombres = tuple(columnas)
+        self.filas = 0
+        elegidas = set(self.nombres if numericas is None else numericas)
+        self._estricto = numericas is not None
+        self._datos = {nombre: array('q') if nombre in elegidas else [] for nombre in self.nombres}
+        self._decimales = set()  # columnas en array('d') con algún decimal (las demás solo tienen enteros y vacíos)
+        self._textos = {nombre: {} for nombre in self.nombres}
+        valores = iter(valores)
+        for lote in iter(lambda: list(islice(valores, tamano_lote)), []):
+            self.agregar(lote)
+
+    @classmethod
+    def desde_cursor(cls, cursor, numericas: Sequence[str] = None, tamano_lote: int = TAMANO_LOTE) -> 'Columnas':
+        """Lee el resultado de un cursor ya ejecutado con fetchmany, lote por lote."""
+        columnas = cls([columna[0] for columna in cursor.description], (), numericas, tamano_lote)
+        for lote in iter(lambda: cursor.fetchmany(tamano_lote), []):
+            columnas.agregar(lote)
+        return columnas
+
+    def agregar(self, lote: Sequence[tuple]):
+        """Agrega un lote de filas al final de las columnas."""
+        for posicion, nombre in enumerate(self.nombres):
+            lista = [fila[posicion] for fila in lote]
+            datos = self._datos[nombre]
+            if isinstance(datos, array):
+                arreglo = _arreglo_numerico(lista)
+                if arreglo is None:
+                    if self._estricto:
+                        raise ValueError(f"La columna {nombre} tiene valores que no son números")
+                    datos = self._datos[nombre] = self._a_lista(nombre, datos)
+                else:
+                    if datos.typecode == 'q' and arreglo.typecode == 'd':
+                        # Un vacío o un decimal pasa la columna entera a 'd'
+                        datos = self._datos[nombre] = array('d', datos)
+                    if arreglo.typecode == 'd' and any(valor.__class__ is float for valor in lista):
+                        self._decimales.add(nombre)
+                    datos.extend(arreglo if arreglo.typecode == 'd' else lista)
+                    continue
+            unicos = self._textos[nombre]
+            datos.extend(unicos.setdefault(valor, valor) if valor.__class__ is str else valor for valor in lista)
+        self.filas += len(lote)
+
+    def _a_lista(self, nombre: str, datos: array) -> List:
+        """Los valores ya guardados en el arreglo de una columna que resultó no ser numérica."""
+        if datos.typecode == 'q':
+            return list(datos)
+        enteros = nombre not in self._decimales
+        return [None if valor != valor else (int(valor) if enteros else valor) for valor in datos]
+
+    def __getitem__(self, nombre: str):
+        return self._datos[nombre]
+
+    def __contains__(self, nombre: str):
+        return nombre in self._datos
+
+    def __len__(self):
+        return self.filas
+
+    def numericas(self) -> Tuple[str, ...]:
+        return tuple(nombre for nombre, datos in self._datos.items() if isinstance(datos, array))
+
+    def a_filas(self) -> Filas:
+        """Vuelve a la forma por filas (por ejemplo para llenar un Treeview)."""
+        return Filas(self.nombres, zip(*(self._datos[nombre] for nombre in self.nombres)))
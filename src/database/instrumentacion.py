@@ -0,0 +1,270 @@
+"""
+Instrumentación de las consultas a la base de datos.
+
+DatabaseManager._conectar abre las conexiones con ConexionInstrumentada
+(factory de sqlite3.connect). Pasan por ahí las del gestor y las de los módulos
+que reciben su _conectar: cola de escritura, replicación, mantenimiento,
+archivo histórico y respaldos. Quedan fuera la conexión de sondeo del monitor
+de cambios (solo PRAGMA data_version y contadores_cambios) y las copias
+temporales que verifican los respaldos. Cada sentencia se agrupa por su forma
+(el SQL con los literales cambiados por ? y los espacios normalizados) y se
+acumula:
+
+- un histograma de latencia con cubetas logarítmicas (p50/p95/p99 aproximados),
+- las filas devueltas o modificadas,
+- qué método del controlador la originó.
+
+Las sentencias que superan umbral_ms se guardan en un registro de consultas
+lentas junto con su EXPLAIN QUERY PLAN.
+
+En una SELECT el tiempo incluye la lectura de las filas (fetchone/fetchmany/
+fetchall o iterando el cursor); se cierra la medición al leer la última fila,
+al ejecutar otra sentencia con el mismo cursor o al cerrar la conexión.
+"""
+import re
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List
+
+from src.utils import trazas
+
+# Límite superior (ms) de cada cubeta del histograma; la última es "más de 2.5 s"
+CUBETAS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_ESPACIOS = re.compile(r'\s+')
+_MODULOS_PROPIOS = ('src.database.instrumentacion', 'src.database.database_manager', 'sqlite3')
+
+
+@lru_cache(maxsize=1024)
+def forma_sentencia(sql: str) -> str:
+    """SQL normalizado: literales → ?, listas IN (?, ?, ...) → (...), espacios simples."""
+    forma = _LITERALES.sub('?', sql)
+    forma = _LISTAS.sub('(...)', forma)
+    return _ESPACIOS.sub(' ', forma).strip()
+
+
+def _llamador() -> str:
+    """Método del controlador que originó la consulta (o el primer llamador fuera de la capa de datos)."""
+    marco = sys._getframe(1)
+    primero = None
+    while marco is not None:
+        modulo = marco.f_globals.get('__name__', '')
+        if modulo.startswith('src.controllers'):
+            return getattr(marco.f_code, 'co_qualname', marco.f_code.co_name)
+        if primero is None and not modulo.startswith(_MODULOS_PROPIOS):
+            primero = f"{modulo.rsplit('.', 1)[-1]}.{getattr(marco.f_code, 'co_qualname', marco.f_code.co_name)}"
+        marco = marco.f_back
+    return primero or '?'
+
+
+class _Estadistica:
+    __slots__ = ('conteo', 'total', 'maximo', 'filas', 'cubetas', 'llamadores')
+
+    def __init__(self):
+        self.conteo = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.filas = 0
+        self.cubetas = [0] * len(CUBETAS_MS)
+        self.llamadores = Counter()
+
+    def percentil(self, p: float) -> float:
+        """Límite superior (ms) de la cubeta donde cae el percentil p."""
+        objetivo = self.conteo * p
+        acumulado = 0
+        for limite, cantidad in zip(CUBETAS_MS, self.cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return self.maximo * 1000 if limite == float('inf') else limite
+        return self.maximo * 1000
+
+
+class Instrumentacion:
+    """Estadísticas por forma de sentencia y registro de consultas lentas (seguro entre hilos)."""
+
+    def __init__(self, umbral_ms: float = 100, max_lentas: int = 200):
+        self.activa = True
+        self.umbral_ms = umbral_ms
+        self._lock = threading.Lock()
+        self._estadisticas: Dict[str, _Estadistica] = {}
+        self.lentas = deque(maxlen=max_lentas)
+        self.desde = datetime.now()
+
+    def registrar(self, conn, sql, parametros, segundos, filas):
+        forma = forma_sentencia(sql)
+        llamador = _llamador()
+        with self._lock:
+            estadistica = self._estadisticas.get(forma)
+            if estadistica is None:
+                estadistica = self._estadisticas[forma] = _Estadistica()
+            estadistica.conteo += 1
+            estadistica.total += segundos
+            estadistica.maximo = max(estadistica.maximo, segundos)
+            estadistica.filas += max(filas, 0)
+            estadistica.cubetas[bisect_left(CUBETAS_MS, segundos * 1000)] += 1
+            estadistica.llamadores[llamador] += 1
+        trazas.registrar_sql(forma, segundos, filas)
+
+        if segundos * 1000 >= self.umbral_ms:
+            plan = self._plan(conn, sql, parametros)
+            self.lentas.append({
+                'fecha': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+                'ms': segundos * 1000,
+                'sql': forma,
+                'llamador': llamador,
+                'filas': filas,
+                'plan': plan,
+            })
+            print(f"🐢 Consulta lenta ({segundos * 1000:.1f} ms) en {llamador}: {forma[:200]}\n   Plan: {plan}")
+
+    @staticmethod
+    def _plan(conn, sql, parametros) -> str:
+        if not sql.lstrip()[:7].upper().startswith(('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')):
+            return ''
+        try:
+            # EXPLAIN no vuelve a ejecutar la sentencia
+            filas = sqlite3.Connection.execute(conn, 'EXPLAIN QUERY PLAN ' + sql, parametros).fetchall()
+            return ' | '.join(str(fila[-1]) for fila in filas)
+        except sqlite3.Error as e:
+            return f'(sin plan: {e})'
+
+    def resumen(self, orden: str = 'total') -> List[Dict]:
+        """Una fila por forma de sentencia, ordenadas por tiempo total (o 'conteo', 'maximo')."""
+        with self._lock:
+            filas = [{
+                'sql': forma,
+                'conteo': e.conteo,
+                'total_ms': e.total * 1000,
+                'promedio_ms': e.total * 1000 / e.conteo,
+                'p50_ms': e.percentil(0.50),
+                'p95_ms': e.percentil(0.95),
+                'p99_ms': e.percentil(0.99),
+                'maximo_ms': e.maximo * 1000,
+                'filas': e.filas,
+                'llamadores': e.llamadores.most_common(3),
+            } for forma, e in self._estadisticas.items()]
+        clave = {'total': 'total_ms', 'conteo': 'conteo', 'maximo': 'maximo_ms'}[orden]
+        return sorted(filas, key=lambda f: f[clave], reverse=True)
+
+    def reiniciar(self):
+        with self._lock:
+            self._estadisticas.clear()
+            self.lentas.clear()
+            self.desde = datetime.now()
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que mide cada sentencia; en las SELECT incluye la lectura de las filas."""
+
+    _pendiente = None  # [sql, parámetros, segundos acumulados, filas leídas]
+
+    def execute(self, sql, parametros=()):
+        self._cerrar_medicion()
+        t0 = time.perf_counter()
+        super().execute(sql, parametros)
+        segundos = time.perf_counter() - t0
+        if self.description is not None:
+            self._pendiente = [sql, parametros, segundos, 0]
+            self.connection._cursores_pendientes.add(self)
+        else:
+            self.connection.instrumentacion.registrar(self.connection, sql, parametros, segundos, self.rowcount)
+        return self
+
+    def executemany(self, sql, secuencia):
+        self._cerrar_medicion()
+        t0 = time.perf_counter()
+        super().executemany(sql, secuencia)
+        self.connection.instrumentacion.registrar(
+            self.connection, sql, (), time.perf_counter() - t0, self.rowcount)
+        return self
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        fila = super().fetchone()
+        self._sumar(time.perf_counter() - t0, 0 if fila is None else 1, fila is None)
+        return fila
+
+    def fetchmany(self, size=None):
+        t0 = time.perf_counter()
+        filas = super().fetchmany(self.arraysize if size is None else size)
+        self._sumar(time.perf_counter() - t0, len(filas), not filas)
+        return filas
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        filas = super().fetchall()
+        self._sumar(time.perf_counter() - t0, len(filas), True)
+        return filas
+
+    def __next__(self):
+        # for fila in conn.execute(...) lee por aquí, no por fetch*
+        t0 = time.perf_counter()
+        try:
+            fila = super().__next__()
+        except StopIteration:
+            self._sumar(time.perf_counter() - t0, 0, True)
+            raise
+        self._sumar(time.perf_counter() - t0, 1, False)
+        return fila
+
+    def close(self):
+        self._cerrar_medicion()
+        super().close()
+
+    def _sumar(self, segundos, filas, terminado):
+        if self._pendiente is not None:
+            self._pendiente[2] += segundos
+            self._pendiente[3] += filas
+            if terminado:
+                self._cerrar_medicion()
+
+    def _cerrar_medicion(self):
+        pendiente = self._pendiente
+        if pendiente is not None:
+            self._pendiente = None
+            self.connection._cursores_pendientes.discard(self)
+            self.connection.instrumentacion.registrar(self.connection, *pendiente)
+
+
+class ConexionInstrumentada(sqlite3.Connection):
+    """Conexión cuyos cursores registran sus sentencias en `instrumentacion`."""
+
+    instrumentacion: Instrumentacion = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursores_pendientes = set()
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    # Connection.execute no pasa por cursor(): se redirigen aquí
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, secuencia):
+        return self.cursor().executemany(sql, secuencia)
+
+    def _cerrar_mediciones(self):
+        for cursor in list(self._cursores_pendientes):
+            cursor._cerrar_medicion()
+
+    def commit(self):
+        self._cerrar_mediciones()
+        super().commit()
+
+    def close(self):
+        self._cerrar_mediciones()
+        super().close()
+
+    def __exit__(self, *args):
+        self._cerrar_mediciones()
+        return super().__exit__(*args)
@@ -0,0 +1,169 @@
+"""
+Mantenimiento periódico de la base de datos.
+
+- Estadísticas del planificador: ANALYZE la primera vez, luego PRAGMA optimize
+  (solo vuelve a analizar las tablas que cambiaron bastante).
+- Espacio libre: con auto_vacuum=INCREMENTAL las páginas que dejan los borrados
+  (productos eliminados, movimientos de caja, años archivados) se devuelven al
+  sistema de archivos por tramos acotados con PRAGMA incremental_vacuum(N), así
+  el archivo que sincroniza OneDrive no crece de más. Una base de datos creada
+  antes de este módulo se convierte una sola vez con VACUUM.
+- Integridad: PRAGMA quick_check.
+
+Cada ejecución compara el plan de consultas frecuentes antes y después, y queda
+registrada en la tabla mantenimiento (migración 6) con el tamaño antes/después.
+"""
+import os
+import sqlite3
+import time
+from typing import Callable, Dict
+
+# Consultas frecuentes cuyo plan se vigila (el cambio de plan se informa en el reporte)
+CONSULTAS_VIGILADAS = {
+    'producto por código': ("SELECT id FROM productos WHERE codigo = ?", ('X',)),
+    'lotes PEPS': ("SELECT id FROM compras WHERE producto_id = ? AND COALESCE(cantidad_disponible, cantidad) > 0 "
+                   "ORDER BY fecha ASC", (1,)),
+    'detalle de venta': ("SELECT * FROM ventas_detalle WHERE venta_id = ?", (1,)),
+    'movimientos de producto': ("SELECT * FROM movimientos_stock WHERE producto_id = ? ORDER BY fecha DESC", (1,)),
+    'saldo de caja': ("SELECT saldo_nuevo FROM movimientos_caja ORDER BY id DESC LIMIT 1", ()),
+    'cliente por NIT': ("SELECT id FROM clientes WHERE nit_normalizado = ?", ('X',)),
+}
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def tamano_archivo(db_path) -> int:
+    """Bytes de la base de datos más su WAL, si existe."""
+    total = 0
+    for ruta in (db_path, db_path + '-wal'):
+        if os.path.exists(ruta):
+            total += os.path.getsize(ruta)
+    return total
+
+
+def planes(conn) -> Dict[str, str]:
+    """Plan de cada consulta vigilada, como texto de una línea."""
+    resultado = {}
+    for nombre, (sql, parametros) in CONSULTAS_VIGILADAS.items():
+        try:
+            filas = conn.execute('EXPLAIN QUERY PLAN ' + sql, parametros).fetchall()
+            resultado[nombre] = ' | '.join(fila[-1] for fila in filas)
+        except sqlite3.Error as e:
+            resultado[nombre] = f'error: {e}'
+    return resultado
+
+
+def ejecutar(db_path, completo=True, max_paginas=2000, conectar: Callable = None) -> Dict:
+    """
+    Ejecuta el mantenimiento.
+
+    Args:
+        completo: También quick_check y la conversión única a auto_vacuum
+                  incremental (puede tardar). En False solo lo barato: optimize
+                  y un tramo de incremental_vacuum (al cerrar la aplicación).
+        max_paginas: Páginas libres devueltas como máximo en esta ejecución
+        conectar: Función(**opciones) que abre la conexión (DatabaseManager._conectar)
+
+    Returns:
+        {'segundos', 'bytes_antes', 'bytes_despues', 'paginas_liberadas',
+         'integridad', 'analisis', 'auto_vacuum', 'planes_cambiados'}
+    """
+    t0 = time.perf_counter()
+    reporte = {'bytes_antes': tamano_archivo(db_path), 'integridad': None, 'planes_cambiados': {}}
+
+    conn = (conectar or (lambda **opciones: sqlite3.connect(db_path, **opciones)))(
+        isolation_level=None, timeout=30)
+    try:
+        planes_antes = planes(conn)
+        libres_antes = conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+        if completo:
+            resultado = conn.execute('PRAGMA quick_check').fetchall()
+            reporte['integridad'] = 'ok' if resultado == [('ok',)] else '; '.join(f[0] for f in resultado[:10])
+
+        tiene_estadisticas = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is not None
+        if tiene_estadisticas:
+            conn.execute('PRAGMA optimize')
+            reporte['analisis'] = 'optimize'
+        else:
+            conn.execute('ANALYZE')
+            reporte['analisis'] = 'ANALYZE'
+
+        modo = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+        if modo == AUTO_VACUUM_INCREMENTAL:
+            # execute() avanza la sentencia un solo paso (una página); executescript la completa
+            conn.executescript(f'PRAGMA incremental_vacuum({int(max_paginas)});')
+            reporte['auto_vacuum'] = 'incremental'
+        elif completo:
+            # El modo solo cambia en una base de datos existente al reconstruirla
+            try:
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                conn.execute('VACUUM')
+                reporte['auto_vacuum'] = 'convertida a incremental (VACUUM)'
+            except sqlite3.OperationalError as e:
+                # Otra conexión tiene la base de datos abierta: se reintenta la próxima vez
+                reporte['auto_vacuum'] = f'conversión pendiente ({e})'
+        else:
+            reporte['auto_vacuum'] = 'sin auto_vacuum'
+
+        libres_despues = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        reporte['paginas_liberadas'] = max(libres_antes - libres_despues, 0)
+
+        planes_despues = planes(conn)
+        reporte['planes_cambiados'] = {
+            nombre: (planes_antes[nombre], planes_despues[nombre])
+            for nombre in planes_antes if planes_antes[nombre] != planes_despues[nombre]
+        }
+    finally:
+        conn.close()
+
+    reporte['bytes_despues'] = tamano_archivo(db_path)
+    reporte['segundos'] = time.perf_counter() - t0
+    return reporte
+
+
+def formatear_reporte(reporte: Dict) -> str:
+    """Devuelve el reporte de mantenimiento como texto."""
+    lineas = [
+        f"Mantenimiento de la base de datos ({reporte['segundos']:.1f} s)",
+        f"  Tamaño: {reporte['bytes_antes'] / 1024:,.0f} KB → {reporte['bytes_despues'] / 1024:,.0f} KB",
+        f"  Estadísticas: {reporte['analisis']}",
+        f"  Espacio libre: {reporte['auto_vacuum']}, {reporte['paginas_liberadas']} páginas liberadas",
+    ]
+    if reporte['integridad'] is not None:
+        lineas.append(f"  Integridad: {reporte['integridad']}")
+    for nombre, (antes, despues) in reporte['planes_cambiados'].items():
+        lineas.append(f"  Plan '{nombre}':\n    antes:   {antes}\n    después: {despues}")
+    return "\n".join(lineas)
+
+
+def registrar(db_path, reporte: Dict, completo: bool, conectar: Callable = None, ejecutar_unidad: Callable = None):
+    """
+    Guarda la ejecución en la tabla mantenimiento.
+
+    Args:
+        conectar: Función que abre la conexión (DatabaseManager._conectar)
+        ejecutar_unidad: PoliticaBloqueos.ejecutar(nombre, conectar, unidad) para
+                         escribir con BEGIN IMMEDIATE y reintentos
+    """
+    def unidad(conn):
+        conn.execute('''
+            INSERT INTO mantenimiento (completo, segundos, bytes_antes, bytes_despues,
+                                       paginas_liberadas, integridad, planes_cambiados)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (1 if completo else 0, round(reporte['segundos'], 3), reporte['bytes_antes'],
+              reporte['bytes_despues'], reporte['paginas_liberadas'], reporte['integridad'],
+              len(reporte['planes_cambiados'])))
+
+    conectar = conectar or (lambda: sqlite3.connect(db_path, timeout=30))
+    if ejecutar_unidad is not None:
+        ejecutar_unidad('registrar_mantenimiento', conectar, unidad)
+        return
+    conn = conectar()
+    try:
+        with conn:
+            unidad(conn)
+    finally:
+        conn.close()
+
@@ -0,0 +1,483 @@
+"""
+Migraciones numeradas del esquema de la base de datos.
+
+Cada migración se registra en la tabla schema_version. Al abrir la base de datos
+solo se lee la versión actual; las migraciones pendientes se aplican en orden,
+dentro de una única transacción, y se devuelve un reporte con sus tiempos.
+
+Para agregar un cambio de esquema: crear una función _migracion_NNN(cursor) y
+agregarla al final de MIGRACIONES. Nunca modificar una migración ya publicada.
+"""
+import sqlite3
+import time
+from typing import Dict, List
+
+from src.database.normalizacion import normalizar_nit
+
+
+def _agregar_columna(cursor, tabla: str, definicion: str):
+    """Agrega una columna si no existe (bases de datos creadas antes de las migraciones)"""
+    try:
+        cursor.execute(f'ALTER TABLE {tabla} ADD COLUMN {definicion}')
+        return True
+    except sqlite3.OperationalError:
+        return False  # La columna ya existe
+
+
+def _migracion_001_esquema_base(cursor):
+    """Esquema base v2.0 (tablas, columnas agregadas y usuario por defecto)"""
+    # Tabla de proveedores
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS proveedores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            nit_dpi TEXT NOT NULL UNIQUE,
+            direccion TEXT NOT NULL,
+            telefono TEXT,
+            fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Tabla de clientes
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS clientes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            nit_dpi TEXT NOT NULL UNIQUE,
+            direccion TEXT,
+            telefono TEXT,
+            fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Tabla de productos
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS productos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            codigo TEXT UNIQUE,
+            nombre TEXT NOT NULL UNIQUE,
+            categoria TEXT,
+            precio_compra REAL NOT NULL,
+            porcentaje_ganancia REAL NOT NULL,
+            precio_venta REAL NOT NULL,
+            stock_actual INTEGER DEFAULT 0,
+            fecha_creacion TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Columnas agregadas en versiones anteriores (categoría, ganancia y datos del SKU)
+    _agregar_columna(cursor, 'productos', 'categoria TEXT')
+    _agregar_columna(cursor, 'productos', 'monto_ganancia REAL DEFAULT 0')
+    _agregar_columna(cursor, 'productos', 'marca TEXT')
+    _agregar_columna(cursor, 'productos', 'color TEXT')
+    _agregar_columna(cursor, 'productos', 'tamaño TEXT')
+    _agregar_columna(cursor, 'productos', 'dibujo TEXT')
+    _agregar_columna(cursor, 'productos', 'cod_color TEXT')
+
+    # Tabla de compras
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS compras (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            producto_id INTEGER,
+            proveedor_id INTEGER,
+            cantidad INTEGER NOT NULL,
+            precio_unitario REAL NOT NULL,
+            total REAL NOT NULL,
+            no_documento TEXT NOT NULL,
+            fecha TEXT NOT NULL,
+            FOREIGN KEY (producto_id) REFERENCES productos (id),
+            FOREIGN KEY (proveedor_id) REFERENCES proveedores (id)
+        )
+    ''')
+
+    # Tabla de ventas (encabezado)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ventas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            referencia_no TEXT NOT NULL UNIQUE,
+            cliente_id INTEGER,
+            fecha TEXT NOT NULL,
+            total REAL NOT NULL,
+            estado TEXT DEFAULT 'Emitido',
+            FOREIGN KEY (cliente_id) REFERENCES clientes (id)
+        )
+    ''')
+
+    # Tabla de detalle de ventas (productos individuales)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ventas_detalle (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            venta_id INTEGER NOT NULL,
+            producto_id INTEGER,
+            cantidad INTEGER NOT NULL,
+            precio_unitario REAL NOT NULL,
+            subtotal REAL NOT NULL,
+            FOREIGN KEY (venta_id) REFERENCES ventas (id) ON DELETE CASCADE,
+            FOREIGN KEY (producto_id) REFERENCES productos (id)
+        )
+    ''')
+
+    # Tabla de movimientos de stock
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS movimientos_stock (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            producto_id INTEGER,
+            tipo TEXT NOT NULL, -- 'entrada' o 'salida'
+            cantidad INTEGER NOT NULL,
+            motivo TEXT NOT NULL, -- 'compra', 'venta', 'ajuste'
+            fecha TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (producto_id) REFERENCES productos (id)
+        )
+    ''')
+
+    # Tabla de movimientos de caja
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS movimientos_caja (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo TEXT NOT NULL, -- 'INGRESO' o 'EGRESO'
+            categoria TEXT NOT NULL, -- 'VENTA', 'COMPRA', 'RETIRO_UTILIDAD', 'GASTO_OPERATIVO', 'APORTE_CAPITAL'
+            concepto TEXT NOT NULL,
+            monto REAL NOT NULL,
+            saldo_anterior REAL NOT NULL,
+            saldo_nuevo REAL NOT NULL,
+            fecha TEXT NOT NULL,
+            usuario TEXT DEFAULT 'Sistema'
+        )
+    ''')
+
+    # Tabla de usuarios
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario TEXT NOT NULL UNIQUE,
+            contrasena TEXT NOT NULL,
+            nombre_completo TEXT NOT NULL,
+            rol TEXT DEFAULT 'usuario',
+            activo INTEGER DEFAULT 1,
+            fecha_creacion TEXT DEFAULT CURRENT_TIMESTAMP,
+            ultimo_acceso TEXT
+        )
+    ''')
+
+    # Crear usuario por defecto si no existe
+    cursor.execute("SELECT COUNT(*) FROM usuarios WHERE usuario = 'Marteliz'")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute('''
+            INSERT INTO usuarios (usuario, contrasena, nombre_completo, rol)
+            VALUES (?, ?, ?, ?)
+        ''', ('Marteliz', 'Admin', 'Administrador', 'admin'))
+        print("Usuario por defecto 'Marteliz' creado exitosamente")
+
+    # Columnas de vencimiento y de productos descontinuados
+    _agregar_columna(cursor, 'compras', 'es_perecedero INTEGER DEFAULT 0')
+    _agregar_columna(cursor, 'compras', 'fecha_vencimiento TEXT')
+    _agregar_columna(cursor, 'productos', 'activo INTEGER DEFAULT 1')
+
+    # Columna cantidad_disponible para método PEPS
+    if _agregar_columna(cursor, 'compras', 'cantidad_disponible INTEGER'):
+        # Inicializar cantidad_disponible = cantidad para compras existentes
+        cursor.execute('UPDATE compras SET cantidad_disponible = cantidad WHERE cantidad_disponible IS NULL')
+
+    # MIGRACIÓN: Si existe la columna producto_id en ventas, es la estructura antigua
+    try:
+        cursor.execute("SELECT producto_id FROM ventas LIMIT 1")
+        cursor.execute("SELECT COUNT(*) FROM ventas")
+        count = cursor.fetchone()[0]
+
+        if count > 0:
+            # Hay datos, hacer migración completa
+            _migrar_ventas_a_nueva_estructura(cursor)
+        else:
+            # No hay datos, solo actualizar estructura
+            print("Actualizando estructura de tabla ventas (sin datos)...")
+            cursor.execute("DROP TABLE ventas")
+            cursor.execute('''
+                CREATE TABLE ventas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    referencia_no TEXT NOT NULL UNIQUE,
+                    cliente_id INTEGER,
+                    fecha TEXT NOT NULL,
+                    total REAL NOT NULL,
+                    estado TEXT DEFAULT 'Emitido',
+                    FOREIGN KEY (cliente_id) REFERENCES clientes (id)
+                )
+            ''')
+    except sqlite3.OperationalError:
+        # La columna producto_id no existe, es la nueva estructura
+        if _agregar_columna(cursor, 'ventas', "estado TEXT DEFAULT 'Emitido'"):
+            print("Columna 'estado' agregada a la tabla ventas")
+
+
+def _migrar_ventas_a_nueva_estructura(cursor):
+    """Migra ventas de la estructura antigua (un producto por venta) a la nueva (encabezado + detalle)"""
+    # Verificar si ya existe la tabla ventas_detalle
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='ventas_detalle'")
+    if not cursor.fetchone():
+        return  # No hay tabla detalle, no migrar aún
+
+    # Obtener todas las ventas antiguas agrupadas por referencia_no
+    cursor.execute("""
+        SELECT referencia_no, cliente_id, fecha,
+               producto_id, cantidad, precio_unitario, total
+        FROM ventas
+        ORDER BY referencia_no, id
+    """)
+    ventas_antiguas = cursor.fetchall()
+
+    if not ventas_antiguas:
+        return
+
+    # Renombrar tabla antigua (se conserva como respaldo)
+    cursor.execute("ALTER TABLE ventas RENAME TO ventas_old")
+
+    # Crear nueva tabla ventas (encabezado)
+    cursor.execute('''
+        CREATE TABLE ventas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            referencia_no TEXT NOT NULL UNIQUE,
+            cliente_id INTEGER,
+            fecha TEXT NOT NULL,
+            total REAL NOT NULL,
+            estado TEXT DEFAULT 'Emitido',
+            FOREIGN KEY (cliente_id) REFERENCES clientes (id)
+        )
+    ''')
+
+    # Agrupar ventas por referencia_no
+    ventas_agrupadas = {}
+    for row in ventas_antiguas:
+        ref_no = str(row[0])
+        if ref_no not in ventas_agrupadas:
+            ventas_agrupadas[ref_no] = {
+                'cliente_id': row[1],
+                'fecha': row[2],
+                'productos': [],
+                'total': 0
+            }
+        ventas_agrupadas[ref_no]['productos'].append({
+            'producto_id': row[3],
+            'cantidad': row[4],
+            'precio_unitario': row[5],
+            'subtotal': row[6]
+        })
+        ventas_agrupadas[ref_no]['total'] += row[6]
+
+    # Insertar en nueva estructura
+    for ref_no, venta_data in ventas_agrupadas.items():
+        cursor.execute("""
+            INSERT INTO ventas (referencia_no, cliente_id, fecha, total, estado)
+            VALUES (?, ?, ?, ?, 'Emitido')
+        """, (ref_no, venta_data['cliente_id'], venta_data['fecha'], venta_data['total']))
+
+        venta_id = cursor.lastrowid
+
+        for producto in venta_data['productos']:
+            cursor.execute("""
+                INSERT INTO ventas_detalle (venta_id, producto_id, cantidad, precio_unitario, subtotal)
+                VALUES (?, ?, ?, ?, ?)
+            """, (venta_id, producto['producto_id'], producto['cantidad'],
+                  producto['precio_unitario'], producto['subtotal']))
+
+    print(f"✅ Migración completada: {len(ventas_agrupadas)} ventas migradas a nueva estructura")
+
+
+def _migracion_002_nit_normalizado(cursor):
+    """Columna nit_normalizado en clientes con índice para búsqueda exacta por NIT"""
+    _agregar_columna(cursor, 'clientes', 'nit_normalizado TEXT')
+
+    cursor.execute('SELECT id, nit_dpi FROM clientes')
+    cursor.executemany(
+        'UPDATE clientes SET nit_normalizado = ? WHERE id = ?',
+        [(normalizar_nit(nit), cliente_id) for cliente_id, nit in cursor.fetchall()]
+    )
+
+    try:
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_clientes_nit_normalizado ON clientes (nit_normalizado)')
+    except sqlite3.IntegrityError:
+        # Hay clientes que solo difieren en mayúsculas/espacios: se conserva la búsqueda
+        # indexada y la unicidad se valida al crear clientes nuevos
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_clientes_nit_normalizado ON clientes (nit_normalizado)')
+        print("⚠️ Hay clientes con NIT duplicado (mayúsculas/espacios); se creó un índice no único")
+
+
+# Tablas cuyos cambios se cuentan (para detectar escrituras de otras terminales)
+TABLAS_OBSERVADAS = ('productos', 'proveedores', 'clientes', 'compras', 'ventas',
+                     'ventas_detalle', 'movimientos_stock', 'movimientos_caja')
+
+
+def _migracion_003_contadores_cambios(cursor):
+    """Contador de cambios por tabla, mantenido por triggers"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contadores_cambios (
+            tabla TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.executemany('INSERT OR IGNORE INTO contadores_cambios (tabla) VALUES (?)',
+                       [(tabla,) for tabla in TABLAS_OBSERVADAS])
+    for tabla in TABLAS_OBSERVADAS:
+        for operacion in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_contador_{tabla}_{operacion.lower()}
+                AFTER {operacion} ON {tabla}
+                BEGIN
+                    UPDATE contadores_cambios SET version = version + 1 WHERE tabla = '{tabla}';
+                END
+            ''')
+
+
+# Tablas cuyas filas modificadas se registran en el log de cambios (tabla cambios)
+TABLAS_CON_LOG = ('productos', 'compras', 'ventas', 'ventas_detalle',
+                  'movimientos_stock', 'movimientos_caja')
+
+
+def _migracion_004_log_cambios(cursor):
+    """Log de cambios por fila (tabla, id, operación) con secuencia creciente"""
+    # AUTOINCREMENT: una secuencia nunca se reutiliza, aunque se poden filas viejas
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cambios (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabla TEXT NOT NULL,
+            fila_id INTEGER NOT NULL,
+            operacion TEXT NOT NULL CHECK (operacion IN ('I', 'U', 'D')),
+            fecha TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    for tabla in TABLAS_CON_LOG:
+        _crear_triggers_log(cursor, tabla)
+
+
+def _crear_triggers_log(cursor, tabla: str):
+    """Triggers que registran en cambios cada INSERT, UPDATE y DELETE de la tabla"""
+    for operacion, evento, fila in (('I', 'INSERT', 'NEW'), ('U', 'UPDATE', 'NEW'), ('D', 'DELETE', 'OLD')):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_cambios_{tabla}_{evento.lower()}
+            AFTER {evento} ON {tabla}
+            BEGIN
+                INSERT INTO cambios (tabla, fila_id, operacion) VALUES ('{tabla}', {fila}.id, '{operacion}');
+            END
+        ''')
+
+
+def _migracion_005_replicacion(cursor):
+    """Estado de la replicación entre terminales y origen de cada cambio"""
+    # origen NULL = cambio hecho en esta terminal; si no, la terminal de la que se importó
+    _agregar_columna(cursor, 'cambios', 'origen TEXT')
+    # Las ventas referencian clientes y las compras proveedores: también se replican
+    _crear_triggers_log(cursor, 'clientes')
+    _crear_triggers_log(cursor, 'proveedores')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS replicacion_estado (
+            clave TEXT PRIMARY KEY,
+            valor TEXT
+        )
+    ''')
+    # Los movimientos de caja importados reciben un ID local (se encadenan al saldo local)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS replicacion_ids (
+            tabla TEXT NOT NULL,
+            terminal TEXT NOT NULL,
+            id_origen INTEGER NOT NULL,
+            id_local INTEGER NOT NULL,
+            PRIMARY KEY (tabla, terminal, id_origen)
+        )
+    ''')
+
+
+def _migracion_006_mantenimiento(cursor):
+    """Registro de las ejecuciones del mantenimiento (ANALYZE, vacuum, integridad)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mantenimiento (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            completo INTEGER NOT NULL,
+            segundos REAL,
+            bytes_antes INTEGER,
+            bytes_despues INTEGER,
+            paginas_liberadas INTEGER,
+            integridad TEXT,
+            planes_cambiados INTEGER
+        )
+    ''')
+
+
+# Lista ordenada de migraciones: (versión, descripción, función)
+MIGRACIONES = [
+    (1, "Esquema base v2.0", _migracion_001_esquema_base),
+    (2, "NIT normalizado de clientes", _migracion_002_nit_normalizado),
+    (3, "Contadores de cambios por tabla", _migracion_003_contadores_cambios),
+    (4, "Log de cambios por fila", _migracion_004_log_cambios),
+    (5, "Replicación entre terminales", _migracion_005_replicacion),
+    (6, "Registro de mantenimiento", _migracion_006_mantenimiento),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+
+def version_actual(conn) -> int:
+    """Lee la versión del esquema (0 si la base de datos no tiene tabla schema_version)"""
+    try:
+        resultado = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+        return resultado[0] or 0
+    except sqlite3.OperationalError:
+        return 0
+
+
+def aplicar_migraciones(conn, version_inicial: int) -> List[Dict]:
+    """
+    Aplica las migraciones pendientes dentro de una única transacción.
+
+    La versión se vuelve a leer después de BEGIN IMMEDIATE: si otra terminal
+    migró la misma base mientras esta esperaba el bloqueo, sus migraciones ya
+    están confirmadas y aquí solo se aplican las que sigan pendientes.
+
+    Args:
+        conn: Conexión abierta con isolation_level=None (transacción manual)
+        version_inicial: Versión leída antes de la transacción (la que se usa es la releída)
+
+    Returns:
+        Reporte: lista de {version, descripcion, segundos}
+    """
+    reporte = []
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        version_inicial = version_actual(conn)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                descripcion TEXT NOT NULL,
+                aplicada TEXT DEFAULT CURRENT_TIMESTAMP,
+                duracion_ms REAL
+            )
+        ''')
+
+        for version, descripcion, migracion in MIGRACIONES:
+            if version <= version_inicial:
+                continue
+
+            t0 = time.perf_counter()
+            migracion(cursor)
+            segundos = time.perf_counter() - t0
+
+            cursor.execute(
+                'INSERT INTO schema_version (version, descripcion, duracion_ms) VALUES (?, ?, ?)',
+                (version, descripcion, round(segundos * 1000, 3))
+            )
+            reporte.append({'version': version, 'descripcion': descripcion, 'segundos': segundos})
+
+        cursor.execute('COMMIT')
+    except Exception:
+        cursor.execute('ROLLBACK')
+        raise
+
+    return reporte
+
+
+def formatear_reporte(reporte: List[Dict]) -> str:
+    """Devuelve el reporte de migraciones como texto"""
+    lineas = [f"Migraciones aplicadas: {len(reporte)}"]
+    for paso in reporte:
+        lineas.append(f"  v{paso['version']:03d} {paso['descripcion']:<45} {paso['segundos'] * 1000:>8.1f} ms")
+    lineas.append(f"  Total: {sum(p['segundos'] for p in reporte) * 1000:.1f} ms")
+    return "\n".join(lineas)
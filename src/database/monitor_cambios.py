@@ -0,0 +1,147 @@
+"""
+Detección de cambios hechos por otras terminales sobre la misma base de datos.
+
+Cuando la base de datos está en OneDrive o en una carpeta compartida, otra
+terminal puede modificarla. El monitor mantiene una conexión abierta y en cada
+revisión:
+
+1. Compara la firma del archivo (mtime, tamaño, inodo). Si el cliente de
+   sincronización reemplazó el archivo (otro inodo), la conexión se vuelve a abrir.
+2. Lee PRAGMA data_version, que cambia cuando otra conexión confirma algo.
+   Si no cambió y la firma tampoco, la revisión termina ahí (no se lee ninguna tabla).
+3. Si algo cambió, lee contadores_cambios (mantenida por triggers, migración 3)
+   y devuelve exactamente las tablas cuyo contador avanzó.
+
+Las escrituras de esta misma terminal no se reportan: cada unidad de escritura
+informa el avance de los contadores que produjo (registrar_escritura_local,
+leído dentro de su transacción BEGIN IMMEDIATE, así que es solo lo suyo) y
+absorber() lo acepta cuando su evento ya refrescó la interfaz. Una tabla se
+reporta si su contador avanzó más que lo escrito localmente.
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def leer_contadores(conn) -> Dict[str, int]:
+    """Lee contadores_cambios ({} si la base de datos no tiene la migración 3)"""
+    try:
+        return dict(conn.execute('SELECT tabla, version FROM contadores_cambios'))
+    except sqlite3.OperationalError:
+        return {}
+
+
+class MonitorCambios:
+    """Revisa de forma barata si la base de datos cambió y en qué tablas."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()  # la revisión puede correr en un hilo lector
+        self._data_version = None
+        self._firma = None
+        self._contadores: Dict[str, int] = {}
+        # Avances (antes, después) de los contadores hechos por esta terminal
+        self._locales_pendientes: Dict[str, List[Tuple[int, int]]] = {}
+        self._locales_aceptados: Dict[str, List[Tuple[int, int]]] = {}
+        self.revisiones = 0
+        with self._lock:
+            self._abrir()
+
+    def _abrir(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+        self._firma = self._firma_archivo()
+        if not self._contadores:
+            self._contadores = self._leer_contadores()
+
+    def _firma_archivo(self):
+        firma = []
+        for ruta in (self.db_path, self.db_path + '-wal'):
+            try:
+                st = os.stat(ruta)
+                firma.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except OSError:
+                firma.append(None)
+        return tuple(firma)
+
+    def _leer_contadores(self) -> Dict[str, int]:
+        return leer_contadores(self._conn)
+
+    def cambiar_ruta(self, db_path):
+        """Vigila otra base de datos (después de cambiar la ubicación)."""
+        with self._lock:
+            self.db_path = db_path
+            self._contadores = {}
+            self._locales_pendientes = {}
+            self._locales_aceptados = {}
+            self._abrir()
+
+    def revisar(self) -> Set[str]:
+        """Devuelve las tablas que cambiaron desde la revisión anterior (vacío si ninguna)."""
+        with self._lock:
+            self.revisiones += 1
+            firma = self._firma_archivo()
+            if firma[0] is None or self._firma[0] is None or firma[0][2] != self._firma[0][2]:
+                # Archivo reemplazado (otro inodo): la conexión anterior ya no lo vería
+                self._abrir()
+            else:
+                version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+                if version == self._data_version and firma == self._firma:
+                    return set()
+                self._data_version = version
+                self._firma = firma
+
+            contadores = self._leer_contadores()
+            cambiadas = {tabla for tabla, valor in contadores.items()
+                         if self._cambio_externo(tabla, self._contadores.get(tabla), valor)}
+            self._contadores = contadores
+            return cambiadas
+
+    def _cambio_externo(self, tabla: str, conocido, valor: int) -> bool:
+        """
+        True si el contador avanzó de conocido a valor por algo más que las
+        escrituras locales aceptadas. Descarta los avances locales ya pasados.
+        """
+        aceptados = self._locales_aceptados.get(tabla, [])
+        locales = sum(despues - antes for antes, despues in aceptados
+                      if conocido is not None and antes >= conocido and despues <= valor)
+        for registro in (self._locales_aceptados, self._locales_pendientes):
+            if tabla in registro:
+                registro[tabla] = [(antes, despues) for antes, despues in registro[tabla] if despues > valor]
+        if conocido is None or valor < conocido:
+            return conocido != valor  # tabla nueva o archivo restaurado
+        return valor - conocido > locales
+
+    def registrar_escritura_local(self, cambios: Dict[str, Tuple[int, int]]):
+        """
+        Anota el avance {tabla: (antes, después)} de los contadores que produjo
+        una escritura de esta terminal (leído dentro de su transacción).
+        """
+        with self._lock:
+            for tabla, intervalo in cambios.items():
+                self._locales_pendientes.setdefault(tabla, []).append(intervalo)
+
+    def absorber(self, tablas: Iterable[str]):
+        """
+        Acepta las escrituras locales anotadas en estas tablas.
+
+        Se llama después de una escritura de esta misma terminal (que ya refrescó
+        la interfaz por eventos) para que la siguiente revisión no la reporte.
+        Solo se descuenta lo que escribió esta terminal: un cambio de otra
+        terminal confirmado entre medio se sigue reportando.
+        """
+        with self._lock:
+            for tabla in tablas:
+                pendientes = self._locales_pendientes.pop(tabla, [])
+                if pendientes:
+                    self._locales_aceptados.setdefault(tabla, []).extend(pendientes)
+
+    def cerrar(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
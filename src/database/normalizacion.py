@@ -0,0 +1,8 @@
+"""
+Normalización de valores usados como claves de búsqueda en la base de datos.
+"""
+
+
+def normalizar_nit(nit_dpi: str) -> str:
+    """Normaliza un NIT/DPI para compararlo: sin espacios en los extremos y en mayúsculas"""
+    return (nit_dpi or '').strip().upper()
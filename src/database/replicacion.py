@@ -0,0 +1,421 @@
+"""
+Replicación entre terminales: cada terminal trabaja sobre su base de datos
+local y comparte solo lotes de cambios en una carpeta de intercambio
+(normalmente dentro de OneDrive; cualquier carpeta compartida sirve).
+
+    carpeta_intercambio/
+        T01/00000001.json, 00000002.json, ...   (lotes de la terminal 1)
+        T02/...
+
+Exportar: se leen del log `cambios` (migración 4) las filas modificadas en esta
+terminal desde el último lote y se escribe un lote nuevo con su estado actual.
+Importar: se aplican en orden los lotes nuevos de las demás terminales. Los
+cambios que genera la importación quedan marcados con `origen` y no se vuelven
+a exportar.
+
+Reglas para que todas las terminales lleguen al mismo resultado:
+- IDs: cada terminal inserta en su propio rango (terminal_id * RANGO_IDS), así
+  una venta o compra nunca choca con la de otra terminal.
+- Stock: nunca se copia productos.stock_actual. El stock cambia solo al aplicar
+  los movimientos_stock importados (entrada suma, salida resta), así las ventas
+  simultáneas de dos terminales se acumulan en lugar de pisarse.
+- PEPS: tampoco se copia compras.cantidad_disponible. Una compra importada
+  llega completa y cada detalle de venta importado se descuenta con PEPS
+  sobre las compras locales, igual que una venta hecha aquí.
+- Caja: los movimientos importados se agregan al final de la cadena local con
+  un ID local y su saldo se recalcula sobre el saldo local. El orden de la
+  cadena puede variar entre terminales, pero el saldo final es el mismo.
+- Resto de columnas: gana el último lote aplicado. Si una fila viola una
+  restricción UNIQUE (por ejemplo el mismo código de producto creado en dos
+  terminales) no se aplica y se reporta como conflicto.
+- Un lote que falla por otra causa (que no sea la base bloqueada) se reintenta
+  en los siguientes ciclos; al fallar INTENTOS_ANTES_DE_CUARENTENA veces se
+  pone en cuarentena (se copia a <base>.cuarentena/, se anota en
+  replicacion_estado y se reporta como conflicto) y se sigue con los demás.
+"""
+import json
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+from typing import Dict, List
+
+from src.database.bloqueos import es_bloqueo
+
+# Cantidad de IDs reservados para cada terminal en cada tabla
+RANGO_IDS = 10_000_000
+
+# Fallos seguidos de un mismo lote antes de apartarlo
+INTENTOS_ANTES_DE_CUARENTENA = 3
+
+# Orden de aplicación (las tablas referenciadas primero); los borrados van al revés
+TABLAS_REPLICADAS = ('proveedores', 'clientes', 'productos', 'compras', 'ventas',
+                     'ventas_detalle', 'movimientos_stock', 'movimientos_caja')
+
+
+class Replicador:
+    """Exporta e importa lotes de cambios entre la réplica local y la carpeta compartida."""
+
+    def __init__(self, db, carpeta, terminal_id):
+        """
+        Args:
+            db: DatabaseManager de la réplica local
+            carpeta: Carpeta de intercambio compartida
+            terminal_id: Número de esta terminal (distinto en cada una, 1-99)
+        """
+        self.db = db
+        self.carpeta = carpeta
+        self.terminal_id = int(terminal_id)
+        self.terminal = f"T{self.terminal_id:02d}"
+        self.conflictos: List[str] = []
+        self._fallos: Dict[tuple, int] = {}  # (terminal, lote) -> intentos fallidos
+
+    @property
+    def carpeta_propia(self):
+        return os.path.join(self.carpeta, self.terminal)
+
+    def _conectar(self):
+        conn = self.db._conectar(isolation_level=None, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _estado(conn, clave, defecto=None):
+        fila = conn.execute('SELECT valor FROM replicacion_estado WHERE clave = ?', (clave,)).fetchone()
+        return fila[0] if fila else defecto
+
+    @staticmethod
+    def _guardar_estado(conn, clave, valor):
+        conn.execute('INSERT OR REPLACE INTO replicacion_estado (clave, valor) VALUES (?, ?)',
+                     (clave, str(valor)))
+
+    # ===== PREPARACIÓN =====
+
+    def preparar(self):
+        """Crea la carpeta de la terminal, reserva su rango de IDs y fija el inicio del log."""
+        os.makedirs(self.carpeta_propia, exist_ok=True)
+        conn = self._conectar()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            self._reservar_rango(conn)
+            if self._estado(conn, 'ultimo_seq_exportado') is None:
+                # Todas las terminales parten de la misma copia: solo se envía lo posterior
+                seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM cambios').fetchone()[0]
+                self._guardar_estado(conn, 'ultimo_seq_exportado', seq)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _reservar_rango(self, conn):
+        """Hace que el próximo ID de cada tabla caiga en el rango de esta terminal."""
+        # Insertar un ID ajeno más alto mueve sqlite_sequence: se recalcula en cada importación
+        base = self.terminal_id * RANGO_IDS
+        for tabla in TABLAS_REPLICADAS:
+            maximo = conn.execute(
+                f'SELECT COALESCE(MAX(id), ?) FROM {tabla} WHERE id >= ? AND id < ?',
+                (base, base, base + RANGO_IDS)
+            ).fetchone()[0]
+            conn.execute('DELETE FROM sqlite_sequence WHERE name = ?', (tabla,))
+            conn.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (tabla, maximo))
+
+    # ===== EXPORTACIÓN =====
+
+    def exportar(self) -> int:
+        """Escribe un lote con los cambios locales pendientes. Devuelve las filas exportadas."""
+        self.db.cola_escritura.vaciar()
+        conn = self._conectar()
+        try:
+            conn.execute('BEGIN')  # lectura consistente del log y de las filas
+            desde = int(self._estado(conn, 'ultimo_seq_exportado', 0))
+            registros = conn.execute(
+                'SELECT seq, tabla, fila_id, operacion, origen FROM cambios WHERE seq > ? ORDER BY seq',
+                (desde,)
+            ).fetchall()
+            if not registros:
+                conn.execute('COMMIT')
+                return 0
+            hasta = registros[-1]['seq']
+            cambios = self._armar_cambios(conn, registros)
+            conn.execute('COMMIT')
+
+            lote = int(self._estado(conn, 'ultimo_lote', 0)) + 1
+            if cambios:
+                self._escribir_lote(lote, desde, hasta, cambios)
+
+            conn.execute('BEGIN IMMEDIATE')
+            self._guardar_estado(conn, 'ultimo_seq_exportado', hasta)
+            if cambios:
+                self._guardar_estado(conn, 'ultimo_lote', lote)
+            conn.execute('COMMIT')
+            return len(cambios)
+        finally:
+            conn.close()
+
+    def _armar_cambios(self, conn, registros) -> List[Dict]:
+        # Una entrada por fila con su estado actual; 'I' se conserva si la fila es nueva
+        operaciones = {}
+        for registro in registros:
+            if registro['origen'] is not None or registro['tabla'] not in TABLAS_REPLICADAS:
+                continue  # vino de otra terminal
+            clave = (registro['tabla'], registro['fila_id'])
+            if registro['operacion'] == 'D':
+                # Insertada y borrada dentro del mismo lote: no hay nada que enviar
+                operaciones[clave] = None if operaciones.get(clave) == 'I' else 'D'
+            elif clave not in operaciones:
+                operaciones[clave] = registro['operacion']
+
+        cambios = []
+        for (tabla, fila_id), operacion in operaciones.items():
+            if operacion is None:
+                continue
+            fila = conn.execute(f'SELECT * FROM {tabla} WHERE id = ?', (fila_id,)).fetchone()
+            if fila is None or operacion == 'D':
+                cambio = {'tabla': tabla, 'op': 'D', 'id': fila_id}
+                if tabla == 'movimientos_caja':
+                    cambio['ref'] = self._referencia_caja(conn, fila_id)
+            else:
+                cambio = {'tabla': tabla, 'op': operacion, 'id': fila_id, 'fila': dict(fila)}
+            cambios.append(cambio)
+        return cambios
+
+    def _referencia_caja(self, conn, id_local):
+        """Identifica un movimiento de caja por su terminal de origen y su ID allí."""
+        fila = conn.execute(
+            'SELECT terminal, id_origen FROM replicacion_ids WHERE tabla = ? AND id_local = ?',
+            ('movimientos_caja', id_local)
+        ).fetchone()
+        return [fila[0], fila[1]] if fila else [self.terminal, id_local]
+
+    def _escribir_lote(self, lote, desde, hasta, cambios):
+        os.makedirs(self.carpeta_propia, exist_ok=True)
+        ruta = os.path.join(self.carpeta_propia, f"{lote:08d}.json")
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({
+                'terminal': self.terminal,
+                'lote': lote,
+                'desde_seq': desde,
+                'hasta_seq': hasta,
+                'fecha': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+                'cambios': cambios,
+            }, f, ensure_ascii=False, default=str)
+        # El cliente de sincronización nunca ve un lote a medio escribir
+        os.replace(temporal, ruta)
+
+    # ===== IMPORTACIÓN =====
+
+    def importar(self) -> int:
+        """Aplica los lotes nuevos de las demás terminales. Devuelve los cambios aplicados."""
+        if not os.path.isdir(self.carpeta):
+            return 0
+        aplicados = 0
+        conn = self._conectar()
+        try:
+            for terminal in sorted(os.listdir(self.carpeta)):
+                carpeta = os.path.join(self.carpeta, terminal)
+                if terminal == self.terminal or not os.path.isdir(carpeta):
+                    continue
+                ultimo = int(self._estado(conn, f'importado:{terminal}', 0))
+                for archivo in sorted(os.listdir(carpeta)):
+                    if not archivo.endswith('.json'):
+                        continue
+                    try:
+                        lote = int(archivo[:-5])
+                    except ValueError:
+                        continue
+                    if lote <= ultimo:
+                        continue
+                    try:
+                        with open(os.path.join(carpeta, archivo), 'r', encoding='utf-8') as f:
+                            datos = json.load(f)
+                    except (OSError, ValueError):
+                        break  # aún se está sincronizando: se reintenta en el próximo ciclo
+                    try:
+                        aplicados += self._aplicar_lote(conn, terminal, lote, datos['cambios'])
+                    except sqlite3.OperationalError as e:
+                        if es_bloqueo(e):
+                            raise  # la base está ocupada: se reintenta en el próximo ciclo
+                        if not self._fallo_lote(conn, terminal, lote, archivo, e):
+                            break
+                    except (sqlite3.Error, KeyError, TypeError, ValueError) as e:
+                        if not self._fallo_lote(conn, terminal, lote, archivo, e):
+                            break
+                    ultimo = lote
+        finally:
+            conn.close()
+        return aplicados
+
+    def _fallo_lote(self, conn, terminal, lote, archivo, error) -> bool:
+        """
+        Cuenta un fallo del lote. Devuelve True si se puso en cuarentena (se
+        sigue con el siguiente) y False si se reintentará en el próximo ciclo.
+        """
+        clave = (terminal, lote)
+        self._fallos[clave] = self._fallos.get(clave, 0) + 1
+        print(f"Error al aplicar el lote {terminal}/{archivo} "
+              f"(intento {self._fallos[clave]}): {error}")
+        if self._fallos[clave] < INTENTOS_ANTES_DE_CUARENTENA:
+            return False
+
+        # Copia local para revisarlo; el original se deja en la carpeta compartida
+        destino = self.carpeta_cuarentena()
+        os.makedirs(destino, exist_ok=True)
+        shutil.copy2(os.path.join(self.carpeta, terminal, archivo),
+                     os.path.join(destino, f"{terminal}_{archivo}"))
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._guardar_estado(conn, f'cuarentena:{terminal}:{lote}', str(error))
+            self._guardar_estado(conn, f'importado:{terminal}', lote)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        del self._fallos[clave]
+        self._conflicto(f"{terminal} lote {lote} en cuarentena: {error}")
+        return True
+
+    def carpeta_cuarentena(self):
+        """Carpeta local (junto a la base de datos) con los lotes que no se pudieron aplicar."""
+        return self.db.db_path + '.cuarentena'
+
+    def lotes_en_cuarentena(self) -> Dict[str, str]:
+        """Lotes apartados: {'T02:5': error}"""
+        conn = self._conectar()
+        try:
+            filas = conn.execute(
+                "SELECT clave, valor FROM replicacion_estado WHERE clave LIKE 'cuarentena:%'"
+            ).fetchall()
+            return {clave[len('cuarentena:'):]: valor for clave, valor in filas}
+        finally:
+            conn.close()
+
+    def _aplicar_lote(self, conn, terminal, lote, cambios) -> int:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            seq_antes = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM cambios').fetchone()[0]
+            orden = {tabla: i for i, tabla in enumerate(TABLAS_REPLICADAS)}
+            escrituras = sorted((c for c in cambios if c['op'] != 'D'), key=lambda c: orden[c['tabla']])
+            borrados = sorted((c for c in cambios if c['op'] == 'D'), key=lambda c: -orden[c['tabla']])
+
+            for cambio in escrituras:
+                self._aplicar_fila(conn, terminal, cambio)
+            for cambio in borrados:
+                self._borrar_fila(conn, terminal, cambio)
+
+            # Lo que acaba de escribirse viene de otra terminal: no se reexporta
+            conn.execute('UPDATE cambios SET origen = ? WHERE seq > ?', (terminal, seq_antes))
+            self._reservar_rango(conn)
+            self._guardar_estado(conn, f'importado:{terminal}', lote)
+            conn.execute('COMMIT')
+            return len(cambios)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _columnas(self, conn, tabla, fila):
+        existentes = {c[1] for c in conn.execute(f'PRAGMA table_info({tabla})')}
+        # Tolera diferencias de esquema entre terminales con versiones distintas
+        return [c for c in fila if c in existentes]
+
+    def _aplicar_fila(self, conn, terminal, cambio):
+        tabla, fila = cambio['tabla'], cambio['fila']
+
+        if tabla == 'movimientos_caja':
+            if cambio['op'] == 'I':
+                self._agregar_movimiento_caja(conn, terminal, fila)
+            return
+
+        existe = conn.execute(f'SELECT 1 FROM {tabla} WHERE id = ?', (fila['id'],)).fetchone() is not None
+        columnas = self._columnas(conn, tabla, fila)
+        if tabla == 'productos':
+            # El stock solo cambia con los movimientos importados
+            if existe:
+                columnas = [c for c in columnas if c != 'stock_actual']
+            else:
+                fila = dict(fila, stock_actual=0)
+        elif tabla == 'compras' and 'cantidad_disponible' in columnas:
+            # Lo disponible solo cambia con los detalles de venta importados (PEPS local)
+            if existe:
+                columnas = [c for c in columnas if c != 'cantidad_disponible']
+            else:
+                fila = dict(fila, cantidad_disponible=fila['cantidad'])
+
+        lista = ', '.join(columnas)
+        marcas = ', '.join('?' for _ in columnas)
+        asignaciones = ', '.join(f'{c} = excluded.{c}' for c in columnas if c != 'id')
+        try:
+            conn.execute(
+                f'INSERT INTO {tabla} ({lista}) VALUES ({marcas}) '
+                f'ON CONFLICT(id) DO UPDATE SET {asignaciones}',
+                [fila[c] for c in columnas]
+            )
+        except sqlite3.IntegrityError as e:
+            self._conflicto(f"{terminal} {tabla} id={fila['id']}: {e}")
+            return
+
+        if tabla == 'movimientos_stock' and not existe:
+            delta = fila['cantidad'] if fila['tipo'] == 'entrada' else -fila['cantidad']
+            conn.execute('UPDATE productos SET stock_actual = stock_actual + ? WHERE id = ?',
+                         (delta, fila['producto_id']))
+        elif tabla == 'ventas_detalle' and not existe:
+            self.db._descontar_peps(conn, fila['producto_id'], fila['cantidad'])
+
+    def _agregar_movimiento_caja(self, conn, terminal, fila):
+        ya_importado = conn.execute(
+            'SELECT 1 FROM replicacion_ids WHERE tabla = ? AND terminal = ? AND id_origen = ?',
+            ('movimientos_caja', terminal, fila['id'])
+        ).fetchone()
+        if ya_importado:
+            return
+        anterior = conn.execute('SELECT saldo_nuevo FROM movimientos_caja ORDER BY id DESC LIMIT 1').fetchone()
+        saldo_anterior = anterior[0] if anterior else 0.0
+        if fila['tipo'] == 'INGRESO':
+            saldo_nuevo = saldo_anterior + fila['monto']
+        else:
+            saldo_nuevo = saldo_anterior - fila['monto']
+        cursor = conn.execute('''
+            INSERT INTO movimientos_caja
+            (tipo, categoria, concepto, monto, saldo_anterior, saldo_nuevo, fecha, usuario)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (fila['tipo'], fila['categoria'], fila['concepto'], fila['monto'],
+              saldo_anterior, saldo_nuevo, fila['fecha'], fila.get('usuario', 'Sistema')))
+        conn.execute('INSERT INTO replicacion_ids (tabla, terminal, id_origen, id_local) VALUES (?, ?, ?, ?)',
+                     ('movimientos_caja', terminal, fila['id'], cursor.lastrowid))
+
+    def _borrar_fila(self, conn, terminal, cambio):
+        tabla = cambio['tabla']
+        if tabla == 'movimientos_caja':
+            terminal_origen, id_origen = cambio.get('ref') or [terminal, cambio['id']]
+            if terminal_origen == self.terminal:
+                id_local = id_origen
+            else:
+                fila = conn.execute(
+                    'SELECT id_local FROM replicacion_ids WHERE tabla = ? AND terminal = ? AND id_origen = ?',
+                    (tabla, terminal_origen, id_origen)
+                ).fetchone()
+                if fila is None:
+                    return
+                id_local = fila[0]
+            conn.execute('DELETE FROM movimientos_caja WHERE id = ?', (id_local,))
+            return
+        conn.execute(f'DELETE FROM {tabla} WHERE id = ?', (cambio['id'],))
+
+    def _conflicto(self, mensaje):
+        print(f"⚠️ Conflicto de replicación: {mensaje}")
+        self.conflictos.append(mensaje)
+
+    # ===== CICLO COMPLETO =====
+
+    def sincronizar(self) -> Dict:
+        """Exporta lo local e importa lo de las demás terminales."""
+        conflictos_antes = len(self.conflictos)
+        exportados = self.exportar()
+        importados = self.importar()
+        return {
+            'exportados': exportados,
+            'importados': importados,
+            'conflictos': self.conflictos[conflictos_antes:],
+        }
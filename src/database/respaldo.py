@@ -0,0 +1,240 @@
+"""
+Respaldos en caliente de la base de datos con la API de backup de SQLite.
+
+A diferencia de copiar el archivo, la API de backup produce siempre una copia
+consistente aunque la aplicación esté escribiendo. La copia se hace por pasos
+de `paginas_por_paso` páginas con una pausa entre pasos, así las ventas pueden
+escribir entre un paso y otro. Si una escritura de otra conexión obliga a
+SQLite a reiniciar la copia demasiadas veces, el último intento se hace en un
+solo paso (bloquea a los escritores solo lo que dura esa copia).
+
+Los respaldos se guardan comprimidos (gzip) como
+    <carpeta>/<nombre>_AAAAMMDD_HHMMSS.db.gz  (con _N si ya existe uno de ese segundo)
+y se conservan según una política por hora, día y mes.
+"""
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+PATRON_RESPALDO = re.compile(r'_(\d{8}_\d{6})(?:_\d+)?\.db\.gz$')
+
+
+def copiar_en_caliente(origen, destino, paginas_por_paso=256, pausa=0.005,
+                       max_reinicios=3, progreso=None, conectar: Callable = None) -> Dict:
+    """
+    Copia una base de datos en uso a otro archivo.
+
+    Args:
+        origen: Ruta de la base de datos en uso
+        destino: Ruta del archivo copia (se sobrescribe)
+        paginas_por_paso: Páginas copiadas por paso (a 4 KB, 256 páginas = 1 MB)
+        pausa: Segundos de espera entre pasos para dejar escribir a la aplicación
+        max_reinicios: Reinicios tolerados antes de copiar en un solo paso
+        progreso: Función(copiadas, total) opcional
+        conectar: Función que abre la base de datos en uso (DatabaseManager._conectar)
+
+    Returns:
+        {'segundos', 'paginas', 'pasos', 'reinicios', 'bytes'}
+    """
+    if os.path.exists(destino):
+        os.remove(destino)
+
+    estado = {'pasos': 0, 'reinicios': 0, 'restantes': None, 'total': 0}
+
+    def al_avanzar(_status, restantes, total):
+        # Si quedan más páginas que en el paso anterior, otra conexión escribió y la copia reinició
+        if estado['restantes'] is not None and restantes > estado['restantes']:
+            estado['reinicios'] += 1
+        estado['restantes'] = restantes
+        estado['total'] = total
+        estado['pasos'] += 1
+        if progreso:
+            progreso(total - restantes, total)
+        if estado['reinicios'] > max_reinicios:
+            raise _DemasiadosReinicios()
+        if pausa and restantes:
+            time.sleep(pausa)
+
+    t0 = time.perf_counter()
+    fuente = conectar() if conectar else sqlite3.connect(origen)
+    copia = sqlite3.connect(destino)  # archivo nuevo que nadie más usa
+    try:
+        try:
+            fuente.backup(copia, pages=paginas_por_paso, progress=al_avanzar)
+        except _DemasiadosReinicios:
+            fuente.backup(copia, pages=-1)
+    finally:
+        copia.close()
+        fuente.close()
+
+    return {
+        'segundos': time.perf_counter() - t0,
+        'paginas': estado['total'],
+        'pasos': estado['pasos'],
+        'reinicios': estado['reinicios'],
+        'bytes': os.path.getsize(destino),
+    }
+
+
+class _DemasiadosReinicios(Exception):
+    """La base de datos cambia más rápido de lo que avanza la copia por pasos."""
+
+
+def verificar(ruta) -> Optional[str]:
+    """
+    Ejecuta PRAGMA quick_check sobre una copia (respaldo o restauración en un
+    archivo temporal). Devuelve None si la base de datos está bien, o el error.
+    """
+    conn = sqlite3.connect(ruta)
+    try:
+        resultado = conn.execute('PRAGMA quick_check').fetchone()[0]
+        return None if resultado == 'ok' else resultado
+    finally:
+        conn.close()
+
+
+def crear_respaldo(db_path, carpeta, verificar_copia=True, **opciones) -> Dict:
+    """
+    Crea un respaldo comprimido y consistente de la base de datos.
+
+    Args:
+        db_path: Base de datos en uso
+        carpeta: Carpeta de respaldos
+        verificar_copia: Ejecutar quick_check sobre la copia antes de comprimirla
+        **opciones: Parámetros de copiar_en_caliente (conectar, paginas_por_paso, ...)
+
+    Returns:
+        {'ruta', 'segundos_copia', 'segundos_compresion', 'bytes_db', 'bytes_gz', ...}
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    nombre = os.path.splitext(os.path.basename(db_path))[0]
+    marca = datetime.now().strftime('%Y%m%d_%H%M%S')
+    destino = os.path.join(carpeta, f"{nombre}_{marca}.db.gz")
+    n = 1
+    while os.path.exists(destino):  # dos respaldos en el mismo segundo (p. ej. antes de restaurar)
+        destino = os.path.join(carpeta, f"{nombre}_{marca}_{n}.db.gz")
+        n += 1
+
+    fd, temporal = tempfile.mkstemp(suffix='.db', dir=carpeta)
+    os.close(fd)
+    try:
+        copia = copiar_en_caliente(db_path, temporal, **opciones)
+        if verificar_copia:
+            error = verificar(temporal)
+            if error:
+                raise sqlite3.DatabaseError(f"La copia no pasó la verificación: {error}")
+
+        t0 = time.perf_counter()
+        with open(temporal, 'rb') as entrada, gzip.open(destino + '.tmp', 'wb', compresslevel=6) as salida:
+            shutil.copyfileobj(entrada, salida, 1024 * 1024)
+        os.replace(destino + '.tmp', destino)
+        segundos_compresion = time.perf_counter() - t0
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+    return {
+        'ruta': destino,
+        'segundos_copia': copia['segundos'],
+        'segundos_compresion': segundos_compresion,
+        'reinicios': copia['reinicios'],
+        'bytes_db': copia['bytes'],
+        'bytes_gz': os.path.getsize(destino),
+    }
+
+
+def listar_respaldos(carpeta) -> List[Dict]:
+    """Respaldos de la carpeta, del más reciente al más antiguo."""
+    if not os.path.isdir(carpeta):
+        return []
+    respaldos = []
+    for archivo in os.listdir(carpeta):
+        coincidencia = PATRON_RESPALDO.search(archivo)
+        if coincidencia:
+            respaldos.append({
+                'ruta': os.path.join(carpeta, archivo),
+                'fecha': datetime.strptime(coincidencia.group(1), '%Y%m%d_%H%M%S'),
+                'mtime': os.path.getmtime(os.path.join(carpeta, archivo)),
+            })
+    return sorted(respaldos, key=lambda r: (r['fecha'], r['mtime']), reverse=True)
+
+
+def aplicar_retencion(carpeta, horas=24, dias=30, meses=12) -> List[str]:
+    """
+    Elimina los respaldos que no entran en la política de retención.
+
+    Se conserva el respaldo más reciente de cada una de las últimas `horas`
+    horas, de cada uno de los últimos `dias` días y de cada uno de los últimos
+    `meses` meses (un mismo archivo puede cubrir varias categorías).
+
+    Returns:
+        Rutas eliminadas
+    """
+    respaldos = listar_respaldos(carpeta)
+    conservar = set()
+    for formato, cantidad in (('%Y%m%d%H', horas), ('%Y%m%d', dias), ('%Y%m', meses)):
+        periodos = []
+        for respaldo in respaldos:  # del más reciente al más antiguo
+            periodo = respaldo['fecha'].strftime(formato)
+            if periodo not in periodos:
+                if len(periodos) == cantidad:
+                    break
+                periodos.append(periodo)
+                conservar.add(respaldo['ruta'])
+
+    eliminados = []
+    for respaldo in respaldos:
+        if respaldo['ruta'] not in conservar:
+            os.remove(respaldo['ruta'])
+            eliminados.append(respaldo['ruta'])
+    return eliminados
+
+
+def restaurar_respaldo(respaldo, db_path, carpeta_respaldos=None, conectar: Callable = None) -> Dict:
+    """
+    Reemplaza el contenido de la base de datos por el de un respaldo.
+
+    La restauración usa también la API de backup (en sentido inverso), así las
+    demás conexiones de la aplicación ven el contenido nuevo sin reabrir el
+    archivo. Antes se respalda el estado actual en carpeta_respaldos.
+
+    Args:
+        conectar: Función(**opciones) que abre la base de datos en uso (DatabaseManager._conectar)
+
+    Returns:
+        {'segundos', 'respaldo_previo'}
+    """
+    t0 = time.perf_counter()
+    directorio = os.path.dirname(os.path.abspath(db_path))
+    fd, temporal = tempfile.mkstemp(suffix='.db', dir=directorio)
+    os.close(fd)
+    try:
+        with gzip.open(respaldo, 'rb') as entrada, open(temporal, 'wb') as salida:
+            shutil.copyfileobj(entrada, salida, 1024 * 1024)
+        error = verificar(temporal)
+        if error:
+            raise sqlite3.DatabaseError(f"El respaldo está dañado: {error}")
+
+        previo = None
+        if carpeta_respaldos and os.path.exists(db_path):
+            previo = crear_respaldo(db_path, carpeta_respaldos, verificar_copia=False,
+                                    conectar=conectar)['ruta']
+
+        fuente = sqlite3.connect(temporal)
+        destino = conectar(timeout=30) if conectar else sqlite3.connect(db_path, timeout=30)
+        try:
+            fuente.backup(destino)
+        finally:
+            destino.close()
+            fuente.close()
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+    return {'segundos': time.perf_counter() - t0, 'respaldo_previo': previo}
@@ -8,6 +8,7 @@ import tkinter as tk
 from datetime import datetime
 from ttkbootstrap import DateEntry
 from src.ui.utils.ui_helpers import centrar_ventana, agregar_icono, configurar_navegacion_calendario
+from src.utils.trazas import trazado
 
 
 class CajaTab:
@@ -23,6 +24,9 @@ class CajaTab:
         
         # Crear interfaz
         self.create_ui()
+        
+        # Insertar/quitar solo la fila del movimiento y actualizar el saldo
+        self.controller.suscribir('cash_moved', self.on_movimiento_caja)
     
     def setup_variables(self):
         """Inicializa las variables del formulario"""
@@ -379,7 +383,6 @@ class CajaTab:
             if exito:
                 messagebox.showinfo("Éxito", mensaje)
                 self.limpiar_formulario()
-                self.refresh()
             else:
                 messagebox.showerror("Error", mensaje)
         
@@ -466,7 +469,6 @@ class CajaTab:
                 exito, mensaje = self.controller.eliminar_movimiento_caja(movimiento_id)
                 if exito:
                     messagebox.showinfo("Éxito", mensaje)
-                    self.refresh()
                 else:
                     messagebox.showerror("Error", mensaje)
             except Exception as e:
@@ -622,8 +624,20 @@ class CajaTab:
         centrar_ventana(detalle_window)
         detalle_window.deiconify()
     
+    @trazado(categoria='ui')
     def refresh(self):
         """Actualiza los datos de caja con filtro de búsqueda"""
+        # Obtener movimientos
+        movimientos = self.controller.obtener_movimientos_caja()
+        
+        # Aplicar filtro de búsqueda si existe
+        movimientos = [m for m in movimientos if self.coincide_busqueda(m)]
+        
+        self.cargar_movimientos(movimientos)
+        self.actualizar_saldo_y_resumen()
+    
+    def actualizar_saldo_y_resumen(self):
+        """Actualiza el saldo actual y los totales de ingresos y egresos"""
         # Obtener saldo actual
         saldo = self.controller.obtener_saldo_caja()
         self.saldo_label.config(text=f"Q {saldo:,.2f}")
@@ -634,75 +648,99 @@ class CajaTab:
         else:
             self.saldo_label.config(bootstyle="success")  # Verde para saldo positivo
         
-        # Obtener movimientos
-        movimientos = self.controller.obtener_movimientos_caja()
-        
-        # Aplicar filtro de búsqueda si existe
-        if hasattr(self, 'caja_busqueda'):
-            busqueda = self.caja_busqueda.get().lower()
-            if busqueda:
-                movimientos = [m for m in movimientos if 
-                              busqueda in m['concepto'].lower() or 
-                              busqueda in m['categoria'].lower() or
-                              busqueda in m['tipo'].lower()]
-        
-        self.cargar_movimientos(movimientos)
-        
         # Obtener resumen
         resumen = self.controller.obtener_resumen_caja()
         self.ingresos_label.config(text=f"↑ Ingresos: Q {resumen['total_ingresos']:,.2f}")
         self.egresos_label.config(text=f"↓ Egresos: Q {resumen['total_egresos']:,.2f}")
     
+    def coincide_busqueda(self, mov):
+        """Indica si el movimiento coincide con el texto de búsqueda"""
+        if not hasattr(self, 'caja_busqueda'):
+            return True
+        busqueda = self.caja_busqueda.get().lower()
+        return (not busqueda or
+                busqueda in mov['concepto'].lower() or
+                busqueda in mov['categoria'].lower() or
+                busqueda in mov['tipo'].lower())
+    
     def cargar_movimientos(self, movimientos):
         """Carga los movimientos en la tabla"""
         # Limpiar tabla
         for item in self.caja_tree.get_children():
             self.caja_tree.delete(item)
         
-        # Llenar tabla
+        # Llenar tabla (el iid de cada fila es el ID del movimiento)
         for mov in movimientos:
-            # Formatear fecha a dd/mm/yyyy
-            fecha_str = mov['fecha']
+            tag = 'ingreso' if mov['tipo'] == 'INGRESO' else 'egreso'
+            self.caja_tree.insert('', 'end', iid=str(mov['id']), values=self.valores_fila(mov), tags=(tag,))
+    
+    def valores_fila(self, mov):
+        """Valores de la fila de un movimiento de caja"""
+        # Formatear fecha a dd/mm/yyyy
+        fecha_str = mov['fecha']
+        try:
+            fecha_obj = datetime.strptime(fecha_str, '%Y-%m-%d %H:%M:%S')
+            fecha_formateada = fecha_obj.strftime('%d/%m/%Y')
+        except:
             try:
-                fecha_obj = datetime.strptime(fecha_str, '%Y-%m-%d %H:%M:%S')
+                fecha_obj = datetime.strptime(fecha_str, '%d/%m/%Y %H:%M:%S')
                 fecha_formateada = fecha_obj.strftime('%d/%m/%Y')
             except:
-                try:
-                    fecha_obj = datetime.strptime(fecha_str, '%d/%m/%Y %H:%M:%S')
-                    fecha_formateada = fecha_obj.strftime('%d/%m/%Y')
-                except:
-                    fecha_formateada = fecha_str.split()[0] if ' ' in fecha_str else fecha_str
-            
+                fecha_formateada = fecha_str.split()[0] if ' ' in fecha_str else fecha_str
+        
+        # Extraer número de venta del concepto si existe
+        venta_num = ''
+        concepto_limpio = mov['concepto']
+        
+        if 'Venta #' in mov['concepto']:
+            try:
+                # Extraer "Venta #123 (REF000456)" del concepto
+                venta_parte = mov['concepto'].split('Venta #')[1]
+                if ' (' in venta_parte:
+                    venta_num = venta_parte.split(' (')[0].strip()
+                elif ' -' in venta_parte:
+                    venta_num = venta_parte.split(' -')[0].strip()
+                else:
+                    venta_num = venta_parte.strip()
+            except:
+                pass
+        
+        return (
+            mov['id'],
+            fecha_formateada,
+            mov['tipo'],
+            mov['categoria'],
+            venta_num if venta_num else '-',
+            concepto_limpio,
+            f"Q {mov['monto']:,.2f}",
+            f"Q {mov['saldo_anterior']:,.2f}",
+            f"Q {mov['saldo_nuevo']:,.2f}"
+        )
+    
+    def on_movimiento_caja(self, movimiento_id, **_):
+        """Evento cash_moved: programa la fila del movimiento y un solo recálculo del saldo"""
+        planificador = self.main_window.planificador
+        planificador.programar('caja', movimiento_id, lambda: self.actualizar_fila(movimiento_id))
+        planificador.programar('caja', 'saldo', self.actualizar_saldo_y_resumen)
+    
+    def actualizar_fila(self, movimiento_id):
+        """Agrega la fila de un movimiento nuevo o quita la de uno eliminado"""
+        iid = str(movimiento_id)
+        mov = self.controller.obtener_movimiento_caja_por_id(movimiento_id)
+        
+        if not mov:
+            if self.caja_tree.exists(iid):
+                self.caja_tree.delete(iid)
+            return
+        
+        if self.coincide_busqueda(mov) and not self.caja_tree.exists(iid):
             tag = 'ingreso' if mov['tipo'] == 'INGRESO' else 'egreso'
+            self.caja_tree.insert('', 0, iid=iid, values=self.valores_fila(mov), tags=(tag,))
             
-            # Extraer número de venta del concepto si existe
-            venta_num = ''
-            concepto_limpio = mov['concepto']
-            
-            if 'Venta #' in mov['concepto']:
-                try:
-                    # Extraer "Venta #123 (REF000456)" del concepto
-                    venta_parte = mov['concepto'].split('Venta #')[1]
-                    if ' (' in venta_parte:
-                        venta_num = venta_parte.split(' (')[0].strip()
-                    elif ' -' in venta_parte:
-                        venta_num = venta_parte.split(' -')[0].strip()
-                    else:
-                        venta_num = venta_parte.strip()
-                except:
-                    pass
-            
-            self.caja_tree.insert('', 'end', values=(
-                mov['id'],
-                fecha_formateada,
-                mov['tipo'],
-                mov['categoria'],
-                venta_num if venta_num else '-',
-                concepto_limpio,
-                f"Q {mov['monto']:,.2f}",
-                f"Q {mov['saldo_anterior']:,.2f}",
-                f"Q {mov['saldo_nuevo']:,.2f}"
-            ), tags=(tag,))
+            # La vista sin filtro muestra solo los últimos 100 movimientos
+            filas = self.caja_tree.get_children()
+            for sobrante in filas[100:]:
+                self.caja_tree.delete(sobrante)
     
     def sort_tree(self, col, reverse):
         """Ordena la tabla de caja por columna"""
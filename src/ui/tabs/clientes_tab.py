@@ -5,6 +5,7 @@ Permite crear, editar, buscar y listar clientes
 import ttkbootstrap as tb
 from tkinter import messagebox
 from datetime import datetime
+from src.utils.trazas import trazado
 
 
 class ClientesTab:
@@ -140,7 +141,7 @@ class ClientesTab:
     
     def crear_cliente(self):
         """Crea un nuevo cliente"""
-        exito, mensaje = self.controller.crear_cliente(
+        exito, mensaje, _ = self.controller.crear_cliente(
             self.cliente_nombre.get(),
             self.cliente_nit.get(),
             self.cliente_direccion.get(),
@@ -213,6 +214,7 @@ class ClientesTab:
                 fecha_formateada
             ), tags=(tag,))
     
+    @trazado(categoria='ui')
     def refresh(self):
         """Actualiza la lista de clientes"""
         # Limpiar el treeview
@@ -8,6 +8,7 @@ import tkinter as tk
 from datetime import datetime
 from ttkbootstrap import DateEntry
 from src.ui.utils.ui_helpers import centrar_ventana, agregar_icono, configurar_navegacion_calendario
+from src.utils.trazas import trazado
 
 
 class ComprasTab:
@@ -27,6 +28,9 @@ class ComprasTab:
         
         # Crear interfaz
         self.create_ui()
+        
+        # Agregar solo la fila nueva cuando se registra una compra
+        self.controller.suscribir('purchase_added', self.on_compra_agregada)
     
     def setup_variables(self):
         """Inicializa las variables del formulario"""
@@ -113,6 +117,10 @@ class ComprasTab:
         self.compra_producto_entry.pack(side='left', fill='x', expand=True)
         self.compra_producto_entry.bind('<KeyRelease>', self.autocompletar_producto)
         
+        # Lector de código de barras: cada lectura selecciona el producto o suma una unidad
+        from src.ui.utils.lector_codigos import LectorCodigos
+        self.lector_codigos = LectorCodigos(self.compra_producto_entry, self.agregar_por_codigo)
+        
         tb.Button(
             prod_search_frame,
             text="🔍",
@@ -333,6 +341,7 @@ class ComprasTab:
         except:
             self.compra_total_label.config(text="Total: Q 0.00")
     
+    @trazado(categoria='ui')
     def registrar_compra(self):
         """Registra una nueva compra"""
         try:
@@ -388,12 +397,9 @@ class ComprasTab:
             )
             
             if exito:
+                # Las pestañas suscritas actualizan sus filas al recibir los eventos
                 messagebox.showinfo("Éxito", mensaje)
                 self.limpiar_formulario()
-                self.refresh()
-                self.main_window.refresh_productos()
-                self.main_window.refresh_caja()
-                self.main_window.actualizar_resumen()
             else:
                 messagebox.showerror("Error", mensaje)
         except Exception as e:
@@ -489,7 +495,7 @@ class ComprasTab:
             if exito:
                 messagebox.showinfo("Éxito", mensaje)
                 dialog.destroy()
-                self.refresh()
+                self.actualizar_fila(compra_id)
             else:
                 messagebox.showerror("Error", mensaje)
         
@@ -502,79 +508,110 @@ class ComprasTab:
         centrar_ventana(dialog)
         dialog.deiconify()
     
+    @trazado(categoria='ui')
     def refresh(self):
         """Actualiza la lista de compras"""
         # Limpiar treeview
         for item in self.compras_tree.get_children():
             self.compras_tree.delete(item)
         
-        # Obtener búsqueda
-        texto_busqueda = self.compra_search.get().strip().lower()
-        
-        # Cargar compras
+        # Cargar compras (el iid de cada fila es el ID de la compra)
         compras = self.controller.obtener_compras()
         for i, compra in enumerate(compras):
-            # Aplicar filtro
-            if texto_busqueda:
-                proveedor = compra.get('proveedor_nombre', '').lower()
-                producto = compra['producto_nombre'].lower()
-                no_doc = compra.get('no_documento', '').lower()
-                fecha = compra['fecha'].lower()
-                
-                if (texto_busqueda not in proveedor and
-                    texto_busqueda not in producto and
-                    texto_busqueda not in no_doc and
-                    texto_busqueda not in fecha):
-                    continue
-            
-            # Formatear fecha
-            fecha_str = compra['fecha']
+            if not self.coincide_busqueda(compra):
+                continue
+            valores, tag = self.valores_fila(compra, i)
+            self.compras_tree.insert('', 'end', iid=str(compra['id']), values=valores, tags=(tag,))
+    
+    def coincide_busqueda(self, compra):
+        """Indica si la compra coincide con el texto de búsqueda"""
+        texto_busqueda = self.compra_search.get().strip().lower()
+        if not texto_busqueda:
+            return True
+        
+        proveedor = compra.get('proveedor_nombre', '').lower()
+        producto = compra['producto_nombre'].lower()
+        no_doc = compra.get('no_documento', '').lower()
+        fecha = compra['fecha'].lower()
+        
+        return (texto_busqueda in proveedor or
+                texto_busqueda in producto or
+                texto_busqueda in no_doc or
+                texto_busqueda in fecha)
+    
+    def valores_fila(self, compra, indice):
+        """Devuelve (valores, tag) de la fila de una compra"""
+        # Formatear fecha
+        fecha_str = compra['fecha']
+        try:
+            fecha_obj = datetime.strptime(fecha_str, '%Y-%m-%d %H:%M:%S')
+            fecha_formateada = fecha_obj.strftime('%d/%m/%Y')
+        except:
             try:
-                fecha_obj = datetime.strptime(fecha_str, '%Y-%m-%d %H:%M:%S')
+                fecha_obj = datetime.strptime(fecha_str, '%d/%m/%Y %H:%M:%S')
                 fecha_formateada = fecha_obj.strftime('%d/%m/%Y')
             except:
-                try:
-                    fecha_obj = datetime.strptime(fecha_str, '%d/%m/%Y %H:%M:%S')
-                    fecha_formateada = fecha_obj.strftime('%d/%m/%Y')
-                except:
-                    fecha_formateada = fecha_str.split()[0] if ' ' in fecha_str else fecha_str
-            
-            # Determinar color según vencimiento
-            tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-            vencimiento_texto = "No perecedero"
+                fecha_formateada = fecha_str.split()[0] if ' ' in fecha_str else fecha_str
+        
+        # Determinar color según vencimiento
+        tag = 'evenrow' if indice % 2 == 0 else 'oddrow'
+        vencimiento_texto = "No perecedero"
+        
+        if compra.get('es_perecedero', 0) == 1 and compra.get('fecha_vencimiento'):
+            fecha_venc = compra['fecha_vencimiento']
+            vencimiento_texto = fecha_venc
             
-            if compra.get('es_perecedero', 0) == 1 and compra.get('fecha_vencimiento'):
-                fecha_venc = compra['fecha_vencimiento']
-                vencimiento_texto = fecha_venc
+            try:
+                fecha_venc_obj = datetime.strptime(fecha_venc, '%d/%m/%Y')
+                hoy = datetime.now()
+                dias_restantes = (fecha_venc_obj - hoy).days
                 
-                try:
-                    fecha_venc_obj = datetime.strptime(fecha_venc, '%d/%m/%Y')
-                    hoy = datetime.now()
-                    dias_restantes = (fecha_venc_obj - hoy).days
-                    
-                    if dias_restantes < 0:
-                        tag = 'vencido'
-                        vencimiento_texto = f"{fecha_venc} ⚠️ VENCIDO"
-                    elif dias_restantes <= 7:
-                        tag = 'critico'
-                        vencimiento_texto = f"{fecha_venc} ({dias_restantes}d)"
-                    elif dias_restantes <= 30:
-                        tag = 'advertencia'
-                        vencimiento_texto = f"{fecha_venc} ({dias_restantes}d)"
-                except:
-                    pass
-            
-            self.compras_tree.insert('', 'end', values=(
-                compra['id'],
-                compra.get('proveedor_nombre', '[Sin Proveedor]'),
-                compra.get('no_documento', ''),
-                compra['producto_nombre'],
-                f"{compra['cantidad']:,}",
-                f"Q {compra['precio_unitario']:,.2f}",
-                f"Q {compra['total']:,.2f}",
-                fecha_formateada,
-                vencimiento_texto
-            ), tags=(tag,))
+                if dias_restantes < 0:
+                    tag = 'vencido'
+                    vencimiento_texto = f"{fecha_venc} ⚠️ VENCIDO"
+                elif dias_restantes <= 7:
+                    tag = 'critico'
+                    vencimiento_texto = f"{fecha_venc} ({dias_restantes}d)"
+                elif dias_restantes <= 30:
+                    tag = 'advertencia'
+                    vencimiento_texto = f"{fecha_venc} ({dias_restantes}d)"
+            except:
+                pass
+        
+        valores = (
+            compra['id'],
+            compra.get('proveedor_nombre', '[Sin Proveedor]'),
+            compra.get('no_documento', ''),
+            compra['producto_nombre'],
+            f"{compra['cantidad']:,}",
+            f"Q {compra['precio_unitario']:,.2f}",
+            f"Q {compra['total']:,.2f}",
+            fecha_formateada,
+            vencimiento_texto
+        )
+        return valores, tag
+    
+    def actualizar_fila(self, compra_id):
+        """Inserta o actualiza la fila de una compra sin recargar la tabla"""
+        iid = str(compra_id)
+        compra = self.controller.obtener_compra_por_id(compra_id)
+        
+        if not compra or not self.coincide_busqueda(compra):
+            if self.compras_tree.exists(iid):
+                self.compras_tree.delete(iid)
+            return
+        
+        if self.compras_tree.exists(iid):
+            valores, tag = self.valores_fila(compra, self.compras_tree.index(iid))
+            self.compras_tree.item(iid, values=valores, tags=(tag,))
+        else:
+            valores, tag = self.valores_fila(compra, len(self.compras_tree.get_children()))
+            self.compras_tree.insert('', 'end', iid=iid, values=valores, tags=(tag,))
+    
+    def on_compra_agregada(self, compra_id, **_):
+        """Evento purchase_added: programa la fila de la compra nueva"""
+        self.main_window.planificador.programar(
+            'compras', compra_id, lambda: self.actualizar_fila(compra_id))
     
     def limpiar_formulario(self):
         """Limpia el formulario de compras"""
@@ -654,7 +691,8 @@ class ComprasTab:
         if hasattr(self, 'producto_compra_listbox') and self.producto_compra_listbox.winfo_exists():
             self.producto_compra_listbox.destroy()
         
-        if len(texto) < 2:
+        # Durante una lectura del lector de códigos no se busca en cada tecla
+        if len(texto) < 2 or self.lector_codigos.en_rafaga():
             return
         
         productos = self.controller.obtener_productos()
@@ -703,6 +741,25 @@ class ComprasTab:
             self.producto_compra_listbox.focus_set()
             self.producto_compra_listbox.selection_set(0)
     
+    def agregar_por_codigo(self, codigo):
+        """Selecciona el producto leído por el lector; si ya estaba seleccionado suma una unidad."""
+        producto = self.controller.obtener_producto_por_codigo(codigo)
+        if not producto:
+            self.compra_producto_busqueda.set(codigo)
+            self.compra_producto_entry.bell()
+            self.compra_producto_label.config(text="✗", bootstyle="danger")
+            return
+        
+        codigo_txt = f"[{producto['codigo']}] " if producto.get('codigo') else ""
+        self.compra_producto_busqueda.set(f"{codigo_txt}{producto['nombre']}")
+        if self.compra_producto_id == producto['id']:
+            self.compra_cantidad.set(self.compra_cantidad.get() + 1)
+        else:
+            self.compra_producto_id = producto['id']
+            self.compra_precio.set(producto['precio_compra'])
+            self.compra_cantidad.set(1)
+        self.compra_producto_label.config(text="✓", bootstyle="success")
+    
     def buscar_proveedor(self):
         """Abre diálogo para buscar proveedor"""
         from ..utils import centrar_ventana, agregar_icono
@@ -6,7 +6,9 @@ import ttkbootstrap as tb
 from tkinter import messagebox, filedialog
 import tkinter as tk
 import os
+from datetime import datetime
 from src.config.settings import Settings
+from src.utils.trazas import trazado
 
 
 class ConfiguracionTab:
@@ -40,6 +42,12 @@ class ConfiguracionTab:
         # Panel de base de datos
         self.crear_panel_base_datos(left_column)
         
+        # Panel de respaldos
+        self.crear_panel_respaldos(left_column)
+        
+        # Panel de recibos (empresa e impresora térmica)
+        self.crear_panel_recibos(left_column)
+        
         # Panel de OneDrive
         self.crear_panel_onedrive(left_column)
         
@@ -96,6 +104,527 @@ class ConfiguracionTab:
             bootstyle="info",
             width=18
         ).pack(side='left', padx=5)
+        
+        diagnostico_frame = tb.Frame(db_frame)
+        diagnostico_frame.pack(fill='x', pady=(5, 0))
+        
+        tb.Button(
+            diagnostico_frame, 
+            text="📊 Estadísticas de consultas", 
+            command=self.abrir_estadisticas_consultas,
+            bootstyle="secondary-outline",
+            width=28
+        ).pack(side='left', padx=5)
+        
+        tb.Button(
+            diagnostico_frame, 
+            text="🧭 Exportar traza", 
+            command=self.exportar_traza,
+            bootstyle="secondary-outline",
+            width=20
+        ).pack(side='left', padx=5)
+        
+        tb.Button(
+            diagnostico_frame, 
+            text="🐌 Respuesta de la interfaz", 
+            command=self.abrir_respuesta_interfaz,
+            bootstyle="secondary-outline",
+            width=26
+        ).pack(side='left', padx=5)
+        
+        from src.utils import trazas
+        self.trazas_var = tk.BooleanVar(value=trazas.activo)
+        tb.Checkbutton(
+            diagnostico_frame,
+            text="Registrar trazas",
+            variable=self.trazas_var,
+            command=self.cambiar_registro_trazas,
+            bootstyle="round-toggle"
+        ).pack(side='left', padx=10)
+    
+    # ========== ESTADÍSTICAS DE CONSULTAS ==========
+    
+    def abrir_estadisticas_consultas(self):
+        """Ventana (no modal) con los tiempos por sentencia, las consultas lentas y las esperas por bloqueo, actualizada cada 2 s"""
+        from src.ui.utils.ui_helpers import centrar_ventana, agregar_icono
+        
+        instrumentacion = self.controller.db.instrumentacion
+        bloqueos = self.controller.db.bloqueos
+        dialog = tk.Toplevel(self.main_window.root)
+        dialog.title("Estadísticas de Consultas")
+        dialog.geometry("1100x760")
+        dialog.withdraw()
+        agregar_icono(dialog)
+        
+        frame = tb.Frame(dialog, padding=10)
+        frame.pack(fill='both', expand=True)
+        
+        barra = tb.Frame(frame)
+        barra.pack(fill='x', pady=(0, 10))
+        estado_label = tb.Label(barra, font=('Segoe UI', 9))
+        estado_label.pack(side='left')
+        
+        umbral_var = tk.StringVar(value=f"{instrumentacion.umbral_ms:g}")
+        
+        def guardar_umbral():
+            try:
+                umbral = float(umbral_var.get())
+            except ValueError:
+                messagebox.showerror("Error", "Ingrese un número de milisegundos", parent=dialog)
+                return
+            instrumentacion.umbral_ms = umbral
+            Settings.set_umbral_consultas_lentas(umbral)
+        
+        tb.Button(barra, text="🔄 Reiniciar",
+                  command=lambda: (instrumentacion.reiniciar(), bloqueos.reiniciar(), actualizar(False)),
+                  bootstyle="secondary", width=12).pack(side='right', padx=5)
+        tb.Button(barra, text="Guardar", command=guardar_umbral, bootstyle="primary", width=8).pack(side='right')
+        tb.Entry(barra, textvariable=umbral_var, width=8).pack(side='right', padx=5)
+        tb.Label(barra, text="Consulta lenta desde (ms):", font=('Segoe UI', 9)).pack(side='right')
+        
+        columnas = ('Sentencia', 'Llamadas', 'Total', 'Prom', 'p95', 'Máx', 'Filas', 'Origen')
+        anchos = (430, 70, 80, 70, 70, 70, 70, 220)
+        tb.Label(frame, text="Por sentencia (ms, ordenado por tiempo total)",
+                 font=('Segoe UI', 10, 'bold')).pack(anchor='w')
+        tree = tb.Treeview(frame, columns=columnas, show='headings', height=12)
+        for columna, ancho in zip(columnas, anchos):
+            tree.heading(columna, text=columna)
+            tree.column(columna, width=ancho, anchor='w' if columna in ('Sentencia', 'Origen') else 'e')
+        tree.pack(fill='both', expand=True, pady=(5, 10))
+        
+        columnas_lentas = ('Fecha', 'ms', 'Origen', 'Sentencia', 'Plan')
+        anchos_lentas = (130, 70, 200, 380, 300)
+        tb.Label(frame, text="Consultas lentas (más recientes primero)",
+                 font=('Segoe UI', 10, 'bold')).pack(anchor='w')
+        tree_lentas = tb.Treeview(frame, columns=columnas_lentas, show='headings', height=8)
+        for columna, ancho in zip(columnas_lentas, anchos_lentas):
+            tree_lentas.heading(columna, text=columna)
+            tree_lentas.column(columna, width=ancho, anchor='e' if columna == 'ms' else 'w')
+        tree_lentas.pack(fill='both', expand=True, pady=(5, 10))
+        
+        columnas_bloqueos = ('Operación', 'Unidades', 'Esperas', 'Total', 'p95', 'Máx', 'Reintentos', 'Fallidas')
+        anchos_bloqueos = (300, 90, 90, 100, 80, 80, 100, 90)
+        tb.Label(frame, text=f"Esperas por bloqueo de otra terminal (ms; espera máxima {bloqueos.espera_ms} ms, "
+                             f"{bloqueos.reintentos} reintentos)",
+                 font=('Segoe UI', 10, 'bold')).pack(anchor='w')
+        tree_bloqueos = tb.Treeview(frame, columns=columnas_bloqueos, show='headings', height=4)
+        for columna, ancho in zip(columnas_bloqueos, anchos_bloqueos):
+            tree_bloqueos.heading(columna, text=columna)
+            tree_bloqueos.column(columna, width=ancho, anchor='w' if columna == 'Operación' else 'e')
+        tree_bloqueos.pack(fill='both', expand=True, pady=(5, 0))
+        
+        def actualizar(reprogramar=True):
+            if not dialog.winfo_exists():
+                return
+            resumen = instrumentacion.resumen()
+            tree.delete(*tree.get_children())
+            for fila in resumen:
+                tree.insert('', 'end', values=(
+                    fila['sql'][:200], fila['conteo'], f"{fila['total_ms']:,.1f}", f"{fila['promedio_ms']:.2f}",
+                    f"{fila['p95_ms']:g}", f"{fila['maximo_ms']:.1f}", fila['filas'],
+                    ', '.join(f"{nombre} ({n})" for nombre, n in fila['llamadores'])
+                ))
+            tree_lentas.delete(*tree_lentas.get_children())
+            for lenta in reversed(instrumentacion.lentas):
+                tree_lentas.insert('', 'end', values=(
+                    lenta['fecha'], f"{lenta['ms']:.1f}", lenta['llamador'], lenta['sql'][:200], lenta['plan']
+                ))
+            tree_bloqueos.delete(*tree_bloqueos.get_children())
+            for fila in bloqueos.resumen():
+                tree_bloqueos.insert('', 'end', values=(
+                    fila['operacion'], fila['unidades'], fila['esperas'], f"{fila['espera_total_ms']:,.1f}",
+                    f"{fila['espera_p95_ms']:.1f}", f"{fila['espera_maxima_ms']:.1f}", fila['reintentos'],
+                    fila['fallidas']
+                ))
+            estado_label.configure(text=(
+                f"Desde {instrumentacion.desde.strftime('%d/%m/%Y %H:%M:%S')} · "
+                f"{sum(f['conteo'] for f in resumen):,} sentencias · {len(resumen)} formas distintas"
+            ))
+            if reprogramar:
+                dialog.after(2000, actualizar)
+        
+        actualizar()
+        centrar_ventana(dialog)
+        dialog.deiconify()
+    
+    def abrir_respuesta_interfaz(self):
+        """Ventana (no modal) con los bloqueos de la interfaz por pestaña y acción, actualizada cada 2 s"""
+        from src.ui.utils.ui_helpers import centrar_ventana, agregar_icono
+        
+        monitor = self.main_window.monitor_ui
+        dialog = tk.Toplevel(self.main_window.root)
+        dialog.title("Respuesta de la Interfaz")
+        dialog.geometry("1100x600")
+        dialog.withdraw()
+        agregar_icono(dialog)
+        
+        frame = tb.Frame(dialog, padding=10)
+        frame.pack(fill='both', expand=True)
+        
+        barra = tb.Frame(frame)
+        barra.pack(fill='x', pady=(0, 10))
+        estado_label = tb.Label(barra, font=('Segoe UI', 9))
+        estado_label.pack(side='left')
+        tb.Button(barra, text="🔄 Reiniciar", command=lambda: (monitor.reiniciar(), actualizar(False)),
+                  bootstyle="secondary", width=12).pack(side='right', padx=5)
+        
+        columnas = ('Pestaña', 'Acción', 'Veces', 'Total', 'Máx', 'Dónde')
+        anchos = (110, 300, 60, 80, 70, 460)
+        tb.Label(frame, text="Bloqueos por acción (ms, ordenado por tiempo total)",
+                 font=('Segoe UI', 10, 'bold')).pack(anchor='w')
+        tree = tb.Treeview(frame, columns=columnas, show='headings', height=10)
+        for columna, ancho in zip(columnas, anchos):
+            tree.heading(columna, text=columna)
+            tree.column(columna, width=ancho, anchor='e' if columna in ('Veces', 'Total', 'Máx') else 'w')
+        tree.pack(fill='both', expand=True, pady=(5, 10))
+        
+        columnas_recientes = ('Fecha', 'ms', 'Pestaña', 'Acción', 'Pila')
+        anchos_recientes = (130, 70, 110, 300, 470)
+        tb.Label(frame, text="Bloqueos recientes (más recientes primero)",
+                 font=('Segoe UI', 10, 'bold')).pack(anchor='w')
+        tree_recientes = tb.Treeview(frame, columns=columnas_recientes, show='headings', height=8)
+        for columna, ancho in zip(columnas_recientes, anchos_recientes):
+            tree_recientes.heading(columna, text=columna)
+            tree_recientes.column(columna, width=ancho, anchor='e' if columna == 'ms' else 'w')
+        tree_recientes.pack(fill='both', expand=True, pady=(5, 0))
+        
+        def actualizar(reprogramar=True):
+            if not dialog.winfo_exists():
+                return
+            reporte = monitor.reporte()
+            tree.delete(*tree.get_children())
+            for grupo in reporte['por_accion']:
+                donde = grupo['pila'][-1] if grupo['pila'] else grupo['detalle']
+                tree.insert('', 'end', values=(
+                    grupo['pestana'], grupo['accion'], grupo['conteo'],
+                    f"{grupo['total_ms']:,.0f}", f"{grupo['maximo_ms']:,.0f}", donde
+                ))
+            tree_recientes.delete(*tree_recientes.get_children())
+            for bloqueo in reversed(monitor.bloqueos):
+                tree_recientes.insert('', 'end', values=(
+                    bloqueo['fecha'], f"{bloqueo['ms']:.0f}", bloqueo['pestana'], bloqueo['accion'],
+                    ' ← '.join(reversed(bloqueo['pila'][-3:]))
+                ))
+            estado_label.configure(text=(
+                f"Retraso del ciclo de eventos: p50 {reporte['p50_ms']:.0f} ms · p95 {reporte['p95_ms']:.0f} ms · "
+                f"máx {reporte['maximo_ms']:.0f} ms · {reporte['bloqueos']} bloqueos de "
+                f"{monitor.umbral_ms} ms o más"
+            ))
+            if reprogramar:
+                dialog.after(2000, actualizar)
+        
+        actualizar()
+        centrar_ventana(dialog)
+        dialog.deiconify()
+    
+    def cambiar_registro_trazas(self):
+        """Enciende o apaga el registro de trazas y lo recuerda para el próximo inicio"""
+        from src.utils import trazas
+        
+        activas = self.trazas_var.get()
+        trazas.activar(activas)
+        Settings.set_trazas_activas(activas)
+    
+    def exportar_traza(self):
+        """Guarda las operaciones recientes en formato Chrome trace (chrome://tracing o ui.perfetto.dev)"""
+        from src.utils import trazas
+        
+        if not trazas.activo and not trazas.eventos():
+            messagebox.showinfo(
+                "Exportar Traza",
+                "El registro de trazas está apagado.\n\n"
+                "Active \"Registrar trazas\", repita la operación que quiere medir y vuelva a exportar."
+            )
+            return
+        
+        archivo = filedialog.asksaveasfilename(
+            title="Exportar Traza",
+            defaultextension=".json",
+            initialfile=f"traza_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            filetypes=[("Chrome trace JSON", "*.json"), ("Todos los archivos", "*.*")]
+        )
+        if not archivo:
+            return
+        try:
+            cantidad = trazas.exportar_chrome(archivo)
+            messagebox.showinfo(
+                "Traza Exportada",
+                f"Se exportaron {cantidad} intervalos a:\n{archivo}\n\n"
+                "Ábrala en ui.perfetto.dev o chrome://tracing"
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo exportar la traza:\n{str(e)}")
+    
+    def crear_panel_respaldos(self, container):
+        """Crea el panel de respaldos de la base de datos"""
+        respaldos_frame = tb.Labelframe(
+            container, 
+            text="🛟 Respaldos", 
+            padding=20,
+            bootstyle="secondary"
+        )
+        respaldos_frame.pack(fill='x', pady=(0, 15))
+        
+        config = Settings.get_respaldos(self.controller.db.db_path)
+        self.respaldos_label = tb.Label(
+            respaldos_frame, 
+            text=self.texto_estado_respaldos(),
+            font=('Segoe UI', 9),
+            bootstyle="info",
+            wraplength=500
+        )
+        self.respaldos_label.pack(anchor='w', pady=(0, 10))
+        
+        buttons_respaldos = tb.Frame(respaldos_frame)
+        buttons_respaldos.pack(fill='x')
+        
+        self.btn_crear_respaldo = tb.Button(
+            buttons_respaldos, 
+            text="🛟 Crear respaldo", 
+            command=self.crear_respaldo,
+            bootstyle="primary",
+            width=25
+        )
+        self.btn_crear_respaldo.pack(side='left', padx=5)
+        
+        tb.Button(
+            buttons_respaldos, 
+            text="♻️ Restaurar...", 
+            command=self.restaurar_respaldo,
+            bootstyle="warning",
+            width=25
+        ).pack(side='left', padx=5)
+        
+        self.btn_archivar_anio = tb.Button(
+            respaldos_frame, 
+            text="🗄️ Archivar año cerrado...", 
+            command=self.archivar_anio,
+            bootstyle="secondary",
+            width=25
+        )
+        self.btn_archivar_anio.pack(anchor='w', padx=5, pady=(10, 0))
+        
+        if config['cada_horas']:
+            tb.Label(
+                respaldos_frame, 
+                text=f"Respaldo automático cada {config['cada_horas']} h en {config['carpeta']}",
+                font=('Segoe UI', 8),
+                bootstyle="secondary"
+            ).pack(anchor='w', pady=(10, 0))
+    
+    def texto_estado_respaldos(self):
+        """Texto con el último respaldo disponible"""
+        respaldos = self.controller.obtener_respaldos()
+        if not respaldos:
+            return "Aún no hay respaldos."
+        return (f"Último respaldo: {respaldos[0]['fecha'].strftime('%d/%m/%Y %H:%M:%S')} "
+                f"({len(respaldos)} disponibles)")
+    
+    def crear_respaldo(self):
+        """Crea un respaldo sin detener el trabajo en las demás pestañas"""
+        self.btn_crear_respaldo.configure(state='disabled')
+        # En un hilo lector: la copia por pasos no detiene las ventas que se registren mientras tanto
+        futuro = self.main_window.ejecutor_bd.leer(self.controller.crear_respaldo)
+        self.main_window.puente.al_completar(futuro, self.respaldo_terminado, self.error_respaldo)
+    
+    def respaldo_terminado(self, resultado):
+        self.btn_crear_respaldo.configure(state='normal')
+        exito, mensaje = resultado
+        if exito:
+            self.respaldos_label.configure(text=self.texto_estado_respaldos())
+            messagebox.showinfo("Respaldo", mensaje)
+        else:
+            messagebox.showerror("Error", mensaje)
+    
+    def error_respaldo(self, error):
+        self.btn_crear_respaldo.configure(state='normal')
+        messagebox.showerror("Error", f"Error al crear respaldo:\n{str(error)}")
+    
+    def restaurar_respaldo(self):
+        """Restaura la base de datos desde un respaldo elegido por el usuario"""
+        archivo = filedialog.askopenfilename(
+            title="Seleccionar Respaldo",
+            filetypes=[("Respaldo comprimido", "*.db.gz")],
+            initialdir=Settings.get_respaldos(self.controller.db.db_path)['carpeta']
+        )
+        if not archivo:
+            return
+        
+        if not messagebox.askyesno(
+            "Restaurar Respaldo",
+            f"Se reemplazarán todos los datos actuales por los del respaldo:\n{archivo}\n\n"
+            "Antes se guardará un respaldo del estado actual.\n\n¿Continuar?"
+        ):
+            return
+        
+        futuro = self.controller.asincrono.restaurar_respaldo(archivo)
+        self.main_window.puente.al_completar(futuro, self.restauracion_terminada, self.error_respaldo)
+    
+    def restauracion_terminada(self, resultado):
+        exito, mensaje = resultado
+        if exito:
+            self.respaldos_label.configure(text=self.texto_estado_respaldos())
+            messagebox.showinfo("Respaldo Restaurado", mensaje)
+            self.refresh_all_tabs()
+        else:
+            messagebox.showerror("Error", mensaje)
+    
+    def archivar_anio(self):
+        """Mueve un año cerrado a su archivo histórico"""
+        anios = self.controller.obtener_anios_archivables()
+        if not anios:
+            messagebox.showinfo("Archivo Histórico", "No hay años cerrados con movimientos para archivar.")
+            return
+        
+        texto = self.main_window.pedir_texto(
+            "Archivar Año",
+            f"Años que se pueden archivar: {', '.join(str(a) for a in anios)}\nAño a archivar:"
+        )
+        if not texto:
+            return
+        try:
+            anio = int(texto.strip())
+        except ValueError:
+            messagebox.showerror("Error", "Ingrese un año válido")
+            return
+        if anio not in anios:
+            messagebox.showerror("Error", f"El año {anio} no se puede archivar")
+            return
+        
+        if not messagebox.askyesno(
+            "Archivar Año",
+            f"Las compras agotadas, ventas y movimientos de {anio} se moverán al archivo histórico.\n"
+            "Seguirán apareciendo en los reportes, pero ya no en las listas diarias.\n"
+            "Antes se creará un respaldo.\n\n¿Continuar?"
+        ):
+            return
+        
+        self.btn_archivar_anio.configure(state='disabled')
+        futuro = self.controller.asincrono.archivar_anio(anio)
+        self.main_window.puente.al_completar(futuro, self.archivo_terminado, self.error_archivo)
+    
+    def archivo_terminado(self, resultado):
+        self.btn_archivar_anio.configure(state='normal')
+        exito, mensaje = resultado
+        if exito:
+            self.respaldos_label.configure(text=self.texto_estado_respaldos())
+            messagebox.showinfo("Archivo Histórico", mensaje)
+            self.refresh_all_tabs()
+        else:
+            messagebox.showerror("Error", mensaje)
+    
+    def error_archivo(self, error):
+        self.btn_archivar_anio.configure(state='normal')
+        messagebox.showerror("Error", f"Error al archivar:\n{str(error)}")
+    
+    def crear_panel_recibos(self, container):
+        """Crea el panel con los datos de la empresa y la impresora térmica de tickets"""
+        recibos_frame = tb.Labelframe(
+            container, 
+            text="🧾 Recibos e Impresora Térmica", 
+            padding=20,
+            bootstyle="secondary"
+        )
+        recibos_frame.pack(fill='x', pady=(0, 15))
+        
+        empresa = Settings.get_datos_empresa()
+        impresora = Settings.get_impresora_termica()
+        self.empresa_nombre_var = tk.StringVar(value=empresa['empresa_nombre'])
+        self.empresa_direccion_var = tk.StringVar(value=empresa['empresa_direccion'])
+        self.empresa_telefono_var = tk.StringVar(value=empresa['empresa_telefono'])
+        self.impresora_var = tk.StringVar(value=impresora['nombre'])
+        self.ancho_papel_var = tk.StringVar(value=str(impresora['ancho_mm']))
+        
+        campos = tb.Frame(recibos_frame)
+        campos.pack(fill='x')
+        campos.columnconfigure(1, weight=1)
+        for fila, (etiqueta, variable) in enumerate((
+            ("Empresa:", self.empresa_nombre_var),
+            ("Dirección:", self.empresa_direccion_var),
+            ("Teléfono:", self.empresa_telefono_var),
+            ("Impresora:", self.impresora_var),
+        )):
+            tb.Label(campos, text=etiqueta, font=('Segoe UI', 9)).grid(row=fila, column=0, sticky='w', pady=3)
+            tb.Entry(campos, textvariable=variable).grid(row=fila, column=1, sticky='ew', padx=(10, 0), pady=3)
+        
+        tb.Label(campos, text="Papel (mm):", font=('Segoe UI', 9)).grid(row=4, column=0, sticky='w', pady=3)
+        tb.Combobox(
+            campos, 
+            textvariable=self.ancho_papel_var, 
+            values=['58', '80'], 
+            state='readonly', 
+            width=6
+        ).grid(row=4, column=1, sticky='w', padx=(10, 0), pady=3)
+        
+        tb.Label(
+            recibos_frame, 
+            text="Con impresora configurada, el ticket se imprime al finalizar cada venta.\n"
+                 "Déjela vacía para no imprimir automáticamente.",
+            font=('Segoe UI', 8),
+            bootstyle="secondary",
+            wraplength=500
+        ).pack(anchor='w', pady=(10, 10))
+        
+        buttons_recibos = tb.Frame(recibos_frame)
+        buttons_recibos.pack(fill='x')
+        
+        tb.Button(
+            buttons_recibos, 
+            text="💾 Guardar", 
+            command=self.guardar_config_recibos,
+            bootstyle="primary",
+            width=25
+        ).pack(side='left', padx=5)
+        
+        tb.Button(
+            buttons_recibos, 
+            text="🧾 Ticket de prueba", 
+            command=self.imprimir_ticket_prueba,
+            bootstyle="info",
+            width=25
+        ).pack(side='left', padx=5)
+    
+    def guardar_config_recibos(self):
+        """Guarda los datos de la empresa y la impresora térmica"""
+        nombre = self.empresa_nombre_var.get().strip()
+        if not nombre:
+            messagebox.showwarning("Advertencia", "El nombre de la empresa es obligatorio")
+            return False
+        
+        guardado = Settings.set_datos_empresa(
+            nombre,
+            self.empresa_direccion_var.get().strip(),
+            self.empresa_telefono_var.get().strip()
+        ) and Settings.set_impresora_termica(
+            self.impresora_var.get().strip(),
+            int(self.ancho_papel_var.get())
+        )
+        if guardado:
+            messagebox.showinfo("Recibos", "Configuración de recibos guardada")
+        else:
+            messagebox.showerror("Error", "No se pudo guardar la configuración de recibos")
+        return guardado
+    
+    def imprimir_ticket_prueba(self):
+        """Envía un ticket de ejemplo a la impresora configurada"""
+        from src.ui.utils.recibo_termico import ReciboTermico, ColaImpresoraSink, venta_de_prueba
+        
+        nombre = self.impresora_var.get().strip()
+        if not nombre:
+            messagebox.showwarning("Advertencia", "Escriba el nombre de la impresora térmica")
+            return
+        
+        generador = ReciboTermico(
+            empresa_nombre=self.empresa_nombre_var.get().strip() or "Mi Empresa",
+            empresa_direccion=self.empresa_direccion_var.get().strip(),
+            empresa_telefono=self.empresa_telefono_var.get().strip(),
+            ancho_mm=int(self.ancho_papel_var.get())
+        )
+        exito, mensaje = generador.imprimir(venta_de_prueba(), ColaImpresoraSink(nombre))
+        if exito:
+            messagebox.showinfo("Ticket de prueba", mensaje)
+        else:
+            messagebox.showerror("Error", mensaje)
     
     def crear_panel_onedrive(self, container):
         """Crea el panel de sincronización con OneDrive"""
@@ -340,6 +869,7 @@ class ConfiguracionTab:
             else:
                 messagebox.showerror("Error", mensaje)
     
+    @trazado(categoria='ui')
     def exportar_resumen(self):
         """Exporta un resumen completo a un archivo de texto"""
         archivo = filedialog.asksaveasfilename(
@@ -396,13 +926,11 @@ class ConfiguracionTab:
             
             if not respuesta:
                 # Copiar BD actual a OneDrive
-                try:
-                    import shutil
-                    shutil.copy2(self.controller.db.db_path, nueva_db_path)
-                    messagebox.showinfo("Éxito", "Base de datos copiada a OneDrive correctamente")
-                except Exception as e:
-                    messagebox.showerror("Error", f"No se pudo copiar la base de datos:\n{str(e)}")
+                exito, mensaje = self.controller.copiar_base_datos(nueva_db_path)
+                if not exito:
+                    messagebox.showerror("Error", mensaje)
                     return
+                messagebox.showinfo("Éxito", "Base de datos copiada a OneDrive correctamente")
         else:
             # Preguntar si copiar la BD actual
             if os.path.exists(self.controller.db.db_path):
@@ -414,11 +942,9 @@ class ConfiguracionTab:
                 )
                 
                 if copiar:
-                    try:
-                        import shutil
-                        shutil.copy2(self.controller.db.db_path, nueva_db_path)
-                    except Exception as e:
-                        messagebox.showerror("Error", f"No se pudo copiar la base de datos:\n{str(e)}")
+                    exito, mensaje = self.controller.copiar_base_datos(nueva_db_path)
+                    if not exito:
+                        messagebox.showerror("Error", mensaje)
                         return
         
         # Cambiar a la nueva ruta
@@ -481,11 +1007,9 @@ class ConfiguracionTab:
                 )
                 
                 if copiar and os.path.exists(self.controller.db.db_path):
-                    try:
-                        import shutil
-                        shutil.copy2(self.controller.db.db_path, archivo)
-                    except Exception as e:
-                        messagebox.showerror("Error", f"No se pudo copiar:\n{str(e)}")
+                    exito, mensaje = self.controller.copiar_base_datos(archivo)
+                    if not exito:
+                        messagebox.showerror("Error", mensaje)
                         return
             
             # Cambiar a la nueva ubicación
@@ -540,6 +1064,7 @@ class ConfiguracionTab:
     
     # ========== MÉTODO DE ACTUALIZACIÓN ==========
     
+    @trazado(categoria='ui')
     def refresh(self):
         """Actualiza la información de configuración"""
         # Actualizar ruta de BD
@@ -6,6 +6,7 @@ import tkinter as tk
 import ttkbootstrap as tb
 from tkinter import messagebox
 import re
+from src.utils.trazas import trazado
 
 
 class ProductosTab:
@@ -25,6 +26,9 @@ class ProductosTab:
         
         # Crear interfaz
         self.create_ui()
+        
+        # Actualizar solo las filas afectadas cuando cambia un producto
+        self.controller.suscribir('product_changed', self.on_producto_cambiado)
     
     def setup_variables(self):
         """Inicializa las variables del formulario"""
@@ -675,7 +679,6 @@ class ProductosTab:
                 
                 messagebox.showinfo("Éxito", mensaje)
                 self.limpiar_formulario()
-                self.refresh()
                 self.main_window.refresh_combos()
             else:
                 messagebox.showerror("Error", mensaje)
@@ -710,7 +713,6 @@ class ProductosTab:
             if exito:
                 messagebox.showinfo("Éxito", mensaje)
                 self.limpiar_formulario()
-                self.refresh()
                 self.main_window.refresh_combos()
             else:
                 messagebox.showerror("Error", mensaje)
@@ -783,10 +785,9 @@ class ProductosTab:
                 f"¿Está seguro de marcar como INACTIVO el producto:\n\n'{producto_nombre}'?\n\n" +
                 "El producto no aparecerá en compras ni ventas."):
                 
-                exito, mensaje = self.controller.desactivar_producto(producto_id)
+                exito, mensaje = self.controller.cambiar_estado_producto(producto_id, False)
                 if exito:
                     messagebox.showinfo("Éxito", mensaje)
-                    self.refresh()
                 else:
                     messagebox.showerror("Error", mensaje)
         except Exception as e:
@@ -818,15 +819,15 @@ class ProductosTab:
             if messagebox.askyesno("Confirmar",
                 f"¿Está seguro de ACTIVAR el producto:\n\n'{producto_nombre}'?"):
                 
-                exito, mensaje = self.controller.activar_producto(producto_id)
+                exito, mensaje = self.controller.cambiar_estado_producto(producto_id, True)
                 if exito:
                     messagebox.showinfo("Éxito", mensaje)
-                    self.refresh()
                 else:
                     messagebox.showerror("Error", mensaje)
         except Exception as e:
             messagebox.showerror("Error", f"Error: {str(e)}")
     
+    @trazado(categoria='ui')
     def refresh(self):
         """Actualiza la lista de productos"""
         # Limpiar el treeview
@@ -848,41 +849,80 @@ class ProductosTab:
         if busqueda:
             productos = [p for p in productos if busqueda in p['nombre'].lower()]
         
-        # Llenar tabla
+        # Llenar tabla (el iid de cada fila es el ID del producto)
         for i, producto in enumerate(productos):
-            tags = []
-            activo = producto.get('activo', 1)
-            
-            # Determinar tags
-            if activo == 0:
-                tags = ['inactivo']
-            elif producto['stock_actual'] <= 5:
-                tags = ['lowstock']
-            else:
-                tags = ['evenrow' if i % 2 == 0 else 'oddrow']
-            
-            # Calcular monto de ganancia
-            monto_ganancia = producto.get('monto_ganancia', 0)
-            if monto_ganancia == 0 or monto_ganancia is None:
-                monto_ganancia = round(producto['precio_venta'] - producto['precio_compra'], 2)
-            
-            estado_texto = "ACTIVO" if activo == 1 else "INACTIVO"
-            
-            self.productos_tree.insert('', 'end', values=(
-                producto['id'],
-                producto.get('codigo', ''),
-                producto['nombre'],
-                producto.get('categoria', ''),
-                producto.get('marca', ''),
-                producto.get('color', ''),
-                producto.get('tamaño', ''),
-                f"Q {producto['precio_compra']:,.2f}",
-                f"{producto['porcentaje_ganancia']:.2f}%",
-                f"Q {monto_ganancia:,.2f}",
-                f"Q {producto['precio_venta']:,.2f}",
-                f"{producto['stock_actual']:,}",
-                estado_texto
-            ), tags=tags)
+            self.productos_tree.insert('', 'end', iid=str(producto['id']),
+                                       values=self.valores_fila(producto),
+                                       tags=self.tags_fila(producto, i))
+    
+    def valores_fila(self, producto):
+        """Valores de la fila de un producto en la tabla"""
+        # Calcular monto de ganancia
+        monto_ganancia = producto.get('monto_ganancia', 0)
+        if monto_ganancia == 0 or monto_ganancia is None:
+            monto_ganancia = round(producto['precio_venta'] - producto['precio_compra'], 2)
+        
+        estado_texto = "ACTIVO" if producto.get('activo', 1) == 1 else "INACTIVO"
+        
+        return (
+            producto['id'],
+            producto.get('codigo', ''),
+            producto['nombre'],
+            producto.get('categoria', ''),
+            producto.get('marca', ''),
+            producto.get('color', ''),
+            producto.get('tamaño', ''),
+            f"Q {producto['precio_compra']:,.2f}",
+            f"{producto['porcentaje_ganancia']:.2f}%",
+            f"Q {monto_ganancia:,.2f}",
+            f"Q {producto['precio_venta']:,.2f}",
+            f"{producto['stock_actual']:,}",
+            estado_texto
+        )
+    
+    def tags_fila(self, producto, indice):
+        """Tags de color de la fila según estado y stock"""
+        if producto.get('activo', 1) == 0:
+            return ['inactivo']
+        if producto['stock_actual'] <= 5:
+            return ['lowstock']
+        return ['evenrow' if indice % 2 == 0 else 'oddrow']
+    
+    def cumple_filtro(self, producto):
+        """Indica si el producto debe mostrarse con el filtro y la búsqueda actuales"""
+        filtro = self.producto_filtro.get()
+        activo = producto.get('activo', 1)
+        if filtro == 'activos' and activo == 0:
+            return False
+        if filtro == 'inactivos' and activo != 0:
+            return False
+        busqueda = self.producto_search.get().lower()
+        return not busqueda or busqueda in producto['nombre'].lower()
+    
+    def on_producto_cambiado(self, producto_id, **_):
+        """Evento product_changed: programa la actualización de la fila del producto"""
+        self.main_window.planificador.programar(
+            'productos', producto_id, lambda: self.actualizar_fila(producto_id))
+    
+    def actualizar_fila(self, producto_id):
+        """Inserta, actualiza o quita la fila de un producto sin recargar la tabla"""
+        iid = str(producto_id)
+        existe = self.productos_tree.exists(iid)
+        producto = self.controller.obtener_producto_por_id(producto_id)
+        
+        if not producto or not self.cumple_filtro(producto):
+            if existe:
+                self.productos_tree.delete(iid)
+            return
+        
+        if existe:
+            indice = self.productos_tree.index(iid)
+            self.productos_tree.item(iid, values=self.valores_fila(producto),
+                                     tags=self.tags_fila(producto, indice))
+        else:
+            indice = len(self.productos_tree.get_children())
+            self.productos_tree.insert('', 'end', iid=iid, values=self.valores_fila(producto),
+                                       tags=self.tags_fila(producto, indice))
     
     def limpiar_formulario(self):
         """Limpia el formulario de productos"""
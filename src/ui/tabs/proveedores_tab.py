@@ -5,6 +5,7 @@ Permite crear, editar, buscar y listar proveedores
 import ttkbootstrap as tb
 from tkinter import messagebox
 from datetime import datetime
+from src.utils.trazas import trazado
 
 
 class ProveedoresTab:
@@ -213,6 +214,7 @@ class ProveedoresTab:
                 fecha_formateada
             ), tags=(tag,))
     
+    @trazado(categoria='ui')
     def refresh(self):
         """Actualiza la lista de proveedores"""
         # Limpiar el treeview
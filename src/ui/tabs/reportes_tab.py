@@ -8,6 +8,11 @@ import tkinter as tk
 from datetime import datetime, timedelta
 from ttkbootstrap import DateEntry
 from src.ui.utils.ui_helpers import sort_treeview, centrar_ventana, agregar_icono
+from src.controllers.inventario_controller import EVENTOS
+from src.utils.trazas import trazado
+from src.controllers.reportes_exportacion import (
+    filtrar_por_fecha, filas_productos, filas_compras, filas_caja, hojas_reporte_general, hojas_reporte_ventas
+)
 
 
 class ReportesTab:
@@ -20,6 +25,10 @@ class ReportesTab:
         
         # Crear interfaz
         self.create_ui()
+        
+        # Las métricas son agregados: cualquier escritura las deja desactualizadas
+        for evento in EVENTOS:
+            self.controller.suscribir(evento, self.on_datos_cambiados)
     
     def create_ui(self):
         """Crea la interfaz de usuario de reportes"""
@@ -259,18 +268,49 @@ class ReportesTab:
         # Cargar alertas iniciales
         self.refresh()
     
+    @trazado(categoria='ui')
     def refresh(self):
         """Actualiza los datos de reportes y alertas"""
-        # Actualizar métricas
+        # actualizar_metricas también recalcula las alertas
         self.actualizar_metricas()
-        
-        # Actualizar alertas
-        self.actualizar_alertas()
+    
+    def on_datos_cambiados(self, **_):
+        """Programa un único recálculo de métricas y alertas por escritura"""
+        self.main_window.planificador.programar('reportes', 'metricas', self.refresh)
     
     def actualizar_metricas(self):
-        """Actualiza las tarjetas de métricas"""
-        # Obtener resumen completo del inventario
+        """Actualiza las tarjetas de métricas y las alertas (consultas en un hilo lector)"""
+        futuro = self.main_window.ejecutor_bd.leer(self.cargar_datos_reportes)
+        self.main_window.puente.al_completar(futuro, self.mostrar_datos_reportes)
+    
+    def cargar_datos_reportes(self):
+        """Consulta todo lo que muestra la pestaña. Se ejecuta fuera del hilo de Tk."""
+        from datetime import datetime
+        
         resumen = self.controller.obtener_resumen_inventario()
+        productos_bajo_stock = self.controller.obtener_productos_con_stock_bajo()
+        
+        # Compras perecederas próximas a vencer (30 días o menos)
+        hoy = datetime.now()
+        vencimientos = []
+        for compra in self.controller.obtener_compras():
+            if compra.get('es_perecedero', 0) == 1 and compra.get('fecha_vencimiento'):
+                try:
+                    fecha_venc = datetime.strptime(compra['fecha_vencimiento'], '%d/%m/%Y')
+                except ValueError:
+                    continue
+                dias_restantes = (fecha_venc - hoy).days
+                if dias_restantes > 30:
+                    continue  # No mostrar si es > 30 días
+                producto = self.controller.obtener_producto_por_id(compra['producto_id'])
+                if producto:
+                    vencimientos.append((compra, producto, dias_restantes))
+        
+        return resumen, productos_bajo_stock, vencimientos
+    
+    def mostrar_datos_reportes(self, datos):
+        """Pinta en el hilo de Tk los datos de cargar_datos_reportes"""
+        resumen, productos_bajo_stock, vencimientos = datos
         
         # Actualizar labels con datos del resumen
         self.total_compras_label.config(text=f"Q {resumen['total_compras']:,.2f}")
@@ -280,17 +320,14 @@ class ReportesTab:
         self.saldo_banco_label.config(text=f"Q {resumen['saldo_banco']:,.2f}")
         
         # Actualizar también las alertas
-        self.actualizar_alertas()
+        self.actualizar_alertas(productos_bajo_stock, vencimientos)
     
-    def actualizar_alertas(self):
+    def actualizar_alertas(self, productos_bajo_stock, vencimientos):
         """Actualiza la tabla de alertas"""
         # Limpiar tabla
         for item in self.stock_tree.get_children():
             self.stock_tree.delete(item)
         
-        # Obtener productos con stock bajo
-        productos_bajo_stock = self.controller.obtener_productos_con_stock_bajo()
-        
         for producto in productos_bajo_stock:
             self.stock_tree.insert('', 'end', values=(
                 '⚠️ STOCK BAJO',
@@ -301,45 +338,28 @@ class ReportesTab:
                 'Realizar compra urgente'
             ), tags=('alert_stock',))
         
-        # Obtener productos próximos a vencer
-        from datetime import datetime, timedelta
-        
-        compras = self.controller.obtener_compras()
-        hoy = datetime.now()
-        
-        for compra in compras:
-            if compra.get('es_perecedero', 0) == 1 and compra.get('fecha_vencimiento'):
-                try:
-                    fecha_venc = datetime.strptime(compra['fecha_vencimiento'], '%d/%m/%Y')
-                    dias_restantes = (fecha_venc - hoy).days
-                    
-                    if dias_restantes < 0:
-                        tag = 'alert_vencido'
-                        estado = f"VENCIDO hace {abs(dias_restantes)} días"
-                        accion = "Revisar y gestionar producto"
-                    elif dias_restantes <= 7:
-                        tag = 'alert_critico'
-                        estado = f"Vence en {dias_restantes} días"
-                        accion = "Vender con urgencia o promocionar"
-                    elif dias_restantes <= 30:
-                        tag = 'alert_advertencia'
-                        estado = f"Vence en {dias_restantes} días"
-                        accion = "Monitorear y planificar ventas"
-                    else:
-                        continue  # No mostrar si es > 30 días
-                    
-                    producto = self.controller.obtener_producto_por_id(compra['producto_id'])
-                    if producto:
-                        self.stock_tree.insert('', 'end', values=(
-                            '📅 VENCIMIENTO',
-                            producto.get('codigo', 'N/A'),
-                            producto['nombre'],
-                            estado,
-                            compra['fecha_vencimiento'],
-                            accion
-                        ), tags=(tag,))
-                except:
-                    pass
+        for compra, producto, dias_restantes in vencimientos:
+            if dias_restantes < 0:
+                tag = 'alert_vencido'
+                estado = f"VENCIDO hace {abs(dias_restantes)} días"
+                accion = "Revisar y gestionar producto"
+            elif dias_restantes <= 7:
+                tag = 'alert_critico'
+                estado = f"Vence en {dias_restantes} días"
+                accion = "Vender con urgencia o promocionar"
+            else:
+                tag = 'alert_advertencia'
+                estado = f"Vence en {dias_restantes} días"
+                accion = "Monitorear y planificar ventas"
+            
+            self.stock_tree.insert('', 'end', values=(
+                '📅 VENCIMIENTO',
+                producto.get('codigo', 'N/A'),
+                producto['nombre'],
+                estado,
+                compra['fecha_vencimiento'],
+                accion
+            ), tags=(tag,))
     
     def on_tree_motion(self, event):
         """Maneja el efecto hover sobre las filas del treeview"""
@@ -458,6 +478,7 @@ class ReportesTab:
         self.main_window.root.wait_window(dialog)
         return resultado
     
+    @trazado(categoria='ui')
     def exportar_reporte_general(self):
         """Exporta el reporte general completo a Excel con estado de vencimientos"""
         fecha_actual = datetime.now().strftime("%Y-%m-%d")
@@ -470,83 +491,39 @@ class ReportesTab:
         )
         
         if archivo:
-            try:
-                import pandas as pd
-                from datetime import datetime as dt
-                
-                # Obtener resumen completo del inventario (ahora con cálculos correctos)
-                resumen = self.controller.obtener_resumen_inventario()
-                
-                # Crear DataFrame de resumen
-                resumen_data = {
-                    'Concepto': ['Total Compras', 'Total Ventas', 'Ganancia Bruta', 'Valor Inventario', 'Saldo en Banco'],
-                    'Monto (Q)': [
-                        f"Q {resumen['total_compras']:,.2f}",
-                        f"Q {resumen['total_ventas']:,.2f}",
-                        f"Q {resumen['ganancia_bruta']:,.2f}",
-                        f"Q {resumen['valor_inventario']:,.2f}",
-                        f"Q {resumen['saldo_banco']:,.2f}"
-                    ]
-                }
-                df_resumen = pd.DataFrame(resumen_data)
-                
-                # Productos con stock bajo (solo activos)
-                productos = self.controller.obtener_productos()
-                productos_bajo = [p for p in productos if p['stock_actual'] <= 5 and p.get('activo', 1) == 1]
-                if productos_bajo:
-                    for p in productos_bajo:
-                        p['estado'] = 'ACTIVO' if p.get('activo', 1) == 1 else 'INACTIVO'
-                df_stock_bajo = pd.DataFrame(productos_bajo) if productos_bajo else pd.DataFrame()
-                
-                # Estado de vencimientos
-                compras = self.controller.obtener_compras()
-                vencimientos = []
-                for compra in compras:
-                    if compra.get('es_perecedero') == 1 and compra.get('fecha_vencimiento'):
-                        try:
-                            fecha_venc = dt.strptime(compra['fecha_vencimiento'], '%d/%m/%Y')
-                            hoy = dt.now()
-                            dias_restantes = (fecha_venc - hoy).days
-                            
-                            estado_vencimiento = ''
-                            if dias_restantes < 0:
-                                estado_vencimiento = f'VENCIDO (hace {abs(dias_restantes)} días)'
-                            elif dias_restantes <= 7:
-                                estado_vencimiento = f'CRITICO ({dias_restantes} días)'
-                            elif dias_restantes <= 30:
-                                estado_vencimiento = f'ADVERTENCIA ({dias_restantes} días)'
-                            else:
-                                estado_vencimiento = f'OK ({dias_restantes} días)'
-                            
-                            vencimientos.append({
-                                'Producto': compra.get('producto_nombre', 'N/A'),
-                                'Proveedor': compra.get('proveedor_nombre', 'N/A'),
-                                'Cantidad': compra['cantidad'],
-                                'Fecha Vencimiento': compra['fecha_vencimiento'],
-                                'Días Restantes': dias_restantes,
-                                'Estado': estado_vencimiento
-                            })
-                        except:
-                            pass
-                
-                # Ordenar por días restantes (vencidos y críticos primero)
-                vencimientos.sort(key=lambda x: x['Días Restantes'])
-                df_vencimientos = pd.DataFrame(vencimientos) if vencimientos else pd.DataFrame()
-                
-                # Exportar a Excel con múltiples hojas
-                with pd.ExcelWriter(archivo, engine='openpyxl') as writer:
-                    df_resumen.to_excel(writer, sheet_name='Resumen General', index=False)
-                    if not df_vencimientos.empty:
-                        df_vencimientos.to_excel(writer, sheet_name='Estado Vencimientos', index=False)
-                    if not df_stock_bajo.empty:
-                        df_stock_bajo.to_excel(writer, sheet_name='Stock Bajo', index=False)
-                
-                messagebox.showinfo("Éxito", f"Reporte general exportado a:\n{archivo}\n\n{len(vencimientos)} productos con control de vencimiento")
-            except ImportError:
-                messagebox.showerror("Error", "Se requiere instalar 'pandas' y 'openpyxl' para exportar a Excel.\nEjecute: pip install pandas openpyxl")
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo exportar el reporte: {str(e)}")
+            # El resumen de ventas recorre todo el historial: consultas y escritura en un hilo lector
+            futuro = self.main_window.ejecutor_bd.leer(self.escribir_reporte_general, archivo)
+            self.main_window.puente.al_completar(futuro, self.reporte_exportado, self.error_exportacion)
     
+    def escribir_reporte_general(self, archivo):
+        """Arma y guarda el reporte general. Se ejecuta fuera del hilo de Tk."""
+        import pandas as pd
+        
+        hojas, con_vencimiento = hojas_reporte_general(self.controller)
+        
+        # Exportar a Excel con múltiples hojas (el resumen siempre, las demás si tienen filas)
+        with pd.ExcelWriter(archivo, engine='openpyxl') as writer:
+            for nombre, datos in hojas.items():
+                if datos or nombre == 'Resumen General':
+                    pd.DataFrame(datos).to_excel(writer, sheet_name=nombre, index=False)
+        
+        return True, f"Reporte general exportado a:\n{archivo}\n\n{con_vencimiento} productos con control de vencimiento"
+    
+    def reporte_exportado(self, resultado):
+        """Muestra en el hilo de Tk el resultado de una exportación hecha en segundo plano"""
+        exito, mensaje = resultado
+        if exito:
+            messagebox.showinfo("Éxito", mensaje)
+        else:
+            messagebox.showwarning("Aviso", mensaje)
+    
+    def error_exportacion(self, error):
+        if isinstance(error, ImportError):
+            messagebox.showerror("Error", "Se requiere instalar 'pandas' y 'openpyxl' para exportar a Excel.\nEjecute: pip install pandas openpyxl")
+        else:
+            messagebox.showerror("Error", f"No se pudo exportar el reporte: {str(error)}")
+    
+    @trazado(categoria='ui')
     def exportar_productos_completo(self):
         """Exporta todos los productos con todos sus detalles a Excel"""
         fecha_actual = datetime.now().strftime("%Y-%m-%d")
@@ -568,24 +545,7 @@ class ReportesTab:
                     messagebox.showwarning("Aviso", "No hay productos registrados para exportar.")
                     return
                 
-                datos_exportar = []
-                for p in productos:
-                    datos_exportar.append({
-                        'ID': p.get('id', ''),
-                        'Código SKU': p.get('codigo', ''),
-                        'Nombre': p.get('nombre', ''),
-                        'Categoría': p.get('categoria', ''),
-                        'Marca': p.get('marca', ''),
-                        'Color': p.get('color', ''),
-                        'Tamaño': p.get('tamaño', ''),
-                        'Dibujo': p.get('dibujo', ''),
-                        'Código Color': p.get('cod_color', ''),
-                        'Stock Actual': p.get('stock_actual', 0),
-                        'Precio Compra (Q)': f"{p.get('precio_compra', 0):.2f}",
-                        'Precio Venta (Q)': f"{p.get('precio_venta', 0):.2f}",
-                        '% Ganancia': f"{p.get('porcentaje_ganancia', 0):.2f}",
-                        'Estado': 'ACTIVO' if p.get('activo', 1) == 1 else 'INACTIVO'
-                    })
+                datos_exportar = filas_productos(productos)
                 
                 df = pd.DataFrame(datos_exportar)
                 
@@ -602,6 +562,7 @@ class ReportesTab:
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo exportar los productos: {str(e)}")
     
+    @trazado(categoria='ui')
     def exportar_reporte_compras(self):
         """Exporta todas las compras a Excel con filtro de fechas"""
         rango = self.seleccionar_rango_fechas("Filtrar Compras por Fecha")
@@ -621,107 +582,20 @@ class ReportesTab:
         if archivo:
             try:
                 import pandas as pd
-                from datetime import datetime as dt
                 
-                compras = self.controller.obtener_compras()
+                compras = self.controller.obtener_compras(historico=True)
                 
                 if not compras:
                     messagebox.showwarning("Aviso", "No hay compras registradas para exportar.")
                     return
                 
-                fecha_inicio = dt.strptime(rango['fecha_inicio'], '%d/%m/%Y')
-                fecha_fin = dt.strptime(rango['fecha_fin'], '%d/%m/%Y')
-                # Ajustar fecha_fin para incluir todo el día
-                fecha_fin = fecha_fin.replace(hour=23, minute=59, second=59)
-                
-                compras_filtradas = []
-                for compra in compras:
-                    try:
-                        fecha_str = compra['fecha']
-                        fecha_compra = None
-                        
-                        # Intentar múltiples formatos de fecha
-                        formatos = [
-                            '%d/%m/%Y %H:%M:%S',
-                            '%Y-%m-%d %H:%M:%S',
-                            '%d/%m/%Y',
-                            '%Y-%m-%d'
-                        ]
-                        
-                        for formato in formatos:
-                            try:
-                                fecha_compra = dt.strptime(fecha_str, formato)
-                                break
-                            except ValueError:
-                                continue
-                        
-                        # Si aún no se pudo parsear, intentar solo la parte de la fecha
-                        if fecha_compra is None and ' ' in fecha_str:
-                            try:
-                                fecha_compra = dt.strptime(fecha_str.split()[0], '%d/%m/%Y')
-                            except:
-                                try:
-                                    fecha_compra = dt.strptime(fecha_str.split()[0], '%Y-%m-%d')
-                                except:
-                                    pass
-                        
-                        if fecha_compra and fecha_inicio <= fecha_compra <= fecha_fin:
-                            compras_filtradas.append(compra)
-                    except Exception as e:
-                        # Si hay error, omitir esta compra
-                        continue
+                compras_filtradas = filtrar_por_fecha(compras, rango['fecha_inicio'], rango['fecha_fin'])
                 
                 if not compras_filtradas:
                     messagebox.showwarning("Aviso", f"No hay compras en el rango seleccionado:\n{rango['fecha_inicio']} - {rango['fecha_fin']}")
                     return
                 
-                datos = []
-                total_general = 0
-                for compra in compras_filtradas:
-                    estado_vencimiento = 'N/A'
-                    fecha_vencimiento_texto = 'N/A'
-                    
-                    if compra.get('es_perecedero') == 1 and compra.get('fecha_vencimiento'):
-                        fecha_vencimiento_texto = compra['fecha_vencimiento']
-                        try:
-                            fecha_venc = dt.strptime(compra['fecha_vencimiento'], '%d/%m/%Y')
-                            hoy = dt.now()
-                            dias_restantes = (fecha_venc - hoy).days
-                            
-                            if dias_restantes < 0:
-                                estado_vencimiento = f'VENCIDO (hace {abs(dias_restantes)} días)'
-                            elif dias_restantes <= 7:
-                                estado_vencimiento = f'CRITICO ({dias_restantes} días)'
-                            elif dias_restantes <= 30:
-                                estado_vencimiento = f'ADVERTENCIA ({dias_restantes} días)'
-                            else:
-                                estado_vencimiento = f'OK ({dias_restantes} días)'
-                        except:
-                            estado_vencimiento = 'Error en fecha'
-                    
-                    fecha_mostrar = compra['fecha']
-                    try:
-                        fecha_obj = dt.strptime(compra['fecha'], '%d/%m/%Y %H:%M:%S')
-                        fecha_mostrar = fecha_obj.strftime('%d/%m/%Y')
-                    except:
-                        try:
-                            fecha_obj = dt.strptime(compra['fecha'], '%Y-%m-%d %H:%M:%S')
-                            fecha_mostrar = fecha_obj.strftime('%d/%m/%Y')
-                        except:
-                            fecha_mostrar = compra['fecha'].split()[0] if ' ' in compra['fecha'] else compra['fecha']
-                    
-                    datos.append({
-                        'ID': compra['id'],
-                        'Fecha': fecha_mostrar,
-                        'Producto': compra.get('producto_nombre', 'N/A'),
-                        'Proveedor': compra.get('proveedor_nombre', 'N/A'),
-                        'Cantidad': compra['cantidad'],
-                        'Precio Unitario': f"Q {compra['precio_unitario']:,.2f}",
-                        'Total': f"Q {compra['total']:,.2f}",
-                        'Vencimiento': fecha_vencimiento_texto,
-                        'Estado': estado_vencimiento
-                    })
-                    total_general += compra['total']
+                datos, total_general = filas_compras(compras_filtradas)
                 
                 df = pd.DataFrame(datos)
                 df.loc[len(df)] = ['', '', '', '', '', 'TOTAL:', f"Q {total_general:,.2f}", '', '']
@@ -733,6 +607,7 @@ class ReportesTab:
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo exportar el reporte: {str(e)}")
     
+    @trazado(categoria='ui')
     def exportar_reporte_ventas(self):
         """Exporta todas las ventas a Excel con filtro de fechas"""
         rango = self.seleccionar_rango_fechas("Filtrar Ventas por Fecha")
@@ -750,117 +625,29 @@ class ReportesTab:
         )
         
         if archivo:
-            try:
-                import pandas as pd
-                from datetime import datetime as dt
-                
-                ventas = self.controller.obtener_ventas()
-                
-                if not ventas:
-                    messagebox.showwarning("Aviso", "No hay ventas registradas para exportar.")
-                    return
-                
-                fecha_inicio = dt.strptime(rango['fecha_inicio'], '%d/%m/%Y')
-                fecha_fin = dt.strptime(rango['fecha_fin'], '%d/%m/%Y')
-                # Ajustar fecha_fin para incluir todo el día
-                fecha_fin = fecha_fin.replace(hour=23, minute=59, second=59)
-                
-                ventas_filtradas = []
-                for venta in ventas:
-                    try:
-                        fecha_str = venta['fecha']
-                        fecha_venta = None
-                        
-                        # Intentar múltiples formatos de fecha
-                        formatos = [
-                            '%d/%m/%Y %H:%M:%S',
-                            '%Y-%m-%d %H:%M:%S',
-                            '%d/%m/%Y',
-                            '%Y-%m-%d'
-                        ]
-                        
-                        for formato in formatos:
-                            try:
-                                fecha_venta = dt.strptime(fecha_str, formato)
-                                break
-                            except ValueError:
-                                continue
-                        
-                        # Si aún no se pudo parsear, intentar solo la parte de la fecha
-                        if fecha_venta is None and ' ' in fecha_str:
-                            try:
-                                fecha_venta = dt.strptime(fecha_str.split()[0], '%d/%m/%Y')
-                            except:
-                                try:
-                                    fecha_venta = dt.strptime(fecha_str.split()[0], '%Y-%m-%d')
-                                except:
-                                    pass
-                        
-                        if fecha_venta and fecha_inicio <= fecha_venta <= fecha_fin:
-                            ventas_filtradas.append(venta)
-                    except Exception as e:
-                        # Si hay error, omitir esta venta
-                        continue
-                
-                if not ventas_filtradas:
-                    messagebox.showwarning("Aviso", f"No hay ventas en el rango seleccionado:\n{rango['fecha_inicio']} - {rango['fecha_fin']}")
-                    return
-                
-                # Exportar el detalle de cada venta (con todos los productos)
-                datos = []
-                total_general = 0
-                for venta in ventas_filtradas:
-                    fecha_mostrar = venta['fecha']
-                    try:
-                        fecha_obj = dt.strptime(venta['fecha'], '%d/%m/%Y %H:%M:%S')
-                        fecha_mostrar = fecha_obj.strftime('%d/%m/%Y')
-                    except:
-                        try:
-                            fecha_obj = dt.strptime(venta['fecha'], '%Y-%m-%d %H:%M:%S')
-                            fecha_mostrar = fecha_obj.strftime('%d/%m/%Y')
-                        except:
-                            fecha_mostrar = venta['fecha'].split()[0] if ' ' in venta['fecha'] else venta['fecha']
-                    
-                    # Agregar cada producto de la venta como una fila separada
-                    for detalle in venta.get('detalles', []):
-                        datos.append({
-                            'ID Venta': venta['id'],
-                            'Referencia': venta.get('referencia_no', 'N/A'),
-                            'Fecha': fecha_mostrar,
-                            'Cliente': venta.get('cliente_nombre', 'N/A'),
-                            'Producto': detalle.get('producto_nombre', 'N/A'),
-                            'Cantidad': detalle['cantidad'],
-                            'Precio Unitario': f"Q {detalle['precio_unitario']:,.2f}",
-                            'Subtotal': f"Q {detalle['subtotal']:,.2f}",
-                            'Estado': venta.get('estado', 'N/A')
-                        })
-                    
-                    total_general += venta['total']
-                
-                df = pd.DataFrame(datos)
-                
-                # Agregar fila de total
-                fila_total = {
-                    'ID Venta': '',
-                    'Referencia': '',
-                    'Fecha': '',
-                    'Cliente': '',
-                    'Producto': '',
-                    'Cantidad': '',
-                    'Precio Unitario': 'TOTAL:',
-                    'Subtotal': f"Q {total_general:,.2f}",
-                    'Estado': ''
-                }
-                df = pd.concat([df, pd.DataFrame([fila_total])], ignore_index=True)
-                
-                df.to_excel(archivo, index=False, sheet_name='Ventas')
-                
-                messagebox.showinfo("Éxito", f"Reporte de ventas exportado:\n{archivo}\n\n{len(ventas_filtradas)} ventas encontradas\nTotal: Q {total_general:,.2f}")
-            except ImportError:
-                messagebox.showerror("Error", "Se requiere instalar 'pandas' y 'openpyxl' para exportar a Excel.\nEjecute: pip install pandas openpyxl")
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo exportar el reporte: {str(e)}")
+            # Filtro por fecha en SQL y totales por columnas, en un hilo lector
+            futuro = self.main_window.ejecutor_bd.leer(
+                self.escribir_reporte_ventas, archivo, rango['fecha_inicio'], rango['fecha_fin']
+            )
+            self.main_window.puente.al_completar(futuro, self.reporte_exportado, self.error_exportacion)
+    
+    def escribir_reporte_ventas(self, archivo, fecha_inicio, fecha_fin):
+        """Arma y guarda el reporte de ventas del rango. Se ejecuta fuera del hilo de Tk."""
+        import pandas as pd
+        
+        # Exportar el detalle de cada venta (con todos los productos)
+        hojas, ventas, total_general = hojas_reporte_ventas(self.controller, fecha_inicio, fecha_fin)
+        
+        if not ventas:
+            return False, f"No hay ventas en el rango seleccionado:\n{fecha_inicio} - {fecha_fin}"
+        
+        with pd.ExcelWriter(archivo, engine='openpyxl') as writer:
+            for nombre, datos in hojas.items():
+                pd.DataFrame(datos).to_excel(writer, index=False, sheet_name=nombre)
+        
+        return True, f"Reporte de ventas exportado:\n{archivo}\n\n{ventas} ventas encontradas\nTotal: Q {total_general:,.2f}"
     
+    @trazado(categoria='ui')
     def exportar_reporte_caja(self):
         """Exporta todos los movimientos de caja a Excel con filtro de fechas"""
         rango = self.seleccionar_rango_fechas("Filtrar Movimientos de Caja por Fecha")
@@ -880,89 +667,20 @@ class ReportesTab:
         if archivo:
             try:
                 import pandas as pd
-                from datetime import datetime as dt
                 
-                movimientos = self.controller.obtener_movimientos_caja()
+                movimientos = self.controller.obtener_movimientos_caja(historico=True)
                 
                 if not movimientos:
                     messagebox.showwarning("Aviso", "No hay movimientos de caja registrados para exportar.")
                     return
                 
-                fecha_inicio = dt.strptime(rango['fecha_inicio'], '%d/%m/%Y')
-                fecha_fin = dt.strptime(rango['fecha_fin'], '%d/%m/%Y')
-                # Ajustar fecha_fin para incluir todo el día
-                fecha_fin = fecha_fin.replace(hour=23, minute=59, second=59)
-                
-                movimientos_filtrados = []
-                for mov in movimientos:
-                    try:
-                        fecha_str = mov['fecha']
-                        fecha_mov = None
-                        
-                        # Intentar múltiples formatos de fecha
-                        formatos = [
-                            '%d/%m/%Y %H:%M:%S',
-                            '%Y-%m-%d %H:%M:%S',
-                            '%d/%m/%Y',
-                            '%Y-%m-%d'
-                        ]
-                        
-                        for formato in formatos:
-                            try:
-                                fecha_mov = dt.strptime(fecha_str, formato)
-                                break
-                            except ValueError:
-                                continue
-                        
-                        # Si aún no se pudo parsear, intentar solo la parte de la fecha
-                        if fecha_mov is None and ' ' in fecha_str:
-                            try:
-                                fecha_mov = dt.strptime(fecha_str.split()[0], '%d/%m/%Y')
-                            except:
-                                try:
-                                    fecha_mov = dt.strptime(fecha_str.split()[0], '%Y-%m-%d')
-                                except:
-                                    pass
-                        
-                        if fecha_mov and fecha_inicio <= fecha_mov <= fecha_fin:
-                            movimientos_filtrados.append(mov)
-                    except Exception as e:
-                        # Si hay error, omitir este movimiento
-                        continue
+                movimientos_filtrados = filtrar_por_fecha(movimientos, rango['fecha_inicio'], rango['fecha_fin'])
                 
                 if not movimientos_filtrados:
                     messagebox.showwarning("Aviso", f"No hay movimientos en el rango seleccionado:\n{rango['fecha_inicio']} - {rango['fecha_fin']}")
                     return
                 
-                datos = []
-                total_ingresos = 0
-                total_egresos = 0
-                
-                for mov in movimientos_filtrados:
-                    fecha_mostrar = mov['fecha']
-                    try:
-                        fecha_obj = dt.strptime(mov['fecha'], '%d/%m/%Y %H:%M:%S')
-                        fecha_mostrar = fecha_obj.strftime('%d/%m/%Y')
-                    except:
-                        try:
-                            fecha_obj = dt.strptime(mov['fecha'], '%Y-%m-%d %H:%M:%S')
-                            fecha_mostrar = fecha_obj.strftime('%d/%m/%Y')
-                        except:
-                            fecha_mostrar = mov['fecha'].split()[0] if ' ' in mov['fecha'] else mov['fecha']
-                    
-                    datos.append({
-                        'ID': mov['id'],
-                        'Fecha': fecha_mostrar,
-                        'Tipo': mov['tipo'],
-                        'Categoría': mov.get('categoria', 'N/A'),
-                        'Concepto': mov['concepto'],
-                        'Monto': f"Q {mov['monto']:,.2f}"
-                    })
-                    
-                    if mov['tipo'].upper() == 'INGRESO':
-                        total_ingresos += mov['monto']
-                    else:
-                        total_egresos += mov['monto']
+                datos, total_ingresos, total_egresos = filas_caja(movimientos_filtrados)
                 
                 df = pd.DataFrame(datos)
                 df.loc[len(df)] = ['', '', '', '', '', '']
@@ -10,6 +10,7 @@ import ttkbootstrap as tb
 from ttkbootstrap import DateEntry
 from datetime import datetime
 import os
+from src.utils.trazas import trazado
 
 
 class VentasTab:
@@ -26,6 +27,10 @@ class VentasTab:
         # Crear interfaz
         self.create_ui()
         
+        # Actualizar solo la fila de la venta registrada o anulada
+        self.controller.suscribir('sale_added', self.on_venta_agregada)
+        self.controller.suscribir('sale_voided', self.on_venta_anulada)
+        
     def setup_variables(self):
         """Inicializa las variables del tab."""
         # Variables del cliente
@@ -48,6 +53,9 @@ class VentasTab:
         
         # Carrito de ventas
         self.carrito_ventas = []
+        # True mientras la venta está en el hilo escritor: el carrito y el cliente no se modifican
+        self.venta_en_curso = False
+        self._estados_bloqueados = {}
     
     def create_ui(self):
         """Crea la interfaz del tab de ventas."""
@@ -74,6 +82,7 @@ class VentasTab:
             bootstyle="warning"
         )
         form_frame.pack(side='left', fill='both', expand=True, padx=(0, 10))
+        self.form_frame = form_frame
         
         # Fila 0 - Cliente y Fecha
         tb.Label(form_frame, text="Cliente: *", font=('Segoe UI', 10, 'bold')).grid(
@@ -184,6 +193,10 @@ class VentasTab:
         self.venta_producto_entry.pack(side='left', fill='x', expand=True)
         self.venta_producto_entry.bind('<KeyRelease>', self.autocompletar_producto)
         
+        # Lector de código de barras: las ráfagas terminadas en Enter agregan directo al carrito
+        from ..utils.lector_codigos import LectorCodigos
+        self.lector_codigos = LectorCodigos(self.venta_producto_entry, self.agregar_por_codigo)
+        
         tb.Button(
             prod_search_frame,
             text="🔍",
@@ -364,6 +377,7 @@ class VentasTab:
         # Botones del carrito
         btn_carrito_frame = tb.Frame(carrito_frame)
         btn_carrito_frame.pack(fill='x', pady=5)
+        self.btn_carrito_frame = btn_carrito_frame
         
         tb.Button(
             btn_carrito_frame,
@@ -381,13 +395,14 @@ class VentasTab:
             width=20
         ).pack(side='left', padx=5)
         
-        tb.Button(
+        self.btn_finalizar_venta = tb.Button(
             btn_carrito_frame,
             text="✅ Finalizar Venta",
             command=self.finalizar_venta,
             bootstyle="success",
             width=20
-        ).pack(side='left', padx=5)
+        )
+        self.btn_finalizar_venta.pack(side='left', padx=5)
         
     def crear_historial(self, parent):
         """Crea el historial de ventas."""
@@ -555,7 +570,8 @@ class VentasTab:
         if hasattr(self, 'producto_listbox_window') and self.producto_listbox_window.winfo_exists():
             self.producto_listbox_window.destroy()
         
-        if len(texto) < 2:
+        # Durante una lectura del lector de códigos no se busca en cada tecla
+        if len(texto) < 2 or self.lector_codigos.en_rafaga():
             return
         
         # Buscar productos
@@ -861,8 +877,7 @@ class VentasTab:
             return
         
         # Verificar si el cliente ya existe por NIT exacto
-        todos_clientes = self.controller.obtener_clientes()
-        cliente_existente = next((c for c in todos_clientes if c['nit_dpi'].strip().upper() == nit.strip().upper()), None)
+        cliente_existente = self.controller.obtener_cliente_por_nit(nit)
         
         if cliente_existente:
             messagebox.showwarning("Cliente Existente", 
@@ -874,9 +889,9 @@ class VentasTab:
         
         # Confirmar guardado
         if messagebox.askyesno("Confirmar", f"¿Guardar cliente '{nombre}' en la base de datos?"):
-            resultado = self.controller.crear_cliente(nombre, nit, direccion, telefono)
-            if resultado['exito']:
-                self.venta_cliente_id = resultado['id']
+            exito, mensaje, cliente_id = self.controller.crear_cliente(nombre, nit, direccion, telefono)
+            if exito:
+                self.venta_cliente_id = cliente_id
                 messagebox.showinfo("Éxito", f"Cliente '{nombre}' guardado correctamente")
                 self.venta_cliente_label.config(text="✓", bootstyle="success")
                 
@@ -884,7 +899,7 @@ class VentasTab:
                 if hasattr(self.main_window, 'clientes_tab'):
                     self.main_window.clientes_tab.refresh()
             else:
-                messagebox.showerror("Error", resultado['mensaje'])
+                messagebox.showerror("Error", mensaje)
     
     def buscar_producto(self):
         """Abre diálogo para buscar producto."""
@@ -1003,6 +1018,8 @@ class VentasTab:
     
     def agregar_al_carrito(self):
         """Agrega un producto al carrito."""
+        if self.avisar_venta_en_curso():
+            return
         try:
             if not self.venta_producto_id:
                 messagebox.showwarning("Advertencia", "Busque y seleccione un producto")
@@ -1077,6 +1094,48 @@ class VentasTab:
         except Exception as e:
             messagebox.showerror("Error", f"Error al agregar al carrito: {str(e)}")
     
+    def agregar_por_codigo(self, codigo):
+        """Agrega una unidad del producto leído por el lector de códigos, sin diálogos."""
+        self.venta_producto_busqueda.set("")
+        if self.avisar_venta_en_curso():
+            return
+        producto = self.controller.obtener_producto_por_codigo(codigo)
+        if not producto:
+            self.venta_producto_entry.bell()
+            self.stock_label.config(text=f"❌ Código no encontrado: {codigo}", bootstyle="danger")
+            return
+        
+        item = next((i for i in self.carrito_ventas if i['producto_id'] == producto['id']), None)
+        en_carrito = item['cantidad'] if item else 0
+        if producto['stock_actual'] < en_carrito + 1:
+            self.venta_producto_entry.bell()
+            self.stock_label.config(
+                text=f"❌ Sin stock: {producto['nombre'][:25]} ({producto['stock_actual']})",
+                bootstyle="danger"
+            )
+            return
+        
+        if item:
+            item['cantidad'] += 1
+            item['subtotal'] = item['cantidad'] * item['precio_unitario']
+        else:
+            self.carrito_ventas.append({
+                'producto_id': producto['id'],
+                'nombre': producto['nombre'],
+                'cantidad': 1,
+                'precio_unitario': producto['precio_venta'],
+                'precio_original': producto['precio_venta'],
+                'descuento_aplicado': False,
+                'descuento_porcentaje': 0,
+                'subtotal': producto['precio_venta']
+            })
+        
+        self.actualizar_tabla_carrito()
+        self.stock_label.config(
+            text=f"✓ {producto['nombre'][:25]} x{en_carrito + 1}",
+            bootstyle="success"
+        )
+    
     def actualizar_tabla_carrito(self):
         """Actualiza la tabla del carrito."""
         # Limpiar tabla
@@ -1114,6 +1173,8 @@ class VentasTab:
     
     def quitar_del_carrito(self):
         """Quita el producto seleccionado del carrito."""
+        if self.avisar_venta_en_curso():
+            return
         seleccion = self.carrito_tree.selection()
         if not seleccion:
             messagebox.showwarning("Advertencia", "Seleccione un producto del carrito")
@@ -1128,6 +1189,8 @@ class VentasTab:
     
     def limpiar_carrito(self):
         """Limpia todo el carrito."""
+        if self.avisar_venta_en_curso():
+            return
         if not self.carrito_ventas:
             messagebox.showinfo("Carrito Vacío", "El carrito ya está vacío")
             return
@@ -1270,8 +1333,11 @@ class VentasTab:
         
         return resultado
     
+    @trazado(categoria='ui')
     def finalizar_venta(self):
         """Finaliza la venta."""
+        if self.avisar_venta_en_curso():
+            return
         try:
             nombre = self.venta_cliente_busqueda.get().strip()
             nit = self.venta_cliente_nit.get().strip()
@@ -1282,9 +1348,8 @@ class VentasTab:
             
             # Si no hay cliente_id, buscar si existe o crear cliente automáticamente
             if not self.venta_cliente_id:
-                # Primero buscar si el cliente ya existe por NIT
-                todos_clientes = self.controller.obtener_clientes()
-                cliente_existente = next((c for c in todos_clientes if c['nit_dpi'].strip().upper() == nit.strip().upper()), None)
+                # Primero buscar si el cliente ya existe por NIT (búsqueda indexada)
+                cliente_existente = self.controller.obtener_cliente_por_nit(nit)
                 
                 if cliente_existente:
                     # El cliente ya existe (ej: Consumidor Final), usarlo
@@ -1300,12 +1365,9 @@ class VentasTab:
                     direccion = self.venta_cliente_direccion.get().strip()
                     telefono = self.venta_cliente_telefono.get().strip()
                     
-                    exito, mensaje = self.controller.crear_cliente(nombre, nit, direccion, telefono)
+                    exito, mensaje, cliente_id = self.controller.crear_cliente(nombre, nit, direccion, telefono)
                     if exito:
-                        clientes = self.controller.buscar_cliente(nombre)
-                        if clientes:
-                            nuevo_cliente = clientes[-1]
-                            self.venta_cliente_id = nuevo_cliente['id']
+                        self.venta_cliente_id = cliente_id
                     else:
                         messagebox.showerror("Error", f"No se pudo registrar el cliente: {mensaje}")
                         return
@@ -1333,50 +1395,106 @@ class VentasTab:
             hora_actual = datetime.now().strftime('%H:%M:%S')
             fecha_manual = f"{fecha_cal} {hora_actual}"
             
-            # Registrar venta
-            exito, mensaje = self.controller.registrar_venta_con_carrito(
+            # Registrar venta en el hilo escritor; la ventana sigue respondiendo mientras tanto,
+            # pero el carrito y el cliente quedan bloqueados hasta conocer el resultado
+            self.bloquear_carrito(True)
+            futuro = self.controller.asincrono.registrar_venta_con_carrito(
                 self.venta_cliente_id,
-                self.carrito_ventas,
+                [dict(item) for item in self.carrito_ventas],
                 fecha_manual
             )
-            
-            if exito:
-                # Mostrar información de pago
-                mensaje_completo = (
-                    f"{mensaje}\n\n"
-                    f"💰 Total: Q {total:,.2f}\n"
-                    f"💵 Pagado: Q {monto_pagado:,.2f}\n"
-                    f"💸 Cambio: Q {cambio:,.2f}"
-                )
-                messagebox.showinfo("Venta Exitosa", mensaje_completo)
-                
-                # Limpiar todo
-                self.carrito_ventas = []
-                self.actualizar_tabla_carrito()
-                self.limpiar_formulario_producto()
-                
-                # Limpiar datos del cliente
-                self.venta_cliente_busqueda.set("")
-                self.venta_cliente_nit.set("")
-                self.venta_cliente_direccion.set("")
-                self.venta_cliente_telefono.set("")
-                self.venta_cliente_label.config(text="")
-                self.venta_cliente_id = None
-                
-                # Actualizar tablas
-                self.refresh()
-                if hasattr(self.main_window, 'refresh_productos'):
-                    self.main_window.refresh_productos()
-                if hasattr(self.main_window, 'refresh_caja'):
-                    self.main_window.refresh_caja()
-                if hasattr(self.main_window, 'actualizar_resumen'):
-                    self.main_window.actualizar_resumen()
-            else:
-                messagebox.showerror("Error", mensaje)
+            self.main_window.puente.al_completar(
+                futuro,
+                lambda resultado: self.venta_registrada(resultado, total, monto_pagado, cambio),
+                self.error_registro_venta
+            )
                 
         except Exception as e:
             messagebox.showerror("Error", f"Error inesperado: {str(e)}")
     
+    @trazado(categoria='ui')
+    def venta_registrada(self, resultado, total, monto_pagado, cambio):
+        """Recibe en el hilo de Tk el resultado de registrar la venta."""
+        exito, mensaje, venta_id = resultado
+        
+        if exito:
+            # Mostrar información de pago
+            mensaje_completo = (
+                f"{mensaje}\n\n"
+                f"💰 Total: Q {total:,.2f}\n"
+                f"💵 Pagado: Q {monto_pagado:,.2f}\n"
+                f"💸 Cambio: Q {cambio:,.2f}"
+            )
+            messagebox.showinfo("Venta Exitosa", mensaje_completo)
+            
+            # Ticket térmico automático si hay impresora configurada
+            self.imprimir_ticket_venta_registrada(venta_id, monto_pagado, cambio)
+            
+            # Limpiar todo
+            self.carrito_ventas = []
+            self.actualizar_tabla_carrito()
+            self.limpiar_formulario_producto()
+            
+            # Limpiar datos del cliente
+            self.venta_cliente_busqueda.set("")
+            self.venta_cliente_nit.set("")
+            self.venta_cliente_direccion.set("")
+            self.venta_cliente_telefono.set("")
+            self.venta_cliente_label.config(text="")
+            self.venta_cliente_id = None
+            self.bloquear_carrito(False)
+            
+            # Las pestañas suscritas actualizan sus filas al recibir los eventos
+        else:
+            # El carrito queda como estaba para corregir y reintentar
+            self.bloquear_carrito(False)
+            messagebox.showerror("Error", mensaje)
+    
+    def error_registro_venta(self, error):
+        """Recibe en el hilo de Tk un error inesperado al registrar la venta."""
+        self.bloquear_carrito(False)
+        messagebox.showerror("Error", f"Error inesperado: {str(error)}")
+    
+    def bloquear_carrito(self, bloquear):
+        """
+        Deshabilita (o restaura) el formulario de cliente y producto y los botones
+        del carrito mientras la venta se registra. La venta se envía como copia
+        del carrito y al terminar se vacía: lo que se agregara mientras tanto se perdería.
+        """
+        self.venta_en_curso = bloquear
+        if bloquear:
+            self._estados_bloqueados = {}
+            for widget in self._widgets_con_estado(self.form_frame, self.btn_carrito_frame):
+                self._estados_bloqueados[widget] = str(widget.cget('state'))
+                widget.configure(state='disabled')
+            self.btn_finalizar_venta.config(text="⏳ Registrando...")
+        else:
+            for widget, estado in self._estados_bloqueados.items():
+                try:
+                    widget.configure(state=estado)
+                except tk.TclError:
+                    pass  # El widget ya no existe
+            self._estados_bloqueados = {}
+            self.btn_finalizar_venta.config(state='normal', text="✅ Finalizar Venta")
+    
+    def _widgets_con_estado(self, *contenedores):
+        """Widgets editables o pulsables (con opción 'state') dentro de los contenedores."""
+        for contenedor in contenedores:
+            for widget in contenedor.winfo_children():
+                if isinstance(widget, (tk.Entry, tk.Button, tk.Checkbutton, tb.Entry, tb.Button,
+                                       tb.Checkbutton, tb.Combobox, tb.Spinbox)):
+                    yield widget
+                else:
+                    yield from self._widgets_con_estado(widget)
+    
+    def avisar_venta_en_curso(self):
+        """Si hay una venta registrándose, lo indica (sin diálogo: puede ser el lector) y retorna True."""
+        if not self.venta_en_curso:
+            return False
+        self.venta_producto_entry.bell()
+        self.stock_label.config(text="⏳ Registrando la venta anterior, espere...", bootstyle="warning")
+        return True
+    
     # ===== MÉTODOS DE LIMPIEZA =====
     
     def limpiar_formulario_producto(self):
@@ -1399,6 +1517,8 @@ class VentasTab:
     
     def limpiar_formulario_carrito(self):
         """Limpia el formulario completo (cliente, productos y carrito)."""
+        if self.avisar_venta_en_curso():
+            return
         # Limpiar datos del cliente
         self.venta_cliente_busqueda.set("")
         self.venta_cliente_nit.set("")
@@ -1416,74 +1536,108 @@ class VentasTab:
     
     # ===== MÉTODOS DE DATOS =====
     
+    @trazado(categoria='ui')
     def refresh(self):
         """Actualiza la lista de ventas."""
         # Limpiar treeview
         for item in self.ventas_tree.get_children():
             self.ventas_tree.delete(item)
         
-        # Obtener búsqueda
-        texto_busqueda = self.venta_search.get().strip().lower() if hasattr(self, 'venta_search') else ''
-        
-        # Cargar ventas
+        # Cargar ventas (el iid de cada fila es el ID de la venta)
         ventas = self.controller.obtener_ventas()
         for i, venta in enumerate(ventas):
-            # Aplicar filtro
-            if texto_busqueda:
-                ref_no = str(venta.get('referencia_no', venta['id'])).lower()
-                cliente = venta.get('cliente_nombre', '').lower()
-                nit_dpi = venta.get('cliente_nit', '').lower()
-                fecha = str(venta.get('fecha', '')).lower()
-                
-                productos_match = False
-                if 'detalles' in venta:
-                    for detalle in venta['detalles']:
-                        if texto_busqueda in detalle.get('producto_nombre', '').lower():
-                            productos_match = True
-                            break
-                
-                if (texto_busqueda not in ref_no and 
-                    texto_busqueda not in cliente and
-                    texto_busqueda not in nit_dpi and
-                    texto_busqueda not in fecha and
-                    not productos_match):
-                    continue
+            if not self.coincide_busqueda(venta):
+                continue
             
             tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-            
-            # Formatear fecha
-            fecha_str = venta['fecha']
+            self.ventas_tree.insert('', 'end', iid=str(venta['id']),
+                                    values=self.valores_fila(venta), tags=(tag,))
+    
+    def coincide_busqueda(self, venta):
+        """Indica si la venta coincide con el texto de búsqueda."""
+        texto_busqueda = self.venta_search.get().strip().lower() if hasattr(self, 'venta_search') else ''
+        if not texto_busqueda:
+            return True
+        
+        ref_no = str(venta.get('referencia_no', venta['id'])).lower()
+        cliente = venta.get('cliente_nombre', '').lower()
+        nit_dpi = venta.get('cliente_nit', '').lower()
+        fecha = str(venta.get('fecha', '')).lower()
+        
+        productos_match = False
+        if 'detalles' in venta:
+            for detalle in venta['detalles']:
+                if texto_busqueda in detalle.get('producto_nombre', '').lower():
+                    productos_match = True
+                    break
+        
+        return (texto_busqueda in ref_no or
+                texto_busqueda in cliente or
+                texto_busqueda in nit_dpi or
+                texto_busqueda in fecha or
+                productos_match)
+    
+    def valores_fila(self, venta):
+        """Valores de la fila de una venta en el historial."""
+        # Formatear fecha
+        fecha_str = venta['fecha']
+        try:
+            fecha_obj = datetime.strptime(fecha_str, '%Y-%m-%d %H:%M:%S')
+            fecha_formateada = fecha_obj.strftime('%d/%m/%Y')
+        except:
             try:
-                fecha_obj = datetime.strptime(fecha_str, '%Y-%m-%d %H:%M:%S')
+                fecha_obj = datetime.strptime(fecha_str, '%d/%m/%Y %H:%M:%S')
                 fecha_formateada = fecha_obj.strftime('%d/%m/%Y')
             except:
-                try:
-                    fecha_obj = datetime.strptime(fecha_str, '%d/%m/%Y %H:%M:%S')
-                    fecha_formateada = fecha_obj.strftime('%d/%m/%Y')
-                except:
-                    fecha_formateada = fecha_str.split()[0] if ' ' in fecha_str else fecha_str
-            
-            # Resumen de productos
-            if 'detalles' in venta and len(venta['detalles']) > 0:
-                if len(venta['detalles']) == 1:
-                    productos_str = venta['detalles'][0]['producto_nombre']
-                else:
-                    productos_str = f"{len(venta['detalles'])} productos"
+                fecha_formateada = fecha_str.split()[0] if ' ' in fecha_str else fecha_str
+        
+        # Resumen de productos
+        if 'detalles' in venta and len(venta['detalles']) > 0:
+            if len(venta['detalles']) == 1:
+                productos_str = venta['detalles'][0]['producto_nombre']
             else:
-                productos_str = venta.get('producto_nombre', 'N/A')
-            
-            # NIT/DPI
-            nit_dpi = venta.get('cliente_nit', '').strip() or '-'
-            
-            self.ventas_tree.insert('', 'end', values=(
-                venta.get('referencia_no', f"REF{venta['id']}"),
-                nit_dpi,
-                venta.get('cliente_nombre', '[Sin Cliente]'),
-                productos_str,
-                f"Q {venta['total']:,.2f}",
-                fecha_formateada,
-                venta.get('estado', 'COMPLETADA')
-            ), tags=(tag,))
+                productos_str = f"{len(venta['detalles'])} productos"
+        else:
+            productos_str = venta.get('producto_nombre', 'N/A')
+        
+        # NIT/DPI
+        nit_dpi = venta.get('cliente_nit', '').strip() or '-'
+        
+        return (
+            venta.get('referencia_no', f"REF{venta['id']}"),
+            nit_dpi,
+            venta.get('cliente_nombre', '[Sin Cliente]'),
+            productos_str,
+            f"Q {venta['total']:,.2f}",
+            fecha_formateada,
+            venta.get('estado', 'COMPLETADA')
+        )
+    
+    def on_venta_agregada(self, venta_id, **_):
+        """Evento sale_added: programa la fila de la venta nueva."""
+        if venta_id is None:
+            # No se conoce el ID (método legacy): recargar el historial
+            self.main_window.planificador.programar('ventas', 'historial', self.refresh)
+            return
+        self.main_window.planificador.programar(
+            'ventas', venta_id, lambda: self.actualizar_fila(venta_id))
+    
+    def on_venta_anulada(self, venta_id, **_):
+        """Evento sale_voided: programa la actualización del estado de la venta."""
+        self.main_window.planificador.programar(
+            'ventas', venta_id, lambda: self.actualizar_fila(venta_id))
+    
+    def actualizar_fila(self, venta_id):
+        """Actualiza la fila de una venta o la inserta al inicio del historial."""
+        venta = self.controller.obtener_venta_por_id(venta_id)
+        if not venta or not self.coincide_busqueda(venta):
+            return
+        
+        iid = str(venta_id)
+        if self.ventas_tree.exists(iid):
+            self.ventas_tree.item(iid, values=self.valores_fila(venta))
+        else:
+            self.ventas_tree.insert('', 0, iid=iid, values=self.valores_fila(venta), tags=('evenrow',))
     
     def ver_detalle_venta(self, event):
         """Muestra los detalles completos de una venta."""
@@ -1633,6 +1787,15 @@ class VentasTab:
                 width=18
             ).pack(side='left', padx=5)
             
+            # Botón Ticket térmico (no carga reportlab)
+            tb.Button(
+                btn_frame,
+                text="🧾 Ticket",
+                command=lambda: self.imprimir_recibo_termico(venta, pedir_destino=True),
+                bootstyle="info-outline",
+                width=12
+            ).pack(side='left', padx=5)
+            
             # Botón Anular (solo si no está anulada)
             if venta['estado'] != 'Anulado':
                 tb.Button(
@@ -1744,15 +1907,7 @@ class VentasTab:
                                   f"La venta {venta['referencia_no']} ha sido anulada exitosamente.\n\n"
                                   f"{mensaje}")
                 
-                # Actualizar tablas
-                self.refresh()
-                if hasattr(self.main_window, 'refresh_productos'):
-                    self.main_window.refresh_productos()
-                if hasattr(self.main_window, 'refresh_caja'):
-                    self.main_window.refresh_caja()
-                if hasattr(self.main_window, 'actualizar_resumen'):
-                    self.main_window.actualizar_resumen()
-                
+                # Las pestañas suscritas actualizan sus filas al recibir los eventos
                 return True
             else:
                 messagebox.showerror("Error", f"No se pudo anular la venta:\n{mensaje}")
@@ -1787,12 +1942,9 @@ class VentasTab:
                 return
             
             # Configurar información de la empresa
-            # TODO: Estos datos deberían venir de una configuración
+            from src.config.settings import Settings
             generador = PDFGenerator(
-                empresa_nombre="MARTELIZ SHOP",
-                # empresa_nit="1234567-8",
-                empresa_direccion="Cobán, Alta Verapaz",
-                empresa_telefono="+502 3987-7846",
+                **Settings.get_datos_empresa(),
                 empresa_email="martelizshop@gmail.com",
                 logo_path=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "Logo", "Logo.png")
             )
@@ -1822,6 +1974,61 @@ class VentasTab:
         except Exception as e:
             messagebox.showerror("Error", f"Error al generar PDF: {str(e)}")
     
+    def imprimir_ticket_venta_registrada(self, venta_id, monto_pagado, cambio):
+        """Imprime el ticket de la venta recién registrada si hay impresora térmica configurada."""
+        from src.config.settings import Settings
+        
+        if not Settings.get_impresora_termica()['nombre']:
+            return
+        
+        venta = self.controller.obtener_venta_por_id(venta_id)
+        if venta:
+            venta['monto_pagado'] = monto_pagado
+            venta['cambio'] = cambio
+            self.imprimir_recibo_termico(venta)
+    
+    def imprimir_recibo_termico(self, venta, pedir_destino=False):
+        """
+        Genera el recibo para impresora térmica (texto/ESC-POS).
+        
+        Args:
+            venta: Diccionario con la venta y sus detalles
+            pedir_destino: Si True y no hay impresora configurada, pide un archivo de salida
+        """
+        try:
+            from src.config.settings import Settings
+            from ..utils.recibo_termico import ReciboTermico, ArchivoSink, ColaImpresoraSink
+            
+            config = Settings.get_impresora_termica()
+            generador = ReciboTermico(**Settings.get_datos_empresa(), ancho_mm=config['ancho_mm'])
+            
+            if config['nombre']:
+                sink = ColaImpresoraSink(config['nombre'])
+                formato = 'escpos'
+            elif pedir_destino:
+                from tkinter import filedialog
+                archivo_salida = filedialog.asksaveasfilename(
+                    title="Guardar Ticket",
+                    initialfile=f"Ticket_{venta['referencia_no']}.txt",
+                    defaultextension=".txt",
+                    filetypes=[("Texto", "*.txt"), ("ESC/POS", "*.prn"), ("All files", "*.*")]
+                )
+                if not archivo_salida:
+                    return
+                sink = ArchivoSink(archivo_salida)
+                formato = 'escpos' if archivo_salida.lower().endswith('.prn') else 'texto'
+            else:
+                return
+            
+            exito, mensaje = generador.imprimir(venta, sink, formato)
+            if not exito:
+                messagebox.showerror("Error", mensaje)
+            elif pedir_destino:
+                messagebox.showinfo("Ticket", mensaje)
+        
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al imprimir ticket: {str(e)}")
+    
     def on_tree_motion(self, event):
         """Maneja el efecto hover sobre las filas del treeview"""
         tree = event.widget
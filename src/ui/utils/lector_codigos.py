@@ -0,0 +1,74 @@
+"""
+Detección de lecturas de un lector de código de barras (modo teclado).
+
+Un lector USB "teclea" el código completo en unos pocos milisegundos y termina
+con Enter. Este módulo distingue esa ráfaga del tecleo humano midiendo el
+tiempo entre teclas; cuando detecta una lectura completa llama al callback con
+el código y detiene el Enter para que no llegue a otros bindings.
+"""
+import time
+
+# Teclas que el lector puede enviar dentro de la ráfaga sin ser parte del código
+TECLAS_IGNORADAS = ('Shift_L', 'Shift_R', 'Caps_Lock')
+
+
+class LectorCodigos:
+    """Escucha un Entry y reconoce ráfagas de teclas terminadas en Enter."""
+
+    def __init__(self, entry, al_escanear, intervalo_ms=40, longitud_minima=3):
+        """
+        Args:
+            entry: Widget Entry donde escribe el lector
+            al_escanear: Función(codigo) llamada al completar una lectura
+            intervalo_ms: Tiempo máximo entre teclas para considerarlas ráfaga
+            longitud_minima: Caracteres mínimos para aceptar una lectura
+        """
+        self.entry = entry
+        self.al_escanear = al_escanear
+        self.intervalo_ms = intervalo_ms
+        self.longitud_minima = longitud_minima
+        self._buffer = []
+        self._ultima_tecla = None
+        self.lecturas = 0
+        entry.bind('<KeyPress>', self._tecla, add='+')
+
+    def _tiempo_ms(self, event):
+        # event.time es el instante en que se generó la tecla, no cuando Tk la procesa;
+        # así una cola de eventos atrasada no se confunde con una ráfaga
+        return event.time if event.time else int(time.perf_counter() * 1000)
+
+    def _tecla(self, event):
+        ahora = self._tiempo_ms(event)
+        rapida = self._ultima_tecla is not None and (ahora - self._ultima_tecla) <= self.intervalo_ms
+
+        if event.keysym in ('Return', 'KP_Enter'):
+            codigo = ''.join(self._buffer)
+            es_lectura = rapida and len(codigo) >= self.longitud_minima
+            self.reiniciar()
+            if es_lectura:
+                self.lecturas += 1
+                self.al_escanear(codigo)
+                return 'break'
+            return None
+
+        if event.keysym in TECLAS_IGNORADAS:
+            return None
+
+        if len(event.char) == 1 and event.char.isprintable():
+            if not rapida:
+                self._buffer = []
+            self._buffer.append(event.char)
+            self._ultima_tecla = ahora
+        else:
+            # Borrar, flechas, etc. solo pueden venir de una persona
+            self.reiniciar()
+        return None
+
+    def en_rafaga(self):
+        """Indica si las últimas teclas llegaron a velocidad de lector."""
+        return len(self._buffer) >= 2
+
+    def reiniciar(self):
+        """Descarta la ráfaga en curso."""
+        self._buffer = []
+        self._ultima_tecla = None
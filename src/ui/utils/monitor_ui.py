@@ -0,0 +1,212 @@
+"""
+Monitor de respuesta de la interfaz.
+
+Mientras Tk ejecuta un callback largo (un refresco, una exportación) la
+ventana no se repinta ni atiende clics. Este monitor lo mide:
+
+- Latido: un root.after cada `intervalo_ms`. El retraso con el que llega cada
+  latido es el tiempo que el ciclo de eventos estuvo ocupado (tiempo de cuadro).
+- Vigilante: un hilo que, si el latido se atrasa más de `umbral_ms`, toma una
+  muestra del hilo de Tk mientras sigue bloqueado: los intervalos abiertos de
+  src/utils/trazas.py (qué acción) y la pila de llamadas (en qué línea).
+
+Cada bloqueo queda registrado con su pestaña y acción, y se agrupa en
+reporte(). También se agrega a las trazas como intervalo 'bloqueo UI', así
+que aparece en la exportación Chrome junto a la operación que lo causó.
+"""
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, List
+
+from src.utils import trazas
+
+MAX_BLOQUEOS = 500
+MAX_RETRASOS = 6000
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+def _pila_propia(marco, limite=8) -> List[str]:
+    """Últimos marcos de la pila que pertenecen a la aplicación (src/ o main.py)."""
+    lineas = []
+    for resumen in traceback.extract_stack(marco):
+        ruta = resumen.filename.replace('\\', '/')
+        if '/src/' in ruta or ruta.endswith('main.py'):
+            lineas.append(f"{ruta.split('/src/')[-1]}:{resumen.lineno} {resumen.name}")
+    return lineas[-limite:]
+
+
+class MonitorUI:
+    """Mide el retraso del ciclo de eventos de Tk y registra los bloqueos."""
+
+    def __init__(self, root, pestana_visible, intervalo_ms=100, umbral_ms=200):
+        """
+        Args:
+            root: Ventana raíz de Tk
+            pestana_visible: Función que devuelve el nombre de la pestaña visible
+            intervalo_ms: Cada cuánto se programa el latido
+            umbral_ms: Retraso a partir del cual se registra un bloqueo
+        """
+        self.root = root
+        self.pestana_visible = pestana_visible
+        self.intervalo_ms = intervalo_ms
+        self.umbral_ms = umbral_ms
+        self.retrasos = deque(maxlen=MAX_RETRASOS)  # ms de retraso de cada latido
+        self.bloqueos = deque(maxlen=MAX_BLOQUEOS)
+        self.desde = time.time()
+        self._activo = False
+        self._latido_id = None
+        self._hilo_tk = None
+        self._vigilante = None
+        self._lock = threading.Lock()
+        self._esperado = 0.0     # perf_counter en que debería llegar el latido
+        self._numero = 0         # latido pendiente
+        self._muestra = None     # (número de latido, intervalos abiertos, pila)
+
+    def iniciar(self):
+        """Arranca el latido y el hilo vigilante (llamar desde el hilo de Tk)."""
+        if self._activo:
+            return
+        self._activo = True
+        self._hilo_tk = threading.get_ident()
+        self._programar()
+        self._vigilante = threading.Thread(target=self._vigilar, name='monitor-ui', daemon=True)
+        self._vigilante.start()
+
+    def detener(self):
+        self._activo = False
+        if self._latido_id is not None:
+            try:
+                self.root.after_cancel(self._latido_id)
+            except Exception:
+                pass
+            self._latido_id = None
+
+    def _programar(self):
+        with self._lock:
+            self._numero += 1
+            self._esperado = time.perf_counter() + self.intervalo_ms / 1000
+        self._latido_id = self.root.after(self.intervalo_ms, self._latido)
+
+    def _latido(self):
+        ahora = time.perf_counter()
+        with self._lock:
+            retraso_ms = max((ahora - self._esperado) * 1000, 0.0)
+            numero, muestra = self._numero, self._muestra
+        self.retrasos.append(retraso_ms)
+        if retraso_ms >= self.umbral_ms:
+            self._registrar_bloqueo(retraso_ms, muestra if muestra and muestra[0] == numero else None)
+        if self._activo:
+            self._programar()
+
+    def _vigilar(self):
+        """Hilo vigilante: muestrea el hilo de Tk mientras el latido está atrasado."""
+        pausa = min(self.intervalo_ms, self.umbral_ms) / 2000
+        while self._activo:
+            time.sleep(pausa)
+            with self._lock:
+                numero, esperado = self._numero, self._esperado
+                ya_muestreado = self._muestra is not None and self._muestra[0] == numero
+            if ya_muestreado or (time.perf_counter() - esperado) * 1000 < self.umbral_ms:
+                continue
+            marco = sys._current_frames().get(self._hilo_tk)
+            muestra = (numero, trazas.abiertos(self._hilo_tk), _pila_propia(marco) if marco else [])
+            with self._lock:
+                if self._numero == numero:
+                    self._muestra = muestra
+
+    def _registrar_bloqueo(self, retraso_ms, muestra):
+        fin_us = trazas.ahora_us()
+        if muestra is not None:
+            intervalos, pila = muestra[1], muestra[2]
+        else:
+            # Bloqueo más corto que la pausa del vigilante: se usa el intervalo que terminó en él
+            intervalos, pila = self._intervalos_terminados(fin_us - retraso_ms * 1000), []
+        intervalos = [nombre for nombre in intervalos if not nombre.startswith('bloqueo UI')]
+        try:
+            pestana = self.pestana_visible()
+        except Exception:
+            pestana = None
+        bloqueo = {
+            'fecha': time.strftime('%d/%m/%Y %H:%M:%S'),
+            'ms': retraso_ms,
+            'pestana': pestana or '-',
+            'accion': intervalos[0] if intervalos else '(sin traza)',
+            'detalle': intervalos[-1] if intervalos else '',
+            'pila': pila,
+        }
+        self.bloqueos.append(bloqueo)
+        trazas.registrar_intervalo('bloqueo UI', 'ui_lag', fin_us - retraso_ms * 1000, retraso_ms * 1000,
+                                   tid=self._hilo_tk, accion=bloqueo['accion'], pestana=bloqueo['pestana'])
+        print(f"🐌 Interfaz bloqueada {retraso_ms:.0f} ms en {bloqueo['pestana']}: {bloqueo['accion']}")
+
+    def _intervalos_terminados(self, desde_us) -> List[str]:
+        """Intervalos del hilo de Tk que terminaron después de desde_us, el más largo primero."""
+        candidatos = [e for e in trazas.eventos()
+                      if e['tid'] == self._hilo_tk and e['cat'] not in ('sql', 'ui_lag')
+                      and e['ts'] + e.get('dur', 0) >= desde_us]
+        candidatos.sort(key=lambda e: e.get('dur', 0), reverse=True)
+        return [e['name'] for e in candidatos[:2]]
+
+    def reporte(self) -> Dict:
+        """
+        Resumen de la respuesta de la interfaz.
+
+        Returns:
+            {'latidos', 'p50_ms', 'p95_ms', 'p99_ms', 'maximo_ms' (retraso del ciclo de eventos),
+             'bloqueos': total, 'por_accion': [{'pestana', 'accion', 'conteo', 'total_ms',
+             'maximo_ms', 'detalle', 'pila'}] ordenado por tiempo total bloqueado}
+        """
+        retrasos = list(self.retrasos)
+        grupos = {}
+        for bloqueo in list(self.bloqueos):
+            clave = (bloqueo['pestana'], bloqueo['accion'])
+            grupo = grupos.setdefault(clave, {'pestana': clave[0], 'accion': clave[1], 'conteo': 0,
+                                              'total_ms': 0.0, 'maximo_ms': 0.0, 'detalle': '', 'pila': []})
+            grupo['conteo'] += 1
+            grupo['total_ms'] += bloqueo['ms']
+            if bloqueo['ms'] >= grupo['maximo_ms']:
+                # Detalle y pila del peor caso
+                grupo['maximo_ms'] = bloqueo['ms']
+                grupo['detalle'] = bloqueo['detalle']
+                grupo['pila'] = bloqueo['pila']
+        return {
+            'latidos': len(retrasos),
+            'p50_ms': _percentil(retrasos, 0.50),
+            'p95_ms': _percentil(retrasos, 0.95),
+            'p99_ms': _percentil(retrasos, 0.99),
+            'maximo_ms': max(retrasos, default=0.0),
+            'bloqueos': len(self.bloqueos),
+            'por_accion': sorted(grupos.values(), key=lambda g: g['total_ms'], reverse=True),
+        }
+
+    def reiniciar(self):
+        self.retrasos.clear()
+        self.bloqueos.clear()
+        self.desde = time.time()
+
+
+def formatear_reporte(reporte: Dict) -> str:
+    """Devuelve el reporte de MonitorUI.reporte() como texto."""
+    lineas = [
+        f"Respuesta de la interfaz ({reporte['latidos']} latidos)",
+        f"  Retraso del ciclo de eventos: p50 {reporte['p50_ms']:.0f} ms · p95 {reporte['p95_ms']:.0f} ms · "
+        f"p99 {reporte['p99_ms']:.0f} ms · máx {reporte['maximo_ms']:.0f} ms",
+        f"  Bloqueos: {reporte['bloqueos']}",
+    ]
+    for grupo in reporte['por_accion']:
+        lineas.append(f"  {grupo['pestana']:<14} {grupo['accion']:<45} {grupo['conteo']:>4}x  "
+                      f"total {grupo['total_ms']:>8,.0f} ms  máx {grupo['maximo_ms']:>6,.0f} ms")
+        if grupo['detalle'] and grupo['detalle'] != grupo['accion']:
+            lineas.append(f"      en {grupo['detalle']}")
+        for linea in grupo['pila'][-3:]:
+            lineas.append(f"      {linea}")
+    return "\n".join(lineas)
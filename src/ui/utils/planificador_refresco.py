@@ -0,0 +1,78 @@
+"""
+Planificador de refrescos de la interfaz.
+
+Una escritura (por ejemplo una venta) emite varios eventos seguidos. En lugar
+de refrescar en cada uno, las pestañas registran aquí el trabajo pendiente y
+el planificador lo ejecuta una sola vez, en el siguiente ciclo ocioso de Tk
+(after_idle). El trabajo se agrupa por clave: si la misma clave se programa
+varias veces antes del ciclo ocioso, solo se ejecuta la última.
+
+Las pestañas que no están visibles no se refrescan: se marcan como
+desactualizadas y se recargan completas la próxima vez que se muestran.
+"""
+import time
+
+from src.utils.trazas import traza
+
+
+class PlanificadorRefresco:
+    """Agrupa los refrescos pendientes y los ejecuta en un solo pase ocioso."""
+
+    def __init__(self, root, pestana_visible, marcar_desactualizada):
+        """
+        Args:
+            root: Ventana raíz de Tk (para after_idle)
+            pestana_visible: Función que devuelve el nombre de la pestaña visible
+            marcar_desactualizada: Función(nombre) que marca una pestaña para recarga
+        """
+        self.root = root
+        self.pestana_visible = pestana_visible
+        self.marcar_desactualizada = marcar_desactualizada
+        self._pendientes = {}  # pestaña -> {clave: función}
+        self._programado = False
+        self.ultimo_pase = None  # estadísticas del último pase
+
+    def programar(self, pestana, clave, funcion):
+        """
+        Registra trabajo de refresco para una pestaña.
+
+        Args:
+            pestana: Nombre de la pestaña (ver PESTANAS en main_window)
+            clave: Identifica el trabajo para agruparlo (ej. ('fila', 15) o 'saldo')
+            funcion: Callable sin argumentos que aplica el refresco
+        """
+        self._pendientes.setdefault(pestana, {})[clave] = funcion
+        if not self._programado:
+            self._programado = True
+            self.root.after_idle(self.ejecutar)
+
+    def ejecutar(self):
+        """Ejecuta el trabajo de la pestaña visible y marca las demás como desactualizadas."""
+        self._programado = False
+        pendientes, self._pendientes = self._pendientes, {}
+        visible = self.pestana_visible()
+
+        t0 = time.perf_counter()
+        ejecutadas = 0
+        with traza(f"refresco agrupado {visible}", categoria='ui'):
+            for pestana, trabajos in pendientes.items():
+                if pestana != visible:
+                    self.marcar_desactualizada(pestana)
+                    continue
+                for clave, funcion in trabajos.items():
+                    try:
+                        funcion()
+                        ejecutadas += 1
+                    except Exception as e:
+                        print(f"Error al refrescar {pestana} {clave}: {e}")
+
+        self.ultimo_pase = {
+            'pestanas': list(pendientes),
+            'visible': visible,
+            'tareas': ejecutadas,
+            'segundos': time.perf_counter() - t0,
+        }
+
+    def pendiente(self):
+        """Indica si hay trabajo esperando el ciclo ocioso."""
+        return self._programado
@@ -0,0 +1,69 @@
+"""
+Puente entre hilos de trabajo y el hilo de Tk.
+
+Tk no admite llamadas desde otros hilos. Los hilos dejan aquí las funciones
+que deben correr en la interfaz y el puente las ejecuta desde el propio hilo
+de Tk, revisando la cola periódicamente con root.after.
+"""
+import queue
+import time
+
+
+class PuenteTk:
+    """Cola de llamadas que se ejecutan en el hilo de Tk."""
+
+    def __init__(self, root, intervalo_ms=15, presupuesto_ms=20):
+        """
+        Args:
+            root: Ventana raíz de Tk
+            intervalo_ms: Cada cuánto se revisa la cola
+            presupuesto_ms: Tiempo máximo por revisión; lo que sobre queda para la siguiente
+        """
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self.presupuesto_ms = presupuesto_ms
+        self._cola = queue.SimpleQueue()
+        self._activo = True
+        self.root.after(self.intervalo_ms, self._drenar)
+
+    def llamar(self, funcion, *args, **kwargs):
+        """Programa funcion(*args, **kwargs) en el hilo de Tk. Se puede usar desde cualquier hilo."""
+        self._cola.put((funcion, args, kwargs))
+
+    def al_completar(self, futuro, exito, error=None):
+        """
+        Entrega el resultado de un Future en el hilo de Tk.
+
+        Args:
+            futuro: concurrent.futures.Future
+            exito: Función(resultado) si terminó bien
+            error: Función(excepcion) si falló; si se omite, el error se imprime
+        """
+        def entregar(f):
+            excepcion = f.exception()
+            if excepcion is None:
+                self.llamar(exito, f.result())
+            elif error is not None:
+                self.llamar(error, excepcion)
+            else:
+                self.llamar(print, f"Error en operación de base de datos: {excepcion}")
+        futuro.add_done_callback(entregar)
+        return futuro
+
+    def _drenar(self):
+        limite = time.perf_counter() + self.presupuesto_ms / 1000
+        while time.perf_counter() < limite:
+            try:
+                funcion, args, kwargs = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                funcion(*args, **kwargs)
+            except Exception as e:
+                print(f"Error en llamada diferida a la interfaz: {e}")
+        if self._activo:
+            self.root.after(self.intervalo_ms, self._drenar)
+
+    def detener(self):
+        """Deja de revisar la cola (al cerrar la aplicación)."""
+        self._activo = False
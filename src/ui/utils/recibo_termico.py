@@ -0,0 +1,296 @@
+"""
+Módulo para generar recibos de venta para impresoras térmicas (58/80 mm).
+
+Alternativa ligera a PDFGenerator: produce texto plano o un flujo de bytes
+ESC/POS a partir del mismo diccionario `venta_data`, sin importar reportlab.
+La salida se envía a un "sink" (archivo, cola de impresión local o memoria).
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+from datetime import datetime
+
+
+# Comandos ESC/POS básicos
+ESC = b'\x1b'
+GS = b'\x1d'
+CMD_INICIALIZAR = ESC + b'@'
+CMD_CODEPAGE_1252 = ESC + b't' + bytes([16])  # WPC1252 (acentos y ñ)
+CMD_NEGRITA_ON = ESC + b'E' + b'\x01'
+CMD_NEGRITA_OFF = ESC + b'E' + b'\x00'
+CMD_ALINEAR_IZQ = ESC + b'a' + b'\x00'
+CMD_ALINEAR_CENTRO = ESC + b'a' + b'\x01'
+CMD_TAMANO_DOBLE = GS + b'!' + b'\x11'
+CMD_TAMANO_NORMAL = GS + b'!' + b'\x00'
+CMD_CORTE_PARCIAL = GS + b'V' + b'B' + b'\x00'  # Avanza y corta
+
+# Caracteres por línea (fuente A) según el ancho del papel
+COLUMNAS_POR_ANCHO = {
+    58: 32,
+    80: 48,
+}
+
+
+class ReciboTermico:
+    """Generador de recibos para impresoras térmicas."""
+
+    def __init__(self, empresa_nombre="Mi Empresa", empresa_nit="", empresa_direccion="",
+                 empresa_telefono="", ancho_mm=80):
+        """
+        Inicializa el generador con la información de la empresa.
+
+        Args:
+            empresa_nombre: Nombre de la empresa
+            empresa_nit: NIT de la empresa
+            empresa_direccion: Dirección de la empresa
+            empresa_telefono: Teléfono de la empresa
+            ancho_mm: Ancho del papel (58 u 80)
+        """
+        if ancho_mm not in COLUMNAS_POR_ANCHO:
+            raise ValueError(f"Ancho de papel no soportado: {ancho_mm} mm (use 58 u 80)")
+
+        self.empresa_nombre = empresa_nombre
+        self.empresa_nit = empresa_nit
+        self.empresa_direccion = empresa_direccion
+        self.empresa_telefono = empresa_telefono
+        self.ancho_mm = ancho_mm
+        self.columnas = COLUMNAS_POR_ANCHO[ancho_mm]
+
+    # ===== CONSTRUCCIÓN DE LÍNEAS =====
+
+    def _centrar(self, texto):
+        """Centra un texto dentro del ancho del papel."""
+        return texto[:self.columnas].center(self.columnas).rstrip()
+
+    def _separador(self, caracter='-'):
+        """Devuelve una línea separadora."""
+        return caracter * self.columnas
+
+    def _izq_der(self, izquierda, derecha):
+        """Alinea un texto a la izquierda y otro a la derecha en la misma línea."""
+        espacio = self.columnas - len(derecha) - 1
+        return f"{izquierda[:espacio]:<{espacio}} {derecha}"
+
+    def _lineas(self, venta_data):
+        """
+        Genera las líneas del recibo marcadas con su estilo.
+
+        Returns:
+            Lista de tuplas (estilo, texto). Estilos: 'titulo', 'centro',
+            'negrita', 'normal'.
+        """
+        lineas = [('titulo', self.empresa_nombre.upper())]
+        if self.empresa_nit:
+            lineas.append(('centro', f"NIT: {self.empresa_nit}"))
+        if self.empresa_direccion:
+            lineas.append(('centro', self.empresa_direccion))
+        if self.empresa_telefono:
+            lineas.append(('centro', f"Tel: {self.empresa_telefono}"))
+
+        anulado = venta_data.get('estado') == 'Anulado'
+        lineas.append(('normal', self._separador('=')))
+        lineas.append(('negrita', self._centrar("RECIBO ANULADO" if anulado else "RECIBO")))
+        lineas.append(('normal', f"Ref: {venta_data['referencia_no']}"))
+        lineas.append(('normal', f"Fecha: {venta_data['fecha']}"))
+        lineas.append(('normal', f"Cliente: {venta_data.get('cliente_nombre', '')}"[:self.columnas]))
+        nit_cliente = str(venta_data.get('cliente_nit', '') or '').strip()
+        if nit_cliente:
+            lineas.append(('normal', f"NIT/DPI: {nit_cliente}"))
+        lineas.append(('normal', self._separador()))
+
+        # Detalle: nombre en una línea, "cant x precio ... subtotal" en la siguiente
+        for detalle in venta_data.get('detalles', []):
+            lineas.append(('normal', str(detalle['producto_nombre'])[:self.columnas]))
+            cantidad_precio = f"  {detalle['cantidad']} x Q {detalle['precio_unitario']:,.2f}"
+            lineas.append(('normal', self._izq_der(cantidad_precio, f"Q {detalle['subtotal']:,.2f}")))
+
+        lineas.append(('normal', self._separador()))
+        lineas.append(('negrita', self._izq_der("TOTAL:", f"Q {venta_data['total']:,.2f}")))
+
+        if venta_data.get('monto_pagado') and venta_data['monto_pagado'] > 0:
+            lineas.append(('normal', self._izq_der("Pagado:", f"Q {venta_data['monto_pagado']:,.2f}")))
+            lineas.append(('normal', self._izq_der("Cambio:", f"Q {venta_data.get('cambio', 0):,.2f}")))
+
+        lineas.append(('normal', self._separador('=')))
+        if anulado:
+            lineas.append(('negrita', self._centrar("*** SIN VALIDEZ ***")))
+        lineas.append(('centro', "Gracias por su compra"))
+        lineas.append(('centro', datetime.now().strftime('%d/%m/%Y %H:%M:%S')))
+        return lineas
+
+    # ===== FORMATOS DE SALIDA =====
+
+    def generar_texto(self, venta_data):
+        """
+        Genera el recibo como texto plano.
+
+        Args:
+            venta_data: Diccionario con la venta (mismo formato que PDFGenerator)
+
+        Returns:
+            str: Recibo listo para imprimir o mostrar
+        """
+        salida = []
+        for estilo, texto in self._lineas(venta_data):
+            if estilo in ('titulo', 'centro'):
+                salida.append(self._centrar(texto))
+            else:
+                salida.append(texto)
+        return "\n".join(salida) + "\n"
+
+    def generar_escpos(self, venta_data, cortar=True):
+        """
+        Genera el recibo como flujo de bytes ESC/POS.
+
+        Args:
+            venta_data: Diccionario con la venta (mismo formato que PDFGenerator)
+            cortar: Si True, agrega el comando de corte de papel al final
+
+        Returns:
+            bytes: Flujo listo para enviar a la impresora
+        """
+        salida = bytearray(CMD_INICIALIZAR + CMD_CODEPAGE_1252)
+
+        for estilo, texto in self._lineas(venta_data):
+            datos = texto.encode('cp1252', errors='replace') + b'\n'
+            if estilo == 'titulo':
+                # En tamaño doble caben la mitad de columnas
+                datos = texto[:self.columnas // 2].encode('cp1252', errors='replace') + b'\n'
+                salida += CMD_ALINEAR_CENTRO + CMD_TAMANO_DOBLE + datos + CMD_TAMANO_NORMAL + CMD_ALINEAR_IZQ
+            elif estilo == 'centro':
+                salida += CMD_ALINEAR_CENTRO + datos + CMD_ALINEAR_IZQ
+            elif estilo == 'negrita':
+                salida += CMD_NEGRITA_ON + datos + CMD_NEGRITA_OFF
+            else:
+                salida += datos
+
+        salida += b'\n\n\n'
+        if cortar:
+            salida += CMD_CORTE_PARCIAL
+        return bytes(salida)
+
+    def imprimir(self, venta_data, sink, formato='escpos'):
+        """
+        Genera el recibo y lo envía al sink indicado.
+
+        Args:
+            venta_data: Diccionario con la venta
+            sink: Destino con método enviar(datos: bytes)
+            formato: 'escpos' o 'texto'
+
+        Returns:
+            Tuple[bool, str]: (éxito, mensaje)
+        """
+        try:
+            if formato == 'texto':
+                datos = self.generar_texto(venta_data).encode('utf-8')
+            else:
+                datos = self.generar_escpos(venta_data)
+            sink.enviar(datos)
+            return True, f"Recibo {venta_data['referencia_no']} enviado a {sink.descripcion()}"
+        except Exception as e:
+            return False, f"Error al imprimir recibo: {str(e)}"
+
+
+def venta_de_prueba():
+    """Venta de ejemplo para el ticket de prueba de la configuración."""
+    return {
+        'referencia_no': 'PRUEBA-0001',
+        'fecha': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+        'cliente_nombre': 'Consumidor Final',
+        'cliente_nit': 'CF',
+        'estado': 'Completada',
+        'detalles': [
+            {'producto_nombre': 'Cuaderno cuadriculado', 'cantidad': 2, 'precio_unitario': 12.5, 'subtotal': 25.0},
+            {'producto_nombre': 'Lápiz HB (niño/niña)', 'cantidad': 3, 'precio_unitario': 1.75, 'subtotal': 5.25},
+        ],
+        'total': 30.25,
+        'monto_pagado': 50.0,
+        'cambio': 19.75,
+    }
+
+
+# ===== DESTINOS DE IMPRESIÓN =====
+
+class ArchivoSink:
+    """Escribe el recibo en un archivo (spool manual o depuración)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def enviar(self, datos):
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(self.ruta, 'wb') as f:
+            f.write(datos)
+
+    def descripcion(self):
+        return self.ruta
+
+
+class ColaImpresoraSink:
+    """Envía el recibo en bruto (RAW) a una impresora de la cola local."""
+
+    def __init__(self, nombre_impresora):
+        self.nombre_impresora = nombre_impresora
+
+    def enviar(self, datos):
+        if sys.platform.startswith('win'):
+            self._enviar_windows(datos)
+        else:
+            # CUPS: -o raw evita que el driver reinterprete los comandos ESC/POS
+            subprocess.run(['lp', '-d', self.nombre_impresora, '-o', 'raw'],
+                           input=datos, check=True, capture_output=True)
+
+    def _enviar_windows(self, datos):
+        """Usa win32print si está disponible, si no copia el archivo al recurso compartido."""
+        try:
+            import win32print
+        except ImportError:
+            win32print = None
+
+        if win32print:
+            handle = win32print.OpenPrinter(self.nombre_impresora)
+            try:
+                win32print.StartDocPrinter(handle, 1, ("Recibo", None, "RAW"))
+                try:
+                    win32print.StartPagePrinter(handle)
+                    win32print.WritePrinter(handle, datos)
+                    win32print.EndPagePrinter(handle)
+                finally:
+                    win32print.EndDocPrinter(handle)
+            finally:
+                win32print.ClosePrinter(handle)
+            return
+
+        # Impresora compartida: copy /b archivo \\localhost\NombreImpresora
+        fd, temporal = tempfile.mkstemp(suffix='.prn')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(datos)
+            destino = self.nombre_impresora
+            if not destino.startswith('\\\\'):
+                destino = f"\\\\localhost\\{destino}"
+            subprocess.run(['cmd', '/c', 'copy', '/b', temporal, destino],
+                           check=True, capture_output=True)
+        finally:
+            os.remove(temporal)
+
+    def descripcion(self):
+        return f"impresora '{self.nombre_impresora}'"
+
+
+class MemoriaSink:
+    """Impresora falsa: acumula los trabajos recibidos (útil para pruebas)."""
+
+    def __init__(self):
+        self.trabajos = []
+
+    def enviar(self, datos):
+        self.trabajos.append(bytes(datos))
+
+    def descripcion(self):
+        return "memoria"
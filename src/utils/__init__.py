@@ -0,0 +1 @@
+# Paquete utils
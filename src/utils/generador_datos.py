@@ -0,0 +1,449 @@
+"""
+Generador de bases de datos sintéticas para pruebas de escala.
+
+Crea una base de datos nueva con el esquema de DatabaseManager (todas las
+migraciones) y la llena simulando la operación de la tienda en orden
+cronológico, de modo que los datos son coherentes entre sí:
+
+- Productos con los campos del SKU (marca, color, tamaño, dibujo, cod_color);
+  una parte son perecederos y sus lotes llevan fecha de vencimiento.
+- Popularidad de productos y clientes con distribución de Zipf: pocos
+  productos concentran la mayoría de las ventas, como en la tienda real.
+- Ventas de varias líneas con estacionalidad (diciembre, fines de semana,
+  horas pico) y un crecimiento leve año con año; ~2% se anulan.
+- Compras en lotes: cuando el stock no alcanza para una venta se repone con
+  un lote nuevo (PEPS: cantidad_disponible se descuenta del lote más antiguo).
+- Caja con la cadena de saldos continua: ventas, compras, devoluciones,
+  gastos operativos, retiros de utilidad y el aporte de capital inicial.
+
+La misma semilla y la misma fecha final (--hasta) producen la misma base de
+datos. Uso:
+
+    python -m src.utils.generador_datos --preset 100k --salida data/prueba_100k.db
+    python -m src.utils.generador_datos --preset 10k --salida x.db --semilla 7 --hasta 31/12/2025
+    python -m src.utils.generador_datos --ventas 5000 --productos 300 --salida x.db
+
+Presets (filas totales aproximadas en todas las tablas): 10k, 100k, 1m.
+"""
+import argparse
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List
+
+# Conteos por preset. Cada venta genera ~7 filas (encabezado, detalle, movimientos
+# de stock y caja) y cada compra 3.
+PRESETS = {
+    '10k': {'productos': 200, 'proveedores': 15, 'clientes': 300, 'ventas': 1300, 'compras': 500, 'anios': 1},
+    '100k': {'productos': 1000, 'proveedores': 40, 'clientes': 3000, 'ventas': 13500, 'compras': 5000, 'anios': 2},
+    '1m': {'productos': 5000, 'proveedores': 120, 'clientes': 25000, 'ventas': 135000, 'compras': 50000,
+           'anios': 3},
+}
+
+SEMILLA = 42
+EXPONENTE_ZIPF_PRODUCTOS = 1.1
+EXPONENTE_ZIPF_CLIENTES = 0.8
+PROPORCION_CONSUMIDOR_FINAL = 0.55
+PROPORCION_ANULADAS = 0.02
+
+# Estacionalidad: factor por mes y por día de la semana (lunes = 0)
+FACTOR_MES = {1: 0.80, 2: 0.85, 3: 0.95, 4: 1.00, 5: 1.05, 6: 1.00,
+              7: 1.00, 8: 0.95, 9: 0.95, 10: 1.05, 11: 1.20, 12: 1.70}
+FACTOR_DIA = (0.90, 0.95, 1.00, 1.00, 1.15, 1.35, 0.60)
+CRECIMIENTO_ANUAL = 0.10
+
+CATEGORIAS = {
+    'Cuadernos': ('Cuaderno', 'Libreta', 'Block'),
+    'Escritura': ('Lapicero', 'Lápiz', 'Marcador', 'Resaltador'),
+    'Arte': ('Crayones', 'Acuarela', 'Témpera', 'Pincel'),
+    'Oficina': ('Folder', 'Engrapadora', 'Clips', 'Archivador'),
+    'Papel': ('Papel Bond', 'Cartulina', 'Papel China', 'Foamy'),
+    'Mochilas': ('Mochila', 'Lonchera', 'Cartuchera'),
+    'Alimentos': ('Galletas', 'Jugo', 'Dulces', 'Snack'),
+}
+CATEGORIAS_PERECEDERAS = {'Alimentos'}
+MARCAS = ('Scribe', 'Bic', 'Faber Castell', 'Pelikan', 'Maped', 'Paper Mate', 'Norma', 'Artesco', 'Pilot', 'Kores')
+COLORES = (('Rojo', 'R01'), ('Azul', 'A02'), ('Negro', 'N03'), ('Verde', 'V04'), ('Amarillo', 'Y05'),
+           ('Blanco', 'B06'), ('Rosado', 'P07'), ('Morado', 'M08'))
+TAMANOS = ('Pequeño', 'Mediano', 'Grande', 'Carta', 'Oficio', 'Unidad', 'Caja 12')
+DIBUJOS = ('', '', '', 'Liso', 'Rayado', 'Cuadriculado', 'Superhéroes', 'Flores')
+NOMBRES = ('José', 'María', 'Juan', 'Ana', 'Carlos', 'Lucía', 'Luis', 'Sofía', 'Pedro', 'Elena',
+           'Miguel', 'Carmen', 'Jorge', 'Rosa', 'Diego', 'Marta', 'Andrés', 'Gabriela', 'Fernando', 'Paola')
+APELLIDOS = ('García', 'López', 'Pérez', 'González', 'Hernández', 'Martínez', 'Ramírez', 'Morales', 'Castillo',
+             'Juárez', 'Méndez', 'Cruz', 'Ortiz', 'Reyes', 'Barrios', 'Urizar', 'Escobar', 'Orellana')
+ZONAS = ('Zona 1', 'Zona 3', 'Zona 7', 'Zona 10', 'Zona 18', 'Mixco', 'Villa Nueva', 'Chimaltenango')
+
+TAMANO_LOTE_INSERCION = 20000
+
+
+def _fecha(dt: datetime) -> str:
+    """Formato de ventas, compras y caja"""
+    return dt.strftime('%d/%m/%Y %H:%M:%S')
+
+
+def _fecha_iso(dt: datetime) -> str:
+    """Formato de movimientos_stock"""
+    return dt.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _restar_anios(fecha: datetime, anios: int) -> datetime:
+    """La misma fecha `anios` años antes; el 29 de febrero pasa al 28 si aquel año no es bisiesto."""
+    try:
+        return fecha.replace(year=fecha.year - anios)
+    except ValueError:
+        return fecha.replace(year=fecha.year - anios, day=28)
+
+
+def _pesos_zipf(n: int, exponente: float, rng: random.Random) -> List[float]:
+    """Pesos 1/rango^s asignados a las posiciones en orden aleatorio."""
+    pesos = [1 / (rango ** exponente) for rango in range(1, n + 1)]
+    rng.shuffle(pesos)
+    return pesos
+
+
+def _elegir(rng: random.Random, acumulados: List[float]) -> int:
+    """Índice elegido según pesos acumulados (búsqueda binaria, sin recorrer la lista)."""
+    return bisect_left(acumulados, rng.random() * acumulados[-1])
+
+
+def _cantidad_linea(rng: random.Random) -> int:
+    r = rng.random()
+    if r < 0.60:
+        return 1
+    if r < 0.80:
+        return 2
+    if r < 0.95:
+        return rng.randint(3, 5)
+    return rng.randint(6, 12)
+
+
+def _lineas_venta(rng: random.Random) -> int:
+    """1 línea en la mitad de las ventas; luego cae geométricamente (máximo 12)."""
+    lineas = 1
+    while lineas < 12 and rng.random() < 0.5:
+        lineas += 1
+    return lineas
+
+
+def _momentos_venta(rng: random.Random, inicio: datetime, fin: datetime, cantidad: int) -> List[datetime]:
+    """Fechas de venta con estacionalidad mensual, semanal, horas pico y crecimiento anual."""
+    dias = [inicio + timedelta(days=i) for i in range((fin - inicio).days + 1)]
+    pesos = [FACTOR_MES[d.month] * FACTOR_DIA[d.weekday()] * (1 + CRECIMIENTO_ANUAL * (d.year - inicio.year))
+             for d in dias]
+    acumulados = list(accumulate(pesos))
+    momentos = []
+    for _ in range(cantidad):
+        dia = dias[_elegir(rng, acumulados)]
+        # Dos picos: media mañana y tarde
+        hora = rng.gauss(11, 1.5) if rng.random() < 0.5 else rng.gauss(16.5, 1.5)
+        hora = min(max(hora, 8.0), 19.99)
+        momentos.append(dia + timedelta(seconds=int(hora * 3600) + rng.randint(0, 59)))
+    momentos.sort()
+    return momentos
+
+
+class _Escritor:
+    """Acumula filas por tabla y las inserta por lotes con executemany."""
+
+    COLUMNAS = {
+        'ventas': ('id', 'referencia_no', 'cliente_id', 'fecha', 'total', 'estado'),
+        'ventas_detalle': ('venta_id', 'producto_id', 'cantidad', 'precio_unitario', 'subtotal'),
+        'movimientos_stock': ('producto_id', 'tipo', 'cantidad', 'motivo', 'fecha'),
+        'movimientos_caja': ('tipo', 'categoria', 'concepto', 'monto', 'saldo_anterior', 'saldo_nuevo',
+                             'fecha', 'usuario'),
+    }
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.filas = {tabla: [] for tabla in self.COLUMNAS}
+        self.totales = {tabla: 0 for tabla in self.COLUMNAS}
+
+    def agregar(self, tabla, fila):
+        pendientes = self.filas[tabla]
+        pendientes.append(fila)
+        if len(pendientes) >= TAMANO_LOTE_INSERCION:
+            self.vaciar(tabla)
+
+    def vaciar(self, tabla=None):
+        for nombre in ([tabla] if tabla else list(self.filas)):
+            filas = self.filas[nombre]
+            if filas:
+                columnas = self.COLUMNAS[nombre]
+                self.conn.executemany(
+                    f"INSERT INTO {nombre} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})",
+                    filas)
+                self.totales[nombre] += len(filas)
+                filas.clear()
+
+
+def generar(ruta: str, preset: str = '10k', semilla: int = SEMILLA, hasta: datetime = None,
+            **conteos) -> Dict[str, int]:
+    """
+    Crea y llena una base de datos nueva en `ruta`.
+
+    Args:
+        preset: Conteos base ('10k', '100k', '1m'); se pueden reemplazar con
+                productos=, proveedores=, clientes=, ventas=, compras=, anios=
+        semilla: Semilla del generador aleatorio
+        hasta: Último día de datos (por defecto hoy); los datos abarcan `anios` años hasta él
+
+    Returns:
+        Filas insertadas por tabla
+    """
+    from src.database.database_manager import DatabaseManager
+    from src.database.normalizacion import normalizar_nit
+
+    if os.path.exists(ruta):
+        raise FileExistsError(f"Ya existe {ruta}")
+    config = dict(PRESETS[preset])
+    config.update({clave: valor for clave, valor in conteos.items() if valor is not None})
+
+    rng = random.Random(semilla)
+    hasta = (hasta or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    inicio = _restar_anios(hasta, config['anios']) + timedelta(days=1)
+
+    # Esquema completo (migraciones) a través de DatabaseManager
+    DatabaseManager(ruta)
+
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    # WAL solo para la carga; al terminar se vuelve al modo de las bases de la aplicación
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('BEGIN')
+    escritor = _Escritor(conn)
+
+    # ----- Proveedores -----
+    proveedores = []
+    for i in range(1, config['proveedores'] + 1):
+        nombre = f"Distribuidora {rng.choice(APELLIDOS)} {rng.choice(('S.A.', 'y Cía.', 'Comercial', ''))}".strip()
+        proveedores.append((i, f"{nombre} #{i}", f"{rng.randint(1000000, 9999999)}-{i % 10}",
+                            f"{rng.randint(1, 30)} Calle {rng.randint(1, 20)}-{rng.randint(10, 99)}, {rng.choice(ZONAS)}",
+                            f"{rng.randint(2000, 5999)}{rng.randint(1000, 9999)}", _fecha_iso(inicio)))
+    conn.executemany('INSERT INTO proveedores (id, nombre, nit_dpi, direccion, telefono, fecha_registro) '
+                     'VALUES (?, ?, ?, ?, ?, ?)', proveedores)
+
+    # ----- Clientes (el 1 es Consumidor Final) -----
+    clientes = [(1, 'Consumidor Final', 'CF', 'Ciudad', '', normalizar_nit('CF'), _fecha_iso(inicio))]
+    for i in range(2, config['clientes'] + 1):
+        nit = f"{rng.randint(100000, 9999999)}{i:05d}"
+        clientes.append((i, f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}", nit,
+                         rng.choice(ZONAS), f"{rng.randint(3000, 5999)}{rng.randint(1000, 9999)}",
+                         normalizar_nit(nit), _fecha_iso(inicio)))
+    conn.executemany('INSERT INTO clientes (id, nombre, nit_dpi, direccion, telefono, nit_normalizado, '
+                     'fecha_registro) VALUES (?, ?, ?, ?, ?, ?, ?)', clientes)
+    nombres_clientes = {fila[0]: fila[1] for fila in clientes}
+    acumulados_clientes = list(accumulate(_pesos_zipf(len(clientes) - 1, EXPONENTE_ZIPF_CLIENTES, rng)))
+
+    # ----- Productos -----
+    productos = []
+    filas_productos = []
+    for i in range(1, config['productos'] + 1):
+        categoria = rng.choice(list(CATEGORIAS))
+        tipo = rng.choice(CATEGORIAS[categoria])
+        marca = rng.choice(MARCAS)
+        color, cod_color = rng.choice(COLORES)
+        tamano = rng.choice(TAMANOS)
+        dibujo = rng.choice(DIBUJOS)
+        nombre = f"{tipo} {marca} {color} {tamano} #{i}"
+        partes = [p.split()[0][:3].upper() for p in (tipo, categoria, marca, color, tamano, dibujo) if p]
+        codigo = '-'.join(partes + [cod_color, f"{i:03d}"])
+        precio_compra = round(min(max(rng.lognormvariate(math.log(25), 0.9), 1.5), 900), 2)
+        ganancia = rng.choice((20, 25, 30, 35, 40, 50, 60))
+        precio_venta = round(precio_compra * (1 + ganancia / 100), 2)
+        perecedero = categoria in CATEGORIAS_PERECEDERAS
+        filas_productos.append((i, codigo, nombre, categoria, precio_compra, ganancia, precio_venta,
+                                round(precio_venta - precio_compra, 2), marca, color, tamano, dibujo, cod_color,
+                                _fecha_iso(inicio - timedelta(days=rng.randint(1, 30)))))
+        productos.append({'id': i, 'nombre': nombre, 'precio_compra': precio_compra, 'precio_venta': precio_venta,
+                          'perecedero': perecedero, 'stock': 0, 'lotes': deque()})
+    conn.executemany('INSERT INTO productos (id, codigo, nombre, categoria, precio_compra, porcentaje_ganancia, '
+                     'precio_venta, monto_ganancia, marca, color, tamaño, dibujo, cod_color, fecha_creacion) '
+                     'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', filas_productos)
+
+    # Tamaño de lote por producto: las compras de reposición suman aproximadamente `compras`
+    pesos_productos = _pesos_zipf(len(productos), EXPONENTE_ZIPF_PRODUCTOS, rng)
+    acumulados_productos = list(accumulate(pesos_productos))
+    total_pesos = acumulados_productos[-1]
+    unidades_por_venta = 2.0 * 2.0  # líneas promedio × cantidad promedio por línea
+    for producto, peso in zip(productos, pesos_productos):
+        demanda = config['ventas'] * unidades_por_venta * peso / total_pesos
+        reposiciones = max(1.0, config['compras'] * peso / total_pesos)
+        producto['lote'] = max(6, math.ceil(demanda / reposiciones))
+
+    # ----- Simulación -----
+    compras = []  # filas completas; cantidad_disponible se fija al final
+    estado = {'saldo': 0.0}
+
+    def caja(tipo, categoria, concepto, monto, momento):
+        anterior = estado['saldo']
+        estado['saldo'] = round(anterior + monto if tipo == 'INGRESO' else anterior - monto, 2)
+        escritor.agregar('movimientos_caja', (tipo, categoria, concepto, round(monto, 2), anterior,
+                                              estado['saldo'], _fecha(momento), 'Sistema'))
+
+    def comprar(producto, momento, minimo=0):
+        proveedor = proveedores[rng.randrange(len(proveedores))]
+        cantidad = max(producto['lote'], minimo)
+        costo = round(producto['precio_compra'] * rng.uniform(0.95, 1.05), 2)
+        compra_id = len(compras) + 1
+        documento = f"FAC-{rng.randint(1000, 9999)}-{compra_id:06d}"
+        vencimiento = None
+        if producto['perecedero']:
+            vencimiento = (momento + timedelta(days=rng.randint(45, 240))).strftime('%d/%m/%Y')
+        lote = [compra_id, cantidad]
+        producto['lotes'].append(lote)
+        producto['stock'] += cantidad
+        compras.append([compra_id, producto['id'], proveedor[0], cantidad, costo, round(cantidad * costo, 2),
+                        documento, _fecha(momento), 1 if vencimiento else 0, vencimiento, lote])
+        escritor.agregar('movimientos_stock', (producto['id'], 'entrada', cantidad, 'compra', _fecha_iso(momento)))
+        caja('EGRESO', 'COMPRA_MERCADERIA', f"Compra #{compra_id} - Proveedor: {proveedor[1]} - Doc: {documento}",
+             cantidad * costo, momento)
+
+    # Capital inicial y primer lote de cada producto
+    caja('INGRESO', 'APORTE_CAPITAL', 'Aporte de capital inicial',
+         sum(p['lote'] * p['precio_compra'] for p in productos) * 1.2 + 10000, inicio + timedelta(hours=7))
+    for producto in productos:
+        comprar(producto, inicio + timedelta(hours=7, minutes=30))
+
+    # Eventos: ventas, anulaciones (pocas horas después) y gastos mensuales
+    eventos = [(momento, 0, None) for momento in _momentos_venta(rng, inicio, hasta, config['ventas'])]
+    anuladas = set(rng.sample(range(len(eventos)), int(len(eventos) * PROPORCION_ANULADAS)))
+    for indice in anuladas:
+        eventos.append((min(eventos[indice][0] + timedelta(minutes=rng.randint(5, 240)),
+                            hasta + timedelta(hours=23)), 1, indice))
+    mes = inicio.replace(day=1)
+    while mes <= hasta:
+        for momento, concepto in ((mes + timedelta(hours=9), 'Pago de alquiler del local'),
+                                  (mes + timedelta(days=14, hours=18), 'Servicios (luz, agua, internet)')):
+            if inicio <= momento <= hasta + timedelta(days=1):
+                eventos.append((momento, 2, concepto))
+        mes = (mes + timedelta(days=32)).replace(day=1)
+    eventos.sort(key=lambda evento: (evento[0], evento[1]))
+
+    ventas_por_indice = {}
+    anulaciones = []
+    venta_id = 0
+    for momento, tipo, dato in eventos:
+        if tipo == 0:
+            # Venta de varias líneas (productos distintos)
+            lineas = {}
+            for _ in range(_lineas_venta(rng)):
+                producto = productos[_elegir(rng, acumulados_productos)]
+                lineas[producto['id']] = lineas.get(producto['id'], 0) + _cantidad_linea(rng)
+            if rng.random() < PROPORCION_CONSUMIDOR_FINAL:
+                cliente_id = 1
+            else:
+                cliente_id = 2 + _elegir(rng, acumulados_clientes)
+            # Reposición antes de la venta si el stock no alcanza
+            for producto_id, cantidad in lineas.items():
+                producto = productos[producto_id - 1]
+                if producto['stock'] < cantidad:
+                    comprar(producto, momento - timedelta(minutes=rng.randint(10, 90)), cantidad)
+
+            venta_id += 1
+            referencia = f"REF{venta_id:06d}"
+            total = 0.0
+            detalle = []
+            for producto_id, cantidad in lineas.items():
+                producto = productos[producto_id - 1]
+                precio = producto['precio_venta']
+                if rng.random() < 0.10:
+                    precio = round(precio * rng.choice((0.90, 0.95)), 2)
+                subtotal = round(cantidad * precio, 2)
+                total += subtotal
+                detalle.append((producto_id, cantidad))
+                escritor.agregar('ventas_detalle', (venta_id, producto_id, cantidad, precio, subtotal))
+                # PEPS: descontar de los lotes más antiguos
+                restante = cantidad
+                lotes = producto['lotes']
+                while restante > 0 and lotes:
+                    lote = lotes[0]
+                    usado = min(lote[1], restante)
+                    lote[1] -= usado
+                    restante -= usado
+                    if lote[1] == 0:
+                        lotes.popleft()
+                producto['stock'] -= cantidad
+                escritor.agregar('movimientos_stock', (producto_id, 'salida', cantidad, 'venta', _fecha_iso(momento)))
+            total = round(total, 2)
+            escritor.agregar('ventas', (venta_id, referencia, cliente_id, _fecha(momento), total, 'Emitido'))
+            caja('INGRESO', 'VENTA', f"Venta #{venta_id} ({referencia}) - Cliente: {nombres_clientes[cliente_id]}",
+                 total, momento)
+            ventas_por_indice[len(ventas_por_indice)] = (venta_id, cliente_id, total, detalle)
+        elif tipo == 1:
+            # Anulación: el stock vuelve al producto (los lotes PEPS no, igual que anular_venta)
+            anulada_id, cliente_id, total, detalle = ventas_por_indice[dato]
+            for producto_id, cantidad in detalle:
+                productos[producto_id - 1]['stock'] += cantidad
+                escritor.agregar('movimientos_stock', (producto_id, 'entrada', cantidad,
+                                                       'Devolución por anulación de venta', _fecha_iso(momento)))
+            caja('EGRESO', 'DEVOLUCION_VENTA',
+                 f"Devolución Venta #{anulada_id} - Cliente: {nombres_clientes[cliente_id]}", total, momento)
+            anulaciones.append((anulada_id,))
+        else:
+            monto = round(rng.uniform(1500, 3000) if 'alquiler' in dato else rng.uniform(300, 900), 2)
+            caja('EGRESO', 'GASTO_OPERATIVO', dato, monto, momento)
+            # Retiro de utilidad cuando la caja acumula de más
+            if 'alquiler' in dato and estado['saldo'] > 50000:
+                caja('EGRESO', 'RETIRO_UTILIDAD', 'Retiro de utilidades del mes',
+                     round(estado['saldo'] * 0.3, 2), momento + timedelta(minutes=5))
+
+    escritor.vaciar()
+    conn.executemany('UPDATE ventas SET estado = ? WHERE id = ?', [('Anulado', fila[0]) for fila in anulaciones])
+    conn.executemany(
+        'INSERT INTO compras (id, producto_id, proveedor_id, cantidad, precio_unitario, total, no_documento, '
+        'fecha, es_perecedero, fecha_vencimiento, cantidad_disponible) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [fila[:10] + [fila[10][1]] for fila in compras])
+    conn.executemany('UPDATE productos SET stock_actual = ? WHERE id = ?',
+                     [(producto['stock'], producto['id']) for producto in productos])
+    # Historial generado: no hay cambios pendientes que replicar o notificar
+    conn.execute('DELETE FROM cambios')
+    conn.execute('COMMIT')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.execute('PRAGMA journal_mode = DELETE')
+    conn.close()
+
+    filas = dict(escritor.totales)
+    filas.update({'productos': len(productos), 'proveedores': len(proveedores), 'clientes': len(clientes),
+                  'compras': len(compras)})
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera una base de datos sintética para pruebas de escala")
+    parser.add_argument('--salida', required=True, help="Ruta de la base de datos a crear")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='10k')
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--hasta', help="Último día de datos dd/mm/yyyy (por defecto hoy)")
+    parser.add_argument('--forzar', action='store_true', help="Reemplazar la base de datos si existe")
+    for clave in ('productos', 'proveedores', 'clientes', 'ventas', 'compras', 'anios'):
+        parser.add_argument(f'--{clave}', type=int)
+    args = parser.parse_args(argv)
+
+    if args.forzar:
+        for sufijo in ('', '-wal', '-shm'):
+            if os.path.exists(args.salida + sufijo):
+                os.remove(args.salida + sufijo)
+    hasta = datetime.strptime(args.hasta, '%d/%m/%Y') if args.hasta else None
+
+    t0 = time.perf_counter()
+    filas = generar(args.salida, args.preset, args.semilla, hasta,
+                    **{clave: getattr(args, clave) for clave in
+                       ('productos', 'proveedores', 'clientes', 'ventas', 'compras', 'anios')})
+    segundos = time.perf_counter() - t0
+
+    print(f"\nBase de datos generada: {args.salida} ({os.path.getsize(args.salida) / 1024 / 1024:,.1f} MB)")
+    for tabla, cantidad in filas.items():
+        print(f"  {tabla:<20} {cantidad:>10,}")
+    print(f"  {'Total':<20} {sum(filas.values()):>10,} filas en {segundos:.1f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Perfilador del arranque de la aplicación.
+
+Registra el tiempo de importación de cada módulo (inclusivo y propio) y la
+duración de las fases del arranque (login, ventana principal). Se activa con:
+
+    python main.py --profile-startup [--startup-budget SEGUNDOS] [--profile-output archivo.json]
+
+Con --profile-tabs además se construye cada pestaña y se cuentan sus widgets.
+"""
+import json
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import Loader, MetaPathFinder
+from typing import Dict, List, Optional
+
+
+class _CargadorCronometrado(Loader):
+    """Envuelve el loader real de un módulo para medir su ejecución."""
+
+    def __init__(self, loader, perfil, nombre):
+        self._loader = loader
+        self._perfil = perfil
+        self._nombre = nombre
+
+    def create_module(self, spec):
+        # Los módulos de extensión (.pyd/.so) hacen su trabajo aquí
+        with self._perfil._medir_modulo(self._nombre + ' [create]'):
+            return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._perfil._medir_modulo(self._nombre):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, nombre):
+        return getattr(self._loader, nombre)
+
+
+class _BuscadorCronometrado(MetaPathFinder):
+    """Finder que delega en los demás y sustituye el loader por uno cronometrado."""
+
+    def __init__(self, perfil):
+        self._perfil = perfil
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _CargadorCronometrado(spec.loader, self._perfil, fullname)
+                return spec
+        return None
+
+
+class PerfilArranque:
+    """Acumula tiempos de importación por módulo y tiempos por fase."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.modulos: Dict[str, Dict[str, float]] = {}
+        self.fases: List[Dict] = []
+        self.widgets: Optional[int] = None
+        self.widgets_por_pestana: Dict[str, int] = {}
+        self._pila: List[List] = []
+        self._buscador = None
+
+    def instalar(self):
+        """Empieza a registrar las importaciones nuevas."""
+        if self._buscador is None:
+            self._buscador = _BuscadorCronometrado(self)
+            sys.meta_path.insert(0, self._buscador)
+
+    def desinstalar(self):
+        """Deja de registrar importaciones."""
+        if self._buscador in sys.meta_path:
+            sys.meta_path.remove(self._buscador)
+        self._buscador = None
+
+    @contextmanager
+    def _medir_modulo(self, nombre):
+        # Cada entrada de la pila: [nombre, tiempo acumulado de los hijos]
+        self._pila.append([nombre, 0.0])
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            inclusivo = time.perf_counter() - t0
+            _, hijos = self._pila.pop()
+            if self._pila:
+                self._pila[-1][1] += inclusivo
+            registro = self.modulos.setdefault(nombre, {'inclusivo': 0.0, 'propio': 0.0})
+            registro['inclusivo'] += inclusivo
+            registro['propio'] += inclusivo - hijos
+
+    @contextmanager
+    def fase(self, nombre):
+        """Mide la duración de una fase del arranque."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases.append({
+                'fase': nombre,
+                'inicio': t0 - self.inicio,
+                'duracion': time.perf_counter() - t0
+            })
+
+    def total(self) -> float:
+        """Tiempo total medido desde la creación del perfil hasta la última fase."""
+        if not self.fases:
+            return time.perf_counter() - self.inicio
+        ultima = self.fases[-1]
+        return ultima['inicio'] + ultima['duracion']
+
+    def a_dict(self) -> Dict:
+        """Devuelve el perfil como diccionario serializable."""
+        return {
+            'total': self.total(),
+            'fases': self.fases,
+            'widgets': self.widgets,
+            'widgets_por_pestana': self.widgets_por_pestana,
+            'modulos': self.modulos,
+        }
+
+    def guardar(self, ruta):
+        """Guarda el perfil en formato JSON."""
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.a_dict(), f, indent=4, ensure_ascii=False)
+
+    def reporte(self, top=25) -> str:
+        """Genera un reporte de texto con las fases y los módulos más lentos."""
+        lineas = ["=" * 70, "PERFIL DE ARRANQUE", "=" * 70]
+        for fase in self.fases:
+            lineas.append(f"{fase['fase']:<40} {fase['duracion'] * 1000:>10.1f} ms")
+        lineas.append(f"{'TOTAL':<40} {self.total() * 1000:>10.1f} ms")
+        if self.widgets is not None:
+            lineas.append(f"{'Widgets creados':<40} {self.widgets:>10d}")
+        for pestana, cantidad in self.widgets_por_pestana.items():
+            lineas.append(f"{'  Widgets pestaña ' + pestana:<40} {cantidad:>10d}")
+
+        lineas.append("")
+        lineas.append(f"{'Módulo (top ' + str(top) + ' por tiempo propio)':<50} {'propio':>9} {'inclusivo':>10}")
+        lineas.append("-" * 70)
+        ordenados = sorted(self.modulos.items(), key=lambda kv: kv[1]['propio'], reverse=True)
+        for nombre, tiempos in ordenados[:top]:
+            lineas.append(f"{nombre[:50]:<50} {tiempos['propio'] * 1000:>7.1f}ms {tiempos['inclusivo'] * 1000:>8.1f}ms")
+        lineas.append(f"Módulos importados durante el arranque: {len(self.modulos)}")
+        return "\n".join(lineas)
+
+
+def contar_widgets(widget) -> int:
+    """Cuenta recursivamente los widgets (incluido el indicado)."""
+    total = 1
+    for hijo in widget.winfo_children():
+        total += contar_widgets(hijo)
+    return total
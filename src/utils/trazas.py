@@ -0,0 +1,172 @@
+"""
+Trazas de operaciones con intervalos anidados (spans).
+
+Una operación visible para el usuario ("finalizar venta", "abrir pestaña
+Ventas", "exportar reporte") pasa por el controlador, la base de datos y los
+widgets. Cada paso se registra como un intervalo con su duración; los
+intervalos abiertos en el mismo hilo quedan anidados, y cada sentencia SQL
+(ver src/database/instrumentacion.py) se agrega como hija del intervalo
+abierto y suma sus filas a él.
+
+Uso:
+    with traza('exportar reporte', categoria='ui'):
+        ...
+
+    @trazado(categoria='ui')
+    def refresh(self): ...
+
+    @trazar_metodos(categoria='controlador')
+    class InventarioController: ...
+
+Los intervalos se guardan en un búfer circular (los más recientes) y se
+exportan en el formato de eventos de Chrome (chrome://tracing, ui.perfetto.dev)
+con exportar_chrome(ruta).
+
+El registro está apagado por defecto (cada intervalo cuesta tiempo y memoria
+en todas las operaciones); se enciende con activar(), que main.py llama con
+--trace o con la opción "Registrar trazas" de Configuración.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List
+
+CAPACIDAD = 50000
+
+_eventos = deque(maxlen=CAPACIDAD)
+_local = threading.local()
+_hilos: Dict[int, str] = {}
+_pilas: Dict[int, List[Dict]] = {}  # pila de cada hilo, para leerla desde otro (monitor de la UI)
+_origen_ns = time.perf_counter_ns()
+
+activo = False
+
+
+def activar(encender: bool = True):
+    """Enciende o apaga el registro de intervalos (apagado, traza() no registra nada)."""
+    global activo
+    activo = bool(encender)
+
+
+def _pila() -> List[Dict]:
+    pila = getattr(_local, 'pila', None)
+    if pila is None:
+        pila = _local.pila = []
+        hilo = threading.current_thread()
+        _hilos[hilo.ident] = hilo.name
+        _pilas[hilo.ident] = pila
+    return pila
+
+
+def ahora_us() -> float:
+    return (time.perf_counter_ns() - _origen_ns) / 1000
+
+
+@contextmanager
+def traza(nombre: str, categoria: str = 'app', **args):
+    """Registra un intervalo; los que se abran dentro (mismo hilo) quedan como hijos."""
+    if not activo:
+        yield None
+        return
+    pila = _pila()
+    intervalo = {'name': nombre, 'cat': categoria, 'ph': 'X', 'ts': ahora_us(),
+                 'pid': os.getpid(), 'tid': threading.get_ident(), 'args': dict(args)}
+    pila.append(intervalo)
+    try:
+        yield intervalo
+    except BaseException as e:
+        intervalo['args']['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        pila.pop()
+        intervalo['dur'] = ahora_us() - intervalo['ts']
+        if pila:
+            # Las filas de las consultas se acumulan hacia arriba
+            padre = pila[-1]['args']
+            for clave in ('filas', 'consultas'):
+                if clave in intervalo['args']:
+                    padre[clave] = padre.get(clave, 0) + intervalo['args'][clave]
+        _eventos.append(intervalo)
+
+
+def trazado(nombre: str = None, categoria: str = 'app'):
+    """Decorador: cada llamada a la función es un intervalo (por defecto con su __qualname__)."""
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__qualname__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not activo:
+                return funcion(*args, **kwargs)
+            with traza(etiqueta, categoria):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def trazar_metodos(categoria: str = 'app', excluir=()):
+    """Decorador de clase: aplica trazado a todos los métodos públicos definidos en ella."""
+    def decorador(clase):
+        for nombre, valor in list(vars(clase).items()):
+            if (nombre.startswith('_') or nombre in excluir or not callable(valor)
+                    or isinstance(valor, (type, staticmethod, classmethod))):
+                continue
+            setattr(clase, nombre, trazado(f"{clase.__name__}.{nombre}", categoria)(valor))
+        return clase
+    return decorador
+
+
+def registrar_sql(sentencia: str, segundos: float, filas: int):
+    """
+    Agrega una sentencia ya ejecutada como hija del intervalo abierto.
+    Sin un intervalo abierto en este hilo no se registra (evita ruido de sondeos).
+    """
+    pila = getattr(_local, 'pila', None)
+    if not activo or not pila:
+        return
+    fin = ahora_us()
+    filas = max(filas, 0)
+    _eventos.append({'name': sentencia[:120], 'cat': 'sql', 'ph': 'X', 'ts': fin - segundos * 1e6,
+                     'dur': segundos * 1e6, 'pid': os.getpid(), 'tid': threading.get_ident(),
+                     'args': {'sql': sentencia, 'filas': filas}})
+    actual = pila[-1]['args']
+    actual['filas'] = actual.get('filas', 0) + filas
+    actual['consultas'] = actual.get('consultas', 0) + 1
+
+
+def registrar_intervalo(nombre: str, categoria: str, inicio_us: float, dur_us: float, tid=None, **args):
+    """Agrega un intervalo medido por fuera de traza() (inicio en la escala de ahora_us())."""
+    if activo:
+        _eventos.append({'name': nombre, 'cat': categoria, 'ph': 'X', 'ts': inicio_us, 'dur': dur_us,
+                         'pid': os.getpid(), 'tid': tid or threading.get_ident(), 'args': args})
+
+
+def abiertos(tid: int) -> List[str]:
+    """Nombres de los intervalos abiertos en otro hilo, del más externo al más interno."""
+    # Copia: el otro hilo puede estar agregando o quitando intervalos
+    return [intervalo['name'] for intervalo in list(_pilas.get(tid, ()))]
+
+
+def eventos() -> List[Dict]:
+    """Copia de los intervalos registrados (terminados), en orden de término."""
+    return list(_eventos)
+
+
+def limpiar():
+    _eventos.clear()
+
+
+def exportar_chrome(ruta) -> int:
+    """Escribe los intervalos en formato Chrome trace-event JSON. Devuelve cuántos se escribieron."""
+    registrados = eventos()
+    pid = os.getpid()
+    metadatos = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'Inventarios'}}]
+    metadatos += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': nombre}}
+                  for tid, nombre in list(_hilos.items())]
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': metadatos + registrados, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+    return len(registrados)
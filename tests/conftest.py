@@ -0,0 +1,20 @@
+"""
+Configuración común de las pruebas.
+
+Settings guarda data/config.json relativo a la carpeta actual: cada prueba
+corre en su propia carpeta temporal para no tocar la configuración real.
+"""
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture(autouse=True)
+def carpeta_temporal(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,62 @@
+"""Pruebas de agregaciones_reportes: con NumPy y sin él el resultado es el mismo."""
+import pytest
+
+from src.controllers import agregaciones_reportes
+from src.controllers.agregaciones_reportes import resumen_ventas, top_n
+from src.controllers.inventario_controller import InventarioController
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.fixture
+def usar_numpy(monkeypatch):
+    def usar(activo):
+        monkeypatch.setattr(agregaciones_reportes, '_numpy', (lambda: np) if activo else (lambda: None))
+    return usar
+
+
+@pytest.fixture
+def controller(carpeta_temporal):
+    controller = InventarioController(str(carpeta_temporal / 'inventario.db'))
+    controller.crear_proveedor('Distribuidora', '1234567', 'Cobán')
+    controller.crear_cliente('Ana', '7654321', 'Cobán')
+    for numero in range(1, 7):
+        controller.crear_producto(f'P{numero:03d}', f'Producto {numero}', 'Papelería', 10.0, 50)
+        controller.registrar_compra(numero, 50, 10.0, 1, f'F-{numero}', '01/01/2024 09:00:00')
+    # Ventas con montos empatados entre productos y en varios meses y formatos de fecha
+    for numero, cantidad, fecha in ((1, 2, '15/01/2024 10:00:00'), (2, 2, '20/01/2024 10:00:00'),
+                                    (3, 4, '03/02/2024 10:00:00'), (4, 2, '29/02/2024 10:00:00'),
+                                    (5, 1, '10/03/2024 10:00:00'), (6, 4, '11/03/2024 10:00:00')):
+        exito, mensaje, _ = controller.registrar_venta_con_carrito(
+            1, [{'producto_id': numero, 'cantidad': cantidad, 'precio_unitario': 15.0}], fecha)
+        assert exito, mensaje
+    controller.db.execute_update("UPDATE ventas SET fecha = '2024-03-10 10:00:00' WHERE id = 5")
+    yield controller
+    controller.db.cola_escritura.cerrar()
+
+
+@pytest.mark.parametrize('valores, n', [
+    ([3.0, 1.0, 3.0, 2.0, 3.0], 2),
+    ([5.0, 5.0, 5.0, 5.0], 3),
+    ([1.0, 2.0, 2.0, 0.0], 10),
+    ([4.0, 1.0], 0),
+])
+def test_top_n_desempata_por_posicion_en_ambos_caminos(usar_numpy, valores, n):
+    usar_numpy(False)
+    esperado = top_n(valores, n)
+    usar_numpy(True)
+    assert top_n(valores, n) == esperado
+
+
+@pytest.mark.parametrize('periodo', ['dia', 'semana', 'mes', 'anio'])
+def test_resumen_ventas_igual_con_y_usar_numpy(controller, usar_numpy, periodo):
+    usar_numpy(False)
+    esperado = resumen_ventas(controller.db, tipo_periodo=periodo, top=3)
+    usar_numpy(True)
+    obtenido = resumen_ventas(controller.db, tipo_periodo=periodo, top=3)
+
+    assert [p['producto_id'] for p in obtenido['top_productos']] == [3, 6, 1]
+    assert obtenido['por_periodo'] == esperado['por_periodo']
+    assert obtenido['top_productos'] == esperado['top_productos']
+    for clave in ('ventas', 'costo', 'ganancia', 'unidades', 'lineas'):
+        assert obtenido[clave] == pytest.approx(esperado[clave])
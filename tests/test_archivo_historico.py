@@ -0,0 +1,40 @@
+"""Pruebas del archivo histórico: archivar espera a otra terminal que está escribiendo."""
+import sqlite3
+import threading
+import time
+
+from src.controllers.inventario_controller import InventarioController
+
+
+def test_archivar_espera_el_bloqueo_de_otra_conexion(carpeta_temporal):
+    controller = InventarioController(str(carpeta_temporal / 'inventario.db'))
+    try:
+        controller.crear_producto('P001', 'Cuaderno', 'Papelería', 10.0, 50)
+        controller.crear_proveedor('Distribuidora', '1234567', 'Cobán')
+        controller.crear_cliente('Ana', '7654321', 'Cobán')
+        controller.registrar_compra(1, 5, 10.0, 1, 'F-1', '01/03/2023 09:00:00')
+        exito, mensaje, _ = controller.registrar_venta_con_carrito(
+            1, [{'producto_id': 1, 'cantidad': 5, 'precio_unitario': 15.0}], '02/03/2023 10:00:00')
+        assert exito, mensaje
+        controller.db.cola_escritura.vaciar()
+
+        # Otra terminal tiene la base bloqueada para escribir durante un momento
+        otra = sqlite3.connect(controller.db.db_path, check_same_thread=False)
+        otra.execute('BEGIN IMMEDIATE')
+        liberar = threading.Timer(0.3, otra.commit)
+        liberar.start()
+        t0 = time.perf_counter()
+        try:
+            movidas = controller.db.archivar_anio(2023)
+        finally:
+            liberar.join()
+            otra.close()
+
+        assert time.perf_counter() - t0 >= 0.25
+        assert movidas['ventas'] == 1
+        assert movidas['compras'] == 1
+        assert controller.db.execute_query('SELECT COUNT(*) AS n FROM ventas')[0]['n'] == 0
+        assert controller.db.execute_query('SELECT COUNT(*) AS n FROM ventas', historico=True)[0]['n'] == 1
+        assert controller.db.obtener_anios_archivados() == [2023]
+    finally:
+        controller.db.cola_escritura.cerrar()
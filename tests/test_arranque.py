@@ -0,0 +1,110 @@
+"""
+Arranque en frío.
+
+La comprobación sin pantalla importa main y los módulos que se cargan al
+arrancar en un intérprete nuevo y falla si alguno arrastra módulos que deben
+importarse solo al usarlos (pandas, numpy, openpyxl, reportlab).
+
+La medición con ventanas es opcional (PRUEBA_ARRANQUE=1): python main.py
+--profile-startup construye el login y la ventana principal, mide y cierra.
+Falla si el arranque excede el presupuesto, que se puede ajustar por equipo
+con PRESUPUESTO_ARRANQUE_S. Se omite sin pantalla o sin ttkbootstrap.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRESUPUESTO_ARRANQUE_S = float(os.environ.get('PRESUPUESTO_ARRANQUE_S', '3.0'))
+
+# Módulos pesados que solo se cargan al exportar, generar un PDF o leer un Excel
+DIFERIDOS = ('pandas', 'numpy', 'openpyxl', 'reportlab')
+
+# Lo que se importa al arrancar sin crear ventanas
+MODULOS_ARRANQUE = (
+    'main',
+    'src.config.settings',
+    'src.controllers.inventario_controller',
+    'src.controllers.agregaciones_reportes',
+    'src.controllers.reportes_exportacion',
+    'src.database.database_manager',
+    'src.ui.utils.lector_codigos',
+    'src.ui.utils.monitor_ui',
+    'src.ui.utils.planificador_refresco',
+    'src.ui.utils.puente_tk',
+    'src.ui.utils.recibo_termico',
+    'src.utils.perfil_arranque',
+)
+
+# Necesitan ttkbootstrap; se importan solo si está instalado
+MODULOS_INTERFAZ = (
+    'src.ui.login_window',
+    'src.ui.main_window',
+)
+
+SCRIPT_IMPORTS = '''
+import importlib, json, sys
+modulos = json.loads(sys.argv[1])
+try:
+    import ttkbootstrap
+    modulos += json.loads(sys.argv[2])
+except ImportError:
+    pass
+for nombre in modulos:
+    importlib.import_module(nombre)
+from src.controllers.inventario_controller import InventarioController
+controller = InventarioController('inventario.db')
+controller.db.cola_escritura.cerrar()
+print(json.dumps(sorted({nombre.split('.')[0] for nombre in sys.modules})))
+'''
+
+
+def _hay_pantalla():
+    try:
+        import tkinter
+        raiz = tkinter.Tk()
+    except Exception:
+        return False
+    raiz.destroy()
+    return True
+
+
+def test_importar_sin_cargar_modulos_diferidos(carpeta_temporal):
+    # Intérprete nuevo: lo que otras pruebas ya importaron no cuenta
+    proceso = subprocess.run(
+        [sys.executable, '-c', SCRIPT_IMPORTS, json.dumps(MODULOS_ARRANQUE), json.dumps(MODULOS_INTERFAZ)],
+        cwd=carpeta_temporal, capture_output=True, text=True, timeout=60,
+        env={**os.environ, 'PYTHONPATH': RAIZ}
+    )
+
+    assert proceso.returncode == 0, proceso.stderr
+    cargados = set(json.loads(proceso.stdout.strip().splitlines()[-1]))
+    assert not cargados.intersection(DIFERIDOS), f"Cargados al importar: {cargados.intersection(DIFERIDOS)}"
+
+
+@pytest.mark.skipif(os.environ.get('PRUEBA_ARRANQUE') != '1',
+                    reason="medición con ventanas: activar con PRUEBA_ARRANQUE=1")
+def test_arranque_dentro_del_presupuesto(carpeta_temporal):
+    pytest.importorskip('ttkbootstrap')
+    if not _hay_pantalla():
+        pytest.skip("sin pantalla para crear ventanas Tk")
+    salida = carpeta_temporal / 'perfil.json'
+
+    # En la carpeta temporal: crea su propia configuración y base de datos vacías
+    proceso = subprocess.run(
+        [sys.executable, os.path.join(RAIZ, 'main.py'), '--profile-startup',
+         '--startup-budget', str(PRESUPUESTO_ARRANQUE_S), '--profile-output', str(salida)],
+        cwd=carpeta_temporal, capture_output=True, text=True, timeout=120
+    )
+
+    assert salida.exists(), proceso.stdout + proceso.stderr
+    perfil = json.loads(salida.read_text(encoding='utf-8'))
+    cargados = {nombre.split('.')[0] for nombre in perfil['modulos']}
+    assert not cargados.intersection(DIFERIDOS), f"Cargados en el arranque: {cargados.intersection(DIFERIDOS)}"
+    assert proceso.returncode == 0, (
+        f"Arranque de {perfil['total']:.2f}s (presupuesto {PRESUPUESTO_ARRANQUE_S:.2f}s)\n{proceso.stdout}"
+    )
@@ -0,0 +1,105 @@
+"""Pruebas del NIT normalizado de clientes: búsqueda exacta, duplicados e índice en bases antiguas."""
+import sqlite3
+
+import pytest
+
+from src.controllers.inventario_controller import InventarioController
+from src.database import migraciones
+from src.database.normalizacion import normalizar_nit
+
+
+@pytest.fixture
+def controller(carpeta_temporal):
+    controller = InventarioController(str(carpeta_temporal / 'inventario.db'))
+    yield controller
+    controller.db.cola_escritura.cerrar()
+
+
+def nit_normalizado(controller, cliente_id):
+    return controller.db.execute_query('SELECT nit_normalizado FROM clientes WHERE id = ?',
+                                       (cliente_id,))[0]['nit_normalizado']
+
+
+def test_normalizar_nit():
+    assert normalizar_nit(' 123-4k ') == '123-4K'
+    assert normalizar_nit('cf') == normalizar_nit('CF ')
+    assert normalizar_nit(None) == ''
+
+
+def test_crear_cliente_devuelve_su_id(controller):
+    exito, mensaje, cliente_id = controller.crear_cliente('Ana', '123-4k', 'Cobán')
+
+    assert exito
+    assert mensaje == f"Cliente creado con ID: {cliente_id}"
+    assert controller.obtener_cliente_por_id(cliente_id)['nombre'] == 'Ana'
+    assert nit_normalizado(controller, cliente_id) == '123-4K'
+
+
+def test_busqueda_por_nit_ignora_mayusculas_y_espacios(controller):
+    _, _, cliente_id = controller.crear_cliente('Ana', '123-4k', 'Cobán')
+
+    for nit in ('123-4k', '123-4K', '  123-4K ', '\t123-4k'):
+        assert controller.obtener_cliente_por_nit(nit)['id'] == cliente_id
+    assert controller.obtener_cliente_por_nit('123-4') is None
+    assert controller.obtener_cliente_por_nit('   ') is None
+
+
+def test_controlador_rechaza_nit_duplicado(controller):
+    controller.crear_cliente('Ana', '123-4k', 'Cobán')
+
+    exito, mensaje, cliente_id = controller.crear_cliente('Otra Ana', ' 123-4K ', 'Cobán')
+
+    assert not exito
+    assert cliente_id is None
+    assert 'Ya existe' in mensaje
+    assert len(controller.obtener_clientes()) == 1
+
+
+def test_actualizar_cliente_sincroniza_nit_normalizado(controller):
+    _, _, ana = controller.crear_cliente('Ana', '123-4k', 'Cobán')
+    _, _, luis = controller.crear_cliente('Luis', '999', 'Cobán')
+
+    exito, _ = controller.actualizar_cliente(ana, 'Ana', ' 555-1x ', 'Cobán')
+    assert exito
+    assert nit_normalizado(controller, ana) == '555-1X'
+    assert controller.obtener_cliente_por_nit('555-1X')['id'] == ana
+    assert controller.obtener_cliente_por_nit('123-4k') is None
+
+    # El mismo NIT del propio cliente con otro formato no es un duplicado
+    exito, _ = controller.actualizar_cliente(ana, 'Ana María', '555-1X', 'Cobán')
+    assert exito
+
+    exito, mensaje = controller.actualizar_cliente(luis, 'Luis', '555-1x', 'Cobán')
+    assert not exito
+    assert 'Ya existe' in mensaje
+    assert nit_normalizado(controller, luis) == '999'
+
+
+def test_base_antigua_con_duplicados_usa_indice_no_unico(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'antigua.db')
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    try:
+        migraciones.aplicar_migraciones(conn, 0)
+        # Base de datos en la versión 1: sin índice y con NIT que solo difieren en el formato
+        conn.execute('DROP INDEX idx_clientes_nit_normalizado')
+        conn.execute('DELETE FROM schema_version WHERE version >= 2')
+        conn.execute("INSERT INTO clientes (nombre, nit_dpi, direccion) VALUES ('Ana', '123-4k', 'Cobán')")
+        conn.execute("INSERT INTO clientes (nombre, nit_dpi, direccion) VALUES ('Ana', ' 123-4K ', 'Cobán')")
+
+        migraciones.aplicar_migraciones(conn, 1)
+
+        indices = dict(conn.execute(
+            "SELECT name, \"unique\" FROM pragma_index_list('clientes')").fetchall())
+        assert indices['idx_clientes_nit_normalizado'] == 0
+        assert [fila[0] for fila in conn.execute('SELECT nit_normalizado FROM clientes ORDER BY id')] == \
+            ['123-4K', '123-4K']
+        assert migraciones.version_actual(conn) == migraciones.VERSION_ESQUEMA
+    finally:
+        conn.close()
+
+    # La búsqueda devuelve el primero de los duplicados
+    controller = InventarioController(ruta)
+    try:
+        assert controller.obtener_cliente_por_nit('123-4K')['id'] == 1
+    finally:
+        controller.db.cola_escritura.cerrar()
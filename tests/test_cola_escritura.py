@@ -0,0 +1,153 @@
+"""Pruebas de la cola de escritura diferida: lo pendiente no se pierde si falla la escritura al cerrar."""
+import gc
+import sqlite3
+import weakref
+
+from src.database.cola_escritura import ColaEscritura
+
+INSERTAR = 'INSERT INTO bitacora (texto) VALUES (?)'
+
+
+def crear_base(ruta):
+    conn = sqlite3.connect(ruta)
+    conn.execute('CREATE TABLE bitacora (id INTEGER PRIMARY KEY, texto TEXT)')
+    conn.commit()
+    conn.close()
+
+
+def textos(ruta):
+    conn = sqlite3.connect(ruta)
+    try:
+        return [fila[0] for fila in conn.execute('SELECT texto FROM bitacora ORDER BY id')]
+    finally:
+        conn.close()
+
+
+def cola_que_falla(ruta, estado):
+    """Cola cuya conexión falla mientras estado['fallar'] sea True."""
+    def conectar():
+        if estado['fallar']:
+            raise sqlite3.OperationalError("database is locked")
+        return sqlite3.connect(ruta)
+    return ColaEscritura(ruta, intervalo_ms=60000, conectar=conectar)
+
+
+def test_cerrar_escribe_lo_pendiente(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'base.db')
+    crear_base(ruta)
+    cola = ColaEscritura(ruta, intervalo_ms=60000)
+    cola.agregar(INSERTAR, ('a',))
+    cola.agregar(INSERTAR, ('b',))
+
+    cola.cerrar()
+
+    assert textos(ruta) == ['a', 'b']
+    assert not (carpeta_temporal / 'base.db.pendientes').exists()
+
+
+def test_fallo_al_cerrar_guarda_y_recupera_las_filas(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'base.db')
+    crear_base(ruta)
+    estado = {'fallar': False}
+    cola = cola_que_falla(ruta, estado)
+    cola.agregar(INSERTAR, ('a',))
+    cola.agregar(INSERTAR, ('ñandú',))
+
+    estado['fallar'] = True
+    cola.cerrar()  # no lanza: las filas van al archivo de pendientes
+    # Con la cola cerrada se escribe de inmediato; si falla, también va al archivo
+    cola.agregar(INSERTAR, ('c',))
+
+    assert textos(ruta) == []
+    assert (carpeta_temporal / 'base.db.pendientes').exists()
+
+    # La siguiente sesión: si todavía falla se conserva el archivo
+    siguiente = cola_que_falla(ruta, estado)
+    assert siguiente.recuperar_pendientes() == 0
+    assert (carpeta_temporal / 'base.db.pendientes').exists()
+
+    estado['fallar'] = False
+    assert siguiente.recuperar_pendientes() == 3
+    assert textos(ruta) == ['a', 'ñandú', 'c']
+    assert not (carpeta_temporal / 'base.db.pendientes').exists()
+    siguiente.cerrar()
+
+
+def test_bloqueo_devuelve_las_filas_a_la_cola(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'base.db')
+    crear_base(ruta)
+    estado = {'fallar': True}
+    cola = cola_que_falla(ruta, estado)
+    cola.agregar(INSERTAR, ('a',))
+
+    assert cola.vaciar() == 0  # no lanza a quien lee
+    assert cola.pendientes() == 1
+
+    estado['fallar'] = False
+    cola.cerrar()
+    assert textos(ruta) == ['a']
+
+
+def test_fila_con_error_se_aparta_sin_detener_la_cola(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'base.db')
+    crear_base(ruta)
+    conn = sqlite3.connect(ruta)
+    conn.execute("""
+        CREATE TRIGGER rechazar BEFORE INSERT ON bitacora WHEN NEW.texto = 'mala'
+        BEGIN SELECT RAISE(ABORT, 'fila rechazada'); END
+    """)
+    conn.commit()
+    conn.close()
+    cola = ColaEscritura(ruta, intervalo_ms=60000)
+    cola.agregar(INSERTAR, ('a',))
+    cola.agregar(INSERTAR, ('mala',))
+    cola.agregar(INSERTAR, ('b',))
+
+    assert cola.vaciar() == 3
+    assert cola.pendientes() == 0
+    assert textos(ruta) == ['a', 'b']
+    pendientes = carpeta_temporal / 'base.db.pendientes'
+    assert 'mala' in pendientes.read_text(encoding='utf-8')
+
+    # La cola sigue escribiendo lo que viene después
+    cola.agregar(INSERTAR, ('c',))
+    cola.cerrar()
+    assert textos(ruta) == ['a', 'b', 'c']
+
+    # Al volver a abrir, la fila que sigue fallando se conserva
+    siguiente = ColaEscritura(ruta, intervalo_ms=60000)
+    assert siguiente.recuperar_pendientes() == 0
+    assert pendientes.read_text(encoding='utf-8').count('\n') == 1
+    siguiente.cerrar()
+
+
+def test_vaciar_no_lanza_si_otra_conexion_bloquea(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'base.db')
+    crear_base(ruta)
+    cola = ColaEscritura(ruta, intervalo_ms=60000,
+                         conectar=lambda: sqlite3.connect(ruta, timeout=0.05))
+    cola.agregar(INSERTAR, ('a',))
+    otra = sqlite3.connect(ruta, isolation_level=None)
+    otra.execute('BEGIN IMMEDIATE')
+    try:
+        assert cola.vaciar() == 0
+        assert cola.pendientes() == 1
+    finally:
+        otra.execute('ROLLBACK')
+        otra.close()
+
+    cola.cerrar()
+    assert textos(ruta) == ['a']
+
+
+def test_cerrar_quita_el_registro_de_atexit(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'base.db')
+    crear_base(ruta)
+    cola = ColaEscritura(ruta, intervalo_ms=60000)
+    referencia = weakref.ref(cola)
+
+    cola.cerrar()
+    del cola
+    gc.collect()
+    # atexit ya no guarda una referencia a la cola cerrada
+    assert referencia() is None
@@ -0,0 +1,48 @@
+"""Pruebas de Columnas: el resultado no depende de cómo se reparten las filas en lotes."""
+import sqlite3
+
+import pytest
+
+from src.database.filas import Columnas
+
+FILAS = [
+    (1, 1.5, 'Efectivo', None, 5),
+    (2, None, 'Tarjeta', 3, 'sin dato'),
+    (3, 2.0, 'Efectivo', 4, 6),
+]
+NOMBRES = ('id', 'total', 'pago', 'descuento', 'mixta')
+
+
+def como_listas(columnas):
+    return {nombre: [None if valor != valor else valor for valor in columnas[nombre]]
+            for nombre in columnas.nombres}
+
+
+@pytest.mark.parametrize('tamano_lote', [1, 2, 100])
+def test_lotes_dan_el_mismo_resultado(tamano_lote):
+    columnas = Columnas(NOMBRES, FILAS, tamano_lote=tamano_lote)
+
+    assert len(columnas) == 3
+    assert columnas.numericas() == ('id', 'total', 'descuento')
+    assert columnas['id'].typecode == 'q'
+    assert columnas['descuento'].typecode == 'd'
+    # Una columna que pasa a texto en un lote posterior conserva los enteros y vacíos anteriores
+    assert como_listas(columnas) == {nombre: [fila[posicion] for fila in FILAS]
+                                     for posicion, nombre in enumerate(NOMBRES)}
+    assert columnas['pago'][0] is columnas['pago'][2]
+
+
+def test_desde_cursor_lee_con_fetchmany():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE t (id INTEGER, total REAL, pago TEXT, descuento INTEGER, mixta)')
+    conn.executemany('INSERT INTO t VALUES (?, ?, ?, ?, ?)', FILAS)
+
+    columnas = Columnas.desde_cursor(conn.execute('SELECT * FROM t ORDER BY id'), tamano_lote=2)
+
+    assert columnas.nombres == NOMBRES
+    assert como_listas(columnas) == como_listas(Columnas(NOMBRES, FILAS))
+
+
+def test_numericas_indicadas_rechazan_texto_en_cualquier_lote():
+    with pytest.raises(ValueError):
+        Columnas(NOMBRES, FILAS, numericas=('id', 'mixta'), tamano_lote=1)
@@ -0,0 +1,125 @@
+"""Pruebas del ejecutor de base de datos y del puente al hilo de Tk (con una raíz simulada)."""
+import threading
+import time
+
+import pytest
+
+from src.database.ejecutor import EjecutorBD
+from src.ui.utils.puente_tk import PuenteTk
+
+
+class RaizFalsa:
+    """Guarda lo programado con after para ejecutarlo a mano, como el bucle de Tk."""
+
+    def __init__(self):
+        self.programadas = []
+
+    def after(self, _ms, funcion):
+        self.programadas.append(funcion)
+
+    def ciclo(self):
+        programadas, self.programadas = self.programadas, []
+        for funcion in programadas:
+            funcion()
+
+
+@pytest.fixture
+def ejecutor():
+    ejecutor = EjecutorBD(lectores=2)
+    yield ejecutor
+    ejecutor.cerrar()
+
+
+def test_escrituras_en_orden_y_en_un_solo_hilo(ejecutor):
+    orden = []
+    hilos = set()
+
+    def escribir(numero):
+        time.sleep(0.001 * (numero % 3))
+        hilos.add(threading.current_thread().name)
+        orden.append(numero)
+        return numero * 2
+
+    futuros = [ejecutor.escribir(escribir, numero) for numero in range(20)]
+
+    assert [futuro.result(timeout=5) for futuro in futuros] == [numero * 2 for numero in range(20)]
+    assert orden == list(range(20))
+    assert len(hilos) == 1
+    assert hilos.pop().startswith('bd-escritura')
+
+
+def test_lecturas_en_hilos_lectores(ejecutor):
+    futuro = ejecutor.leer(lambda: threading.current_thread().name)
+
+    assert futuro.result(timeout=5).startswith('bd-lectura')
+
+
+def test_excepcion_llega_al_future(ejecutor):
+    def falla():
+        raise ValueError('sin stock')
+
+    futuro = ejecutor.escribir(falla)
+
+    with pytest.raises(ValueError):
+        futuro.result(timeout=5)
+    assert ejecutor.pendientes() == 0
+
+
+def test_mantenimiento_en_hilo_propio(ejecutor):
+    futuro = ejecutor.mantener(lambda: threading.current_thread().name)
+
+    assert futuro.result(timeout=5) == 'bd-mantenimiento'
+
+
+def test_cerrar_termina_lo_encolado():
+    ejecutor = EjecutorBD()
+    hechas = []
+    liberar = threading.Event()
+    ejecutor.escribir(liberar.wait, 5)
+    futuros = [ejecutor.escribir(hechas.append, numero) for numero in range(5)]
+    assert ejecutor.pendientes() == 6
+
+    liberar.set()
+    ejecutor.cerrar(esperar=True)
+
+    assert hechas == list(range(5))
+    assert all(futuro.done() for futuro in futuros)
+    assert ejecutor.pendientes() == 0
+    with pytest.raises(RuntimeError):
+        ejecutor.escribir(hechas.append, 99)
+
+
+def test_puente_entrega_el_resultado_en_el_hilo_de_la_raiz(ejecutor):
+    raiz = RaizFalsa()
+    puente = PuenteTk(raiz)
+    recibidos = []
+
+    futuro = ejecutor.escribir(lambda: 42)
+    puente.al_completar(futuro, lambda resultado: recibidos.append((resultado, threading.current_thread())))
+    futuro.result(timeout=5)
+    assert recibidos == []  # hasta que la raíz revise la cola
+
+    raiz.ciclo()
+
+    assert recibidos == [(42, threading.main_thread())]
+    assert len(raiz.programadas) == 1  # vuelve a programarse
+
+
+def test_puente_entrega_errores_y_se_detiene(ejecutor):
+    raiz = RaizFalsa()
+    puente = PuenteTk(raiz)
+    errores = []
+
+    def falla():
+        raise ValueError('base bloqueada')
+
+    futuro = ejecutor.escribir(falla)
+    puente.al_completar(futuro, lambda resultado: None, errores.append)
+    with pytest.raises(ValueError):
+        futuro.result(timeout=5)
+    puente.llamar(lambda: 1 / 0)  # un error en una llamada no detiene el drenado
+    puente.detener()
+    raiz.ciclo()
+
+    assert [str(error) for error in errores] == ['base bloqueada']
+    assert raiz.programadas == []
@@ -0,0 +1,71 @@
+"""Pruebas del bus de eventos del controlador."""
+import threading
+
+import pytest
+
+from src.controllers.inventario_controller import InventarioController
+
+
+@pytest.fixture
+def controller(carpeta_temporal):
+    controller = InventarioController(str(carpeta_temporal / 'inventario.db'))
+    yield controller
+    controller.db.cola_escritura.cerrar()
+
+
+def test_suscriptor_que_falla_no_afecta_a_los_demas(controller):
+    recibidos = []
+
+    def falla(**datos):
+        raise RuntimeError('suscriptor roto')
+
+    controller.suscribir('sale_added', lambda **datos: recibidos.append(('antes', datos)))
+    controller.suscribir('sale_added', falla)
+    controller.suscribir('sale_added', lambda **datos: recibidos.append(('despues', datos)))
+
+    controller.emitir('sale_added', venta_id=7)
+
+    assert recibidos == [('antes', {'venta_id': 7}), ('despues', {'venta_id': 7})]
+
+
+def test_suscribir_dos_veces_y_desuscribir(controller):
+    recibidos = []
+    callback = lambda **datos: recibidos.append(datos)
+
+    controller.suscribir('cash_moved', callback)
+    controller.suscribir('cash_moved', callback)
+    controller.emitir('cash_moved', movimiento_id=1, accion='crear')
+    controller.desuscribir('cash_moved', callback)
+    controller.emitir('cash_moved', movimiento_id=2, accion='crear')
+
+    assert recibidos == [{'movimiento_id': 1, 'accion': 'crear'}]
+
+
+def test_evento_desconocido(controller):
+    with pytest.raises(ValueError):
+        controller.suscribir('venta_creada', lambda **datos: None)
+
+
+def test_escritura_emite_sus_eventos(controller):
+    eventos = []
+    controller.suscribir('product_changed', lambda **datos: eventos.append(datos))
+
+    controller.crear_producto('P001', 'Cuaderno', 'Papelería', 10.0, 50)
+
+    assert [evento['accion'] for evento in eventos] == ['crear']
+
+
+def test_emitir_desde_otro_hilo_pasa_por_el_despachador(controller):
+    despachados = []
+    recibidos = []
+    controller.configurar_ejecutor(None, lambda funcion, *args: despachados.append((funcion, args)))
+    controller.suscribir('sale_added', lambda **datos: recibidos.append(threading.current_thread()))
+
+    hilo = threading.Thread(target=controller.emitir, args=('sale_added',), kwargs={'venta_id': 1})
+    hilo.start()
+    hilo.join()
+    assert recibidos == []  # todavía no se ejecutó en el hilo principal
+
+    for funcion, args in despachados:
+        funcion(*args)
+    assert recibidos == [threading.main_thread()]
@@ -0,0 +1,20 @@
+"""Pruebas del generador de datos: fecha final en 29 de febrero y modo de diario de la base resultante."""
+import sqlite3
+from datetime import datetime
+
+from src.utils.generador_datos import generar
+
+CONTEOS = dict(productos=20, proveedores=3, clientes=20, ventas=50, compras=20, anios=1)
+
+
+def test_hasta_29_de_febrero_deja_la_base_en_modo_delete(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'generada.db')
+
+    filas = generar(ruta, semilla=7, hasta=datetime(2024, 2, 29), **CONTEOS)
+
+    assert filas['ventas'] == 50
+    conn = sqlite3.connect(ruta)
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+    primera = conn.execute('SELECT MIN(fecha_registro) FROM proveedores').fetchone()[0]
+    conn.close()
+    assert primera.startswith('2023-03-01')
@@ -0,0 +1,75 @@
+"""Pruebas del índice de códigos del controlador (búsqueda del lector de código de barras)."""
+import pytest
+
+from src.controllers.inventario_controller import InventarioController
+
+
+@pytest.fixture
+def controller(carpeta_temporal):
+    controller = InventarioController(str(carpeta_temporal / 'inventario.db'))
+    exito, _ = controller.crear_producto('P001', 'Cuaderno', 'Papelería', 10.0, 50)
+    assert exito
+    yield controller
+    controller.db.cola_escritura.cerrar()
+
+
+def id_de(controller, codigo):
+    return controller.db.execute_query('SELECT id FROM productos WHERE codigo = ?', (codigo,))[0]['id']
+
+
+def test_busqueda_normaliza_el_codigo(controller):
+    producto_id = id_de(controller, 'P001')
+
+    assert controller.buscar_id_por_codigo(' p001 ') == producto_id
+    assert controller.obtener_producto_por_codigo('P001')['nombre'] == 'Cuaderno'
+    assert controller.buscar_id_por_codigo('P999') is None
+    assert controller.buscar_id_por_codigo(None) is None
+
+
+def test_crear_invalida_el_indice(controller):
+    assert controller.buscar_id_por_codigo('P002') is None
+
+    controller.crear_producto('P002', 'Lápiz', 'Papelería', 1.0, 50)
+
+    assert controller.buscar_id_por_codigo('P002') == id_de(controller, 'P002')
+
+
+def test_editar_invalida_el_indice(controller):
+    producto_id = id_de(controller, 'P001')
+    assert controller.buscar_id_por_codigo('P001') == producto_id
+
+    exito, _ = controller.actualizar_producto(producto_id, 'C-100', 'Cuaderno', 'Papelería', 10.0, 50)
+
+    assert exito
+    assert controller.buscar_id_por_codigo('P001') is None
+    assert controller.buscar_id_por_codigo('C-100') == producto_id
+
+
+def test_desactivar_y_activar_invalidan_el_indice(controller):
+    producto_id = id_de(controller, 'P001')
+    assert controller.buscar_id_por_codigo('P001') == producto_id
+
+    controller.cambiar_estado_producto(producto_id, False)
+    assert controller.buscar_id_por_codigo('P001') is None
+
+    controller.cambiar_estado_producto(producto_id, True)
+    assert controller.buscar_id_por_codigo('P001') == producto_id
+
+
+def test_eliminar_invalida_el_indice(controller):
+    producto_id = id_de(controller, 'P001')
+    assert controller.buscar_id_por_codigo('P001') == producto_id
+
+    exito, _ = controller.eliminar_producto(producto_id)
+
+    assert exito
+    assert controller.buscar_id_por_codigo('P001') is None
+
+
+def test_cambio_de_stock_conserva_el_indice(controller):
+    controller.buscar_id_por_codigo('P001')
+    indice = controller._indice_codigos
+
+    controller.emitir('product_changed', producto_id=id_de(controller, 'P001'), accion='stock')
+
+    assert controller._indice_codigos is indice
@@ -0,0 +1,59 @@
+"""Pruebas de la instrumentación: las filas leídas iterando el cursor también se miden."""
+import sqlite3
+
+from src.database import respaldo
+from src.database.database_manager import DatabaseManager
+from src.database.instrumentacion import ConexionInstrumentada, Instrumentacion
+
+
+def conexion():
+    conn = sqlite3.connect(':memory:', factory=ConexionInstrumentada)
+    conn.instrumentacion = Instrumentacion()
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.executemany('INSERT INTO t VALUES (?)', [(i,) for i in range(5)])
+    return conn
+
+
+def estadistica(conn, sql):
+    return next(fila for fila in conn.instrumentacion.resumen() if fila['sql'] == sql)
+
+
+def test_iterar_el_cursor_cuenta_filas_y_cierra_la_medicion():
+    conn = conexion()
+
+    assert [fila[0] for fila in conn.execute('SELECT x FROM t')] == [0, 1, 2, 3, 4]
+
+    medida = estadistica(conn, 'SELECT x FROM t')
+    assert medida['conteo'] == 1
+    assert medida['filas'] == 5
+    assert not conn._cursores_pendientes
+
+
+def test_iteracion_interrumpida_se_registra_al_cerrar():
+    conn = conexion()
+    for fila in conn.execute('SELECT x FROM t'):
+        if fila[0] == 1:
+            break
+    conn.close()
+
+    assert estadistica(conn, 'SELECT x FROM t')['filas'] == 2
+
+
+def test_respaldo_abre_la_base_en_uso_con_el_gestor(carpeta_temporal):
+    db = DatabaseManager(str(carpeta_temporal / 'inventario.db'))
+    abiertas = []
+    conectar = db._conectar
+
+    def conectar_contando(**opciones):
+        conn = conectar(**opciones)
+        abiertas.append(type(conn))
+        return conn
+
+    try:
+        resultado = respaldo.crear_respaldo(db.db_path, str(carpeta_temporal / 'respaldos'),
+                                            conectar=conectar_contando)
+        respaldo.restaurar_respaldo(resultado['ruta'], db.db_path, conectar=conectar_contando)
+    finally:
+        db.cola_escritura.cerrar()
+
+    assert abiertas == [ConexionInstrumentada, ConexionInstrumentada]
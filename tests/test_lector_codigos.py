@@ -0,0 +1,97 @@
+"""Pruebas de la detección de ráfagas del lector de código de barras (sin Tk: eventos simulados)."""
+from types import SimpleNamespace
+
+from src.ui.utils.lector_codigos import LectorCodigos
+
+
+class EntryFalso:
+    """Solo guarda el binding que registra el lector."""
+
+    def __init__(self):
+        self.bindings = {}
+
+    def bind(self, secuencia, funcion, add=None):
+        self.bindings[secuencia] = funcion
+
+
+def crear_lector():
+    leidos = []
+    entry = EntryFalso()
+    lector = LectorCodigos(entry, leidos.append)
+    return lector, entry.bindings['<KeyPress>'], leidos
+
+
+def tecla(caracter, tiempo, keysym=None):
+    return SimpleNamespace(char=caracter, keysym=keysym or caracter, time=tiempo)
+
+
+def teclear(funcion, texto, inicio, intervalo_ms):
+    """Envía cada carácter y luego Enter con intervalo_ms entre teclas; devuelve lo que retornó el Enter."""
+    tiempo = inicio
+    for caracter in texto:
+        funcion(tecla(caracter, tiempo))
+        tiempo += intervalo_ms
+    return funcion(tecla('\r', tiempo, keysym='Return'))
+
+
+def test_rafaga_terminada_en_enter_es_una_lectura():
+    lector, funcion, leidos = crear_lector()
+
+    resultado = teclear(funcion, '7501031311309', 1000, 8)
+
+    assert leidos == ['7501031311309']
+    assert resultado == 'break'  # el Enter no llega a otros bindings
+    assert lector.lecturas == 1
+    assert not lector.en_rafaga()
+
+
+def test_tecleo_humano_no_es_una_lectura():
+    lector, funcion, leidos = crear_lector()
+
+    resultado = teclear(funcion, 'P001', 1000, 150)
+
+    assert leidos == []
+    assert resultado is None
+    assert lector.lecturas == 0
+
+
+def test_limite_de_40_ms():
+    _, funcion, leidos = crear_lector()
+    assert teclear(funcion, 'ABC', 1000, 40) == 'break'
+    assert teclear(funcion, 'DEF', 5000, 41) is None
+    assert leidos == ['ABC']
+
+
+def test_codigo_corto_no_es_una_lectura():
+    _, funcion, leidos = crear_lector()
+
+    assert teclear(funcion, 'AB', 1000, 5) is None
+    assert leidos == []
+
+
+def test_pausa_antes_de_la_rafaga_descarta_lo_tecleado():
+    _, funcion, leidos = crear_lector()
+    funcion(tecla('x', 1000))
+    funcion(tecla('y', 1500))
+
+    teclear(funcion, '12345', 3000, 5)
+
+    assert leidos == ['12345']
+
+
+def test_shift_no_corta_la_rafaga_y_borrar_si():
+    lector, funcion, leidos = crear_lector()
+    funcion(tecla('A', 1000))
+    funcion(tecla('', 1003, keysym='Shift_L'))
+    funcion(tecla('B', 1006))
+    funcion(tecla('C', 1009))
+    assert lector.en_rafaga()
+    funcion(tecla('\r', 1012, keysym='Return'))
+    assert leidos == ['ABC']
+
+    funcion(tecla('1', 2000))
+    funcion(tecla('2', 2005))
+    funcion(tecla('\x08', 2010, keysym='BackSpace'))
+    funcion(tecla('3', 2015))
+    assert funcion(tecla('\r', 2020, keysym='Return')) is None
+    assert leidos == ['ABC']
@@ -0,0 +1,100 @@
+"""Pruebas del log de cambios por fila: triggers, lectura incremental y poda."""
+import pytest
+
+from src.controllers.inventario_controller import InventarioController
+from src.database.migraciones import TABLAS_CON_LOG
+
+
+@pytest.fixture
+def controller(carpeta_temporal):
+    controller = InventarioController(str(carpeta_temporal / 'inventario.db'))
+    yield controller
+    controller.db.cola_escritura.cerrar()
+
+
+def registrados(cambios):
+    return [(cambio['tabla'], cambio['operacion']) for cambio in cambios]
+
+
+def test_triggers_para_cada_tabla_registrada(controller):
+    triggers = {fila['name'] for fila in controller.db.execute_query(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_cambios_%'")}
+
+    for tabla in TABLAS_CON_LOG + ('clientes', 'proveedores'):
+        for evento in ('insert', 'update', 'delete'):
+            assert f'trg_cambios_{tabla}_{evento}' in triggers
+
+
+def test_insertar_actualizar_y_eliminar_avanzan_la_secuencia(controller):
+    seq = controller.ultima_secuencia_cambios()
+
+    controller.crear_producto('P001', 'Cuaderno', 'Papelería', 10.0, 50)
+    cambios, seq = controller.cambios_desde(seq)
+    assert registrados(cambios) == [('productos', 'I')]
+    producto_id = cambios[0]['fila_id']
+
+    controller.actualizar_producto(producto_id, 'P001', 'Cuaderno rayado', 'Papelería', 10.0, 50)
+    cambios, seq = controller.cambios_desde(seq)
+    assert registrados(cambios) == [('productos', 'U')]
+
+    controller.eliminar_producto(producto_id)
+    cambios, seq = controller.cambios_desde(seq)
+    assert ('productos', 'D') in registrados(cambios)
+    assert all(cambio['fila_id'] == producto_id for cambio in cambios if cambio['tabla'] == 'productos')
+
+    # Sin escrituras nuevas no hay cambios y la secuencia se conserva
+    assert controller.cambios_desde(seq) == ([], seq)
+
+
+def test_limite_y_lectura_en_varias_llamadas(controller):
+    seq = controller.ultima_secuencia_cambios()
+    for numero in range(5):
+        controller.crear_producto(f'P00{numero}', f'Producto {numero}', 'Papelería', 10.0, 50)
+
+    primeros, seq_intermedia = controller.cambios_desde(seq, limite=3)
+    resto, _ = controller.cambios_desde(seq_intermedia, limite=3)
+
+    assert len(primeros) == 3
+    assert len(resto) == 2
+    assert [cambio['seq'] for cambio in primeros + resto] == sorted(cambio['seq'] for cambio in primeros + resto)
+    assert seq_intermedia == primeros[-1]['seq']
+
+
+def test_movimientos_encolados_aparecen_despues_de_vaciar_la_cola(controller):
+    controller.crear_producto('P001', 'Cuaderno', 'Papelería', 10.0, 50)
+    seq = controller.ultima_secuencia_cambios()
+
+    controller.db.registrar_movimiento_stock(1, 'ajuste', 3, 'conteo')
+    assert controller.db.cola_escritura.pendientes() == 1
+
+    cambios, _ = controller.cambios_desde(seq)
+
+    assert registrados(cambios) == [('movimientos_stock', 'I')]
+    assert controller.db.cola_escritura.pendientes() == 0
+
+
+def test_podar_conserva_lo_no_exportado(controller):
+    for numero in range(4):
+        controller.crear_producto(f'P00{numero}', f'Producto {numero}', 'Papelería', 10.0, 50)
+    seqs = [cambio['seq'] for cambio in controller.cambios_desde(0)[0]]
+    controller.db.execute_update("UPDATE cambios SET fecha = datetime('now', '-40 days')")
+    controller.db.execute_update(
+        "INSERT INTO replicacion_estado (clave, valor) VALUES ('ultimo_seq_exportado', ?)", (str(seqs[1]),))
+
+    exito, mensaje = controller.podar_cambios(30)
+
+    assert exito
+    assert '2 registros' in mensaje
+    assert [cambio['seq'] for cambio in controller.cambios_desde(0)[0]] == seqs[2:]
+
+
+def test_podar_sin_replicacion_respeta_los_dias(controller):
+    for numero in range(3):
+        controller.crear_producto(f'P00{numero}', f'Producto {numero}', 'Papelería', 10.0, 50)
+    seqs = [cambio['seq'] for cambio in controller.cambios_desde(0)[0]]
+    controller.db.execute_update("UPDATE cambios SET fecha = datetime('now', '-40 days') WHERE seq = ?",
+                                 (seqs[0],))
+
+    controller.podar_cambios(30)
+
+    assert [cambio['seq'] for cambio in controller.cambios_desde(0)[0]] == seqs[1:]
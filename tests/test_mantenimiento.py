@@ -0,0 +1,61 @@
+"""Pruebas del mantenimiento: corre en su propio hilo y con las conexiones del gestor."""
+import threading
+
+from src.database.database_manager import DatabaseManager
+from src.database.ejecutor import EjecutorBD
+
+
+def test_mantenimiento_no_retrasa_las_escrituras():
+    ejecutor = EjecutorBD()
+    liberar = threading.Event()
+    try:
+        mantenimiento = ejecutor.mantener(liberar.wait, 5)
+        escritura = ejecutor.escribir(lambda: 'venta')
+
+        # La escritura termina mientras el mantenimiento sigue en curso
+        assert escritura.result(timeout=1) == 'venta'
+        assert not mantenimiento.done()
+    finally:
+        liberar.set()
+        ejecutor.cerrar()
+    assert mantenimiento.result(timeout=1) is True
+
+
+def test_mantenimientos_de_uno_en_uno():
+    ejecutor = EjecutorBD()
+    en_curso = []
+    maximo = []
+
+    def tarea():
+        en_curso.append(1)
+        maximo.append(len(en_curso))
+        threading.Event().wait(0.05)
+        en_curso.pop()
+
+    futuros = [ejecutor.mantener(tarea) for _ in range(3)]
+    for futuro in futuros:
+        futuro.result(timeout=2)
+    ejecutor.cerrar()
+    assert max(maximo) == 1
+
+
+def test_mantenimiento_usa_las_conexiones_del_gestor(carpeta_temporal):
+    db = DatabaseManager(str(carpeta_temporal / 'inventario.db'))
+    conexiones = []
+    conectar = db._conectar
+
+    def conectar_contando(**opciones):
+        conexiones.append(opciones)
+        return conectar(**opciones)
+
+    db._conectar = conectar_contando
+    try:
+        reporte = db.ejecutar_mantenimiento(completo=True)
+    finally:
+        db.cola_escritura.cerrar()
+
+    assert reporte['integridad'] == 'ok'
+    # La del mantenimiento (sin transacción implícita) y la del registro
+    assert len(conexiones) >= 2
+    assert conexiones[0]['isolation_level'] is None
+    assert db.obtener_ultimo_mantenimiento() is not None
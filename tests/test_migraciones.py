@@ -0,0 +1,77 @@
+"""Pruebas de las migraciones: de una base vacía a la versión actual, una vez y con dos terminales a la vez."""
+import sqlite3
+import threading
+
+from src.database import migraciones
+from src.database.database_manager import DatabaseManager
+
+VERSIONES = [version for version, _, _ in migraciones.MIGRACIONES]
+
+
+def conectar(ruta):
+    return sqlite3.connect(ruta, isolation_level=None, timeout=30, check_same_thread=False)
+
+
+def versiones_registradas(ruta):
+    conn = sqlite3.connect(ruta)
+    try:
+        return [fila[0] for fila in conn.execute('SELECT version FROM schema_version ORDER BY version')]
+    finally:
+        conn.close()
+
+
+def test_base_nueva_migra_hasta_la_ultima_version_una_sola_vez(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'inventario.db')
+
+    primera = DatabaseManager(ruta)
+    segunda = DatabaseManager(ruta)
+
+    assert [paso['version'] for paso in primera.reporte_migraciones] == VERSIONES
+    assert segunda.reporte_migraciones == []
+    assert versiones_registradas(ruta) == VERSIONES
+    for manager in (primera, segunda):
+        manager.cola_escritura.cerrar()
+
+
+def test_version_leida_antes_del_bloqueo_no_repite_migraciones(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'inventario.db')
+    conn1, conn2 = conectar(ruta), conectar(ruta)
+    # Las dos terminales leyeron la versión 0 antes de que alguna migrara
+    assert migraciones.version_actual(conn1) == migraciones.version_actual(conn2) == 0
+
+    reporte1 = migraciones.aplicar_migraciones(conn1, 0)
+    reporte2 = migraciones.aplicar_migraciones(conn2, 0)
+
+    assert [paso['version'] for paso in reporte1] == VERSIONES
+    assert reporte2 == []
+    assert versiones_registradas(ruta) == VERSIONES
+    conn1.close()
+    conn2.close()
+
+
+def test_dos_conexiones_migrando_a_la_vez(carpeta_temporal):
+    ruta = str(carpeta_temporal / 'inventario.db')
+    barrera = threading.Barrier(2)
+    reportes, errores = [], []
+
+    def terminal():
+        conn = conectar(ruta)
+        try:
+            version = migraciones.version_actual(conn)
+            barrera.wait()
+            reportes.append(migraciones.aplicar_migraciones(conn, version))
+        except Exception as e:
+            errores.append(e)
+        finally:
+            conn.close()
+
+    hilos = [threading.Thread(target=terminal) for _ in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == []
+    assert sorted(len(reporte) for reporte in reportes) == [0, len(VERSIONES)]
+    assert versiones_registradas(ruta) == VERSIONES
+
@@ -0,0 +1,64 @@
+"""Pruebas del monitor de cambios: solo se descuentan las escrituras de esta terminal."""
+import sqlite3
+
+import pytest
+
+from src.database.database_manager import DatabaseManager
+from src.database.monitor_cambios import MonitorCambios
+
+CREAR_CLIENTE = "INSERT INTO clientes (nombre, nit_dpi, direccion) VALUES (?, ?, 'Cobán')"
+
+
+@pytest.fixture
+def terminal(carpeta_temporal):
+    db = DatabaseManager(str(carpeta_temporal / 'inventario.db'))
+    monitor = MonitorCambios(db.db_path)
+    db.al_confirmar_escritura = monitor.registrar_escritura_local
+    yield db, monitor
+    monitor.cerrar()
+    db.cola_escritura.cerrar()
+
+
+def escribir_desde_otra_terminal(ruta, nombre):
+    conn = sqlite3.connect(ruta)
+    conn.execute(CREAR_CLIENTE, (nombre, nombre))
+    conn.commit()
+    conn.close()
+
+
+def test_escritura_local_absorbida_no_se_reporta(terminal):
+    db, monitor = terminal
+    db.execute_insert(CREAR_CLIENTE, ('Ana', '1'))
+    monitor.absorber(['clientes'])
+
+    assert monitor.revisar() == set()
+
+
+def test_escritura_local_sin_absorber_se_reporta(terminal):
+    db, monitor = terminal
+    db.execute_insert(CREAR_CLIENTE, ('Ana', '1'))
+
+    assert monitor.revisar() == {'clientes'}
+    assert monitor.revisar() == set()
+
+
+def test_cambio_externo_entre_la_escritura_y_absorber_se_reporta(terminal):
+    db, monitor = terminal
+    db.execute_insert(CREAR_CLIENTE, ('Ana', '1'))
+    escribir_desde_otra_terminal(db.db_path, 'Beto')
+    monitor.absorber(['clientes'])
+
+    assert monitor.revisar() == {'clientes'}
+
+
+def test_cambio_externo_antes_de_la_escritura_local_se_reporta(terminal):
+    db, monitor = terminal
+    escribir_desde_otra_terminal(db.db_path, 'Beto')
+    db.execute_insert(CREAR_CLIENTE, ('Ana', '1'))
+    monitor.absorber(['clientes'])
+
+    assert monitor.revisar() == {'clientes'}
+    # Lo local ya se descontó: no queda nada para la siguiente revisión
+    db.execute_insert(CREAR_CLIENTE, ('Carla', '3'))
+    monitor.absorber(['clientes'])
+    assert monitor.revisar() == set()
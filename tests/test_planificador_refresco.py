@@ -0,0 +1,84 @@
+"""Pruebas del planificador de refrescos con un after_idle simulado (sin Tk)."""
+from src.ui.utils.planificador_refresco import PlanificadorRefresco
+
+
+class RaizFalsa:
+    """Guarda lo programado con after_idle para ejecutarlo a mano."""
+
+    def __init__(self):
+        self.ociosos = []
+
+    def after_idle(self, funcion):
+        self.ociosos.append(funcion)
+
+    def ciclo_ocioso(self):
+        ociosos, self.ociosos = self.ociosos, []
+        for funcion in ociosos:
+            funcion()
+
+
+def crear_planificador(visible='ventas'):
+    raiz = RaizFalsa()
+    desactualizadas = []
+    estado = {'visible': visible}
+    planificador = PlanificadorRefresco(raiz, lambda: estado['visible'], desactualizadas.append)
+    return planificador, raiz, desactualizadas
+
+
+def test_misma_clave_se_ejecuta_una_vez_con_la_ultima_funcion():
+    planificador, raiz, _ = crear_planificador()
+    ejecutadas = []
+
+    for numero in range(5):
+        planificador.programar('ventas', ('fila', 1), lambda numero=numero: ejecutadas.append(numero))
+    planificador.programar('ventas', 'saldo', lambda: ejecutadas.append('saldo'))
+
+    assert ejecutadas == []
+    assert len(raiz.ociosos) == 1  # un solo pase ocioso para todo
+    assert planificador.pendiente()
+
+    raiz.ciclo_ocioso()
+
+    assert ejecutadas == [4, 'saldo']
+    assert not planificador.pendiente()
+    assert planificador.ultimo_pase['tareas'] == 2
+
+
+def test_pestanas_ocultas_se_marcan_desactualizadas():
+    planificador, raiz, desactualizadas = crear_planificador(visible='ventas')
+    ejecutadas = []
+
+    planificador.programar('inventario', ('fila', 1), lambda: ejecutadas.append('inventario'))
+    planificador.programar('caja', 'saldo', lambda: ejecutadas.append('caja'))
+    planificador.programar('ventas', ('fila', 2), lambda: ejecutadas.append('ventas'))
+    raiz.ciclo_ocioso()
+
+    assert ejecutadas == ['ventas']
+    assert desactualizadas == ['inventario', 'caja']
+    assert planificador.ultimo_pase['visible'] == 'ventas'
+
+
+def test_un_error_no_detiene_el_pase():
+    planificador, raiz, _ = crear_planificador()
+    ejecutadas = []
+
+    def falla():
+        raise RuntimeError('fila borrada')
+
+    planificador.programar('ventas', 'a', falla)
+    planificador.programar('ventas', 'b', lambda: ejecutadas.append('b'))
+    raiz.ciclo_ocioso()
+
+    assert ejecutadas == ['b']
+
+
+def test_programar_despues_del_pase_abre_otro_pase():
+    planificador, raiz, _ = crear_planificador()
+    ejecutadas = []
+
+    planificador.programar('ventas', 'a', lambda: ejecutadas.append(1))
+    raiz.ciclo_ocioso()
+    planificador.programar('ventas', 'a', lambda: ejecutadas.append(2))
+    raiz.ciclo_ocioso()
+
+    assert ejecutadas == [1, 2]
@@ -0,0 +1,61 @@
+"""Pruebas del recibo para impresora térmica (con la impresora falsa MemoriaSink)."""
+import pytest
+
+from src.ui.utils.recibo_termico import (
+    CMD_CORTE_PARCIAL, CMD_INICIALIZAR, COLUMNAS_POR_ANCHO, MemoriaSink, ReciboTermico, venta_de_prueba
+)
+
+
+def generador(ancho_mm=80):
+    return ReciboTermico(empresa_nombre="Librería Ñandú", empresa_direccion="Cobán, Alta Verapaz",
+                         empresa_telefono="5555-0000", ancho_mm=ancho_mm)
+
+
+@pytest.mark.parametrize('ancho_mm', sorted(COLUMNAS_POR_ANCHO))
+def test_texto_respeta_el_ancho_del_papel(ancho_mm):
+    sink = MemoriaSink()
+    exito, mensaje = generador(ancho_mm).imprimir(venta_de_prueba(), sink, formato='texto')
+
+    assert exito, mensaje
+    assert mensaje.endswith("memoria")
+    assert len(sink.trabajos) == 1
+    lineas = sink.trabajos[0].decode('utf-8').splitlines()
+    assert max(len(linea) for linea in lineas) <= COLUMNAS_POR_ANCHO[ancho_mm]
+    assert any(linea.startswith("TOTAL:") and linea.endswith("Q 30.25") for linea in lineas)
+    assert any(linea.startswith("Cambio:") and linea.endswith("Q 19.75") for linea in lineas)
+
+
+def test_escpos_inicializa_corta_y_codifica_en_cp1252():
+    sink = MemoriaSink()
+    exito, mensaje = generador().imprimir(venta_de_prueba(), sink)
+
+    assert exito, mensaje
+    datos = sink.trabajos[0]
+    assert datos.startswith(CMD_INICIALIZAR)
+    assert datos.endswith(CMD_CORTE_PARCIAL)
+    assert "LIBRERÍA ÑANDÚ".encode('cp1252') in datos
+    assert "Lápiz HB (niño/niña)".encode('cp1252') in datos
+
+
+def test_venta_anulada_se_marca_sin_validez():
+    venta = dict(venta_de_prueba(), estado='Anulado')
+    texto = generador(58).generar_texto(venta)
+
+    assert "RECIBO ANULADO" in texto
+    assert "*** SIN VALIDEZ ***" in texto
+
+
+def test_error_del_destino_se_devuelve_sin_excepcion():
+    class SinPapel(MemoriaSink):
+        def enviar(self, datos):
+            raise OSError("sin papel")
+
+    exito, mensaje = generador().imprimir(venta_de_prueba(), SinPapel())
+
+    assert not exito
+    assert "sin papel" in mensaje
+
+
+def test_ancho_no_soportado():
+    with pytest.raises(ValueError):
+        generador(ancho_mm=76)
@@ -0,0 +1,106 @@
+"""Pruebas de replicación con dos terminales y una carpeta local como carpeta de intercambio."""
+import json
+import os
+import shutil
+
+import pytest
+
+from src.controllers.inventario_controller import InventarioController
+from src.database.replicacion import INTENTOS_ANTES_DE_CUARENTENA, Replicador
+
+FECHA = '15/03/2024 10:00:00'
+
+
+@pytest.fixture
+def terminales(carpeta_temporal):
+    """Dos terminales que parten de la misma copia: un producto con una compra de 10."""
+    base = InventarioController(str(carpeta_temporal / 'base.db'))
+    base.crear_producto('P001', 'Cuaderno', 'Papelería', 10.0, 50)
+    base.crear_proveedor('Distribuidora', '1234567', 'Cobán')
+    base.crear_cliente('Ana', '7654321', 'Cobán')
+    base.registrar_compra(1, 10, 10.0, 1, 'F-1', '01/03/2024 09:00:00')
+    base.db.cola_escritura.cerrar()
+
+    intercambio = str(carpeta_temporal / 'intercambio')
+    terminales = []
+    for numero in (1, 2):
+        ruta = str(carpeta_temporal / f'terminal{numero}.db')
+        shutil.copy(base.db.db_path, ruta)
+        controller = InventarioController(ruta)
+        controller.replicador = Replicador(controller.db, intercambio, numero)
+        controller.replicador.preparar()
+        terminales.append(controller)
+    yield terminales
+    for controller in terminales:
+        controller.db.cola_escritura.cerrar()
+
+
+def vender(controller, cantidad):
+    carrito = [{'producto_id': 1, 'cantidad': cantidad, 'precio_unitario': 15.0}]
+    exito, mensaje, _ = controller.registrar_venta_con_carrito(1, carrito, FECHA)
+    assert exito, mensaje
+
+
+def sincronizar(terminales):
+    for controller in terminales:
+        controller.replicador.exportar()
+    for controller in terminales:
+        controller.replicador.importar()
+
+
+def disponible(controller):
+    return controller.db.execute_query(
+        'SELECT SUM(COALESCE(cantidad_disponible, cantidad)) AS n FROM compras WHERE producto_id = 1')[0]['n']
+
+
+def test_ventas_simultaneas_descuentan_stock_y_peps_en_ambas(terminales):
+    t1, t2 = terminales
+    vender(t1, 3)
+    vender(t2, 4)
+
+    sincronizar(terminales)
+
+    for controller in terminales:
+        assert controller.db.obtener_producto_por_id(1)['stock_actual'] == 3
+        # La compra existente no toma el cantidad_disponible de la otra terminal
+        assert disponible(controller) == 3
+
+
+def test_compra_nueva_con_venta_en_el_mismo_lote(terminales):
+    t1, t2 = terminales
+    t1.registrar_compra(1, 5, 12.0, 1, 'F-2', '10/03/2024 09:00:00')
+    vender(t1, 12)  # agota la compra inicial y toma 2 de la nueva
+    vender(t2, 1)
+
+    sincronizar(terminales)
+
+    for controller in terminales:
+        assert controller.db.obtener_producto_por_id(1)['stock_actual'] == 2
+        assert disponible(controller) == 2
+
+
+def escribir_lote(carpeta, lote, cambios):
+    os.makedirs(carpeta, exist_ok=True)
+    with open(os.path.join(carpeta, f'{lote:08d}.json'), 'w', encoding='utf-8') as f:
+        json.dump({'terminal': 'T03', 'lote': lote, 'cambios': cambios}, f)
+
+
+def test_lote_que_siempre_falla_va_a_cuarentena(terminales):
+    t1, _ = terminales
+    carpeta = os.path.join(t1.replicador.carpeta, 'T03')
+    # Tabla desconocida: falla igual en cada intento
+    escribir_lote(carpeta, 1, [{'tabla': 'inexistente', 'op': 'U', 'id': 1, 'fila': {'id': 1}}])
+    escribir_lote(carpeta, 2, [{'tabla': 'clientes', 'op': 'I', 'id': 30_000_001,
+                                'fila': {'id': 30_000_001, 'nombre': 'Beto', 'nit_dpi': '111',
+                                         'direccion': 'Cobán'}}])
+
+    for _ in range(INTENTOS_ANTES_DE_CUARENTENA - 1):
+        assert t1.replicador.importar() == 0
+        assert t1.replicador.lotes_en_cuarentena() == {}
+
+    # Al último intento el lote se aparta y se aplica el siguiente
+    assert t1.replicador.importar() == 1
+    assert list(t1.replicador.lotes_en_cuarentena()) == ['T03:1']
+    assert os.path.exists(os.path.join(t1.replicador.carpeta_cuarentena(), 'T03_00000001.json'))
+    assert t1.db.obtener_cliente_por_id(30_000_001)['nombre'] == 'Beto'
+    assert t1.replicador.importar() == 0
@@ -0,0 +1,63 @@
+"""Pruebas de las hojas de los reportes general y de ventas (filtro de fechas en SQL, totales por columnas)."""
+import pytest
+
+from src.controllers.inventario_controller import InventarioController
+from src.controllers.reportes_exportacion import hojas_reporte_general, hojas_reporte_ventas
+
+
+@pytest.fixture
+def controller(carpeta_temporal):
+    controller = InventarioController(str(carpeta_temporal / 'inventario.db'))
+    controller.crear_producto('P001', 'Cuaderno', 'Papelería', 10.0, 50)
+    controller.crear_producto('P002', 'Lápiz', 'Papelería', 1.0, 50)
+    controller.crear_proveedor('Distribuidora', '1234567', 'Cobán')
+    controller.crear_cliente('Ana', '7654321', 'Cobán')
+    controller.registrar_compra(1, 20, 10.0, 1, 'F-1', '01/01/2024 09:00:00', True, '31/12/2099')
+    controller.registrar_compra(2, 3, 1.0, 1, 'F-2', '01/01/2024 09:00:00')
+    yield controller
+    controller.db.cola_escritura.cerrar()
+
+
+def vender(controller, fecha, cantidad=1):
+    exito, mensaje, _ = controller.registrar_venta_con_carrito(
+        1, [{'producto_id': 1, 'cantidad': cantidad, 'precio_unitario': 15.0}], fecha)
+    assert exito, mensaje
+
+
+def test_reporte_de_ventas_filtra_el_rango_y_suma_todas_sus_ventas(controller):
+    vender(controller, '28/02/2024 10:00:00')
+    vender(controller, '01/03/2024 08:00:00', 2)
+    vender(controller, '31/03/2024 23:59:59', 3)
+    vender(controller, '01/04/2024 00:00:00')
+    controller.anular_venta(3)
+    # Registro antiguo con fecha ISO
+    controller.db.execute_update("UPDATE ventas SET fecha = '2024-03-15 12:00:00' WHERE id = 2")
+
+    hojas, ventas, total = hojas_reporte_ventas(controller, '01/03/2024', '31/03/2024')
+
+    # El reporte incluye las anuladas, como antes (columna Estado)
+    assert ventas == 2
+    assert total == 75.0
+    filas = hojas['Ventas']
+    assert [fila['ID Venta'] for fila in filas[:-1]] == [3, 2]
+    assert filas[1]['Fecha'] == '15/03/2024'
+    assert filas[0]['Estado'] == 'Anulado'
+    assert filas[-1]['Subtotal'] == 'Q 75.00'
+    assert hojas['Top Productos'][0]['Producto'] == 'Cuaderno'
+
+
+def test_reporte_de_ventas_sin_ventas_en_el_rango(controller):
+    vender(controller, '28/02/2024 10:00:00')
+
+    assert hojas_reporte_ventas(controller, '01/03/2024', '31/03/2024') == ({}, 0, 0.0)
+
+
+def test_reporte_general_filtra_stock_bajo_y_perecederos_en_sql(controller):
+    vender(controller, '01/03/2024 08:00:00')
+
+    hojas, con_vencimiento = hojas_reporte_general(controller)
+
+    assert [p['nombre'] for p in hojas['Stock Bajo']] == ['Lápiz']
+    assert con_vencimiento == 1
+    assert hojas['Estado Vencimientos'][0]['Producto'] == 'Cuaderno'
+    assert hojas['Ventas por Mes'][0]['Período'] == '03/2024'
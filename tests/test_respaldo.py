@@ -0,0 +1,39 @@
+"""Pruebas de la carpeta de respaldos: por defecto junto a la base de datos, no en la carpeta actual."""
+import os
+
+from src.config.settings import Settings
+from src.controllers.inventario_controller import InventarioController
+
+
+def test_carpeta_por_defecto_junto_a_la_base(carpeta_temporal):
+    ruta = carpeta_temporal / 'compartida' / 'inventario.db'
+
+    assert Settings.get_respaldos(str(ruta))['carpeta'] == str(carpeta_temporal / 'compartida' / 'respaldos')
+
+
+def test_valor_por_defecto_anterior_tambien_va_junto_a_la_base(carpeta_temporal):
+    config = Settings.load_config()
+    config['carpeta_respaldos'] = 'data/respaldos'
+    Settings.save_config(config)
+    ruta = carpeta_temporal / 'compartida' / 'inventario.db'
+
+    assert Settings.get_respaldos(str(ruta))['carpeta'] == str(carpeta_temporal / 'compartida' / 'respaldos')
+
+
+def test_carpeta_configurada_se_respeta(carpeta_temporal):
+    Settings.set_respaldos(str(carpeta_temporal / 'otra'), cada_horas=6)
+
+    assert Settings.get_respaldos('x.db') == {'carpeta': str(carpeta_temporal / 'otra'), 'cada_horas': 6}
+
+
+def test_crear_respaldo_usa_la_carpeta_de_la_base(carpeta_temporal):
+    os.makedirs(carpeta_temporal / 'compartida')
+    controller = InventarioController(str(carpeta_temporal / 'compartida' / 'inventario.db'))
+    try:
+        exito, mensaje = controller.crear_respaldo()
+        assert exito, mensaje
+        respaldos = controller.obtener_respaldos()
+        assert len(respaldos) == 1
+        assert os.path.dirname(respaldos[0]['ruta']) == str(carpeta_temporal / 'compartida' / 'respaldos')
+    finally:
+        controller.db.cola_escritura.cerrar()
@@ -0,0 +1,38 @@
+"""Pruebas del registro de trazas: apagado por defecto y encendido con activar()."""
+import pytest
+
+from src.utils import trazas
+
+
+@pytest.fixture(autouse=True)
+def restaurar_estado():
+    activo = trazas.activo
+    yield
+    trazas.activar(activo)
+
+
+def nombres():
+    return [evento['name'] for evento in trazas.eventos()]
+
+
+def test_apagado_por_defecto_no_registra_nada():
+    assert trazas.activo is False
+
+    with trazas.traza('prueba apagada'):
+        pass
+
+    assert 'prueba apagada' not in nombres()
+
+
+def test_activar_registra_intervalos_anidados():
+    trazas.activar()
+
+    with trazas.traza('exterior'):
+        with trazas.traza('interior'):
+            pass
+    trazas.activar(False)
+    with trazas.traza('despues de apagar'):
+        pass
+
+    assert {'exterior', 'interior'} <= set(nombres())
+    assert 'despues de apagar' not in nombres()
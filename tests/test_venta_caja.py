@@ -0,0 +1,118 @@
+"""Pruebas de atomicidad: una venta, una anulación o una compra confirmada siempre tiene su movimiento de caja."""
+import sqlite3
+
+import pytest
+
+from src.controllers.inventario_controller import InventarioController
+
+FECHA = '15/03/2024 10:00:00'
+
+
+@pytest.fixture
+def controller(carpeta_temporal):
+    controller = InventarioController(str(carpeta_temporal / 'inventario.db'))
+    exito, _ = controller.crear_producto('P001', 'Cuaderno', 'Papelería', 10.0, 50)
+    assert exito
+    exito, _ = controller.crear_proveedor('Distribuidora', '1234567', 'Cobán')
+    assert exito
+    exito, _, cliente_id = controller.crear_cliente('Ana', '7654321', 'Cobán')
+    assert exito
+    controller.producto_id = controller.db.execute_query('SELECT id FROM productos')[0]['id']
+    controller.proveedor_id = controller.db.execute_query('SELECT id FROM proveedores')[0]['id']
+    controller.cliente_id = cliente_id
+    yield controller
+    controller.db.cola_escritura.cerrar()
+
+
+def bloquear_caja(controller):
+    """Hace fallar cualquier INSERT en movimientos_caja."""
+    conn = sqlite3.connect(controller.db.db_path)
+    conn.execute('''
+        CREATE TRIGGER caja_falla BEFORE INSERT ON movimientos_caja
+        BEGIN SELECT RAISE(ABORT, 'caja no disponible'); END
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def contar(controller, tabla):
+    return controller.db.execute_query(f'SELECT COUNT(*) AS n FROM {tabla}')[0]['n']
+
+
+def vender(controller):
+    carrito = [{'producto_id': controller.producto_id, 'cantidad': 2, 'precio_unitario': 15.0}]
+    return controller.registrar_venta_con_carrito(controller.cliente_id, carrito, FECHA)
+
+
+def test_venta_registra_su_ingreso_en_caja(controller):
+    controller.registrar_compra(controller.producto_id, 10, 10.0, controller.proveedor_id, 'F-1', FECHA)
+    eventos = []
+    ventas = []
+    controller.suscribir('cash_moved', lambda **datos: eventos.append(datos))
+    controller.suscribir('sale_added', lambda **datos: ventas.append(datos))
+
+    exito, _, venta_id = vender(controller)
+
+    assert exito
+    assert venta_id == 1
+    assert ventas == [{'venta_id': venta_id}]
+    movimiento = controller.db.execute_query(
+        "SELECT * FROM movimientos_caja WHERE categoria = 'VENTA'")[0]
+    assert movimiento['monto'] == 30.0
+    assert movimiento['concepto'].startswith('Venta #1 (REF000001)')
+    assert eventos == [{'movimiento_id': movimiento['id'], 'accion': 'crear'}]
+
+
+def test_fallo_en_caja_deshace_la_venta(controller):
+    controller.registrar_compra(controller.producto_id, 10, 10.0, controller.proveedor_id, 'F-1', FECHA)
+    bloquear_caja(controller)
+
+    exito, mensaje, venta_id = vender(controller)
+
+    assert not exito
+    assert venta_id is None
+    assert 'caja no disponible' in mensaje
+    assert contar(controller, 'ventas') == 0
+    assert contar(controller, 'ventas_detalle') == 0
+    assert controller.db.obtener_producto_por_id(controller.producto_id)['stock_actual'] == 10
+
+
+def test_fallo_en_caja_deshace_la_anulacion(controller):
+    controller.registrar_compra(controller.producto_id, 10, 10.0, controller.proveedor_id, 'F-1', FECHA)
+    exito, _, _ = vender(controller)
+    assert exito
+    bloquear_caja(controller)
+
+    exito, _ = controller.anular_venta(1)
+
+    assert not exito
+    assert controller.db.obtener_venta_por_id(1)['estado'] != 'Anulado'
+    assert controller.db.obtener_producto_por_id(controller.producto_id)['stock_actual'] == 8
+
+
+def test_fallo_en_caja_deshace_la_compra(controller):
+    bloquear_caja(controller)
+
+    exito, _ = controller.registrar_compra(controller.producto_id, 10, 10.0, controller.proveedor_id,
+                                           'F-1', FECHA)
+
+    assert not exito
+    assert contar(controller, 'compras') == 0
+    assert controller.db.obtener_producto_por_id(controller.producto_id)['stock_actual'] == 0
+    assert controller.db.cola_escritura.pendientes() == 0
+    assert contar(controller, 'movimientos_stock') == 0
+
+
+def test_compra_registra_su_movimiento_de_stock_en_la_misma_transaccion(controller):
+    exito, _ = controller.registrar_compra(controller.producto_id, 10, 10.0, controller.proveedor_id,
+                                           'F-1', FECHA)
+
+    assert exito
+    # No pasa por la cola de escritura: ya está confirmado junto con la compra
+    assert controller.db.cola_escritura.pendientes() == 0
+    conn = sqlite3.connect(controller.db.db_path)
+    try:
+        movimientos = conn.execute('SELECT producto_id, tipo, cantidad, motivo FROM movimientos_stock').fetchall()
+    finally:
+        conn.close()
+    assert movimientos == [(controller.producto_id, 'entrada', 10, 'compra')]